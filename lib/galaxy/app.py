@@ -276,12 +276,12 @@ class MinimalGalaxyApplication(BasicSharedApp, HaltableContainer, SentryClientMi
     def _configure_genome_builds(self, data_table_name="__dbkeys__", load_old_style=True):
         self.genome_builds = GenomeBuilds(self, data_table_name=data_table_name, load_old_style=load_old_style)
 
-    def wait_for_toolbox_reload(self, old_toolbox):
+    def wait_for_toolbox_reload(self, old_reload_count):
         timer = ExecutionTimer()
         log.debug("Waiting for toolbox reload")
         # Wait till toolbox reload has been triggered (or more than 60 seconds have passed)
         while timer.elapsed < 60:
-            if self.toolbox.has_reloaded(old_toolbox):
+            if self.toolbox.has_reloaded(old_reload_count):
                 log.debug("Finished waiting for toolbox reload %s", timer)
                 break
             time.sleep(0.1)
@@ -158,7 +158,7 @@ class MockApp(di.Container, GalaxyDataTestApp):
     def toolbox(self) -> ToolBox:
         return self._toolbox
 
-    def wait_for_toolbox_reload(self, toolbox):
+    def wait_for_toolbox_reload(self, old_reload_count):
         # TODO: If the tpm test case passes, does the operation really
         # need to wait.
         return True
@@ -41,7 +41,7 @@ DEFAULT_TEST_REPO = REPO_TYPE("github.com", "galaxyproject", "example", "1", "1"
 class SimplifiedToolBox(ToolBox):
     def __init__(self, test_case: "BaseToolBoxTestCase"):
         app = test_case.app
-        app.watchers.tool_config_watcher.reload_callback = lambda: reload_callback(test_case)
+        app.watchers.tool_config_watcher.reload_callback = lambda changed_paths: reload_callback(test_case)
         # Handle app/config stuff needed by toolbox but not by tools.
         app.tool_cache = ToolCache() if not hasattr(app, "tool_cache") else app.tool_cache
         config_files = test_case.config_files
@@ -230,6 +230,7 @@ def setup_periodic_tasks(config, celery_app):
 
     beat_schedule: Dict[str, Dict[str, Any]] = {}
     schedule_task("prune_history_audit_table", config.history_audit_table_prune_interval)
+    schedule_task("reconcile_user_disk_usage", config.user_disk_usage_reconcile_interval)
     schedule_task("cleanup_short_term_storage", config.short_term_storage_cleanup_interval)
     schedule_task("cleanup_expired_notifications", config.expired_notifications_cleanup_interval)
 
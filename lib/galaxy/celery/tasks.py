@@ -43,6 +43,7 @@ from galaxy.model.scoped_session import galaxy_scoped_session
 from galaxy.objectstore import BaseObjectStore
 from galaxy.objectstore.caching import check_caches
 from galaxy.queue_worker import GalaxyQueueWorker
+from galaxy.quota import reconcile_user_disk_usage as reconcile_disk_usage
 from galaxy.schema.tasks import (
     ComputeDatasetHashTaskRequest,
     GenerateHistoryContentDownload,
@@ -461,6 +462,21 @@ def prune_history_audit_table(sa_session: galaxy_scoped_session):
     model.HistoryAudit.prune(sa_session)
 
 
+@galaxy_task(action="reconciling user disk usage")
+def reconcile_user_disk_usage(
+    sa_session: galaxy_scoped_session, object_store: BaseObjectStore, config: GalaxyAppConfiguration
+):
+    """Reconcile disk usage counters with the recorded usage adjustments and report drift."""
+    drifts = reconcile_disk_usage(
+        sa_session,
+        object_store,
+        max_users=config.user_disk_usage_reconcile_max_users,
+        sample_size=config.user_disk_usage_reconcile_sample_size,
+    )
+    if drifts:
+        log.info(f"Corrected drifted disk usage of {len({drift.user_id for drift in drifts})} users.")
+
+
 @galaxy_task(action="clean up short term storage")
 def cleanup_short_term_storage(storage_monitor: ShortTermStorageMonitor):
     """Cleanup short term storage."""
@@ -26,17 +26,24 @@ class ConfigWatchers:
         # If the reload_data_managers callback wins, the cache will miss the tools that had been removed from the cache
         # and will be blind to further changes in these tools.
 
-        def reload_toolbox():
+        def reload_toolbox(changed_paths=None):
             save_integrated_tool_panel = False
+            # Changed tool config files are reloaded incrementally if possible,
+            # other changes (e.g. to macros or tool files) reload the whole toolbox.
+            tool_conf_paths = changed_paths or None
             try:
                 # Run and wait for toolbox reload on the process that watches the config files.
                 # The toolbox reload will update the integrated_tool_panel_file
-                self.app.queue_worker.send_local_control_task("reload_toolbox", get_response=True),
+                self.app.queue_worker.send_local_control_task(
+                    "reload_toolbox", get_response=True, kwargs={"tool_conf_paths": tool_conf_paths}
+                ),
             except Exception:
                 save_integrated_tool_panel = True
                 log.exception("Exception occured while reloading toolbox")
             self.app.queue_worker.send_control_task(
-                "reload_toolbox", noop_self=True, kwargs={"save_integrated_tool_panel": save_integrated_tool_panel}
+                "reload_toolbox",
+                noop_self=True,
+                kwargs={"save_integrated_tool_panel": save_integrated_tool_panel, "tool_conf_paths": tool_conf_paths},
             ),
 
         self.tool_config_watcher = get_tool_conf_watcher(
@@ -44,7 +51,7 @@ class ConfigWatchers:
             tool_cache=self.app.tool_cache,
         )
         self.data_manager_config_watcher = get_tool_conf_watcher(
-            reload_callback=lambda: self.app.queue_worker.send_control_task("reload_data_managers"),
+            reload_callback=lambda changed_paths: self.app.queue_worker.send_control_task("reload_data_managers"),
         )
         self.tool_data_watcher = get_watcher(self.app.config, "watch_tool_data_dir", monitor_what_str="data tables")
         self.tool_watcher = get_tool_watcher(self, app.config)
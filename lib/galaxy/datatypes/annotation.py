@@ -10,6 +10,8 @@ from galaxy.datatypes.protocols import DatasetProtocol
 from galaxy.datatypes.sniff import (
     build_sniff_from_prefix,
     FilePrefix,
+    sniff_magic,
+    sniff_tar_archive,
 )
 from galaxy.util import nice_size
 
@@ -35,6 +37,7 @@ class SnapHmm(Text):
         except Exception:
             return f"SNAP HMM model ({nice_size(dataset.get_size())})"
 
+    @sniff_magic("zoeHMM")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         """
         SNAP model files start with zoeHMM
@@ -65,6 +68,7 @@ class Augustus(CompressedArchive):
         except Exception:
             return f"Augustus model ({nice_size(dataset.get_size())})"
 
+    @sniff_tar_archive
     def sniff(self, filename: str) -> bool:
         """
         Augustus archives always contain the same files
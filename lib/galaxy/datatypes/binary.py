@@ -77,6 +77,8 @@ from galaxy.datatypes.protocols import (
 from galaxy.datatypes.sniff import (
     build_sniff_from_prefix,
     FilePrefix,
+    sniff_magic,
+    sniff_tar_archive,
 )
 from galaxy.datatypes.text import Html
 from galaxy.util import (
@@ -172,6 +174,7 @@ class Idat(Binary):
     edam_format = "format_2058"
     edam_data = "data_2603"
 
+    @sniff_magic(b"IDAT")
     def sniff(self, filename: str) -> bool:
         try:
             header = open(filename, "rb").read(4)
@@ -294,6 +297,7 @@ class Meryldb(CompressedArchive):
 
     file_ext = "meryldb"
 
+    @sniff_tar_archive
     def sniff(self, filename: str) -> bool:
         """
         Try to guess if the file is a Cel file.
@@ -324,6 +328,7 @@ class Visium(CompressedArchive):
 
     file_ext = "visium.tar.gz"
 
+    @sniff_tar_archive
     def sniff(self, filename: str) -> bool:
         """
         Check data structure:
@@ -351,6 +356,7 @@ class Bref3(Binary):
         super().__init__(**kwd)
         self._magic = binascii.unhexlify("7a8874f400156272")
 
+    @sniff_magic(attribute="_magic")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         return file_prefix.startswith_bytes(self._magic)
 
@@ -1040,6 +1046,7 @@ class CRAM(Binary):
             dataset.peek = "file does not exist"
             dataset.blurb = "file purged from disk"
 
+    @sniff_magic(b"CRAM")
     def sniff(self, filename: str) -> bool:
         try:
             header = open(filename, "rb").read(4)
@@ -1159,6 +1166,7 @@ class H5(Binary):
         super().__init__(**kwd)
         self._magic = binascii.unhexlify("894844460d0a1a0a")
 
+    @sniff_magic(attribute="_magic")
     def sniff(self, filename: str) -> bool:
         # The first 8 bytes of any hdf5 file are 0x894844460d0a1a0a
         try:
@@ -2271,6 +2279,7 @@ class Sff(Binary):
     edam_data = "data_0924"
     file_ext = "sff"
 
+    @sniff_magic(b".sff")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         # The first 4 bytes of any sff file is '.sff', and the file is binary. For details
         # about the format, see http://www.ncbi.nlm.nih.gov/Traces/trace.cgi?cmd=show&f=formats&m=doc&s=format
@@ -2429,6 +2438,7 @@ class SQlite(Binary):
         except Exception as exc:
             log.warning("%s, set_meta Exception: %s", self, exc)
 
+    @sniff_magic(b"SQLite format 3\x00")
     def sniff(self, filename: str) -> bool:
         # The first 16 bytes of any SQLite3 database file is 'SQLite format 3\0', and the file is binary. For details
         # about the format, see http://www.sqlite.org/fileformat.html
@@ -3123,6 +3133,7 @@ class Sra(Binary):
 
     file_ext = "sra"
 
+    @sniff_magic(b"NCBI.sra")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         """The first 8 bytes of any NCBI sra file is 'NCBI.sra', and the file is binary.
         For details about the format, see http://www.ncbi.nlm.nih.gov/books/n/helpsra/SRA_Overview_BK/#SRA_Overview_BK.4_SRA_Data_Structure
@@ -3188,6 +3199,7 @@ class RData(CompressedArchive):
         finally:
             fh.close()
 
+    @sniff_magic(VERSION_2_PREFIX, VERSION_3_PREFIX)
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         return file_prefix.startswith_bytes((self.VERSION_2_PREFIX, self.VERSION_3_PREFIX))
 
@@ -3520,6 +3532,7 @@ class PostgresqlArchive(CompressedArchive):
         except Exception as e:
             log.warning("%s, set_meta Exception: %s", self, util.unicodify(e))
 
+    @sniff_tar_archive
     def sniff(self, filename: str) -> bool:
         if filename and tarfile.is_tarfile(filename):
             with tarfile.open(filename, "r") as temptar:
@@ -3588,6 +3601,7 @@ class MongoDBArchive(CompressedArchive):
         except Exception as e:
             log.warning("%s CompressedArchive set_meta Exception: %s", self, e)
 
+    @sniff_tar_archive
     def sniff(self, filename: str) -> bool:
         if filename and tarfile.is_tarfile(filename):
             with tarfile.open(filename, "r") as temptar:
@@ -3649,6 +3663,7 @@ class Fast5Archive(CompressedArchive):
         except Exception as e:
             log.warning("%s, set_meta Exception: %s", self, e)
 
+    @sniff_tar_archive
     def sniff(self, filename: str) -> bool:
         try:
             if filename and tarfile.is_tarfile(filename):
@@ -3697,6 +3712,7 @@ class Fast5ArchiveGz(Fast5Archive):
 
     file_ext = "fast5.tar.gz"
 
+    @sniff_tar_archive
     def sniff(self, filename: str) -> bool:
         if not is_gzip(filename):
             return False
@@ -3721,6 +3737,7 @@ class Fast5ArchiveBz2(Fast5Archive):
 
     file_ext = "fast5.tar.bz2"
 
+    @sniff_tar_archive
     def sniff(self, filename: str) -> bool:
         if not is_bz2(filename):
             return False
@@ -3810,6 +3827,7 @@ class NetCDF(Binary):
         except Exception:
             return f"Binary netCDF file ({nice_size(dataset.get_size())})"
 
+    @sniff_magic(b"CDF")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         return file_prefix.startswith_bytes(b"CDF")
 
@@ -3939,6 +3957,7 @@ class DAA(Binary):
         super().__init__(**kwd)
         self._magic = binascii.unhexlify("6be33e6d47530e3c")
 
+    @sniff_magic(attribute="_magic")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         # The first 8 bytes of any daa file are 0x3c0e53476d3ee36b
         return file_prefix.startswith_bytes(self._magic)
@@ -3964,6 +3983,7 @@ class RMA6(Binary):
         super().__init__(**kwd)
         self._magic = binascii.unhexlify("000003f600000006")
 
+    @sniff_magic(attribute="_magic")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         return file_prefix.startswith_bytes(self._magic)
 
@@ -3988,6 +4008,7 @@ class DMND(Binary):
         super().__init__(**kwd)
         self._magic = binascii.unhexlify("6d18ee15a4f84a02")
 
+    @sniff_magic(attribute="_magic")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         # The first 8 bytes of any dmnd file are 0x24af8a415ee186d
         return file_prefix.startswith_bytes(self._magic)
@@ -4043,6 +4064,7 @@ class Parquet(Binary):
         super().__init__(**kwd)
         self._magic = b"PAR1"  # Defined at https://parquet.apache.org/documentation/latest/
 
+    @sniff_magic(attribute="_magic")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         return file_prefix.startswith_bytes(self._magic)
 
@@ -4067,6 +4089,7 @@ class BafTar(CompressedArchive):
     def get_signature_file(self) -> str:
         return "analysis.baf"
 
+    @sniff_tar_archive
     def sniff(self, filename: str) -> bool:
         if tarfile.is_tarfile(filename):
             with tarfile.open(filename) as rawtar:
@@ -4157,6 +4180,7 @@ class WiffTar(BafTar):
 
     file_ext = "wiff.tar"
 
+    @sniff_tar_archive
     def sniff(self, filename: str) -> bool:
         if tarfile.is_tarfile(filename):
             with tarfile.open(filename) as rawtar:
@@ -4185,6 +4209,7 @@ class Wiff2Tar(BafTar):
 
     file_ext = "wiff2.tar"
 
+    @sniff_tar_archive
     def sniff(self, filename: str) -> bool:
         if tarfile.is_tarfile(filename):
             with tarfile.open(filename) as rawtar:
@@ -4209,6 +4234,7 @@ class Pretext(Binary):
 
     file_ext = "pretext"
 
+    @sniff_magic(b"pstm")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         # The first 4 bytes of any pretext file is 'pstm', and the rest of the
         # file contains binary data.
@@ -4248,6 +4274,7 @@ class JP2(Binary):
         super().__init__(**kwd)
         self._magic = binascii.unhexlify("0000000C6A5020200D0A870A")
 
+    @sniff_magic(attribute="_magic")
     def sniff(self, filename: str) -> bool:
         # The first 12 bytes of any jp2 file are 0000000C6A5020200D0A870A
         try:
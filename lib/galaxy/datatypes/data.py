@@ -187,6 +187,30 @@ def _get_file_size(data):
     return file_size
 
 
+def _is_remote_only(data) -> bool:
+    object_store = data.dataset.object_store
+    return bool(object_store) and not object_store.exists_locally(data.dataset)
+
+
+def _file_exists(data) -> bool:
+    if _is_remote_only(data):
+        return data.dataset.object_store.exists(data.dataset)
+    return os.path.exists(data.file_name)
+
+
+def _read_peek(data, max_peek_size: int) -> bytes:
+    """Read up to ``max_peek_size`` bytes from the start of ``data``.
+
+    Datasets that are not available locally are read with a ranged request
+    rather than being pulled into the object store cache in their entirety.
+    """
+    if _is_remote_only(data):
+        content = data.dataset.object_store.get_data(data.dataset, count=max_peek_size)
+        return content.encode("utf-8", "surrogateescape")
+    with open(data.file_name, "rb") as fh:
+        return fh.read(max_peek_size)
+
+
 @p_dataproviders.decorators.has_dataproviders
 class Data(metaclass=DataMeta):
     """
@@ -488,7 +512,7 @@ class Data(metaclass=DataMeta):
             trans.fill_template_mako(
                 "/dataset/binary_file.mako",
                 data=data,
-                file_contents=open(data.file_name, "rb").read(max_peek_size),
+                file_contents=_read_peek(data, max_peek_size),
                 file_size=util.nice_size(file_size),
                 truncated=file_size > max_peek_size,
             ),
@@ -506,7 +530,7 @@ class Data(metaclass=DataMeta):
         headers["content-type"] = "text/html"
         return (
             trans.fill_template_mako(
-                "/dataset/large_file.mako", truncated_data=open(data.file_name, "rb").read(max_peek_size), data=data
+                "/dataset/large_file.mako", truncated_data=_read_peek(data, max_peek_size), data=data
             ),
             headers,
         )
@@ -581,7 +605,7 @@ class Data(metaclass=DataMeta):
         downloading = to_ext is not None
         file_size = _get_file_size(dataset)
 
-        if not os.path.exists(dataset.file_name):
+        if not _file_exists(dataset):
             raise ObjectNotFound(f"File Not Found ({dataset.file_name}).")
 
         if downloading:
@@ -4,7 +4,10 @@ MetaCyto analysis datatypes.
 
 import logging
 
-from galaxy.datatypes.sniff import FilePrefix
+from galaxy.datatypes.sniff import (
+    FilePrefix,
+    sniff_magic,
+)
 from galaxy.datatypes.tabular import Tabular
 
 log = logging.getLogger(__name__)
@@ -31,5 +34,6 @@ class mSummary(Tabular):
 
     file_ext = "metacyto_summary.txt"
 
+    @sniff_magic("study_id\tantibodies\tfilenames")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         return file_prefix.startswith("study_id\tantibodies\tfilenames")
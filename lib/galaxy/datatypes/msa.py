@@ -18,6 +18,7 @@ from galaxy.datatypes.protocols import DatasetProtocol
 from galaxy.datatypes.sniff import (
     build_sniff_from_prefix,
     FilePrefix,
+    sniff_magic,
 )
 from galaxy.datatypes.util import generic_util
 from galaxy.util import (
@@ -66,6 +67,7 @@ class InfernalCM(Text):
             dataset.peek = "file does not exist"
             dataset.blurb = "file purged from disc"
 
+    @sniff_magic("INFERNAL")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         """
         >>> from galaxy.datatypes.sniff import get_test_fname
@@ -117,6 +119,7 @@ class Hmmer2(Hmmer):
     edam_format = "format_3328"
     file_ext = "hmm2"
 
+    @sniff_magic("HMMER2.0")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         """HMMER2 files start with HMMER2.0"""
         return file_prefix.startswith("HMMER2.0")
@@ -126,6 +129,7 @@ class Hmmer3(Hmmer):
     edam_format = "format_3329"
     file_ext = "hmm3"
 
+    @sniff_magic("HMMER3/f")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         """HMMER3 files start with HMMER3/f"""
         return file_prefix.startswith("HMMER3/f")
@@ -282,6 +286,7 @@ class MauveXmfa(Text):
             dataset.peek = "file does not exist"
             dataset.blurb = "file purged from disc"
 
+    @sniff_magic("#FormatVersion Mauve1")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         return file_prefix.startswith("#FormatVersion Mauve1")
 
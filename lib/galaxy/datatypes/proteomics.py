@@ -20,6 +20,7 @@ from galaxy.datatypes.sequence import Sequence
 from galaxy.datatypes.sniff import (
     build_sniff_from_prefix,
     FilePrefix,
+    sniff_magic,
 )
 from galaxy.datatypes.tabular import (
     Tabular,
@@ -338,6 +339,7 @@ class PEFF(Sequence):
 
     file_ext = "peff"
 
+    @sniff_magic("# PEFF ")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         """
         >>> from galaxy.datatypes.sniff import get_test_fname
@@ -985,6 +987,7 @@ class Msp(Text):
         next_line = contents.readline()
         return next_line is not None and next_line.startswith(prefix)
 
+    @sniff_magic("Name:")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         """Determines whether the file is a NIST MSP output file."""
         begin_contents = file_prefix.contents_header
@@ -38,6 +38,7 @@ from . import (
     xml,
 )
 from .display_applications.application import DisplayApplication
+from .sniff import SniffOrderIndex
 
 
 class ConfigurationError(Exception):
@@ -71,6 +72,7 @@ class Registry:
         self.available_tracks = []
         self.set_external_metadata_tool = None
         self.sniff_order = []
+        self._sniff_order_index: Optional[SniffOrderIndex] = None
         self.upload_file_formats = []
         # Datatype elements defined in local datatypes_conf.xml that contain display applications.
         self.display_app_containers = []
@@ -898,6 +900,13 @@ class Registry:
             rval["auto"] = rval["txt"]
         return rval
 
+    @property
+    def sniff_order_index(self) -> SniffOrderIndex:
+        """Dispatch structure over ``sniff_order``, rebuilt whenever ``sniff_order`` changes."""
+        if self._sniff_order_index is None or self._sniff_order_index.sniff_order != self.sniff_order:
+            self._sniff_order_index = SniffOrderIndex(self.sniff_order)
+        return self._sniff_order_index
+
     @property
     def edam_formats(self):
         """ """
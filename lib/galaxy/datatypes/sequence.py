@@ -40,6 +40,7 @@ from galaxy.datatypes.sniff import (
     FilePrefix,
     get_headers,
     iter_headers,
+    sniff_magic,
 )
 from galaxy.util import (
     compression_utils,
@@ -1410,6 +1411,7 @@ class Genbank(data.Text):
     edam_data = "data_0849"
     file_ext = "genbank"
 
+    @sniff_magic("LOCUS ")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         """
         Determine whether the file is in genbank format.
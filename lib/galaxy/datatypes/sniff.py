@@ -10,7 +10,9 @@ import os
 import re
 import shutil
 import struct
+import tarfile
 import tempfile
+import threading
 import zipfile
 from functools import partial
 from typing import (
@@ -36,6 +38,7 @@ from galaxy.util.checkers import (
     COMPRESSION_CHECK_FUNCTIONS,
     is_tar,
 )
+from galaxy.util.hash_util import StreamingDigest
 from galaxy.util.path import StrPath
 
 import pylibmagic  # noqa: F401  # isort:skip
@@ -46,6 +49,9 @@ log = logging.getLogger(__name__)
 
 SNIFF_PREFIX_BYTES = int(os.environ.get("GALAXY_SNIFF_PREFIX_BYTES", None) or 2**20)
 BINARY_MIMETYPES = {"application/pdf", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"}
+# The module level detect_from_* functions of the magic bindings share a single
+# libmagic handle, which must not be used by multiple threads at once.
+MAGIC_LOCK = threading.Lock()
 
 
 def get_test_fname(fname):
@@ -90,7 +96,13 @@ class ConvertResult(NamedTuple):
 
 class ConvertFunction(Protocol):
     def __call__(
-        self, fname: str, in_place: bool = True, tmp_dir: Optional[str] = None, tmp_prefix: Optional[str] = "gxupload"
+        self,
+        fname: str,
+        in_place: bool = True,
+        tmp_dir: Optional[str] = None,
+        tmp_prefix: Optional[str] = "gxupload",
+        *,
+        digest: Optional[StreamingDigest] = None,
     ) -> ConvertResult:
         ...
 
@@ -102,10 +114,14 @@ def convert_newlines(
     tmp_prefix: Optional[str] = "gxupload",
     block_size: int = 128 * 1024,
     regexp=None,
+    *,
+    digest: Optional[StreamingDigest] = None,
 ) -> ConvertResult:
     """
     Converts in place a file from universal line endings
     to Posix line endings.
+
+    If ``digest`` is given, it is fed the converted content.
     """
     i = 0
     converted_newlines = False
@@ -115,6 +131,8 @@ def convert_newlines(
     with tempfile.NamedTemporaryFile(mode="wb", prefix=tmp_prefix, dir=tmp_dir, delete=False) as fp, open(
         fname, mode="rb"
     ) as fi:
+        if digest:
+            digest.start(fname if in_place else fp.name)
         last_char = None
         block = fi.read(block_size)
         last_block = b""
@@ -134,6 +152,8 @@ def convert_newlines(
                         converted_regex = True
                     block = b"\t".join(split_block)
                 fp.write(block)
+                if digest:
+                    digest.update(block)
                 i += block.count(b"\n")
                 last_block = block
                 block = fi.read(block_size)
@@ -141,6 +161,8 @@ def convert_newlines(
             converted_newlines = True
             i += 1
             fp.write(b"\n")
+            if digest:
+                digest.update(b"\n")
     if in_place:
         shutil.move(fp.name, fname)
         # Return number of lines in file.
@@ -155,9 +177,13 @@ def convert_sep2tabs(
     tmp_dir: Optional[str] = None,
     tmp_prefix: Optional[str] = "gxupload",
     block_size: int = 128 * 1024,
-):
+    *,
+    digest: Optional[StreamingDigest] = None,
+) -> ConvertResult:
     """
     Transforms in place a 'sep' separated file to a tab separated one
+
+    If ``digest`` is given, it is fed the converted content.
     """
     patt: bytes = rb"[^\S\r\n]+"
     regexp = re.compile(patt)
@@ -167,6 +193,8 @@ def convert_sep2tabs(
     with tempfile.NamedTemporaryFile(mode="wb", prefix=tmp_prefix, dir=tmp_dir, delete=False) as fp, open(
         fname, mode="rb"
     ) as fi:
+        if digest:
+            digest.start(fname if in_place else fp.name)
         block = fi.read(block_size)
         while block:
             if block:
@@ -175,6 +203,8 @@ def convert_sep2tabs(
                     converted_regex = True
                 block = b"\t".join(split_block)
                 fp.write(block)
+                if digest:
+                    digest.update(block)
                 i += block.count(b"\n") or block.count(b"\r")
                 block = fi.read(block_size)
     if in_place:
@@ -186,14 +216,19 @@ def convert_sep2tabs(
 
 
 def convert_newlines_sep2tabs(
-    fname: str, in_place: bool = True, tmp_dir: Optional[str] = None, tmp_prefix: Optional[str] = "gxupload"
+    fname: str,
+    in_place: bool = True,
+    tmp_dir: Optional[str] = None,
+    tmp_prefix: Optional[str] = "gxupload",
+    *,
+    digest: Optional[StreamingDigest] = None,
 ) -> ConvertResult:
     """
     Converts newlines in a file to posix newlines and replaces spaces with tabs.
     """
     patt: bytes = rb"[^\S\n]+"
     regexp = re.compile(patt)
-    return convert_newlines(fname, in_place, tmp_dir, tmp_prefix, regexp=regexp)
+    return convert_newlines(fname, in_place, tmp_dir, tmp_prefix, regexp=regexp, digest=digest)
 
 
 def iter_headers(fname_or_file_prefix, sep, count=60, comment_designator=None):
@@ -591,13 +626,15 @@ class FilePrefix:
         self.truncated = truncated
         self.filename = filename
         self.non_utf8_error = non_utf8_error
-        file_magic = magic.detect_from_content(contents_header_bytes)
+        with MAGIC_LOCK:
+            file_magic = magic.detect_from_content(contents_header_bytes)
         self.encoding = file_magic.encoding
         self.mime_type = file_magic.mime_type
         self.compressed_mime_type = None
         self.compressed_encoding = None
         if compressed_format:
-            compressed_magic = magic.detect_from_filename(filename)
+            with MAGIC_LOCK:
+                compressed_magic = magic.detect_from_filename(filename)
             self.compressed_mime_type = compressed_magic.mime_type
             self.compressed_encoding = compressed_magic.encoding
         self.compressed_format = compressed_format
@@ -680,50 +717,169 @@ def _get_file_prefix(filename_or_file_prefix: Union[str, FilePrefix], auto_decom
     return filename_or_file_prefix
 
 
+def _sniffer_applies(datatype, compressed_format: Optional[str], binary: bool) -> bool:
+    """Check whether ``datatype`` can possibly match a file with the given compression and binary-ness.
+
+    Some classes may not have a sniff function, which is ok.  In fact,
+    Binary, Data, Tabular and Text are examples of classes that should never
+    have a sniff function. Since these classes are default classes, they contain
+    few rules to filter out data of other formats, so they should be called
+    from this function after all other datatypes in sniff_order have not been
+    successfully discovered.
+    """
+    datatype_compressed = getattr(datatype, "compressed", False)
+    if datatype_compressed and not compressed_format and not datatype.file_ext.endswith(".tar"):
+        # we don't auto-detect tar as compressed
+        return False
+    if not datatype_compressed and compressed_format:
+        return False
+    if binary != datatype.is_binary and not datatype.is_binary == "maybe":
+        # Binary detection doesn't match datatype ...
+        compressed_data_for_compressed_text_datatype = (
+            binary and compressed_format and datatype_compressed and not datatype.is_binary
+        )
+        if not compressed_data_for_compressed_text_datatype:
+            # ... and mismatch is not due to compressed text data for a compressed text datatype
+            return False
+    if hasattr(datatype, "sniff_prefix"):
+        if compressed_format and getattr(datatype, "compressed_format", None):
+            # Compare the compressed format detected
+            # to the expected.
+            if compressed_format != datatype.compressed_format:
+                return False
+    return True
+
+
+def _run_sniffer(datatype, file_prefix: FilePrefix) -> bool:
+    try:
+        if hasattr(datatype, "sniff_prefix"):
+            return bool(datatype.sniff_prefix(file_prefix))
+        return bool(datatype.sniff(file_prefix.filename))
+    except Exception:
+        return False
+
+
+def sniff_magic(*prefixes: Union[bytes, str], attribute: Optional[str] = None):
+    """Declare that the decorated sniffer can only succeed for files starting with a magic prefix.
+
+    ``prefixes`` may be bytes (compared to the raw file prefix) or str (compared to the decoded
+    file prefix), ``attribute`` names a datatype attribute holding further bytes or str prefixes.
+    The decorated method is ``sniff_prefix`` or, for datatypes without one, ``sniff``. The
+    declaration belongs to the function, so it does not apply to subclasses overriding it.
+    :class:`SniffOrderIndex` uses it to skip sniffers that cannot match.
+    """
+
+    def decorator(func):
+        func.sniff_magic = (prefixes, attribute)
+        return func
+
+    return decorator
+
+
+def sniff_tar_archive(func):
+    """Declare that the decorated sniffer can only succeed for (possibly compressed) tar archives.
+
+    Like :func:`sniff_magic`, but for sniffers opening the file with :mod:`tarfile`:
+    :class:`SniffOrderIndex` skips them for files not starting with a tar header.
+    """
+    func.sniff_tar_archive = True
+    return func
+
+
+# xz and zstd compressed files, which tarfile reads transparently but FilePrefix does not decompress
+TARFILE_ONLY_COMPRESSION_MAGIC = (b"\xfd7zXZ\x00", b"\x28\xb5\x2f\xfd")
+
+
+def _may_be_tar_archive(file_prefix: FilePrefix) -> bool:
+    header = file_prefix.contents_header_bytes
+    if header is None or header.startswith(TARFILE_ONLY_COMPRESSION_MAGIC):
+        return True
+    try:
+        # tarfile.is_tarfile() is False unless the first block is a valid header
+        tarfile.TarInfo.frombuf(header[: tarfile.BLOCKSIZE], tarfile.ENCODING, "surrogateescape")
+    except tarfile.HeaderError:
+        return False
+    return True
+
+
+def _magic_matches(declared_magic, file_prefix: FilePrefix) -> bool:
+    byte_prefixes, str_prefixes = declared_magic
+    if byte_prefixes and file_prefix.contents_header_bytes is not None:
+        if file_prefix.contents_header_bytes.startswith(byte_prefixes):
+            return True
+    if str_prefixes and file_prefix.non_utf8_error is None and file_prefix.contents_header is not None:
+        if file_prefix.contents_header.startswith(str_prefixes):
+            return True
+    return False
+
+
+def _declared_filter(datatype) -> Optional[Callable[[FilePrefix], bool]]:
+    """Return the check a file must pass for the sniffer of ``datatype`` to possibly match, if declared."""
+    sniffer = datatype.sniff_prefix if hasattr(datatype, "sniff_prefix") else getattr(datatype, "sniff", None)
+    if getattr(sniffer, "sniff_tar_archive", False):
+        return _may_be_tar_archive
+    declaration = getattr(sniffer, "sniff_magic", None)
+    if declaration is None:
+        return None
+    prefixes, attribute = declaration
+    prefixes = list(prefixes)
+    if attribute is not None:
+        value = getattr(datatype, attribute)
+        prefixes.extend(value if isinstance(value, (list, tuple)) else [value])
+    byte_prefixes = tuple(p for p in prefixes if isinstance(p, bytes))
+    str_prefixes = tuple(p for p in prefixes if isinstance(p, str))
+    return partial(_magic_matches, (byte_prefixes, str_prefixes))
+
+
+class SniffOrderIndex:
+    """Precomputed dispatch structure over a datatype registry's sniff order.
+
+    Sniffers are grouped by the compression format and binary-ness of the files they may
+    match, and sniffers declaring a magic prefix (see :func:`sniff_magic`) or that they only
+    match tar archives (see :func:`sniff_tar_archive`) are skipped for files that do not
+    start with it. Candidates are tried in sniff order, so the result is the same as running
+    every sniffer of ``sniff_order`` in turn.
+    """
+
+    def __init__(self, sniff_order):
+        self.sniff_order = list(sniff_order)
+        self._filters = [_declared_filter(datatype) for datatype in self.sniff_order]
+        self._candidates: Dict[tuple, list] = {}
+
+    def candidates(self, file_prefix: FilePrefix):
+        key = (file_prefix.compressed_format, file_prefix.binary)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            compressed_format, binary = key
+            candidates = [
+                (datatype, declared_filter)
+                for datatype, declared_filter in zip(self.sniff_order, self._filters)
+                if _sniffer_applies(datatype, compressed_format, binary)
+            ]
+            self._candidates[key] = candidates
+        for datatype, declared_filter in candidates:
+            if declared_filter is None or declared_filter(file_prefix):
+                yield datatype
+
+    def run(self, file_prefix: FilePrefix) -> Optional[str]:
+        for datatype in self.candidates(file_prefix):
+            if _run_sniffer(datatype, file_prefix):
+                return datatype.file_ext
+        return None
+
+
 def run_sniffers_raw(file_prefix: FilePrefix, sniff_order):
-    """Run through sniffers specified by sniff_order, return None of None match."""
-    fname = file_prefix.filename
-    file_ext = None
+    """Run through sniffers specified by sniff_order, return None of None match.
+
+    ``sniff_order`` may be a list of datatypes or a prebuilt :class:`SniffOrderIndex`.
+    """
+    if isinstance(sniff_order, SniffOrderIndex):
+        return sniff_order.run(file_prefix)
+    compressed_format = file_prefix.compressed_format
     for datatype in sniff_order:
-        """
-        Some classes may not have a sniff function, which is ok.  In fact,
-        Binary, Data, Tabular and Text are examples of classes that should never
-        have a sniff function. Since these classes are default classes, they contain
-        few rules to filter out data of other formats, so they should be called
-        from this function after all other datatypes in sniff_order have not been
-        successfully discovered.
-        """
-        datatype_compressed = getattr(datatype, "compressed", False)
-        if datatype_compressed and not file_prefix.compressed_format and not datatype.file_ext.endswith(".tar"):
-            # we don't auto-detect tar as compressed
-            continue
-        if not datatype_compressed and file_prefix.compressed_format:
-            continue
-        if file_prefix.binary != datatype.is_binary and not datatype.is_binary == "maybe":
-            # Binary detection doesn't match datatype ...
-            compressed_data_for_compressed_text_datatype = (
-                file_prefix.binary and file_prefix.compressed_format and datatype_compressed and not datatype.is_binary
-            )
-            if not compressed_data_for_compressed_text_datatype:
-                # ... and mismatch is not due to compressed text data for a compressed text datatype
-                continue
-        try:
-            if hasattr(datatype, "sniff_prefix"):
-                if file_prefix.compressed_format and getattr(datatype, "compressed_format", None):
-                    # Compare the compressed format detected
-                    # to the expected.
-                    if file_prefix.compressed_format != datatype.compressed_format:
-                        continue
-                if datatype.sniff_prefix(file_prefix):
-                    file_ext = datatype.file_ext
-                    break
-            elif datatype.sniff(fname):
-                file_ext = datatype.file_ext
-                break
-        except Exception:
-            pass
-
-    return file_ext
+        if _sniffer_applies(datatype, compressed_format, file_prefix.binary) and _run_sniffer(datatype, file_prefix):
+            return datatype.file_ext
+    return None
 
 
 def zip_single_fileobj(path: StrPath) -> IO[bytes]:
@@ -779,6 +935,7 @@ def handle_compressed_file(
     tmp_dir: Optional[str] = None,
     in_place: bool = False,
     check_content: bool = True,
+    digest: Optional[StreamingDigest] = None,
 ) -> HandleCompressedFileResponse:
     """
     Check uploaded files for compression, check compressed file contents, and uncompress if necessary.
@@ -794,6 +951,8 @@ def handle_compressed_file(
     ``is_valid`` as returned will only be set if the file is compressed and contains invalid contents (or the first file
     in the case of a zip file), this is so lengthy decompression can be bypassed if there is invalid content in the
     first 32KB. Otherwise the caller should be checking content.
+
+    If ``digest`` is given, it is fed the uncompressed content.
     """
     CHUNK_SIZE = 2**20  # 1Mb
     is_compressed = False
@@ -822,6 +981,8 @@ def handle_compressed_file(
     if is_compressed and is_valid and file_prefix.auto_decompress and not keep_compressed:
         assert compressed_type  # Tell type checker is_compressed will only be true if compressed_type is also set.
         with tempfile.NamedTemporaryFile(prefix=tmp_prefix, dir=tmp_dir, delete=False) as uncompressed:
+            if digest:
+                digest.start(filename if in_place else uncompressed.name)
             with DECOMPRESSION_FUNCTIONS[compressed_type](filename) as compressed_file:
                 # TODO: it'd be ideal to convert to posix newlines and space-to-tab here as well
                 try:
@@ -829,6 +990,8 @@ def handle_compressed_file(
                         if not chunk:
                             break
                         uncompressed.write(chunk)
+                        if digest:
+                            digest.update(chunk)
                 except OSError as e:
                     os.remove(uncompressed.name)
                     raise OSError(
@@ -885,6 +1048,7 @@ def handle_uploaded_dataset_file_internal(
     uploaded_file_ext: Optional[str] = None,
     convert_to_posix_lines: Optional[bool] = None,
     convert_spaces_to_tabs: Optional[bool] = None,
+    digest: Optional[StreamingDigest] = None,
 ) -> HandleUploadedDatasetFileInternalResponse:
     is_valid, ext, converted_path, compressed_type, is_compressed = handle_compressed_file(
         file_prefix,
@@ -894,6 +1058,7 @@ def handle_uploaded_dataset_file_internal(
         tmp_dir=tmp_dir,
         in_place=in_place,
         check_content=check_content,
+        digest=digest,
     )
     converted_newlines = False
     converted_spaces = False
@@ -909,7 +1074,7 @@ def handle_uploaded_dataset_file_internal(
             # TODO: skip this if we haven't actually converted the dataset
             guessed_ext = guess_ext(
                 converted_path,
-                sniff_order=datatypes_registry.sniff_order,
+                sniff_order=datatypes_registry.sniff_order_index,
                 auto_decompress=file_prefix.auto_decompress,
             )
 
@@ -917,7 +1082,7 @@ def handle_uploaded_dataset_file_internal(
             # Convert universal line endings to Posix line endings, spaces to tabs (if desired)
             convert_fxn = convert_function(convert_to_posix_lines, convert_spaces_to_tabs)
             line_count, _converted_path, converted_newlines, converted_spaces = convert_fxn(
-                converted_path, in_place=in_place, tmp_dir=tmp_dir, tmp_prefix=tmp_prefix
+                converted_path, in_place=in_place, tmp_dir=tmp_dir, tmp_prefix=tmp_prefix, digest=digest
             )
             if not in_place:
                 if converted_path and file_prefix.filename != converted_path:
@@ -925,7 +1090,7 @@ def handle_uploaded_dataset_file_internal(
                 assert _converted_path
                 converted_path = _converted_path
             if ext in AUTO_DETECT_EXTENSIONS:
-                ext = guess_ext(converted_path, sniff_order=datatypes_registry.sniff_order)
+                ext = guess_ext(converted_path, sniff_order=datatypes_registry.sniff_order_index)
         else:
             ext = guessed_ext
 
@@ -5,7 +5,9 @@ Tabular datatype
 import abc
 import binascii
 import csv
+import itertools
 import logging
+import operator
 import os
 import re
 import shutil
@@ -15,6 +17,8 @@ from json import dumps
 from typing import (
     cast,
     Dict,
+    Iterable,
+    Iterator,
     List,
     Optional,
     Union,
@@ -31,6 +35,9 @@ from galaxy.datatypes import (
 )
 from galaxy.datatypes.binary import _BamOrSam
 from galaxy.datatypes.data import (
+    _get_file_size,
+    _is_remote_only,
+    _read_peek,
     DatatypeValidation,
     Text,
 )
@@ -63,8 +70,13 @@ from galaxy.datatypes.sniff import (
     FilePrefix,
     get_headers,
     iter_headers,
+    sniff_magic,
     validate_tabular,
 )
+from galaxy.datatypes.util.line_index import (
+    line_offset,
+    LineIndex,
+)
 from galaxy.util import compression_utils
 from galaxy.util.compression_utils import (
     FileObjType,
@@ -79,6 +91,149 @@ from . import dataproviders
 log = logging.getLogger(__name__)
 
 MAX_DATA_LINES = 100000
+# Bytes fetched per request when extending a ranged chunk read to the end of a line
+CHUNK_LINE_EXTENSION_SIZE = 4096
+# Datasets at least this large get a line offset index when setting metadata
+LINE_INDEX_MIN_FILE_SIZE = 64 * 1024 * 1024
+
+
+COLUMN_TYPE_SET_ORDER = ["int", "float", "list", "str"]  # Order to set column types in
+# Characters read at a time when scanning tabular files for metadata
+SET_META_BLOCK_SIZE = 1024 * 1024
+# Sufficient (not necessary) conditions for a block of newline terminated values
+# to all be accepted by int() or float(), checked before falling back to per value checks
+INT_BLOCK_RE = re.compile(r"(?:[+-]?[0-9]+\n)*")
+FLOAT_BLOCK_RE = re.compile(r"(?:[+-]?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][+-]?[0-9]+)?\n)*")
+
+
+def _is_int(column_text: str) -> bool:
+    # Don't allow underscores in numeric literals (PEP 515)
+    if "_" in column_text:
+        return False
+    try:
+        int(column_text)
+        return True
+    except ValueError:
+        return False
+
+
+def _is_float(column_text: str) -> bool:
+    # Don't allow underscores in numeric literals (PEP 515)
+    if "_" in column_text:
+        return False
+    try:
+        float(column_text)
+        return True
+    except ValueError:
+        if column_text.strip().lower() == "na":
+            return True  # na is special cased to be a float
+        return False
+
+
+def _is_list(column_text: str) -> bool:
+    return "," in column_text
+
+
+def _is_str(column_text: str) -> bool:
+    # anything, except an empty string, is True
+    return column_text != ""
+
+
+IS_COLUMN_TYPE = {
+    "int": _is_int,
+    "float": _is_float,
+    "list": _is_list,
+    "str": _is_str,
+}
+
+
+def guess_column_type(column_text: str) -> Optional[str]:
+    for column_type in COLUMN_TYPE_SET_ORDER:
+        if IS_COLUMN_TYPE[column_type](column_text):
+            return column_type
+    return None
+
+
+def type_overrules_type(column_type1: Optional[str], column_type2: Optional[str]) -> bool:
+    if column_type1 is None or column_type1 == column_type2:
+        return False
+    if column_type2 is None:
+        return True
+    for column_type in reversed(COLUMN_TYPE_SET_ORDER):
+        if column_type1 == column_type:
+            return True
+        if column_type2 == column_type:
+            return False
+    # neither column type was found in our ordered list, this cannot happen
+    raise ValueError(f"Tried to compare unknown column types: {column_type1} and {column_type2}")
+
+
+def _update_column_type(column_type: Optional[str], values: Iterable[str]) -> Optional[str]:
+    """Return the type of a column of type ``column_type`` after also observing ``values``.
+
+    Equivalent to applying ``guess_column_type`` and ``type_overrules_type`` to
+    each value in turn, but distinct values are only checked once and blocks of
+    plain integers or decimals are recognized with a single regular expression.
+    """
+    if column_type == "str":
+        # nothing overrules str
+        return column_type
+    distinct_values = set(values)
+    distinct_values.discard("")
+    if not distinct_values:
+        return column_type
+    if column_type in (None, "int", "float"):
+        joined_values = "\n".join(distinct_values) + "\n"
+        if column_type != "float" and INT_BLOCK_RE.fullmatch(joined_values):
+            return "int"
+        if FLOAT_BLOCK_RE.fullmatch(joined_values):
+            return "float"
+    for value in distinct_values:
+        value_type = guess_column_type(value)
+        if type_overrules_type(value_type, column_type):
+            column_type = value_type
+            if column_type == "str":
+                break
+    return column_type
+
+
+def _update_column_types(column_types: List[Optional[str]], lines: List[str]) -> List[Optional[str]]:
+    """Update ``column_types`` with a block of tab separated data ``lines``, column by column."""
+    if not lines:
+        return column_types
+    column_types = list(column_types)
+    tab_counts = set(map(operator.methodcaller("count", "\t"), lines))
+    if len(tab_counts) == 1:
+        # All lines have the same number of fields, split the block in one go and slice out the columns
+        number_of_columns = tab_counts.pop() + 1
+        fields = "\t".join(lines).split("\t")
+        columns: Iterable[Iterable[str]] = (fields[i::number_of_columns] for i in range(number_of_columns))
+    else:
+        columns = itertools.zip_longest(*(line.split("\t") for line in lines), fillvalue="")
+    for column_index, values in enumerate(columns):
+        if column_index >= len(column_types):
+            # found a previously unknown column, we append None
+            column_types.append(None)
+        column_types[column_index] = _update_column_type(column_types[column_index], values)
+    return column_types
+
+
+def _iter_line_blocks(fh, block_size: int = SET_META_BLOCK_SIZE) -> Iterator[List[str]]:
+    """Yield the lines of text file ``fh`` in lists, reading ``block_size`` characters at a time.
+
+    Lines are yielded without their trailing newline, every yielded list
+    corresponds to content actually read from ``fh`` (but may be empty).
+    """
+    remainder = ""
+    while True:
+        block = fh.read(block_size)
+        if not block:
+            if remainder:
+                yield [remainder]
+            return
+        lines = (remainder + block).split("\n")
+        remainder = lines.pop()
+        yield lines
 
 
 @dataproviders.decorators.has_dataproviders
@@ -119,11 +274,54 @@ class TabularData(Text):
     MetadataElement(
         name="delimiter", default="\t", desc="Data delimiter", readonly=True, visible=False, optional=True, no_value=[]
     )
+    MetadataElement(
+        name="line_index",
+        desc="Line offset index",
+        param=metadata.FileParameter,
+        file_ext="line_index",
+        readonly=True,
+        visible=False,
+        optional=True,
+    )
 
     @abc.abstractmethod
     def set_meta(self, dataset: DatasetProtocol, *, overwrite: bool = True, **kwd) -> None:
         raise NotImplementedError
 
+    def set_line_index(self, dataset: DatasetProtocol, metadata_tmp_files_dir: Optional[str] = None) -> None:
+        """Store a line offset index for large datasets, used for line lookups and counting data lines."""
+        if os.path.getsize(dataset.file_name) < LINE_INDEX_MIN_FILE_SIZE:
+            return
+        line_index = LineIndex.build(dataset.file_name)
+        index_file = dataset.metadata.line_index
+        if not index_file:
+            index_file = dataset.metadata.spec["line_index"].param.new_file(
+                dataset=dataset, metadata_tmp_files_dir=metadata_tmp_files_dir
+            )
+        line_index.write(index_file.file_name)
+        dataset.metadata.line_index = index_file
+
+    def get_line_index(self, dataset: HasFileName) -> Optional[LineIndex]:
+        metadata = getattr(dataset, "metadata", None)
+        index_file = getattr(metadata, "line_index", None)
+        if not index_file:
+            return None
+        try:
+            return LineIndex.read(index_file.file_name)
+        except (OSError, ValueError):
+            log.warning("Could not read line index of dataset %s", dataset.file_name, exc_info=True)
+            return None
+
+    def get_line_offset(self, dataset: HasFileName, line_number: int) -> Optional[int]:
+        """Return the offset of zero-based ``line_number``, usable as ``get_chunk`` offset."""
+        return line_offset(dataset.file_name, self.get_line_index(dataset), line_number)
+
+    def count_data_lines(self, dataset: HasFileName) -> Optional[int]:
+        line_index = self.get_line_index(dataset)
+        if line_index is not None:
+            return line_index.data_line_count
+        return super().count_data_lines(dataset)
+
     def set_peek(self, dataset: DatasetProtocol, **kwd) -> None:
         kwd.setdefault("line_wrap", False)
         super().set_peek(dataset, **kwd)
@@ -153,17 +351,41 @@ class TabularData(Text):
         )
 
     def _read_chunk(self, trans, dataset: HasFileName, offset: int, ck_size: Optional[int] = None):
+        if getattr(dataset, "dataset", None) is not None and _is_remote_only(dataset):
+            return self._read_chunk_from_object_store(trans, dataset, offset, ck_size)
         with compression_utils.get_fileobj(dataset.file_name) as f:
             f.seek(offset)
             ck_data = f.read(ck_size or trans.app.config.display_chunk_size)
             if ck_data and ck_data[-1] != "\n":
-                cursor = f.read(1)
-                while cursor and cursor != "\n":
-                    ck_data += cursor
-                    cursor = f.read(1)
+                # complete the last line, the newline itself is consumed but not returned
+                rest_of_line = f.readline()
+                ck_data += rest_of_line[:-1] if rest_of_line.endswith("\n") else rest_of_line
             last_read = f.tell()
         return ck_data, last_read
 
+    def _read_chunk_from_object_store(self, trans, dataset, offset: int, ck_size: Optional[int] = None):
+        """Read a chunk ending on a line boundary using ranged reads from the object store."""
+        object_store = dataset.dataset.object_store
+
+        def read(start, count):
+            return object_store.get_data(dataset.dataset, start=start, count=count).encode("utf-8", "surrogateescape")
+
+        ck_data = read(offset, ck_size or trans.app.config.display_chunk_size)
+        last_read = offset + len(ck_data)
+        while ck_data and not ck_data.endswith(b"\n"):
+            extension = read(last_read, CHUNK_LINE_EXTENSION_SIZE)
+            if not extension:
+                break
+            newline = extension.find(b"\n")
+            if newline != -1:
+                # as for local reads, the newline is consumed but not returned
+                ck_data += extension[:newline]
+                last_read += newline + 1
+                break
+            ck_data += extension
+            last_read += len(extension)
+        return util.unicodify(ck_data), last_read
+
     def display_data(
         self,
         trans,
@@ -177,6 +399,12 @@ class TabularData(Text):
     ):
         headers = kwd.pop("headers", {})
         preview = util.string_as_bool(preview)
+        line_number = kwd.pop("line_number", None)
+        if offset is None and line_number is not None:
+            # Jump to a (zero-based) line, past the end of the dataset an empty chunk is returned
+            offset = self.get_line_offset(dataset, int(line_number))
+            if offset is None:
+                offset = _get_file_size(dataset)
         if offset is not None:
             return self.get_chunk(trans, dataset, offset, ck_size), headers
         elif to_ext or not preview:
@@ -187,7 +415,7 @@ class TabularData(Text):
             # We should add a new datatype 'matrix', with its own draw method, suitable for this kind of data.
             # For now, default to the old behavior, ugly as it is.  Remove this after adding 'matrix'.
             max_peek_size = 1000000  # 1 MB
-            if os.stat(dataset.file_name).st_size < max_peek_size:
+            if _get_file_size(dataset) < max_peek_size:
                 self._clean_and_set_mime_type(trans, dataset.get_mime(), headers)
                 return open(dataset.file_name, mode="rb"), headers
             else:
@@ -195,7 +423,7 @@ class TabularData(Text):
                 return (
                     trans.fill_template_mako(
                         "/dataset/large_file.mako",
-                        truncated_data=open(dataset.file_name).read(max_peek_size),
+                        truncated_data=_read_peek(dataset, max_peek_size),
                         data=dataset,
                     ),
                     headers,
@@ -445,117 +673,91 @@ class Tabular(TabularData):
         requested_skip = skip
         if skip is None:
             skip = 0
-        column_type_set_order = ["int", "float", "list", "str"]  # Order to set column types in
-        default_column_type = column_type_set_order[-1]  # Default column type is lowest in list
-        column_type_compare_order = list(column_type_set_order)  # Order to compare column types
-        column_type_compare_order.reverse()
-
-        def type_overrules_type(column_type1, column_type2):
-            if column_type1 is None or column_type1 == column_type2:
-                return False
-            if column_type2 is None:
-                return True
-            for column_type in column_type_compare_order:
-                if column_type1 == column_type:
-                    return True
-                if column_type2 == column_type:
-                    return False
-            # neither column type was found in our ordered list, this cannot happen
-            raise ValueError(f"Tried to compare unknown column types: {column_type1} and {column_type2}")
-
-        def is_int(column_text):
-            # Don't allow underscores in numeric literals (PEP 515)
-            if "_" in column_text:
-                return False
-            try:
-                int(column_text)
-                return True
-            except ValueError:
-                return False
-
-        def is_float(column_text):
-            # Don't allow underscores in numeric literals (PEP 515)
-            if "_" in column_text:
-                return False
-            try:
-                float(column_text)
-                return True
-            except ValueError:
-                if column_text.strip().lower() == "na":
-                    return True  # na is special cased to be a float
-                return False
-
-        def is_list(column_text):
-            return "," in column_text
-
-        def is_str(column_text):
-            # anything, except an empty string, is True
-            if column_text == "":
-                return False
-            return True
-
-        is_column_type = {}  # Dict to store column type string to checking function
-        for column_type in column_type_set_order:
-            is_column_type[column_type] = locals()[f"is_{column_type}"]
-
-        def guess_column_type(column_text):
-            for column_type in column_type_set_order:
-                if is_column_type[column_type](column_text):
-                    return column_type
-            return None
+        default_column_type = COLUMN_TYPE_SET_ORDER[-1]  # Default column type is lowest in list
 
         data_lines = 0
         comment_lines = 0
         column_names = None
         column_types: List = []
-        first_line_column_types = [default_column_type]  # default value is one column of type str
+        first_line_column_types: List[Optional[str]] = [default_column_type]  # default value is one column of type str
         if dataset.has_data():
             # NOTE: if skip > num_check_lines, we won't detect any metadata, and will use default
             with compression_utils.get_fileobj(dataset.file_name) as dataset_fh:
                 i = 0
-                for line in iter(dataset_fh.readline, ""):
-                    line = line.rstrip("\r\n")
-                    if i == 0:
-                        column_names = self.get_column_names(first_line=line)
-                    if i < skip or not line or line.startswith("#"):
-                        # We'll call blank lines comments
-                        comment_lines += 1
-                    else:
-                        data_lines += 1
-                        if max_guess_type_data_lines is None or data_lines <= max_guess_type_data_lines:
-                            fields = line.split("\t")
-                            for field_count, field in enumerate(fields):
-                                if field_count >= len(
-                                    column_types
-                                ):  # found a previously unknown column, we append None
-                                    column_types.append(None)
-                                column_type = guess_column_type(field)
-                                if type_overrules_type(column_type, column_types[field_count]):
-                                    column_types[field_count] = column_type
-                        if i == 0 and requested_skip is None:
-                            # This is our first line, people seem to like to upload files that have a header line, but do not
-                            # start with '#' (i.e. all column types would then most likely be detected as str).  We will assume
-                            # that the first line is always a header (this was previous behavior - it was always skipped).  When
-                            # the requested skip is None, we only use the data from the first line if we have no other data for
-                            # a column.  This is far from perfect, as
-                            # 1,2,3	1.1	2.2	qwerty
-                            # 0	0		1,2,3
-                            # will be detected as
-                            # "column_types": ["int", "int", "float", "list"]
-                            # instead of
-                            # "column_types": ["list", "float", "float", "str"]  *** would seem to be the 'Truth' by manual
-                            # observation that the first line should be included as data.  The old method would have detected as
-                            # "column_types": ["int", "int", "str", "list"]
-                            first_line_column_types = column_types
-                            column_types = [None for col in first_line_column_types]
-                    if max_data_lines is not None and data_lines >= max_data_lines:
-                        if dataset_fh.tell() != dataset.get_size():
+                line_blocks = _iter_line_blocks(dataset_fh)
+                for lines in line_blocks:
+                    if any("\r" in line for line in lines):
+                        lines = [line.rstrip("\r") for line in lines]
+                    line_index = 0
+                    reached_max_data_lines = False
+                    # The first line and skipped lines need to be looked at one at a time
+                    while line_index < len(lines) and (i == 0 or i < skip):
+                        line = lines[line_index]
+                        if i == 0:
+                            column_names = self.get_column_names(first_line=line)
+                        if i < skip or not line or line.startswith("#"):
+                            # We'll call blank lines comments
+                            comment_lines += 1
+                        else:
+                            data_lines += 1
+                            guess_type = max_guess_type_data_lines is None or data_lines <= max_guess_type_data_lines
+                            if i == 0 and requested_skip is None:
+                                # This is our first line, people seem to like to upload files that have a header line, but do not
+                                # start with '#' (i.e. all column types would then most likely be detected as str).  We will assume
+                                # that the first line is always a header (this was previous behavior - it was always skipped).  When
+                                # the requested skip is None, we only use the data from the first line if we have no other data for
+                                # a column.  This is far from perfect, as
+                                # 1,2,3	1.1	2.2	qwerty
+                                # 0	0		1,2,3
+                                # will be detected as
+                                # "column_types": ["int", "int", "float", "list"]
+                                # instead of
+                                # "column_types": ["list", "float", "float", "str"]  *** would seem to be the 'Truth' by manual
+                                # observation that the first line should be included as data.  The old method would have detected as
+                                # "column_types": ["int", "int", "str", "list"]
+                                first_line_column_types = _update_column_types(
+                                    column_types, [line] if guess_type else []
+                                )
+                                column_types = [None for col in first_line_column_types]
+                            elif guess_type:
+                                column_types = _update_column_types(column_types, [line])
+                        line_index += 1
+                        i += 1
+                        if max_data_lines is not None and data_lines >= max_data_lines:
+                            reached_max_data_lines = True
+                            break
+                    # The rest of the block is classified and its column types guessed in bulk
+                    block = lines[line_index:]
+                    block_data = [line for line in block if line and not line.startswith("#")]
+                    if reached_max_data_lines:
+                        block = block_data = []
+                    elif max_data_lines is not None and 0 < max_data_lines - data_lines <= len(block_data):
+                        # Cut the block after the line with which max_data_lines is reached
+                        reached_max_data_lines = True
+                        block_data = block_data[: max_data_lines - data_lines]
+                        remaining_data_lines = len(block_data)
+                        for cut_index, line in enumerate(block, 1):
+                            if line and not line.startswith("#"):
+                                remaining_data_lines -= 1
+                                if remaining_data_lines == 0:
+                                    break
+                        block = block[:cut_index]
+                    if max_guess_type_data_lines is None:
+                        column_types = _update_column_types(column_types, block_data)
+                    elif data_lines < max_guess_type_data_lines:
+                        column_types = _update_column_types(
+                            column_types, block_data[: max_guess_type_data_lines - data_lines]
+                        )
+                    data_lines += len(block_data)
+                    comment_lines += len(block) - len(block_data)
+                    i += len(block)
+                    if reached_max_data_lines:
+                        if line_index + len(block) < len(lines) or next(line_blocks, None) is not None:
                             # Clear optional data_lines metadata value
                             data_lines = None  # type: ignore [assignment]
                             # Clear optional comment_lines metadata value; additional comment lines could appear below this point
                             comment_lines = None  # type: ignore [assignment]
                         break
-                    i += 1
 
         # we error on the larger number of columns
         # first we pad our column_types by using data from first line
@@ -577,6 +779,8 @@ class Tabular(TabularData):
         dataset.metadata.delimiter = "\t"
         if column_names is not None:
             dataset.metadata.column_names = column_names
+        if dataset.has_data():
+            self.set_line_index(dataset, metadata_tmp_files_dir=kwd.get("metadata_tmp_files_dir"))
 
     def as_gbrowse_display_file(self, dataset: HasFileName, **kwd) -> Union[FileObjType, str]:
         return open(dataset.file_name, "rb")
@@ -1093,6 +1297,7 @@ class BaseVcf(Tabular):
 class Vcf(BaseVcf):
     file_ext = "vcf"
 
+    @sniff_magic("##fileformat=VCF")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         return self._sniff(file_prefix)
 
@@ -1664,6 +1869,7 @@ class MatrixMarket(TabularData):
     def __init__(self, **kwd):
         super().__init__(**kwd)
 
+    @sniff_magic("%%MatrixMarket matrix coordinate")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         return file_prefix.startswith("%%MatrixMarket matrix coordinate")
 
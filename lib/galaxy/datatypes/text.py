@@ -35,6 +35,7 @@ from galaxy.datatypes.sniff import (
     build_sniff_from_prefix,
     FilePrefix,
     iter_headers,
+    sniff_magic,
 )
 from galaxy.util import (
     nice_size,
@@ -917,6 +918,7 @@ class IQTree(Text):
 
     file_ext = "iqtree"
 
+    @sniff_magic("IQ-TREE")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         """
         Detect the IQTree file
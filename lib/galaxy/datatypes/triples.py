@@ -8,6 +8,7 @@ from galaxy.datatypes.protocols import DatasetProtocol
 from galaxy.datatypes.sniff import (
     build_sniff_from_prefix,
     FilePrefix,
+    sniff_magic,
 )
 from . import (
     binary,
@@ -187,6 +188,7 @@ class HDT(binary.Binary, Triples):
     edam_format = "format_2376"
     file_ext = "hdt"
 
+    @sniff_magic(b"$HDT")
     def sniff(self, filename: str) -> bool:
         with open(filename, "rb") as f:
             if f.read(4) == b"$HDT":
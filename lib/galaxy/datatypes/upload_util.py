@@ -9,6 +9,7 @@ from galaxy.datatypes import (
     sniff,
 )
 from galaxy.util.checkers import is_single_file_zip
+from galaxy.util.hash_util import StreamingDigest
 
 
 class UploadProblemException(Exception):
@@ -38,6 +39,7 @@ def handle_upload(
     auto_decompress: bool,
     convert_to_posix_lines: bool,
     convert_spaces_to_tabs: bool,
+    digest: Optional[StreamingDigest] = None,
 ) -> HandleUploadResponse:
     stdout = None
     converted_path = None
@@ -72,11 +74,12 @@ def handle_upload(
                 uploaded_file_ext=os.path.splitext(name)[1].lower().lstrip("."),
                 convert_to_posix_lines=convert_to_posix_lines,
                 convert_spaces_to_tabs=convert_spaces_to_tabs,
+                digest=digest,
             )
         except sniff.InappropriateDatasetContentError as exc:
             raise UploadProblemException(exc)
     elif requested_ext == "auto":
-        ext = sniff.guess_ext(file_prefix, registry.sniff_order)
+        ext = sniff.guess_ext(file_prefix, registry.sniff_order_index)
     else:
         ext = requested_ext
 
@@ -0,0 +1,132 @@
+"""
+Sparse line offset index for text datasets.
+
+The index records the byte offset of every ``interval``-th line of a file,
+together with the total number of lines and of data lines (lines that are
+neither blank nor comments). It is small enough to be stored as a metadata
+file and allows jumping to a line number by seeking to the closest recorded
+offset and skipping at most ``interval - 1`` lines.
+
+Offsets of compressed (gzip, bz2) files refer to the decompressed content, as
+returned by ``galaxy.util.compression_utils.get_fileobj``. Seeking in such
+files still requires decompressing everything before the target, the index
+only saves parsing the skipped lines.
+"""
+
+import struct
+from array import array
+from typing import (
+    Optional,
+    Tuple,
+)
+
+from galaxy.util import compression_utils
+
+LINE_INDEX_MAGIC = b"GXLINEIDX1\n"
+LINE_INDEX_HEADER = struct.Struct("<QQQQ")
+DEFAULT_LINE_INDEX_INTERVAL = 1000
+READ_SIZE = 1024 * 1024
+
+
+class LineIndex:
+    """Byte offsets of every ``interval``-th line of a file."""
+
+    def __init__(self, interval: int, offsets: array, line_count: int, data_line_count: int):
+        self.interval = interval
+        self.offsets = offsets
+        self.line_count = line_count
+        self.data_line_count = data_line_count
+
+    @classmethod
+    def build(cls, path: str, interval: int = DEFAULT_LINE_INDEX_INTERVAL) -> "LineIndex":
+        """Scan the file at ``path`` once and index it.
+
+        Data lines are counted like ``Text.count_data_lines`` does, i.e. lines
+        that are not empty after stripping whitespace and do not start with ``#``.
+        """
+        offsets = array("Q")
+        line_count = 0
+        data_line_count = 0
+        position = 0
+        remainder = b""
+        with compression_utils.get_fileobj(path, "rb") as fh:
+            while True:
+                block = fh.read(READ_SIZE)
+                if not block:
+                    break
+                lines = (remainder + block).split(b"\n")
+                remainder = lines.pop()
+                for line in lines:
+                    if line_count % interval == 0:
+                        offsets.append(position)
+                    line_count += 1
+                    position += len(line) + 1
+                data_line_count += sum(1 for line in lines if line.strip() and not line.lstrip().startswith(b"#"))
+        if remainder:
+            if line_count % interval == 0:
+                offsets.append(position)
+            line_count += 1
+            stripped = remainder.strip()
+            if stripped and not stripped.startswith(b"#"):
+                data_line_count += 1
+        return cls(interval, offsets, line_count, data_line_count)
+
+    @classmethod
+    def read(cls, path: str) -> "LineIndex":
+        with open(path, "rb") as fh:
+            magic = fh.read(len(LINE_INDEX_MAGIC))
+            if magic != LINE_INDEX_MAGIC:
+                raise ValueError(f"File {path} is not a line index")
+            interval, line_count, data_line_count, offset_count = LINE_INDEX_HEADER.unpack(
+                fh.read(LINE_INDEX_HEADER.size)
+            )
+            offsets = array("Q")
+            offsets.frombytes(fh.read(offset_count * offsets.itemsize))
+        if len(offsets) != offset_count:
+            raise ValueError(f"Line index {path} is truncated")
+        return cls(interval, offsets, line_count, data_line_count)
+
+    def write(self, path: str) -> None:
+        with open(path, "wb") as fh:
+            fh.write(LINE_INDEX_MAGIC)
+            fh.write(LINE_INDEX_HEADER.pack(self.interval, self.line_count, self.data_line_count, len(self.offsets)))
+            fh.write(self.offsets.tobytes())
+
+    def checkpoint(self, line_number: int) -> Optional[Tuple[int, int]]:
+        """Return the offset of the closest indexed line at or before zero-based ``line_number``.
+
+        The second element of the returned tuple is the number of lines to skip
+        after seeking to that offset. ``None`` is returned for lines past the end
+        of the file.
+        """
+        if line_number < 0 or line_number >= self.line_count:
+            return None
+        checkpoint_index = line_number // self.interval
+        return self.offsets[checkpoint_index], line_number - checkpoint_index * self.interval
+
+
+def line_offset(path: str, line_index: Optional[LineIndex], line_number: int) -> Optional[int]:
+    """Return the byte offset of zero-based ``line_number`` in the file at ``path``.
+
+    Without a ``line_index`` the file is read from the start. ``None`` is
+    returned if the file has fewer lines.
+    """
+    offset, lines_to_skip = 0, line_number
+    if line_index is not None:
+        checkpoint = line_index.checkpoint(line_number)
+        if checkpoint is None:
+            return None
+        offset, lines_to_skip = checkpoint
+    elif line_number < 0:
+        return None
+    with compression_utils.get_fileobj(path, "rb") as fh:
+        fh.seek(offset)
+        for _ in range(lines_to_skip):
+            line = fh.readline()
+            if not line:
+                return None
+            offset += len(line)
+        if not fh.read(1):
+            # offset is at the end of the file
+            return None
+    return offset
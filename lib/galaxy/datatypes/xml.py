@@ -14,6 +14,7 @@ from galaxy.datatypes.sniff import (
     build_sniff_from_prefix,
     disable_parent_class_sniffing,
     FilePrefix,
+    sniff_magic,
 )
 from . import (
     data,
@@ -51,6 +52,7 @@ class GenericXml(data.Text):
         pattern = r"^<(\w*:)?%s" % root
         return re.match(pattern, line) is not None
 
+    @sniff_magic("<?xml ")
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         """
         Determines whether the file is XML or not
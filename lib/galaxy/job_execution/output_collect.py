@@ -723,9 +723,10 @@ def default_exit_code_file(files_dir, id_tag):
     return os.path.join(files_dir, f"galaxy_{id_tag}.ec")
 
 
-def collect_extra_files(object_store, dataset, job_working_directory):
+def extra_files_source(object_store, dataset, job_working_directory):
+    """Return the name of the extra files directory of ``dataset`` and the path it was written to."""
     # TODO: should this use compute_environment to determine the extra files path ?
-    file_name = dataset.dataset.extra_files_path_name_from(object_store)
+    file_name = dataset.extra_files_path_name_from(object_store)
     output_location = "outputs"
     temp_file_path = os.path.join(job_working_directory, output_location, file_name)
     if not os.path.exists(temp_file_path):
@@ -735,6 +736,11 @@ def collect_extra_files(object_store, dataset, job_working_directory):
     if not os.path.exists(temp_file_path):
         # no outputs to working directory, but may still need to push form cache to backend
         temp_file_path = dataset.extra_files_path
+    return file_name, temp_file_path
+
+
+def push_extra_files(object_store, dataset, file_name, temp_file_path):
+    """Push the extra files found below ``temp_file_path`` to the object store."""
     try:
         # This skips creation of directories - object store
         # automatically creates them.  However, empty directories will
@@ -743,7 +749,7 @@ def collect_extra_files(object_store, dataset, job_working_directory):
         for root, _dirs, files in os.walk(temp_file_path):
             for f in files:
                 object_store.update_from_file(
-                    dataset.dataset,
+                    dataset,
                     extra_dir=os.path.normpath(os.path.join(file_name, os.path.relpath(root, temp_file_path))),
                     alt_name=f,
                     file_name=os.path.join(root, f),
@@ -753,6 +759,18 @@ def collect_extra_files(object_store, dataset, job_working_directory):
     except Exception as e:
         log.debug("Error in collect_associated_files: %s", unicodify(e))
 
+
+def collect_extra_files(object_store, dataset, job_working_directory, extra_files_pushed=False):
+    """Push the extra files of ``dataset`` to the object store and generate missing composite primary files.
+
+    Pass ``extra_files_pushed`` if the extra files have already been pushed
+    with :func:`push_extra_files`.
+    """
+    if not extra_files_pushed:
+        push_extra_files(
+            object_store, dataset.dataset, *extra_files_source(object_store, dataset.dataset, job_working_directory)
+        )
+
     # Handle composite datatypes of auto_primary_file type
     if dataset.datatype.composite_type == "auto_primary_file" and not dataset.has_data():
         try:
@@ -13,19 +13,24 @@ import shutil
 import sys
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from json import loads
 from typing import (
     Any,
     Dict,
     Iterable,
     List,
+    NamedTuple,
     TYPE_CHECKING,
 )
 
 import yaml
 from packaging.version import Version
 from pulsar.client.staging import COMMAND_VERSION_FILENAME
-from sqlalchemy import select
+from sqlalchemy import (
+    inspect,
+    select,
+)
 
 from galaxy import (
     model,
@@ -43,6 +48,8 @@ from galaxy.job_execution.compute_environment import SharedComputeEnvironment
 from galaxy.job_execution.output_collect import (
     collect_extra_files,
     collect_shrinked_content_from_path,
+    extra_files_source,
+    push_extra_files,
 )
 from galaxy.job_execution.setup import (
     create_working_directory_for_job,
@@ -88,6 +95,12 @@ from galaxy.util import (
 from galaxy.util.bunch import Bunch
 from galaxy.util.expressions import ExpressionContext
 from galaxy.util.path import external_chown
+from galaxy.util.spans import (
+    Span,
+    span,
+    spanned,
+    SpanRecorder,
+)
 from galaxy.util.xml_macros import load
 from galaxy.web_stack.handlers import ConfiguresHandlers
 from galaxy.work.context import WorkRequestContext
@@ -333,6 +346,7 @@ class JobConfiguration(ConfiguresHandlers):
         self.handler_assignment_methods_configured = False
         self.handler_max_grab = None
         self.handler_ready_window_size = None
+        self.handler_ready_sweep_interval = None
         self.destinations = {}
         self.default_destination_id = None
         self.tools = {}
@@ -445,6 +459,9 @@ class JobConfiguration(ConfiguresHandlers):
         self.handler_ready_window_size = int(
             handling_config_dict.get("ready_window_size", JobConfiguration.DEFAULT_HANDLER_READY_WINDOW_SIZE)
         )
+        ready_sweep_interval = handling_config_dict.get("ready_sweep_interval")
+        if ready_sweep_interval:
+            self.handler_ready_sweep_interval = float(ready_sweep_interval)
 
         # Parse environments
         job_metrics = self.app.job_metrics
@@ -976,6 +993,17 @@ class HasResourceParameters:
         return resource_params
 
 
+class StagedOutput(NamedTuple):
+    """Result of the I/O heavy part of finishing an output dataset.
+
+    The primary file and extra files of the dataset have been pushed to the
+    object store, ``file_size`` and ``total_size`` are the sizes to record.
+    """
+
+    file_size: int
+    total_size: int
+
+
 class MinimalJobWrapper(HasResourceParameters):
     """
     Wraps a 'model.Job' with convenience methods for running processes and
@@ -1023,6 +1051,27 @@ class MinimalJobWrapper(HasResourceParameters):
         self.__galaxy_system_pwent = None
         self.__working_directory = None
 
+        # Timing spans of the job's lifecycle, persisted to the job_span table
+        self.spans = self._build_span_recorder()
+
+    def _build_span_recorder(self) -> SpanRecorder:
+        enabled = getattr(self.app.config, "track_job_spans", False)
+        statsd_client = None
+        if enabled:
+            execution_timer_factory = getattr(self.app, "execution_timer_factory", None)
+            statsd_client = getattr(execution_timer_factory, "galaxy_statsd_client", None)
+        return SpanRecorder(persist=self._persist_spans, enabled=enabled, statsd_client=statsd_client)
+
+    def _persist_spans(self, spans: List[Span]) -> None:
+        for recorded in spans:
+            self.sa_session.add(
+                model.JobSpan(
+                    self.job_id, recorded.name, recorded.start_time, recorded.duration, occurrences=recorded.occurrences
+                )
+            )
+        with transaction(self.sa_session):
+            self.sa_session.commit()
+
     @property
     def external_output_metadata(self):
         if self.__external_output_metadata is None:
@@ -1223,6 +1272,7 @@ class MinimalJobWrapper(HasResourceParameters):
             if exc.errno != errno.ENOENT or not os.path.exists(new):
                 raise
 
+    @spanned("prepare")
     def prepare(self, compute_environment=None):
         """
         Prepare the job to run by creating the working directory and the
@@ -1715,21 +1765,57 @@ class MinimalJobWrapper(HasResourceParameters):
             job.object_store_id_overrides = object_store_id_overrides
             self._setup_working_directory(job=job)
 
-    def _finish_dataset(self, output_name, dataset, job, context, final_job_state, remote_metadata_directory):
+    def _wait_for_output_file(self, dataset):
+        trynum = 0
+        while trynum < self.app.config.retry_job_output_collection:
+            try:
+                # Attempt to short circuit NFS attribute caching
+                os.stat(dataset.file_name)
+                os.chown(dataset.file_name, os.getuid(), -1)
+                trynum = self.app.config.retry_job_output_collection
+            except (OSError, ObjectNotFound) as e:
+                trynum += 1
+                log.warning("Error accessing dataset with ID %i, will retry: %s", dataset.id, unicodify(e))
+                time.sleep(2)
+
+    def _stage_outputs(self, datasets: List[model.Dataset]) -> Dict[int, StagedOutput]:
+        """Push output datasets to the object store and compute their sizes concurrently.
+
+        Uses up to ``job_output_finish_workers`` threads. Only file system and
+        object store operations happen in the worker threads, the results are
+        applied to the model by ``_finish_dataset`` and ``finish`` in the
+        calling thread. Returns an empty dict if outputs should be finished
+        one after the other.
+        """
+        workers = int(self.get_destination_configuration("job_output_finish_workers", 1))
+        datasets = [dataset for dataset in datasets if not dataset.purged and dataset.external_filename is None]
+        if workers <= 1 or len(datasets) <= 1:
+            return {}
+        tasks = []
+        for dataset in datasets:
+            # Load all columns now, the object store must not trigger lazy loads in the worker threads
+            for column in inspect(dataset).mapper.column_attrs:
+                getattr(dataset, column.key)
+            tasks.append((dataset, extra_files_source(self.object_store, dataset, self.working_directory)))
+        with ThreadPoolExecutor(max_workers=min(workers, len(tasks)), thread_name_prefix="finish_output") as executor:
+            staged = executor.map(lambda task: self._stage_output(*task), tasks)
+            return {dataset.id: staged_output for (dataset, _), staged_output in zip(tasks, staged)}
+
+    def _stage_output(self, dataset, extra_files) -> StagedOutput:
+        self._wait_for_output_file(dataset)
+        file_size = dataset.file_size or dataset._calculate_size()
+        self.object_store.update_from_file(dataset, create=True)
+        push_extra_files(self.object_store, dataset, *extra_files)
+        return StagedOutput(file_size, dataset.calculate_total_size(file_size))
+
+    @spanned("finish_dataset")
+    def _finish_dataset(
+        self, output_name, dataset, job, context, final_job_state, remote_metadata_directory, staged=None
+    ):
         implicit_collection_jobs = job.implicit_collection_jobs_association
         purged = dataset.dataset.purged
-        if not purged and dataset.dataset.external_filename is None:
-            trynum = 0
-            while trynum < self.app.config.retry_job_output_collection:
-                try:
-                    # Attempt to short circuit NFS attribute caching
-                    os.stat(dataset.dataset.file_name)
-                    os.chown(dataset.dataset.file_name, os.getuid(), -1)
-                    trynum = self.app.config.retry_job_output_collection
-                except (OSError, ObjectNotFound) as e:
-                    trynum += 1
-                    log.warning("Error accessing dataset with ID %i, will retry: %s", dataset.dataset.id, unicodify(e))
-                    time.sleep(2)
+        if not purged and dataset.dataset.external_filename is None and staged is None:
+            self._wait_for_output_file(dataset.dataset)
         if getattr(dataset, "hidden_beneath_collection_instance", None):
             dataset.visible = False
         dataset.blurb = "done"
@@ -1742,12 +1828,16 @@ class MinimalJobWrapper(HasResourceParameters):
             # Ensure white space between entries
             dataset.info = f"{dataset.info.rstrip()}\n{context['stderr'].strip()}"
         dataset.tool_version = self.version_string
-        dataset.set_size()
+        if staged is None:
+            dataset.set_size()
+        elif not dataset.dataset.file_size:
+            dataset.dataset.file_size = staged.file_size
         if "uuid" in context:
             dataset.dataset.uuid = context["uuid"]
-        self.__update_output(job, dataset)
+        if staged is None:
+            self.__update_output(job, dataset)
         if not purged:
-            collect_extra_files(self.object_store, dataset, self.working_directory)
+            collect_extra_files(self.object_store, dataset, self.working_directory, extra_files_pushed=bool(staged))
         if job.states.ERROR == final_job_state:
             dataset.blurb = "error"
             if not implicit_collection_jobs:
@@ -1813,6 +1903,7 @@ class MinimalJobWrapper(HasResourceParameters):
 
         self.sa_session.add(dataset)
 
+    @spanned("finish")
     def finish(
         self,
         tool_stdout,
@@ -1924,7 +2015,8 @@ class MinimalJobWrapper(HasResourceParameters):
                     user=job.user,
                     tag_handler=self.app.tag_handler.create_tag_handler_session(job.galaxy_session),
                 )
-                import_model_store.perform_import(history=job.history, job=job)
+                with span("import_outputs"):
+                    import_model_store.perform_import(history=job.history, job=job)
                 if job.state == job.states.ERROR:
                     final_job_state = job.state
             except store.FileTracebackException as e:
@@ -1942,6 +2034,7 @@ class MinimalJobWrapper(HasResourceParameters):
         output_dataset_associations = job.output_datasets + job.output_library_datasets
         inp_data, out_data, out_collections = job.io_dicts()
 
+        staged_outputs: Dict[int, StagedOutput] = {}
         if not extended_metadata:
             # importing metadata will discover outputs if extended metadata
             try:
@@ -1950,11 +2043,26 @@ class MinimalJobWrapper(HasResourceParameters):
                 final_job_state = job.states.ERROR
                 job.job_messages = [str(e)]
 
+            finish_contexts = {
+                dataset_assoc: self.get_dataset_finish_context(job_context, dataset_assoc)
+                for dataset_assoc in output_dataset_associations
+                if not getattr(dataset_assoc.dataset, "discovered", False)
+            }
+            # A uuid provided by the tool changes where the dataset is stored, these are pushed after it is set
+            staged_outputs = self._stage_outputs(
+                list(
+                    {
+                        dataset_assoc.dataset.dataset
+                        for dataset_assoc, context in finish_contexts.items()
+                        if "uuid" not in context
+                    }
+                )
+            )
             for dataset_assoc in output_dataset_associations:
                 if getattr(dataset_assoc.dataset, "discovered", False):
                     # skip outputs that have been discovered
                     continue
-                context = self.get_dataset_finish_context(job_context, dataset_assoc)
+                context = finish_contexts[dataset_assoc]
                 # should this also be checking library associations? - can a library item be added from a history before the job has ended? -
                 # lets not allow this to occur
                 # need to update all associated output hdas, i.e. history was shared with job running
@@ -1965,7 +2073,15 @@ class MinimalJobWrapper(HasResourceParameters):
                     output_name = dataset_assoc.name
 
                     # Handles retry internally on error for instance...
-                    self._finish_dataset(output_name, dataset, job, context, final_job_state, remote_metadata_directory)
+                    self._finish_dataset(
+                        output_name,
+                        dataset,
+                        job,
+                        context,
+                        final_job_state,
+                        remote_metadata_directory,
+                        staged=staged_outputs.get(dataset.dataset.id),
+                    )
                 if (
                     not final_job_state == job.states.ERROR
                     and not dataset_assoc.dataset.dataset.state == job.states.ERROR
@@ -2000,14 +2116,20 @@ class MinimalJobWrapper(HasResourceParameters):
         quota_source_info = None
         # Once datasets are collected, set the total dataset size (includes extra files)
         for dataset_assoc in job.output_datasets:
-            if not dataset_assoc.dataset.dataset.purged:
+            dataset = dataset_assoc.dataset.dataset
+            if not dataset.purged:
                 # assume all datasets in a job get written to the same objectstore
-                quota_source_info = dataset_assoc.dataset.dataset.quota_source_info
-                collected_bytes += dataset_assoc.dataset.set_total_size()
+                quota_source_info = dataset.quota_source_info
+                staged = staged_outputs.get(dataset.id)
+                if staged and staged.file_size == dataset.file_size:
+                    dataset.total_size = staged.total_size
+                    collected_bytes += staged.total_size
+                else:
+                    collected_bytes += dataset.set_total_size()
 
         user = job.user
         if user and collected_bytes > 0 and quota_source_info is not None and quota_source_info.use:
-            user.adjust_total_disk_usage(collected_bytes, quota_source_info.label)
+            user.adjust_total_disk_usage(collected_bytes, quota_source_info.label, reason="job_output")
 
         # Certain tools require tasks to be completed after job execution
         # ( this used to be performed in the "exec_after_process" hook, but hooks are deprecated ).
@@ -2060,6 +2182,7 @@ class MinimalJobWrapper(HasResourceParameters):
         self.cleanup(delete_files=delete_files)
         log.debug(finish_timer.to_str(job_id=self.job_id, tool_id=job.tool_id))
 
+    @spanned("discover_outputs")
     def discover_outputs(self, job, inp_data, out_data, out_collections, final_job_state):
         # Try to just recover input_ext and dbkey from job parameters (used and set in
         # galaxy.tools.actions). Old jobs may have not set these in the job parameters
@@ -2113,6 +2236,7 @@ class MinimalJobWrapper(HasResourceParameters):
 
         return state
 
+    @spanned("cleanup")
     def cleanup(self, delete_files=True):
         # At least one of these tool cleanup actions (job import), is needed
         # for the tool to work properly, that is why one might want to run
@@ -2132,6 +2256,7 @@ class MinimalJobWrapper(HasResourceParameters):
         except Exception:
             log.exception("Unable to cleanup job %d", self.job_id)
 
+    @spanned("collect_metrics")
     def _collect_metrics(self, has_metrics, job_metrics_directory=None):
         job = has_metrics.get_job()
         job_metrics_directory = job_metrics_directory or self.working_directory
@@ -2599,6 +2724,7 @@ class TaskWrapper(JobWrapper):
         # For compatibility with drmaa job runner and TaskWrapper, instead of using job_id directly
         return self.get_task().get_id_tag()
 
+    @spanned("prepare")
     def prepare(self, compute_environment=None):
         """
         Prepare the job to run by creating the working directory and the
@@ -12,6 +12,7 @@ from queue import (
 from typing import (
     Dict,
     List,
+    Optional,
     Tuple,
 )
 
@@ -34,8 +35,14 @@ from galaxy.jobs import (
     TaskWrapper,
 )
 from galaxy.jobs.mapper import JobNotReadyException
+from galaxy.jobs.readiness import JobReadinessIndex
 from galaxy.managers.jobs import get_jobs_to_check_at_startup
 from galaxy.model.base import transaction
+from galaxy.model.job_fingerprint import (
+    has_current_fingerprint,
+    job_fingerprint_from_parameters,
+    set_job_fingerprint,
+)
 from galaxy.structured_app import MinimalManagerApp
 from galaxy.util import unicodify
 from galaxy.util.custom_logging import get_logger
@@ -66,6 +73,8 @@ log = get_logger(__name__)
     "user_over_quota",
     "user_over_total_walltime",
 )
+# Dataset state changes this many seconds older than the previous readiness check are reconsidered
+READINESS_CLOCK_SKEW_SECONDS = 5
 DEFAULT_JOB_RUNNER_FAILURE_MESSAGE = "Unable to run job due to a misconfiguration of the Galaxy job running system.  Please contact a site administrator."
 
 
@@ -233,6 +242,12 @@ class JobHandlerQueue(BaseJobHandlerQueue):
         self.waiting_jobs: List[int] = []
         # Contains wrappers of jobs that are limited or ready (so they aren't created unnecessarily/multiple times)
         self.job_wrappers: Dict[int, JobWrapper] = {}
+        # Tracks which new jobs are waiting on which inputs, if incremental readiness checks are enabled
+        self.readiness_index: Optional[JobReadinessIndex] = None
+        self._readiness_changes_since = datetime.datetime.utcnow()
+        ready_sweep_interval = self.app.job_config.handler_ready_sweep_interval
+        if self.track_jobs_in_database and ready_sweep_interval:
+            self.readiness_index = JobReadinessIndex(ready_sweep_interval)
         name = "JobHandlerQueue.monitor_thread"
         self._init_monitor_thread(name, target=self.__monitor, config=app.config)
         self.job_grabber = None
@@ -387,68 +402,10 @@ class JobHandlerQueue(BaseJobHandlerQueue):
         if self.track_jobs_in_database:
             # Clear the session so we get fresh states for job and all datasets
             self.sa_session.expunge_all()
-            # Fetch all new jobs
-            hda_not_ready = (
-                self.sa_session.query(model.Job.id)
-                .enable_eagerloads(False)
-                .join(model.JobToInputDatasetAssociation)
-                .join(model.HistoryDatasetAssociation)
-                .join(model.Dataset)
-                .filter(
-                    and_(
-                        model.Job.state == model.Job.states.NEW, model.Dataset.state.in_(model.Dataset.non_ready_states)
-                    )
-                )
-                .subquery()
-            )
-            ldda_not_ready = (
-                self.sa_session.query(model.Job.id)
-                .enable_eagerloads(False)
-                .join(model.JobToInputLibraryDatasetAssociation)
-                .join(model.LibraryDatasetDatasetAssociation)
-                .join(model.Dataset)
-                .filter(
-                    and_(
-                        model.Job.state == model.Job.states.NEW, model.Dataset.state.in_(model.Dataset.non_ready_states)
-                    )
-                )
-                .subquery()
-            )
-            coalesce_exp = func.coalesce(
-                model.Job.table.c.user_id, model.Job.table.c.session_id
-            )  # accommodate jobs by anonymous users
-            rank = func.rank().over(partition_by=coalesce_exp, order_by=model.Job.table.c.id).label("rank")
-            job_filter_conditions = (
-                (model.Job.state == model.Job.states.NEW),
-                (model.Job.handler == self.app.config.server_name),
-                ~model.Job.table.c.id.in_(select(hda_not_ready)),
-                ~model.Job.table.c.id.in_(select(ldda_not_ready)),
-            )
-            if self.app.config.user_activation_on:
-                job_filter_conditions = job_filter_conditions + (
-                    or_((model.Job.user_id == null()), (model.User.active == true())),
-                )
-            if self.sa_session.bind.name == "sqlite":
-                query_objects = (model.Job,)
-            else:
-                query_objects = (model.Job, rank)
-            ready_query = (
-                self.sa_session.query(*query_objects)
-                .enable_eagerloads(False)
-                .outerjoin(model.User)
-                .filter(and_(*job_filter_conditions))
-                .order_by(model.Job.id)
-            )
-            if self.sa_session.bind.name == "sqlite":
-                jobs_to_check = ready_query.all()
+            if self.readiness_index is not None:
+                jobs_to_check = self.__get_ready_jobs_from_index()
             else:
-                ranked = ready_query.subquery()
-                jobs_to_check = (
-                    self.sa_session.query(model.Job)
-                    .join(ranked, model.Job.id == ranked.c.id)
-                    .filter(ranked.c.rank <= self.app.job_config.handler_ready_window_size)
-                    .all()
-                )
+                jobs_to_check = self.__get_ready_jobs()
             # Filter jobs with invalid input states
             jobs_to_check = self.__filter_jobs_with_invalid_input_states(jobs_to_check)
             # Fetch all "resubmit" jobs
@@ -552,6 +509,9 @@ class JobHandlerQueue(BaseJobHandlerQueue):
         # Update the waiting list
         if not self.track_jobs_in_database:
             self.waiting_jobs = new_waiting_jobs
+        elif self.readiness_index is not None:
+            # Jobs deferred by limits stay ready, everything else has been dispatched or dealt with
+            self.readiness_index.discard({job.id for job in jobs_to_check} - set(new_waiting_jobs))
         # Remove cached wrappers for any jobs that are no longer being tracked
         for id in set(self.job_wrappers.keys()) - set(new_waiting_jobs):
             del self.job_wrappers[id]
@@ -562,6 +522,139 @@ class JobHandlerQueue(BaseJobHandlerQueue):
         # Done with the session
         self.sa_session.remove()
 
+    def __get_ready_jobs(self, job_ids=None):
+        """
+        Fetch new jobs assigned to this handler whose inputs are all in a ready state, limited to
+        ``handler_ready_window_size`` jobs per user. If ``job_ids`` is given, only those jobs are
+        considered and their inputs are assumed to have been verified by the readiness index.
+        """
+        job_filter_conditions = (
+            (model.Job.state == model.Job.states.NEW),
+            (model.Job.handler == self.app.config.server_name),
+        )
+        if job_ids is None:
+            hda_not_ready = self.__not_ready_input_query(
+                model.JobToInputDatasetAssociation, model.HistoryDatasetAssociation
+            ).subquery()
+            ldda_not_ready = self.__not_ready_input_query(
+                model.JobToInputLibraryDatasetAssociation, model.LibraryDatasetDatasetAssociation
+            ).subquery()
+            job_filter_conditions = job_filter_conditions + (
+                ~model.Job.table.c.id.in_(select(hda_not_ready)),
+                ~model.Job.table.c.id.in_(select(ldda_not_ready)),
+            )
+        else:
+            job_filter_conditions = job_filter_conditions + (model.Job.table.c.id.in_(job_ids),)
+        coalesce_exp = func.coalesce(
+            model.Job.table.c.user_id, model.Job.table.c.session_id
+        )  # accommodate jobs by anonymous users
+        rank = func.rank().over(partition_by=coalesce_exp, order_by=model.Job.table.c.id).label("rank")
+        if self.app.config.user_activation_on:
+            job_filter_conditions = job_filter_conditions + (
+                or_((model.Job.user_id == null()), (model.User.active == true())),
+            )
+        if self.sa_session.bind.name == "sqlite":
+            query_objects = (model.Job,)
+        else:
+            query_objects = (model.Job, rank)
+        ready_query = (
+            self.sa_session.query(*query_objects)
+            .enable_eagerloads(False)
+            .outerjoin(model.User)
+            .filter(and_(*job_filter_conditions))
+            .order_by(model.Job.id)
+        )
+        if self.sa_session.bind.name == "sqlite":
+            return ready_query.all()
+        ranked = ready_query.subquery()
+        return (
+            self.sa_session.query(model.Job)
+            .join(ranked, model.Job.id == ranked.c.id)
+            .filter(ranked.c.rank <= self.app.job_config.handler_ready_window_size)
+            .all()
+        )
+
+    def __not_ready_input_query(self, job_to_input, input_association, *columns):
+        """
+        Query ids of new jobs (and optionally further ``columns``) that have an input of type
+        ``input_association`` whose dataset is not in a ready state.
+        """
+        return (
+            self.sa_session.query(model.Job.id, *columns)
+            .enable_eagerloads(False)
+            .join(job_to_input)
+            .join(input_association)
+            .join(model.Dataset)
+            .filter(
+                and_(model.Job.state == model.Job.states.NEW, model.Dataset.state.in_(model.Dataset.non_ready_states))
+            )
+        )
+
+    def __get_ready_jobs_from_index(self):
+        """
+        Use the readiness index to fetch new jobs that are ready to run. Only jobs that were assigned since the last
+        iteration and jobs waiting on datasets that changed state since the last iteration are examined, every
+        ``ready_sweep_interval`` seconds the index is rebuilt from a full scan of this handler's new jobs.
+        """
+        index = self.readiness_index
+        assert index is not None
+        # Record the time before querying so that no dataset state change can fall between two iterations
+        changes_since = self._readiness_changes_since
+        self._readiness_changes_since = datetime.datetime.utcnow()
+        job_query = self.sa_session.query(model.Job.id).filter(
+            and_(
+                model.Job.state == model.Job.states.NEW,
+                model.Job.handler == self.app.config.server_name,
+            )
+        )
+        if index.sweep_due():
+            max_job_id = self.sa_session.query(func.max(model.Job.id)).scalar() or 0
+            index.reset(max_job_id)
+            new_job_ids = [row[0] for row in job_query]
+            log.debug("Readiness index consistency sweep found %d new job(s)", len(new_job_ids))
+        else:
+            # Allow for clock skew between the processes that update job and dataset states
+            changed_since = changes_since - datetime.timedelta(seconds=READINESS_CLOCK_SKEW_SECONDS)
+            # Jobs created since the last iteration or (re)assigned to this handler by a job grabber or a restart
+            new_job_ids = [
+                row[0]
+                for row in job_query.filter(
+                    or_(model.Job.id > index.max_job_id, model.Job.update_time >= changed_since)
+                )
+                if not index.is_tracking_job(row[0])
+            ]
+            changed_dataset_ids = (
+                row[0]
+                for row in self.sa_session.query(model.Dataset.id).filter(
+                    and_(
+                        model.Dataset.update_time >= changed_since,
+                        not_(model.Dataset.state.in_(model.Dataset.non_ready_states)),
+                    )
+                )
+            )
+            index.datasets_changed(d for d in changed_dataset_ids if index.is_tracking_dataset(d))
+        if new_job_ids:
+            unmet_pairs = []
+            for job_to_input, input_association in (
+                (model.JobToInputDatasetAssociation, model.HistoryDatasetAssociation),
+                (model.JobToInputLibraryDatasetAssociation, model.LibraryDatasetDatasetAssociation),
+            ):
+                unmet_pairs.extend(
+                    self.__not_ready_input_query(job_to_input, input_association, model.Dataset.id)
+                    .filter(model.Job.id.in_(new_job_ids))
+                    .all()
+                )
+            index.add_jobs(new_job_ids, unmet_pairs)
+        ready_job_ids = index.ready_job_ids
+        if not ready_job_ids:
+            return []
+        # Drop jobs that were deleted, paused or reassigned while they were tracked
+        still_new = {row[0] for row in job_query.filter(model.Job.id.in_(ready_job_ids))}
+        index.discard(ready_job_ids - still_new)
+        if not still_new:
+            return []
+        return self.__get_ready_jobs(job_ids=still_new)
+
     def __filter_jobs_with_invalid_input_states(self, jobs):
         """
         Takes  list of jobs and filters out jobs whose input datasets are in invalid state and
@@ -668,7 +761,8 @@ class JobHandlerQueue(BaseJobHandlerQueue):
         # If state == JOB_READY, assume job_destination also set - otherwise
         # in case of various error or cancelled states do not assume
         # destination has been set.
-        state, job_destination = self.__verify_job_ready(job, job_wrapper)
+        with job_wrapper.spans.span("handler.verify_ready"):
+            state, job_destination = self.__verify_job_ready(job, job_wrapper)
 
         if state == JOB_READY:
             # PASS.  increase usage by one job (if caching) so that multiple jobs aren't dispatched on this queue iteration
@@ -677,6 +771,12 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                 # We record the input dataset version, now that we know the inputs are ready
                 if job_to_input_dataset_association.dataset:
                     job_to_input_dataset_association.dataset_version = job_to_input_dataset_association.dataset.version
+            if not has_current_fingerprint(job):
+                # Inputs that were not ready when the job was created can be identified now
+                try:
+                    set_job_fingerprint(job, job_fingerprint_from_parameters(self.sa_session, job))
+                except Exception:
+                    log.exception("(%s) Failed to compute job fingerprint", job.id)
         return state
 
     def __verify_job_ready(self, job, job_wrapper):
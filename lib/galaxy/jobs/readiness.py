@@ -0,0 +1,107 @@
+"""
+Incremental tracking of which queued jobs are ready to run.
+
+The job handler's full "ready to run" query joins every ``new`` job against
+the states of all of its inputs. With many queued jobs this becomes expensive,
+so handlers may instead keep a dependency index (job -> unmet inputs and
+dataset -> waiting jobs) and only re-examine jobs whose inputs changed state.
+A full scan is still performed periodically to correct any drift.
+"""
+import time
+from collections import defaultdict
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+
+class JobReadinessIndex:
+    """Dependency index mapping waiting jobs to the datasets they wait on.
+
+    This structure is only used from the job handler monitor thread and is
+    therefore not thread-safe.
+    """
+
+    def __init__(self, sweep_interval: float):
+        self.sweep_interval = sweep_interval
+        # job id -> ids of input datasets not yet in a ready state
+        self._unmet: Dict[int, Set[int]] = {}
+        # dataset id -> ids of jobs waiting on it
+        self._waiting_on: Dict[int, Set[int]] = defaultdict(set)
+        # jobs with all inputs ready that have not yet been dispatched (e.g. due to limits)
+        self._ready: Set[int] = set()
+        self.max_job_id = 0
+        self.last_sweep: Optional[float] = None
+
+    def sweep_due(self, now: Optional[float] = None) -> bool:
+        if self.last_sweep is None:
+            return True
+        now = time.time() if now is None else now
+        return now - self.last_sweep >= self.sweep_interval
+
+    def reset(self, max_job_id: int, now: Optional[float] = None):
+        """Forget all tracked state, called before a full consistency sweep repopulates the index."""
+        self._unmet.clear()
+        self._waiting_on.clear()
+        self._ready.clear()
+        self.max_job_id = max_job_id
+        self.last_sweep = time.time() if now is None else now
+
+    def add_jobs(self, job_ids: Iterable[int], unmet_pairs: Iterable[Tuple[int, int]]):
+        """Start tracking ``job_ids``.
+
+        ``unmet_pairs`` are ``(job_id, dataset_id)`` tuples for inputs that are not
+        yet ready, jobs without such pairs are immediately considered ready.
+        """
+        job_ids = set(job_ids)
+        for job_id, dataset_id in unmet_pairs:
+            self._unmet.setdefault(job_id, set()).add(dataset_id)
+            self._waiting_on[dataset_id].add(job_id)
+        for job_id in job_ids:
+            self.max_job_id = max(self.max_job_id, job_id)
+            if job_id not in self._unmet:
+                self._ready.add(job_id)
+
+    def datasets_changed(self, dataset_ids: Iterable[int]) -> List[int]:
+        """Record that ``dataset_ids`` reached a ready state and return jobs that became ready."""
+        released = []
+        for dataset_id in dataset_ids:
+            for job_id in self._waiting_on.pop(dataset_id, ()):
+                unmet = self._unmet.get(job_id)
+                if unmet is None:
+                    continue
+                unmet.discard(dataset_id)
+                if not unmet:
+                    del self._unmet[job_id]
+                    self._ready.add(job_id)
+                    released.append(job_id)
+        return released
+
+    def discard(self, job_ids: Iterable[int]):
+        """Stop tracking jobs, e.g. because they were dispatched, paused or failed."""
+        for job_id in job_ids:
+            self._ready.discard(job_id)
+            for dataset_id in self._unmet.pop(job_id, ()):
+                waiting = self._waiting_on.get(dataset_id)
+                if waiting is not None:
+                    waiting.discard(job_id)
+                    if not waiting:
+                        del self._waiting_on[dataset_id]
+
+    def is_tracking_job(self, job_id: int) -> bool:
+        return job_id in self._unmet or job_id in self._ready
+
+    def is_tracking_dataset(self, dataset_id: int) -> bool:
+        return dataset_id in self._waiting_on
+
+    @property
+    def ready_job_ids(self) -> Set[int]:
+        return set(self._ready)
+
+    @property
+    def waiting_job_count(self) -> int:
+        return len(self._unmet)
@@ -2,6 +2,7 @@
 Base classes for job runner plugins.
 """
 import datetime
+import functools
 import os
 import string
 import subprocess
@@ -10,6 +11,7 @@ import threading
 import time
 import traceback
 import typing
+from concurrent.futures import ThreadPoolExecutor
 from queue import (
     Empty,
     Queue,
@@ -51,6 +53,10 @@ from galaxy.util import (
 )
 from galaxy.util.custom_logging import get_logger
 from galaxy.util.monitors import Monitors
+from galaxy.util.spans import (
+    span,
+    SpanRecorder,
+)
 from .state_handler_factory import build_state_handlers
 
 if typing.TYPE_CHECKING:
@@ -64,6 +70,8 @@ if typing.TYPE_CHECKING:
 log = get_logger(__name__)
 
 STOP_SIGNAL = object()
+# Used for work queue items without a job wrapper recording timing spans
+NULL_SPAN_RECORDER = SpanRecorder(enabled=False)
 
 
 JOB_RUNNER_PARAMETER_UNKNOWN_MESSAGE = "Invalid job runner parameter for this plugin: %s"
@@ -145,14 +153,13 @@ class BaseJobRunner:
                 if method is STOP_SIGNAL:
                     return
                 # id and name are collected first so that the call of method() is the last exception.
+                # arg should be an AsynchronousJobState or a JobWrapper/TaskWrapper
+                job_wrapper = arg.job_wrapper if isinstance(arg, AsynchronousJobState) else arg
                 try:
-                    if isinstance(arg, AsynchronousJobState):
-                        job_id = arg.job_wrapper.get_id_tag()
-                    else:
-                        # arg should be a JobWrapper/TaskWrapper
-                        job_id = arg.get_id_tag()
+                    job_id = job_wrapper.get_id_tag()
                 except Exception:
                     job_id = UNKNOWN
+                spans = getattr(job_wrapper, "spans", None) or NULL_SPAN_RECORDER
                 try:
                     name = method.__name__
                 except Exception:
@@ -166,7 +173,8 @@ class BaseJobRunner:
                     action_timer = self.app.execution_timer_factory.get_timer(
                         f"internals.{action_str}", "job runner action %s for job ${job_id} executed" % (action_str)
                     )
-                    method(arg)
+                    with spans.span(f"runner.{name}", persist=True):
+                        method(arg)
                     log.trace(action_timer.to_str(job_id=job_id))
                 except Exception:
                     log.exception(f"({job_id}) Unhandled exception calling {name}")
@@ -290,13 +298,14 @@ class BaseJobRunner:
         # Prepare the job
         try:
             job_wrapper.prepare()
-            job_wrapper.runner_command_line = self.build_command_line(
-                job_wrapper,
-                include_metadata=include_metadata,
-                include_work_dir_outputs=include_work_dir_outputs,
-                modify_command_for_container=modify_command_for_container,
-                stream_stdout_stderr=stream_stdout_stderr,
-            )
+            with span("build_command_line"):
+                job_wrapper.runner_command_line = self.build_command_line(
+                    job_wrapper,
+                    include_metadata=include_metadata,
+                    include_work_dir_outputs=include_work_dir_outputs,
+                    modify_command_for_container=modify_command_for_container,
+                    stream_stdout_stderr=stream_stdout_stderr,
+                )
         except Exception as e:
             log.exception("(%s) Failure preparing job", job_id)
             job_wrapper.fail(unicodify(e), exception=True)
@@ -792,6 +801,11 @@ class AsynchronousJobRunner(BaseJobRunner, Monitors):
     to the correct methods (queue, finish, cleanup) at appropriate times..
     """
 
+    DEFAULT_SPECS = dict(
+        BaseJobRunner.DEFAULT_SPECS,
+        monitor_check_workers=dict(map=int, valid=lambda x: int(x) >= 1, default=1),
+    )
+
     def __init__(self, app, nworkers, **kwargs):
         super().__init__(app, nworkers, **kwargs)
         # 'watched' and 'queue' are both used to keep track of jobs to watch.
@@ -801,6 +815,11 @@ class AsynchronousJobRunner(BaseJobRunner, Monitors):
         # to 'watched' and then manage the watched jobs.
         self.watched = []
         self.monitor_queue = Queue()
+        # Thread pool used by the default check_watched_items_batch, only created if monitor_check_workers > 1
+        self._check_executor: typing.Optional[ThreadPoolExecutor] = None
+        # Duration (in seconds) and size of the most recent watched job check, for monitoring and tuning
+        self.last_check_watched_items_duration: typing.Optional[float] = None
+        self.last_check_watched_items_count = 0
 
     def _init_monitor_thread(self):
         name = f"{self.runner_name}.monitor_thread"
@@ -844,24 +863,71 @@ class AsynchronousJobRunner(BaseJobRunner, Monitors):
         self.monitor_queue.put(STOP_SIGNAL)
         # Call the parent's shutdown method to stop workers
         self.shutdown_monitor()
+        if self._check_executor is not None:
+            self._check_executor.shutdown(wait=False)
         super().shutdown()
 
     def check_watched_items(self):
         """
         This method is responsible for iterating over self.watched and handling
         state changes and updating self.watched with a new list of watched job
-        states. Subclasses can opt to override this directly (as older job runners will
-        initially) or just override check_watched_item and allow the list processing to
-        reuse the logic here.
+        states. Subclasses should override check_watched_items_batch (to query
+        the state of all watched jobs at once) or check_watched_item, so that
+        every cycle is timed and reported here.
+        """
+        timer = self.app.execution_timer_factory.get_timer(
+            "internal.galaxy.jobs.runners.check_watched_items",
+            "Checked ${count} watched job(s) for ${runner_name}",
+            runner_name=self.runner_name,
+        )
+        count = len(self.watched)
+        self.watched = self.check_watched_items_batch(self.watched)
+        self.last_check_watched_items_duration = timer.elapsed
+        self.last_check_watched_items_count = count
+        if count:
+            log.debug(timer.to_str(count=count, runner_name=self.runner_name))
+
+    def check_watched_items_batch(self, job_states):
+        """
+        Check the state of all ``job_states`` and return the list of job states that
+        should still be watched. Subclasses able to query the state of many jobs at once
+        (e.g. with a single ``qstat`` call) should override this.
+
+        By default each job state is passed to ``check_watched_item``, using a pool of
+        ``monitor_check_workers`` threads if more than one worker is configured.
         """
-        new_watched = []
-        for async_job_state in self.watched:
-            new_async_job_state = self.check_watched_item(async_job_state)
-            if new_async_job_state:
-                new_watched.append(new_async_job_state)
-        self.watched = new_watched
-
-    # Subclasses should implement this unless they override check_watched_items all together.
+        results = self._map_watched_items(self._check_watched_item_or_keep, job_states)
+        return [job_state for job_state in results if job_state]
+
+    def _map_watched_items(self, func, job_states):
+        """
+        Return ``func(job_state)`` for each of ``job_states``, in order. The calls are
+        spread over a pool of ``monitor_check_workers`` threads if more than one worker
+        is configured.
+        """
+        workers = self.runner_params.monitor_check_workers
+        if workers <= 1 or len(job_states) <= 1:
+            return [func(job_state) for job_state in job_states]
+        if self._check_executor is None:
+            self._check_executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix=f"{self.runner_name}.check_thread"
+            )
+        # map() preserves the order of the watched list
+        return list(self._check_executor.map(functools.partial(self._call_in_check_thread, func), job_states))
+
+    def _call_in_check_thread(self, func, job_state):
+        with self.app.model.session():  # Create a Session instance and ensure it's closed.
+            return func(job_state)
+
+    def _check_watched_item_or_keep(self, job_state):
+        try:
+            return self.check_watched_item(job_state)
+        except Exception:
+            log.exception("(%s) Unhandled exception checking job state", job_state.job_id)
+            # keep watching the job, it will be checked again in the next cycle
+            return job_state
+
+    # Subclasses should implement this unless they override check_watched_items or check_watched_items_batch.
     def check_watched_item(self, job_state):
         raise NotImplementedError()
 
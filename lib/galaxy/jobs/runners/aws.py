@@ -456,13 +456,15 @@ class AWSBatchJobRunner(AsynchronousJobRunner):
             # Sleep a bit before the next state check
             time.sleep(max(self.app.config.job_runner_monitor_sleep, self.MIN_QUERY_INTERVAL))
 
-    def check_watched_items(self):
+    def check_watched_items_batch(self, job_states):
         done: Set[str] = set()
-        self.check_watched_items_by_batch(0, len(self.watched), done)
-        self.watched = [x for x in self.watched if x[0] not in done]
+        self.check_watched_items_by_batch(0, len(job_states), done, job_states)
+        return [x for x in job_states if x[0] not in done]
 
-    def check_watched_items_by_batch(self, start: int, end: int, done: Set[str]):
-        jobs = self.watched[start : start + self.MAX_JOBS_PER_QUERY]
+    def check_watched_items_by_batch(self, start: int, end: int, done: Set[str], job_states=None):
+        if job_states is None:
+            job_states = self.watched
+        jobs = job_states[start : start + self.MAX_JOBS_PER_QUERY]
         if not jobs:
             return
 
@@ -496,7 +498,7 @@ class AWSBatchJobRunner(AsynchronousJobRunner):
             self._mark_as_failed(job_state, reason)
             done.add(job_id)
 
-        self.check_watched_items_by_batch(start + self.MAX_JOBS_PER_QUERY, end, done)
+        self.check_watched_items_by_batch(start + self.MAX_JOBS_PER_QUERY, end, done, job_states)
 
     def _mark_as_successful(self, job_state):
         _write_logfile(job_state.output_file, "")
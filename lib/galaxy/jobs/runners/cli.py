@@ -152,16 +152,16 @@ class ShellJobRunner(AsynchronousJobRunner):
             log.error(stderr)
             return returncode, cmd_out.stdout
 
-    def check_watched_items(self):
+    def check_watched_items_batch(self, watched):
         """
         Called by the monitor thread to look at each watched job and deal
         with state changes.
         """
         new_watched = []
 
-        job_states = self.__get_job_states()
+        job_states = self.__get_job_states(watched)
 
-        for ajs in self.watched:
+        for ajs in watched:
             external_job_id = ajs.job_id
             id_tag = ajs.job_wrapper.get_id_tag()
             old_state = ajs.old_state
@@ -205,8 +205,7 @@ class ShellJobRunner(AsynchronousJobRunner):
                 self.work_queue.put((self.finish_job, ajs))
             else:
                 new_watched.append(ajs)
-        # Replace the watch list with the updated version
-        self.watched = new_watched
+        return new_watched
 
     def handle_metadata_externally(self, ajs):
         self._handle_metadata_externally(ajs.job_wrapper, resolve_requirements=True)
@@ -223,11 +222,11 @@ class ShellJobRunner(AsynchronousJobRunner):
                 ajs.runner_state = JobState.runner_states.MEMORY_LIMIT_REACHED
                 ajs.fail_message = "Tool failed due to insufficient memory. Try with more memory."
 
-    def __get_job_states(self):
+    def __get_job_states(self, watched):
         job_destinations = {}
         job_states = {}
         # unique the list of destinations
-        for ajs in self.watched:
+        for ajs in watched:
             if ajs.job_destination.id not in job_destinations:
                 job_destinations[ajs.job_destination.id] = dict(
                     job_destination=ajs.job_destination, job_ids=[ajs.job_id]
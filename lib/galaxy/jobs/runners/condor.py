@@ -157,34 +157,35 @@ class CondorJobRunner(AsynchronousJobRunner):
         # Add to our 'queue' of jobs to monitor
         self.monitor_queue.put(cjs)
 
-    def check_watched_items(self):
+    def check_watched_items_batch(self, job_states):
         """
         Called by the monitor thread to look at each watched job and deal
         with state changes.
+
+        Job states are read from the Condor user log of each job rather than
+        from the schedd. The logs are read first, in the pool of
+        ``monitor_check_workers`` threads if configured, and the state changes
+        are then handled in order.
         """
         new_watched = []
-        for cjs in self.watched:
+        summaries = self._map_watched_items(self._summarize_user_log, job_states)
+        for cjs, summary in zip(job_states, summaries):
             job_id = cjs.job_id
             galaxy_id_tag = cjs.job_wrapper.get_id_tag()
-            try:
-                if (
-                    cjs.job_wrapper.tool.tool_type != "interactive"
-                    and os.stat(cjs.user_log).st_size == cjs.user_log_size
-                ):
-                    new_watched.append(cjs)
-                    continue
-                s1, s4, s7, s5, s9, log_size = summarize_condor_log(cjs.user_log, job_id)
-                job_running = s1 and not (s4 or s7)
-                job_complete = s5
-                job_failed = s9
-                cjs.user_log_size = log_size
-            except Exception:
-                # so we don't kill the monitor thread
-                log.exception(f"({galaxy_id_tag}/{job_id}) Unable to check job status")
+            if isinstance(summary, Exception):
                 log.warning(f"({galaxy_id_tag}/{job_id}) job will now be errored")
                 cjs.fail_message = "Cluster could not complete job"
                 self.work_queue.put((self.fail_job, cjs))
                 continue
+            if summary is None:
+                # the user log did not change
+                new_watched.append(cjs)
+                continue
+            s1, s4, s7, s5, s9, log_size = summary
+            job_running = s1 and not (s4 or s7)
+            job_complete = s5
+            job_failed = s9
+            cjs.user_log_size = log_size
 
             if job_running:
                 # If running, check for entry points...
@@ -215,8 +216,21 @@ class CondorJobRunner(AsynchronousJobRunner):
                 continue
             cjs.runnning = job_running
             new_watched.append(cjs)
-        # Replace the watch list with the updated version
-        self.watched = new_watched
+        return new_watched
+
+    def _summarize_user_log(self, cjs):
+        """
+        Return the summary of the Condor user log of ``cjs``, ``None`` if the log did
+        not change since the last check or the exception raised reading it.
+        """
+        try:
+            if cjs.job_wrapper.tool.tool_type != "interactive" and os.stat(cjs.user_log).st_size == cjs.user_log_size:
+                return None
+            return summarize_condor_log(cjs.user_log, cjs.job_id)
+        except Exception as e:
+            # so we don't kill the monitor thread
+            log.exception(f"({cjs.job_wrapper.get_id_tag()}/{cjs.job_id}) Unable to check job status")
+            return e
 
     def stop_job(self, job_wrapper):
         """Attempts to delete a job from the DRM queue"""
@@ -262,7 +262,7 @@ class DRMAAJobRunner(AsynchronousJobRunner):
     def check_watched_item(self, ajs, new_watched):
         """
         look at a single watched job, determine its state, and deal with errors
-        that could happen in this process. to be called from check_watched_items()
+        that could happen in this process. to be called from check_watched_items_batch()
         returns the state or None if exceptions occurred
         in the latter case the job is appended to new_watched if a
 
@@ -270,13 +270,13 @@ class DRMAAJobRunner(AsynchronousJobRunner):
         2 drmaa.InvalidJobExceptionnot, or
         3 drmaa.DrmCommunicationException occurred
 
-        (which causes the job to be tested again in the next iteration of check_watched_items)
+        (which causes the job to be tested again in the next iteration of check_watched_items_batch)
 
         - the job is finished as errored if any other exception occurs
         - the job is finished OK or errored after the maximum number of retries
           depending on the exception
 
-        Note that None is returned in all cases where the loop in check_watched_items
+        Note that None is returned in all cases where the loop in check_watched_items_batch
         is to be continued
         """
         external_job_id = ajs.job_id
@@ -333,17 +333,21 @@ class DRMAAJobRunner(AsynchronousJobRunner):
             return None
         return state
 
-    def check_watched_items(self):
+    def check_watched_items_batch(self, job_states):
         """
         Called by the monitor thread to look at each watched job and deal
         with state changes.
+
+        DRMAA has no call returning the state of several jobs, so the states of
+        all watched jobs are queried first, in the pool of ``monitor_check_workers``
+        threads if configured, and the state changes are then handled in order.
         """
         new_watched = []
-        for ajs in self.watched:
+        states = self._map_watched_items(lambda ajs: self.check_watched_item(ajs, new_watched), job_states)
+        for ajs, state in zip(job_states, states):
             external_job_id = ajs.job_id
             galaxy_id_tag = ajs.job_wrapper.get_id_tag()
             old_state = ajs.old_state
-            state = self.check_watched_item(ajs, new_watched)
             if state is None:
                 continue
             if state != old_state:
@@ -365,8 +369,7 @@ class DRMAAJobRunner(AsynchronousJobRunner):
                 continue
             ajs.old_state = state
             new_watched.append(ajs)
-        # Replace the watch list with the updated version
-        self.watched = new_watched
+        return new_watched
 
     def stop_job(self, job_wrapper):
         """Attempts to delete a job from the DRM queue"""
@@ -349,15 +349,15 @@ class PBSJobRunner(AsynchronousJobRunner):
         # Add to our 'queue' of jobs to monitor
         self.monitor_queue.put(job_state)
 
-    def check_watched_items(self):
+    def check_watched_items_batch(self, job_states):
         """
         Called by the monitor thread to look at each watched job and deal
         with state changes.
         """
         new_watched = []
         # reduce pbs load by batching status queries
-        (failures, statuses) = self.check_all_jobs()
-        for pbs_job_state in self.watched:
+        (failures, statuses) = self.check_all_jobs(job_states)
+        for pbs_job_state in job_states:
             job_id = pbs_job_state.job_id
             galaxy_job_id = pbs_job_state.job_wrapper.get_id_tag()
             old_state = pbs_job_state.old_state
@@ -426,19 +426,20 @@ class PBSJobRunner(AsynchronousJobRunner):
                 continue
             pbs_job_state.old_state = status.job_state
             new_watched.append(pbs_job_state)
-        # Replace the watch list with the updated version
-        self.watched = new_watched
+        return new_watched
 
-    def check_all_jobs(self):
+    def check_all_jobs(self, job_states=None):
         """
         Returns a list of servers that failed to be contacted and a dict
         of "job_id : status" pairs (where status is a bunchified version
         of the API's structure.
         """
+        if job_states is None:
+            job_states = self.watched
         servers = []
         failures = []
         statuses = {}
-        for pbs_job_state in self.watched:
+        for pbs_job_state in job_states:
             pbs_server_name = self.__get_pbs_server(pbs_job_state.job_destination.params)
             if pbs_server_name not in servers:
                 servers.append(pbs_server_name)
@@ -40,8 +40,11 @@ from json import dumps
 from typing import (
     Callable,
     cast,
+    Dict,
+    FrozenSet,
     List,
     Optional,
+    Tuple,
 )
 
 from galaxy.exceptions import (
@@ -49,6 +52,7 @@ from galaxy.exceptions import (
     UserActivationRequiredException,
 )
 from galaxy.model import (
+    cached_id,
     Dataset,
     GalaxySession,
     History,
@@ -61,6 +65,7 @@ from galaxy.model.base import (
     transaction,
 )
 from galaxy.model.scoped_session import galaxy_scoped_session
+from galaxy.model.security import DatasetAccessOracle
 from galaxy.model.tags import GalaxyTagHandlerSession
 from galaxy.schema.tasks import RequestUser
 from galaxy.security.idencoding import IdEncodingHelper
@@ -201,6 +206,8 @@ class ProvidesUserContext(ProvidesAppContext):
 
     galaxy_session: Optional[GalaxySession] = None
     _tag_handler: Optional[GalaxyTagHandlerSession] = None
+    _dataset_access_oracles: Optional[Dict[FrozenSet[int], DatasetAccessOracle]] = None
+    _user_dataset_access_oracle: Optional[Tuple[Optional[int], DatasetAccessOracle]] = None
 
     @property
     def tag_handler(self):
@@ -239,6 +246,25 @@ class ProvidesUserContext(ProvidesAppContext):
             roles = []
         return roles
 
+    def get_dataset_access_oracle(self, user_roles: Optional[List[Role]] = None) -> DatasetAccessOracle:
+        """Return a dataset access oracle for ``user_roles`` that is shared for the lifetime of this context.
+
+        ``user_roles`` defaults to the roles of the current user.
+        """
+        if user_roles is None:
+            user = self.user
+            user_id = cached_id(user) if user else None
+            if self._user_dataset_access_oracle is None or self._user_dataset_access_oracle[0] != user_id:
+                oracle = self.get_dataset_access_oracle(self.get_current_user_roles())
+                self._user_dataset_access_oracle = (user_id, oracle)
+            return self._user_dataset_access_oracle[1]
+        if self._dataset_access_oracles is None:
+            self._dataset_access_oracles = {}
+        role_ids = frozenset(cached_id(role) for role in user_roles)
+        if role_ids not in self._dataset_access_oracles:
+            self._dataset_access_oracles[role_ids] = self.app.security_agent.dataset_access_oracle(user_roles)
+        return self._dataset_access_oracles[role_ids]
+
     @property
     def user_is_admin(self) -> bool:
         return self.app.config.is_admin_user(self.user)
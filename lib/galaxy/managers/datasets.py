@@ -25,6 +25,7 @@ from galaxy.managers import (
     secured,
     users,
 )
+from galaxy.managers.context import ProvidesUserContext
 from galaxy.model.base import transaction
 from galaxy.schema.tasks import (
     ComputeDatasetHashTaskRequest,
@@ -124,30 +125,41 @@ class DatasetManager(base.ModelManager[model.Dataset], secured.AccessibleManager
         """
         Is this dataset readable/viewable to user?
         """
-        if self.user_manager.is_admin(user, trans=kwargs.get("trans")):
+        trans = kwargs.get("trans")
+        if self.user_manager.is_admin(user, trans=trans):
             return True
-        if self.has_access_permission(item, user):
+        if self.has_access_permission(item, user, trans=trans):
             return True
         return False
 
-    def has_access_permission(self, dataset, user):
+    def has_access_permission(self, dataset, user, trans=None):
         """
         Return T/F if the user has role-based access to the dataset.
+
+        If ``trans`` is given the access decision is taken by (and cached in) its
+        dataset access oracle, which may have been prefetched for many datasets.
         """
         roles = user.all_roles_exploiting_cache() if user else []
+        if isinstance(trans, ProvidesUserContext):
+            return trans.get_dataset_access_oracle(roles).can_access_dataset(dataset)
         return self.app.security_agent.can_access_dataset(roles, dataset)
 
     def compute_hash(self, request: ComputeDatasetHashTaskRequest):
         # For files in extra_files_path
         dataset = self.by_id(request.dataset_id)
         extra_files_path = request.extra_files_path
-        if extra_files_path:
-            extra_dir = dataset.extra_files_path_name
-            file_path = self.app.object_store.get_filename(dataset, extra_dir=extra_dir, alt_name=extra_files_path)
-        else:
-            file_path = dataset.file_name
         hash_function = request.hash_function
-        calculated_hash_value = memory_bound_hexdigest(hash_func_name=hash_function, path=file_path)
+        object_store_kwds = {}
+        if extra_files_path:
+            object_store_kwds = dict(extra_dir=dataset.extra_files_path_name, alt_name=extra_files_path)
+        # remote object stores may have hashed the file while uploading it
+        calculated_hash_value = self.app.object_store.get_upload_hexdigest(dataset, hash_function, **object_store_kwds)
+        if calculated_hash_value is None:
+            if extra_files_path:
+                file_path = self.app.object_store.get_filename(dataset, **object_store_kwds)
+            else:
+                file_path = dataset.file_name
+            calculated_hash_value = memory_bound_hexdigest(hash_func_name=hash_function, path=file_path)
         extra_files_path = request.extra_files_path
         dataset_hash = model.DatasetHash(
             hash_function=hash_function.value,
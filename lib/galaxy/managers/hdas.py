@@ -41,7 +41,10 @@ from galaxy.managers import (
     users,
 )
 from galaxy.model.base import transaction
-from galaxy.model.deferred import materializer_factory
+from galaxy.model.deferred import (
+    materialization_cache_for,
+    materializer_factory,
+)
 from galaxy.schema.schema import DatasetSourceType
 from galaxy.schema.storage_cleaner import (
     CleanableItemsSummary,
@@ -170,6 +173,7 @@ class HDAManager(
             object_store=self.app.object_store,
             file_sources=self.app.file_sources,
             sa_session=self.app.model.context,
+            materialization_cache=materialization_cache_for(self.app.config),
         )
         user = self.user_manager.by_id(request_user.user_id)
         if request.source == DatasetSourceType.hda:
@@ -239,7 +243,7 @@ class HDAManager(
         # decrease the user's space used
         quota_source_info = hda.dataset.quota_source_info
         if quota_amount_reduction and quota_source_info.use:
-            user.adjust_total_disk_usage(-quota_amount_reduction, quota_source_info.label)
+            user.adjust_total_disk_usage(-quota_amount_reduction, quota_source_info.label, reason="purge")
             # TODO: don't flush above if we're going to re-flush here
             session = object_session(user)
             with transaction(session):
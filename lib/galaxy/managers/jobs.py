@@ -51,6 +51,11 @@ from galaxy.model.index_filter_util import (
     raw_text_column_filter,
     text_column_filter,
 )
+from galaxy.model.job_fingerprint import (
+    compute_job_fingerprint,
+    lacks_current_fingerprint,
+    session_dataset_token_resolver,
+)
 from galaxy.model.scoped_session import galaxy_scoped_session
 from galaxy.schema.schema import (
     JobIndexQueryPayload,
@@ -309,6 +314,15 @@ class JobSearch:
                 return key, "__id_wildcard__"
             return key, value
 
+        fingerprint = compute_job_fingerprint(
+            tool_id, tool_version, param_dump, session_dataset_token_resolver(self.sa_session)
+        )
+        if fingerprint is not None:
+            job = self.__search_by_fingerprint(
+                fingerprint=fingerprint, tool_id=tool_id, tool_version=tool_version, user=user, job_state=job_state
+            )
+            if job is not None:
+                return job
         wildcard_param_dump = remap(param_dump, visit=populate_input_data_input_id)
         return self.__search(
             tool_id=tool_id,
@@ -318,27 +332,12 @@ class JobSearch:
             job_state=job_state,
             param_dump=param_dump,
             wildcard_param_dump=wildcard_param_dump,
+            # Jobs with a current fingerprint have been checked above
+            legacy_jobs_only=fingerprint is not None,
         )
 
-    def __search(
-        self, tool_id, tool_version, user, input_data, job_state=None, param_dump=None, wildcard_param_dump=None
-    ):
-        search_timer = ExecutionTimer()
-
-        def replace_dataset_ids(path, key, value):
-            """Exchanges dataset_ids (HDA, LDA, HDCA, not Dataset) in param_dump with dataset ids used in job."""
-            if key == "id":
-                current_case = param_dump
-                for p in path:
-                    current_case = current_case[p]
-                src = current_case["src"]
-                value = job_input_ids[src][value]
-                return key, value
-            return key, value
-
-        # build one subquery that selects a job with correct job parameters
-
-        subq = select(model.Job.id).where(
+    def __filter_reusable_jobs(self, stmt, tool_id, tool_version, user, job_state):
+        stmt = stmt.where(
             and_(
                 model.Job.tool_id == tool_id,
                 model.Job.user_id == user.id,
@@ -346,27 +345,68 @@ class JobSearch:
             )
         )
         if tool_version:
-            subq = subq.where(Job.tool_version == str(tool_version))
+            stmt = stmt.where(Job.tool_version == str(tool_version))
 
         if job_state is None:
-            subq = subq.where(
+            stmt = stmt.where(
                 Job.state.in_(
                     [Job.states.NEW, Job.states.QUEUED, Job.states.WAITING, Job.states.RUNNING, Job.states.OK]
                 )
             )
         else:
             if isinstance(job_state, str):
-                subq = subq.where(Job.state == job_state)
+                stmt = stmt.where(Job.state == job_state)
             elif isinstance(job_state, list):
-                subq = subq.where(or_(*[Job.state == s for s in job_state]))
+                stmt = stmt.where(or_(*[Job.state == s for s in job_state]))
 
         # exclude jobs with deleted outputs
-        subq = subq.where(
+        stmt = stmt.where(
             and_(
                 model.Job.any_output_dataset_collection_instances_deleted == false(),
                 model.Job.any_output_dataset_deleted == false(),
             )
         )
+        return stmt
+
+    def __search_by_fingerprint(self, fingerprint, tool_id, tool_version, user, job_state=None):
+        search_timer = ExecutionTimer()
+        stmt = select(model.Job).where(model.Job.fingerprint == fingerprint)
+        stmt = self.__filter_reusable_jobs(stmt, tool_id, tool_version, user, job_state)
+        stmt = stmt.order_by(model.Job.id.desc()).limit(1)
+        job = self.sa_session.scalars(stmt).first()
+        if job is not None:
+            log.info("Found equivalent job by fingerprint %s", search_timer)
+        return job
+
+    def __search(
+        self,
+        tool_id,
+        tool_version,
+        user,
+        input_data,
+        job_state=None,
+        param_dump=None,
+        wildcard_param_dump=None,
+        legacy_jobs_only=False,
+    ):
+        search_timer = ExecutionTimer()
+
+        def replace_dataset_ids(path, key, value):
+            """Exchanges dataset_ids (HDA, LDA, HDCA, not Dataset) in param_dump with dataset ids used in job."""
+            if key == "id":
+                current_case = param_dump
+                for p in path:
+                    current_case = current_case[p]
+                src = current_case["src"]
+                value = job_input_ids[src][value]
+                return key, value
+            return key, value
+
+        # build one subquery that selects a job with correct job parameters
+
+        subq = self.__filter_reusable_jobs(select(model.Job.id), tool_id, tool_version, user, job_state)
+        if legacy_jobs_only:
+            subq = subq.where(lacks_current_fingerprint())
 
         for k, v in wildcard_param_dump.items():
             wildcard_value = None
@@ -870,6 +910,76 @@ def summarize_destination_params(trans, job):
     return destination_params
 
 
+def summarize_job_spans(trans, job):
+    """Produce a dict-ified version of the timing spans recorded for a job.
+
+    ``pickup_delay`` is the number of seconds between the creation of the job
+    and its first recorded span (usually its first readiness check by a job
+    handler).
+
+    Precondition: the caller has verified the job is accessible to the user
+    represented by the trans parameter.
+    """
+    stmt = select(model.JobSpan).where(model.JobSpan.job_id == job.id).order_by(model.JobSpan.id)
+    spans = trans.sa_session.scalars(stmt).all()
+    pickup_delay = None
+    if spans and job.create_time:
+        first_start_time = min(span.start_time for span in spans)
+        pickup_delay = max((first_start_time - job.create_time).total_seconds(), 0.0)
+    return {
+        "tool_id": job.tool_id,
+        "state": job.state,
+        "pickup_delay": pickup_delay,
+        "spans": [
+            {
+                "name": span.name,
+                "start_time": span.start_time.isoformat(),
+                "duration": float(span.duration),
+                "occurrences": span.occurrences,
+            }
+            for span in spans
+        ],
+    }
+
+
+def summarize_span_statistics(sa_session, tool_id=None, limit=1000):
+    """Aggregate the timing spans of the ``limit`` most recent jobs with spans by span name.
+
+    ``duration`` is the total number of seconds spent in a span across the
+    summarized jobs, ``mean`` the average per job that recorded the span.
+    """
+    job_ids = select(model.JobSpan.job_id).distinct()
+    if tool_id is not None:
+        job_ids = job_ids.join(model.Job, model.Job.id == model.JobSpan.job_id).where(model.Job.tool_id == tool_id)
+    job_ids = job_ids.order_by(model.JobSpan.job_id.desc()).limit(limit).subquery()
+    stmt = (
+        select(
+            model.JobSpan.name,
+            func.count(model.JobSpan.job_id.distinct()),
+            func.sum(model.JobSpan.occurrences),
+            func.sum(model.JobSpan.duration),
+            func.max(model.JobSpan.duration),
+        )
+        .where(model.JobSpan.job_id.in_(select(job_ids.c.job_id)))
+        .group_by(model.JobSpan.name)
+        .order_by(model.JobSpan.name)
+    )
+    rval = []
+    for name, jobs, occurrences, duration, max_duration in sa_session.execute(stmt):
+        duration = float(duration or 0)
+        rval.append(
+            {
+                "name": name,
+                "jobs": jobs,
+                "occurrences": int(occurrences or 0),
+                "duration": duration,
+                "mean": duration / jobs if jobs else 0.0,
+                "max": float(max_duration or 0),
+            }
+        )
+    return rval
+
+
 def summarize_job_parameters(trans, job):
     """Produce a dict-ified version of job parameters ready for tabular rendering.
 
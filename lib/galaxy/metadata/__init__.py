@@ -14,6 +14,7 @@ from galaxy.model.metadata import (
 )
 from galaxy.model.store import DirectoryModelExportStore
 from galaxy.util import safe_makedirs
+from galaxy.util.spans import spanned
 
 log = getLogger(__name__)
 
@@ -129,6 +130,7 @@ class PortableDirectoryMetadataGenerator(MetadataCollectionStrategy):
     def __init__(self, job_id):
         self.job_id = job_id
 
+    @spanned("metadata.setup")
     def setup_external_metadata(
         self,
         datasets_dict,
@@ -268,6 +270,7 @@ class PortableDirectoryMetadataGenerator(MetadataCollectionStrategy):
             # return args to galaxy_ext.metadata.set_metadata required to build
             return ""
 
+    @spanned("metadata.load")
     def load_metadata(self, dataset, name, sa_session, working_directory, remote_metadata_directory=None):
         metadata_output_path = os.path.join(working_directory, "metadata", f"metadata_out_{name}")
         self._load_metadata_from_path(dataset, metadata_output_path, working_directory, remote_metadata_directory)
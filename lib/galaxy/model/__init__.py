@@ -909,9 +909,20 @@ WHERE user_id = :user_id and quota_source_label = :label
 
     total_disk_usage = property(get_disk_usage, set_disk_usage)
 
-    def adjust_total_disk_usage(self, amount, quota_source_label):
+    def adjust_total_disk_usage(self, amount, quota_source_label, reason=None):
+        """Add ``amount`` bytes to the usage counter of ``quota_source_label``.
+
+        The adjustment is recorded as a :class:`UserDiskUsageDelta` so that the
+        disk usage reconciler can detect drift of the counters. ``reason``
+        describes the cause of the adjustment (e.g. ``"purge"``).
+        """
         assert amount is not None
         if amount != 0:
+            sa_session = object_session(self)
+            if sa_session is not None:
+                sa_session.add(
+                    UserDiskUsageDelta(self, int(amount), quota_source_label=quota_source_label, reason=reason)
+                )
             if quota_source_label is None:
                 self.disk_usage = func.coalesce(self.table.c.disk_usage, 0) + amount
             else:
@@ -1270,6 +1281,31 @@ class TaskMetricNumeric(BaseJobMetric, RepresentById):
     metric_value = Column(Numeric(JOB_METRIC_PRECISION, JOB_METRIC_SCALE))
 
 
+class JobSpan(Base, RepresentById):
+    """Wall time spent in one (hierarchically named) phase of a job's lifecycle.
+
+    ``name`` is the ``/`` separated path of nested spans (e.g.
+    ``runner.queue_job/prepare``), ``duration`` is the total number of seconds
+    spent in the ``occurrences`` of the span, the first starting at ``start_time``.
+    """
+
+    __tablename__ = "job_span"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("job.id"), index=True)
+    name = Column(Unicode(255))
+    start_time = Column(DateTime)
+    duration = Column(Numeric(JOB_METRIC_PRECISION, JOB_METRIC_SCALE))
+    occurrences = Column(Integer)
+
+    def __init__(self, job_id, name, start_time, duration, occurrences=1):
+        self.job_id = job_id
+        self.name = name
+        self.start_time = start_time
+        self.duration = duration
+        self.occurrences = occurrences
+
+
 class IoDicts(NamedTuple):
     inp_data: Dict[str, Optional["DatasetInstance"]]
     out_data: Dict[str, "DatasetInstance"]
@@ -1319,6 +1355,8 @@ class Job(Base, JobLike, UsesCreateAndUpdateTime, Dictifiable, Serializable):
     handler = Column(TrimmedString(255), index=True)
     preferred_object_store_id = Column(String(255), nullable=True)
     object_store_id_overrides = Column(JSONType)
+    fingerprint = Column(String(64), index=True, nullable=True)
+    fingerprint_version = Column(Integer, nullable=True)
 
     user = relationship("User")
     galaxy_session = relationship("GalaxySession")
@@ -3089,7 +3127,9 @@ class History(Base, HasTags, Dictifiable, UsesAnnotations, HasName, Serializable
         if quota and is_dataset and self.user:
             quota_source_info = dataset.dataset.quota_source_info
             if quota_source_info.use:
-                self.user.adjust_total_disk_usage(dataset.quota_amount(self.user), quota_source_info.label)
+                self.user.adjust_total_disk_usage(
+                    dataset.quota_amount(self.user), quota_source_info.label, reason="add_to_history"
+                )
         dataset.history = self
         if is_dataset and genome_build not in [None, "?"]:
             self.genome_build = genome_build
@@ -3110,7 +3150,7 @@ class History(Base, HasTags, Dictifiable, UsesAnnotations, HasName, Serializable
                 if disk_usage:
                     quota_source_info = datasets[0].dataset.quota_source_info
                     if quota_source_info.use:
-                        self.user.adjust_total_disk_usage(disk_usage, quota_source_info.label)
+                        self.user.adjust_total_disk_usage(disk_usage, quota_source_info.label, reason="add_to_history")
             sa_session.add_all(datasets)
             if flush:
                 with transaction(sa_session):
@@ -3527,6 +3567,40 @@ class UserQuotaSourceUsage(Base, Dictifiable, RepresentById):
     user = relationship("User", back_populates="quota_source_usages")
 
 
+class UserDiskUsageDelta(Base, RepresentById):
+    """Ledger of incremental adjustments to a user's disk usage counters.
+
+    Every call to ``User.adjust_total_disk_usage`` records the signed amount
+    applied to ``galaxy_user.disk_usage`` (``quota_source_label`` is ``None``)
+    or to ``user_quota_source_usage``, so the entries of a user sum up to the
+    counters. The periodic disk usage reconciler checks that sum for users with
+    new deltas, compacts the deltas it has accounted for into one entry per
+    counter and only recalculates the usage of users whose counters drifted.
+    """
+
+    __tablename__ = "user_disk_usage_delta"
+
+    id = Column(Integer, primary_key=True)
+    create_time = Column(DateTime, default=now)
+    user_id = Column(Integer, ForeignKey("galaxy_user.id"), index=True, nullable=False)
+    quota_source_label = Column(String(32))
+    amount = Column(Numeric(15, 0), nullable=False)
+    reason = Column(String(32))
+    user = relationship("User")
+
+    def __init__(self, user, amount, quota_source_label=None, reason=None):
+        self.user = user
+        self.amount = amount
+        self.quota_source_label = quota_source_label
+        self.reason = reason
+
+    @classmethod
+    def prune(cls, sa_session, user_id, max_id):
+        """Delete the deltas of ``user_id`` up to and including ``max_id``."""
+        stmt = cls.__table__.delete().where(and_(cls.user_id == user_id, cls.id <= max_id))
+        sa_session.execute(stmt)
+
+
 class UserQuotaAssociation(Base, Dictifiable, RepresentById):
     __tablename__ = "user_quota_association"
 
@@ -4083,17 +4157,23 @@ class Dataset(Base, StorableObject, Serializable):
     def set_total_size(self):
         if self.file_size is None:
             self.set_size()
-        self.total_size = self.file_size or 0
+        self.total_size = self.calculate_total_size(self.file_size)
+        return self.total_size
+
+    def calculate_total_size(self, file_size) -> int:
+        """Return ``file_size`` plus the size of the dataset's extra files."""
+        total_size = file_size or 0
         rel_path = self._extra_files_rel_path
         if rel_path is not None:
-            if self.object_store.exists(self, extra_dir=rel_path, dir_only=True):
+            object_store = self._assert_object_store_set()
+            if object_store.exists(self, extra_dir=rel_path, dir_only=True):
                 for root, _, files in os.walk(self.extra_files_path):
-                    self.total_size += sum(
+                    total_size += sum(
                         os.path.getsize(os.path.join(root, file))
                         for file in files
                         if os.path.exists(os.path.join(root, file))
                     )
-        return self.total_size
+        return total_size
 
     def has_data(self):
         """Detects whether there is any data"""
@@ -5118,7 +5198,7 @@ class HistoryDatasetAssociation(DatasetInstance, HasTags, Dictifiable, UsesAnnot
     def purge_usage_from_quota(self, user, quota_source_info):
         """Remove this HDA's quota_amount from user's quota."""
         if user and quota_source_info.use:
-            user.adjust_total_disk_usage(-self.quota_amount(user), quota_source_info.label)
+            user.adjust_total_disk_usage(-self.quota_amount(user), quota_source_info.label, reason="purge")
 
     def quota_amount(self, user):
         """
@@ -8167,7 +8247,7 @@ class WorkflowInvocation(Base, UsesCreateAndUpdateTime, Dictifiable, Serializabl
         return [wid for wid in query.all()]
 
     @staticmethod
-    def poll_active_workflow_ids(engine, scheduler=None, handler=None):
+    def _active_workflow_conditions(scheduler=None, handler=None):
         and_conditions = [
             or_(
                 WorkflowInvocation.state == WorkflowInvocation.states.NEW,
@@ -8178,13 +8258,30 @@ class WorkflowInvocation(Base, UsesCreateAndUpdateTime, Dictifiable, Serializabl
             and_conditions.append(WorkflowInvocation.scheduler == scheduler)
         if handler is not None:
             and_conditions.append(WorkflowInvocation.handler == handler)
+        return and_conditions
 
+    @staticmethod
+    def poll_active_workflow_ids(engine, scheduler=None, handler=None):
+        and_conditions = WorkflowInvocation._active_workflow_conditions(scheduler=scheduler, handler=handler)
         stmt = select(WorkflowInvocation.id).filter(and_(*and_conditions)).order_by(WorkflowInvocation.id.asc())
         # Immediately just load all ids into memory so time slicing logic
         # is relatively intutitive.
         with engine.connect() as conn:
             return conn.scalars(stmt).all()
 
+    @staticmethod
+    def poll_active_workflow_invocations(engine, scheduler=None, handler=None):
+        """Like ``poll_active_workflow_ids`` but return ``(id, history_id, user_id)`` rows."""
+        and_conditions = WorkflowInvocation._active_workflow_conditions(scheduler=scheduler, handler=handler)
+        stmt = (
+            select(WorkflowInvocation.id, WorkflowInvocation.history_id, History.user_id)
+            .join(History, WorkflowInvocation.history_id == History.id)
+            .filter(and_(*and_conditions))
+            .order_by(WorkflowInvocation.id.asc())
+        )
+        with engine.connect() as conn:
+            return [tuple(row) for row in conn.execute(stmt)]
+
     def add_output(self, workflow_output, step, output_object):
         if not hasattr(output_object, "history_content_type"):
             # assuming this is a simple type, just JSON-ify it and stick in the database. In the future
@@ -1,9 +1,18 @@
 import abc
+import fcntl
+import hashlib
+import json
 import logging
 import os
 import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from io import BufferedReader
 from typing import (
     cast,
+    Dict,
+    Iterator,
     NamedTuple,
     Optional,
     Union,
@@ -17,7 +26,10 @@ from galaxy.datatypes.sniff import (
     convert_function,
     stream_url_to_file,
 )
-from galaxy.exceptions import ObjectAttributeInvalidException
+from galaxy.exceptions import (
+    MalformedContents,
+    ObjectAttributeInvalidException,
+)
 from galaxy.files import ConfiguredFileSources
 from galaxy.model import (
     Dataset,
@@ -34,6 +46,16 @@ from galaxy.objectstore import (
     ObjectStore,
     ObjectStorePopulator,
 )
+from galaxy.objectstore.caching import (
+    CacheTarget,
+    check_cache,
+    record_cache_access,
+)
+from galaxy.util.hash_util import (
+    HASH_NAME_ALIAS,
+    HashFunctionNameEnum,
+    memory_bound_hexdigests,
+)
 
 log = logging.getLogger(__name__)
 
@@ -66,6 +88,151 @@ class SimpleTransientPathMapper(TransientPathMapper):
         return TransientDatasetPaths(external_filename, external_extras, self._staging_directory)
 
 
+class MaterializationCache:
+    """Content cache for the sources of deferred datasets.
+
+    Entries are keyed by the source URI and the hashes declared for the source,
+    so the many jobs materializing the same deferred dataset only fetch it
+    once. The cache lives in a directory that can be shared by all job
+    handlers and workers. Cache lookups are serialized with one of a fixed set
+    of file locks (shared by all keys starting with the same two hex digits,
+    so lock files never accumulate), which is released while a source is
+    fetched. A fetch in progress is marked by a locked file named after its
+    key, concurrent fetches of the same source wait for it to finish.
+
+    Sources are fetched into ``tmp`` and moved into the cache once their
+    declared hashes are verified. The cache is kept under ``size`` gigabytes
+    by evicting the least recently used entries (a non-positive size means no
+    limit). Sources without declared hashes are assumed not to change.
+    """
+
+    def __init__(self, cache_path: str, size: int):
+        self._files_path = os.path.join(cache_path, "files")
+        self._locks_path = os.path.join(cache_path, "locks")
+        self._in_progress_path = os.path.join(cache_path, "in_progress")
+        self._tmp_path = os.path.join(cache_path, "tmp")
+        for path in (self._files_path, self._locks_path, self._in_progress_path, self._tmp_path):
+            os.makedirs(path, exist_ok=True)
+        self._cache_target = CacheTarget(self._files_path, size, 1.0, eviction_policy="lru")
+
+    @staticmethod
+    def cache_key(source: DatasetSource) -> str:
+        hashes = sorted((h.hash_function, h.hash_value) for h in source.hashes)
+        return hashlib.sha256(json.dumps([source.source_uri, hashes]).encode()).hexdigest()
+
+    def fetch(self, source: DatasetSource, file_sources: Optional[ConfiguredFileSources] = None) -> str:
+        """Return the path of a new temporary copy of the content of ``source``."""
+        key = self.cache_key(source)
+        cached_path = os.path.join(self._files_path, key[:2], key)
+        marker_path = os.path.join(self._in_progress_path, key)
+        while True:
+            with self._lookup_lock(key):
+                # An open file can still be read after it is evicted, so the lock
+                # is only needed until the cached file is opened.
+                cached_file = self._open_cached(cached_path)
+                if cached_file is not None:
+                    break
+                marker = open(marker_path, "a")
+                try:
+                    fcntl.flock(marker, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    fetching_elsewhere = False
+                except BlockingIOError:
+                    fetching_elsewhere = True
+            with marker:
+                if fetching_elsewhere:
+                    # wait for the concurrent fetch of the same source and look again
+                    fcntl.flock(marker, fcntl.LOCK_SH)
+                    continue
+                try:
+                    path = self._fetch_to_tmp(source, file_sources)
+                    size = os.path.getsize(path)
+                    if not self._cache_target.fits_in_cache(size):
+                        log.debug("Not caching source '%s' of %s bytes, larger than the cache", source.source_uri, size)
+                        return path
+                    os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+                    os.replace(path, cached_path)
+                    record_cache_access(self._cache_target, cached_path)
+                finally:
+                    with self._lookup_lock(key):
+                        os.unlink(marker_path)
+            if self._cache_target.size > 0:
+                check_cache(self._cache_target)
+                self._remove_stale_markers()
+        fd, temp_path = tempfile.mkstemp(prefix="gx_file_stream")
+        with cached_file, open(fd, "wb") as temp:
+            shutil.copyfileobj(cached_file, temp)
+        return temp_path
+
+    @contextmanager
+    def _lookup_lock(self, key: str) -> Iterator[None]:
+        with open(os.path.join(self._locks_path, f"{key[:2]}.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _open_cached(self, cached_path: str) -> Optional[BufferedReader]:
+        try:
+            cached_file = open(cached_path, "rb")
+        except FileNotFoundError:
+            return None
+        record_cache_access(self._cache_target, cached_path)
+        return cached_file
+
+    def _fetch_to_tmp(self, source: DatasetSource, file_sources: Optional[ConfiguredFileSources]) -> str:
+        path = stream_url_to_file(source.source_uri, file_sources=file_sources, dir=self._tmp_path)
+        try:
+            verify_source_hashes(source, path)
+        except Exception:
+            os.unlink(path)
+            raise
+        return path
+
+    def _remove_stale_markers(self) -> None:
+        """Remove the markers left behind by fetches of processes that died."""
+        for key in os.listdir(self._in_progress_path):
+            marker_path = os.path.join(self._in_progress_path, key)
+            with self._lookup_lock(key), open(marker_path, "a") as marker:
+                try:
+                    fcntl.flock(marker, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                os.unlink(marker_path)
+
+
+_materialization_caches: Dict[str, MaterializationCache] = {}
+_materialization_caches_lock = threading.Lock()
+
+
+def materialization_cache_for(config) -> Optional[MaterializationCache]:
+    """Return the (per process) shared MaterializationCache configured for ``config``, if enabled."""
+    size = getattr(config, "materialization_cache_size", 0)
+    if not size:
+        return None
+    cache_path = os.path.abspath(config.materialization_cache_path)
+    with _materialization_caches_lock:
+        if cache_path not in _materialization_caches:
+            _materialization_caches[cache_path] = MaterializationCache(cache_path, size)
+        return _materialization_caches[cache_path]
+
+
+def verify_source_hashes(source: DatasetSource, path: str) -> None:
+    """Raise MalformedContents if the file at ``path`` does not match the hashes declared for ``source``."""
+    declared = {}
+    for source_hash in source.hashes:
+        hash_function = HASH_NAME_ALIAS.get(source_hash.hash_function, source_hash.hash_function)
+        try:
+            declared[HashFunctionNameEnum(hash_function)] = source_hash.hash_value
+        except ValueError:
+            log.warning("Cannot verify unknown hash function '%s' of %s", hash_function, source.source_uri)
+    if not declared:
+        return
+    for hash_function, hash_value in memory_bound_hexdigests(declared, path).items():
+        expected = declared[HashFunctionNameEnum(hash_function)]
+        if hash_value.lower() != expected.lower():
+            raise MalformedContents(
+                f"Fetched content of {source.source_uri} does not match its declared {hash_function} hash"
+            )
+
+
 class DatasetInstanceMaterializer:
     """This class is responsible for ensuring dataset instances are not deferred."""
 
@@ -76,6 +243,7 @@ class DatasetInstanceMaterializer:
         transient_path_mapper: Optional[TransientPathMapper] = None,
         file_sources: Optional[ConfiguredFileSources] = None,
         sa_session: Optional[scoped_session] = None,
+        materialization_cache: Optional[MaterializationCache] = None,
     ):
         """Constructor for DatasetInstanceMaterializer.
 
@@ -88,6 +256,7 @@ class DatasetInstanceMaterializer:
         self._object_store_populator = object_store_populator
         self._file_sources = file_sources
         self._sa_session = sa_session
+        self._materialization_cache = materialization_cache
 
     def ensure_materialized(
         self,
@@ -173,7 +342,10 @@ class DatasetInstanceMaterializer:
         return materialized_dataset_instance
 
     def _stream_source(self, target_source: DatasetSource, datatype) -> str:
-        path = stream_url_to_file(target_source.source_uri, file_sources=self._file_sources)
+        if self._materialization_cache:
+            path = self._materialization_cache.fetch(target_source, file_sources=self._file_sources)
+        else:
+            path = stream_url_to_file(target_source.source_uri, file_sources=self._file_sources)
         transform = target_source.transform or []
         to_posix_lines = False
         spaces_to_tabs = False
@@ -279,6 +451,7 @@ def materializer_factory(
     transient_directory: Optional[str] = None,
     file_sources: Optional[ConfiguredFileSources] = None,
     sa_session: Optional[scoped_session] = None,
+    materialization_cache: Optional[MaterializationCache] = None,
 ) -> DatasetInstanceMaterializer:
     if object_store_populator is None and object_store is not None:
         object_store_populator = ObjectStorePopulator(object_store, None)
@@ -290,4 +463,5 @@ def materializer_factory(
         transient_path_mapper=transient_path_mapper,
         file_sources=file_sources,
         sa_session=sa_session,
+        materialization_cache=materialization_cache,
     )
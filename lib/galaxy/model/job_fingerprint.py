@@ -0,0 +1,225 @@
+"""
+Content-addressed fingerprints of jobs used to find reusable (cached) jobs.
+
+A fingerprint is a SHA-256 digest over the tool id and version, the tool's
+non-data parameters and the identity of every input dataset. Input datasets
+are identified by their underlying :class:`~galaxy.model.Dataset` (so copies of
+an HDA share an identity) together with the attributes that can change the
+outcome of a job - extension, metadata and the name or element identifier the
+tool sees. Collections are identified by their underlying
+:class:`~galaxy.model.DatasetCollection`.
+
+Jobs store their fingerprint in ``job.fingerprint`` when they are created,
+which lets :class:`galaxy.managers.jobs.JobSearch` find equivalent jobs with a
+single indexed equality query. If the identity of some input cannot be
+established (e.g. a dataset whose metadata is not final yet) the job is
+fingerprinted from its recorded parameters once its inputs are ready. Jobs
+without a fingerprint of the current ``FINGERPRINT_VERSION`` (e.g. jobs created
+before fingerprints were recorded) are only found by the full parameter
+search, until ``scripts/backfill_job_fingerprints.py`` fingerprints them.
+"""
+
+import hashlib
+import json
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Optional,
+)
+
+from sqlalchemy import or_
+
+from galaxy import model
+
+# Version of the fingerprint scheme, bump it whenever the fingerprint of a job changes.
+FINGERPRINT_VERSION = 1
+
+# Parameters added during job creation that do not change the results of a job.
+FINGERPRINT_EXCLUDED_PARAMETERS = {"chromInfo"}
+
+DatasetToken = Optional[Any]
+ResolveDatasetToken = Callable[[str, Any], DatasetToken]
+
+
+class _UnresolvedDataset(Exception):
+    pass
+
+
+def dataset_instance_token(src: str, instance, identifier: Optional[str] = None) -> DatasetToken:
+    """Return the identity of a tool input referenced by ``src`` in a parameter dump.
+
+    ``None`` is returned if the input cannot be identified reliably.
+    """
+    if instance is None:
+        return None
+    if src == "hda":
+        if instance.state != model.Dataset.states.OK:
+            # extension and metadata may still change
+            return None
+        if identifier is None:
+            identifier = getattr(instance, "element_identifier", None)
+        metadata = json.dumps(instance._metadata or {}, sort_keys=True, default=str)
+        return [
+            src,
+            instance.dataset_id,
+            instance.extension,
+            hashlib.sha1(metadata.encode("utf-8")).hexdigest(),
+            identifier if identifier is not None else instance.name,
+        ]
+    elif src == "ldda":
+        return [src, instance.id]
+    elif src == "hdca":
+        return [src, instance.collection_id, instance.name]
+    elif src == "dce":
+        return [
+            src,
+            instance.element_identifier,
+            instance.hda and instance.hda.dataset_id,
+            instance.child_collection_id,
+        ]
+    return None
+
+
+def session_dataset_token_resolver(sa_session) -> ResolveDatasetToken:
+    """Build a resolver that loads referenced inputs from ``sa_session``."""
+    model_classes = {
+        "hda": model.HistoryDatasetAssociation,
+        "ldda": model.LibraryDatasetDatasetAssociation,
+        "hdca": model.HistoryDatasetCollectionAssociation,
+        "dce": model.DatasetCollectionElement,
+    }
+
+    def resolve(src, id):
+        model_class = model_classes.get(src)
+        if model_class is None:
+            return None
+        return dataset_instance_token(src, sa_session.get(model_class, id))
+
+    return resolve
+
+
+def _replace_dataset_references(value, resolve: ResolveDatasetToken):
+    if isinstance(value, dict):
+        if value.get("src") in ("hda", "ldda", "hdca", "dce") and "id" in value:
+            token = resolve(value["src"], value["id"])
+            if token is None:
+                raise _UnresolvedDataset()
+            value = dict(value, id=token)
+        return {k: _replace_dataset_references(v, resolve) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_replace_dataset_references(v, resolve) for v in value]
+    return value
+
+
+def fingerprint_parameters(param_dump: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the parameters of a nested parameter dump that are part of a fingerprint."""
+    parameters = {}
+    for key, value in param_dump.items():
+        if key.startswith("__") or key in FINGERPRINT_EXCLUDED_PARAMETERS or key.endswith("|__identifier__"):
+            continue
+        if value == {"__class__": "RuntimeValue"}:
+            value = None
+        parameters[key] = value
+    return parameters
+
+
+def compute_job_fingerprint(
+    tool_id: str, tool_version: Optional[str], param_dump: Dict[str, Any], resolve: ResolveDatasetToken
+) -> Optional[str]:
+    """Compute the fingerprint of a job from a nested parameter dump.
+
+    ``param_dump`` is the result of ``tool.params_to_strings(params, app, nested=True)``
+    (or the JSON decoded values of a job's parameters). ``resolve`` maps the
+    ``src`` and ``id`` of every referenced input to its identity token.
+    """
+    if not tool_id or not tool_version:
+        return None
+    try:
+        parameters = _replace_dataset_references(fingerprint_parameters(param_dump), resolve)
+    except _UnresolvedDataset:
+        return None
+    payload = json.dumps(
+        {
+            "version": FINGERPRINT_VERSION,
+            "tool_id": tool_id,
+            "tool_version": str(tool_version),
+            "parameters": parameters,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def set_job_fingerprint(job: "model.Job", fingerprint: Optional[str]) -> None:
+    """Store ``fingerprint`` (computed with the current scheme) on ``job``."""
+    job.fingerprint = fingerprint
+    job.fingerprint_version = FINGERPRINT_VERSION if fingerprint is not None else None
+
+
+def has_current_fingerprint(job: "model.Job") -> bool:
+    return job.fingerprint is not None and job.fingerprint_version == FINGERPRINT_VERSION
+
+
+def lacks_current_fingerprint():
+    """SQL condition matching jobs without a fingerprint of the current version."""
+    return or_(model.Job.fingerprint_version.is_(None), model.Job.fingerprint_version < FINGERPRINT_VERSION)
+
+
+def job_fingerprint_from_parameters(sa_session, job: "model.Job") -> Optional[str]:
+    """Compute the fingerprint of an existing job from its recorded parameters and inputs.
+
+    Used to backfill jobs created before fingerprints were recorded. Jobs whose
+    input datasets changed after the job was created are not fingerprinted, and
+    neither are jobs with collection inputs, whose recorded parameters may differ
+    from the parameters the tool was called with (reduced collections).
+    """
+    if job.input_dataset_collections or job.input_dataset_collection_elements:
+        return None
+    param_dump = {}
+    for parameter in job.parameters:
+        try:
+            param_dump[parameter.name] = json.loads(parameter.value) if parameter.value is not None else None
+        except ValueError:
+            return None
+    identifiers = {
+        name[: -len("|__identifier__")]: value for name, value in param_dump.items() if name.endswith("|__identifier__")
+    }
+    input_identifiers = {}
+    for association in job.input_datasets:
+        dataset = association.dataset
+        if dataset is None:
+            continue
+        # Same check as the full job search: the input must not have changed since the job was created.
+        unchanged = association.dataset_version in (0, dataset.version) or (
+            dataset.update_time and job.create_time and dataset.update_time < job.create_time
+        )
+        if not unchanged:
+            return None
+        if association.name in identifiers:
+            input_identifiers[dataset.id] = identifiers[association.name]
+
+    resolve_from_session = session_dataset_token_resolver(sa_session)
+
+    def resolve(src, id):
+        if src == "hda" and id in input_identifiers:
+            return dataset_instance_token(
+                src, sa_session.get(model.HistoryDatasetAssociation, id), identifier=input_identifiers[id]
+            )
+        return resolve_from_session(src, id)
+
+    return compute_job_fingerprint(job.tool_id, job.tool_version, param_dump, resolve)
+
+
+__all__ = (
+    "compute_job_fingerprint",
+    "dataset_instance_token",
+    "FINGERPRINT_VERSION",
+    "fingerprint_parameters",
+    "has_current_fingerprint",
+    "job_fingerprint_from_parameters",
+    "lacks_current_fingerprint",
+    "session_dataset_token_resolver",
+    "set_job_fingerprint",
+)
@@ -0,0 +1,39 @@
+"""add fingerprint column to job
+
+Revision ID: 3c9e7f2b1d4a
+Revises: 987ce9839ecb
+Create Date: 2023-06-12 10:21:37.114210
+
+"""
+import sqlalchemy as sa
+
+from galaxy.model.database_object_names import build_index_name
+from galaxy.model.migrations.util import (
+    add_column,
+    create_index,
+    drop_column,
+    drop_index,
+    transaction,
+)
+
+# revision identifiers, used by Alembic.
+revision = "3c9e7f2b1d4a"
+down_revision = "987ce9839ecb"
+branch_labels = None
+depends_on = None
+
+table_name = "job"
+column_name = "fingerprint"
+index_name = build_index_name(table_name, column_name)
+
+
+def upgrade():
+    with transaction():
+        add_column(table_name, sa.Column(column_name, sa.String(64), nullable=True))
+        create_index(index_name, table_name, [column_name])
+
+
+def downgrade():
+    with transaction():
+        drop_index(index_name, table_name)
+        drop_column(table_name, column_name)
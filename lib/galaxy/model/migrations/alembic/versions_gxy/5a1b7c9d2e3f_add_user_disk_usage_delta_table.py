@@ -0,0 +1,45 @@
+"""add user_disk_usage_delta table
+
+Revision ID: 5a1b7c9d2e3f
+Revises: 3c9e7f2b1d4a
+Create Date: 2023-06-19 14:02:51.402118
+
+"""
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Numeric,
+    String,
+)
+
+from galaxy.model.migrations.util import (
+    create_table,
+    drop_table,
+)
+
+# revision identifiers, used by Alembic.
+revision = "5a1b7c9d2e3f"
+down_revision = "3c9e7f2b1d4a"
+branch_labels = None
+depends_on = None
+
+# database object names used in this revision
+table_name = "user_disk_usage_delta"
+
+
+def upgrade():
+    create_table(
+        table_name,
+        Column("id", Integer, primary_key=True),
+        Column("create_time", DateTime),
+        Column("user_id", Integer, ForeignKey("galaxy_user.id"), index=True, nullable=False),
+        Column("quota_source_label", String(32)),
+        Column("amount", Numeric(15, 0), nullable=False),
+        Column("reason", String(32)),
+    )
+
+
+def downgrade():
+    drop_table(table_name)
@@ -0,0 +1,45 @@
+"""add job_span table
+
+Revision ID: 7d3e5f1a9b2c
+Revises: 5a1b7c9d2e3f
+Create Date: 2023-06-26 10:41:17.230561
+
+"""
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Numeric,
+    Unicode,
+)
+
+from galaxy.model.migrations.util import (
+    create_table,
+    drop_table,
+)
+
+# revision identifiers, used by Alembic.
+revision = "7d3e5f1a9b2c"
+down_revision = "5a1b7c9d2e3f"
+branch_labels = None
+depends_on = None
+
+# database object names used in this revision
+table_name = "job_span"
+
+
+def upgrade():
+    create_table(
+        table_name,
+        Column("id", Integer, primary_key=True),
+        Column("job_id", Integer, ForeignKey("job.id"), index=True),
+        Column("name", Unicode(255)),
+        Column("start_time", DateTime),
+        Column("duration", Numeric(26, 7)),
+        Column("occurrences", Integer),
+    )
+
+
+def downgrade():
+    drop_table(table_name)
@@ -0,0 +1,30 @@
+"""add fingerprint_version column to job
+
+Revision ID: 9e4b2c7a1f3d
+Revises: 7d3e5f1a9b2c
+Create Date: 2023-07-03 09:12:44.518306
+
+"""
+import sqlalchemy as sa
+
+from galaxy.model.migrations.util import (
+    add_column,
+    drop_column,
+)
+
+# revision identifiers, used by Alembic.
+revision = "9e4b2c7a1f3d"
+down_revision = "7d3e5f1a9b2c"
+branch_labels = None
+depends_on = None
+
+table_name = "job"
+column_name = "fingerprint_version"
+
+
+def upgrade():
+    add_column(table_name, sa.Column(column_name, sa.Integer, nullable=True))
+
+
+def downgrade():
+    drop_column(table_name, column_name)
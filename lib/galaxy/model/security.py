@@ -4,11 +4,19 @@ from datetime import (
     datetime,
     timedelta,
 )
-from typing import List
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
 
 from sqlalchemy import (
     and_,
     false,
+    inspect,
     not_,
     or_,
 )
@@ -21,7 +29,10 @@ from galaxy.security import (
     get_permitted_actions,
     RBACAgent,
 )
-from galaxy.util import listify
+from galaxy.util import (
+    chunk_iterable,
+    listify,
+)
 from galaxy.util.bunch import Bunch
 
 log = logging.getLogger(__name__)
@@ -527,6 +538,10 @@ class GalaxyRBACAgent(RBACAgent):
             return False
         return True
 
+    def dataset_access_oracle(self, user_roles: List[galaxy.model.Role]) -> "DatasetAccessOracle":
+        """Return a new :class:`DatasetAccessOracle` for ``user_roles``."""
+        return DatasetAccessOracle(self, user_roles)
+
     def can_manage_dataset(self, roles, dataset):
         return self.allow_action(roles, self.permitted_actions.DATASET_MANAGE_PERMISSIONS, dataset)
 
@@ -1594,6 +1609,98 @@ class GalaxyRBACAgent(RBACAgent):
         return False, hidden_folder_ids
 
 
+ActionTuple = Tuple[str, int]
+
+
+class DatasetAccessOracle:
+    """
+    Batched and memoized evaluation of dataset access for a fixed set of user roles.
+
+    ``GalaxyRBACAgent.can_access_dataset`` loads the permissions of each dataset
+    separately. The oracle loads the permissions of any number of datasets with
+    one query per chunk of ids (see ``prefetch``), and memoizes the access
+    decision for every distinct set of roles required by a dataset or
+    collection. It is meant to be short lived (e.g. request scoped), permissions
+    changed by other sessions after they were loaded are not seen.
+    """
+
+    def __init__(self, security_agent: GalaxyRBACAgent, user_roles: List[galaxy.model.Role]):
+        self.security_agent = security_agent
+        self.user_role_ids = frozenset(galaxy.model.cached_id(role) for role in user_roles)
+        self.access_action = security_agent.permitted_actions.DATASET_ACCESS.action
+        self._dataset_action_tuples: Dict[int, Tuple[ActionTuple, ...]] = {}
+        self._role_set_access: Dict[FrozenSet[int], bool] = {}
+        self._collection_access: Dict[int, bool] = {}
+
+    @property
+    def sa_session(self):
+        return self.security_agent.sa_session
+
+    def prefetch(self, datasets: Iterable[Optional[galaxy.model.Dataset]]) -> None:
+        """Load the permissions of all ``datasets`` that have not been loaded yet."""
+        self.prefetch_ids(
+            galaxy.model.cached_id(dataset)
+            for dataset in datasets
+            if dataset is not None and not self._has_session_permissions(dataset)
+        )
+
+    def prefetch_ids(self, dataset_ids: Iterable[Optional[int]]) -> None:
+        """Load the permissions of the datasets with the given ids with one query per chunk of ids."""
+        missing_ids = {
+            dataset_id
+            for dataset_id in dataset_ids
+            if dataset_id is not None and dataset_id not in self._dataset_action_tuples
+        }
+        DatasetPermissions = self.security_agent.model.DatasetPermissions
+        for ids in chunk_iterable(sorted(missing_ids)):
+            action_tuples: Dict[int, List[ActionTuple]] = {dataset_id: [] for dataset_id in ids}
+            query = self.sa_session.query(
+                DatasetPermissions.dataset_id, DatasetPermissions.action, DatasetPermissions.role_id
+            ).filter(DatasetPermissions.dataset_id.in_(ids))
+            for dataset_id, action, role_id in query:
+                action_tuples[dataset_id].append((action, role_id))
+            for dataset_id, dataset_action_tuples in action_tuples.items():
+                self._dataset_action_tuples[dataset_id] = tuple(dataset_action_tuples)
+
+    def dataset_action_tuples(self, dataset: galaxy.model.Dataset) -> Tuple[ActionTuple, ...]:
+        """Return the ``(action, role_id)`` pairs of all permissions of ``dataset``."""
+        dataset_id = galaxy.model.cached_id(dataset)
+        if dataset_id is None or self._has_session_permissions(dataset):
+            # new or modified permissions are only known to the session
+            return tuple((permission.action, galaxy.model.cached_id(permission.role)) for permission in dataset.actions)
+        if dataset_id not in self._dataset_action_tuples:
+            self.prefetch_ids([dataset_id])
+        return self._dataset_action_tuples[dataset_id]
+
+    def can_access_dataset(self, dataset: galaxy.model.Dataset) -> bool:
+        """Equivalent to ``GalaxyRBACAgent.can_access_dataset`` for the roles of this oracle."""
+        return self.can_access_action_tuples(self.dataset_action_tuples(dataset))
+
+    def can_access_collection(self, collection: galaxy.model.DatasetCollection) -> bool:
+        """Equivalent to ``GalaxyRBACAgent.can_access_collection`` for the roles of this oracle."""
+        collection_id = galaxy.model.cached_id(collection)
+        if collection_id is None:
+            return self.can_access_action_tuples(collection.dataset_action_tuples)
+        if collection_id not in self._collection_access:
+            self._collection_access[collection_id] = self.can_access_action_tuples(collection.dataset_action_tuples)
+        return self._collection_access[collection_id]
+
+    def can_access_action_tuples(self, action_tuples: Iterable[ActionTuple]) -> bool:
+        """Equivalent to ``GalaxyRBACAgent.can_access_datasets`` for the roles of this oracle."""
+        # Datasets without access permissions are public, for all others
+        # the user needs to have all roles associated with the access action.
+        required_role_ids = frozenset(role_id for action, role_id in action_tuples if action == self.access_action)
+        if required_role_ids not in self._role_set_access:
+            self._role_set_access[required_role_ids] = required_role_ids <= self.user_role_ids
+        return self._role_set_access[required_role_ids]
+
+    def _has_session_permissions(self, dataset: galaxy.model.Dataset) -> bool:
+        # Permissions that are already loaded, or have been added but not yet
+        # flushed, are read from the session instead of the database.
+        state = inspect(dataset)
+        return "actions" not in state.unloaded or state.attrs.actions.history.has_changes()
+
+
 class HostAgent(RBACAgent):
     """
     A simple security agent which allows access to datasets based on host.
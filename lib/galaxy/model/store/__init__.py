@@ -99,7 +99,10 @@ from galaxy.util import (
     safe_makedirs,
 )
 from galaxy.util.bunch import Bunch
-from galaxy.util.compression_utils import CompressedFile
+from galaxy.util.compression_utils import (
+    CompressedFile,
+    open_tar_stream,
+)
 from galaxy.util.path import (
     safe_walk,
     StrPath,
@@ -1885,23 +1888,9 @@ class DirectoryModelExportStore(ModelExportStore):
     def serialize_files(self, dataset: model.DatasetInstance, as_dict: JsonDictT) -> None:
         if self.export_files is None:
             return None
-
-        add: Callable[[str, str], None]
-        if self.export_files == "symlink":
-            add = os.symlink
-        elif self.export_files == "copy":
-
-            def add(src, dest):
-                if os.path.isdir(src):
-                    shutil.copytree(src, dest)
-                else:
-                    shutil.copyfile(src, dest)
-
-        else:
+        if self.export_files not in ("symlink", "copy"):
             raise Exception(f"Unknown export_files parameter type encountered {self.export_files}")
 
-        export_directory = self.export_directory
-
         _, include_files = self.included_datasets[dataset]
         if not include_files:
             return
@@ -1920,7 +1909,6 @@ class DirectoryModelExportStore(ModelExportStore):
             pass
 
         dir_name = "datasets"
-        dir_path = os.path.join(export_directory, dir_name)
         dataset_hid = as_dict["hid"]
         assert dataset_hid, as_dict
 
@@ -1933,15 +1921,9 @@ class DirectoryModelExportStore(ModelExportStore):
             return
 
         if file_name:
-            if not os.path.exists(dir_path):
-                os.makedirs(dir_path)
-
             target_filename = get_export_dataset_filename(as_dict["name"], as_dict["extension"], dataset_hid)
             arcname = os.path.join(dir_name, target_filename)
-
-            src = file_name
-            dest = os.path.join(export_directory, arcname)
-            add(src, dest)
+            self._add_file(file_name, arcname)
             as_dict["file_name"] = arcname
 
         if extra_files_path:
@@ -1952,13 +1934,24 @@ class DirectoryModelExportStore(ModelExportStore):
 
             if len(file_list):
                 arcname = os.path.join(dir_name, f"extra_files_path_{dataset_hid}")
-                add(extra_files_path, os.path.join(export_directory, arcname))
+                self._add_file(extra_files_path, arcname)
                 as_dict["extra_files_path"] = arcname
             else:
                 as_dict["extra_files_path"] = ""
 
         self.dataset_id_to_path[dataset.dataset.id] = (as_dict.get("file_name"), as_dict.get("extra_files_path"))
 
+    def _add_file(self, src: str, arcname: str) -> None:
+        """Export dataset file or extra files directory ``src`` as ``arcname``."""
+        dest = os.path.join(self.export_directory, arcname)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if self.export_files == "symlink":
+            os.symlink(src, dest)
+        elif os.path.isdir(src):
+            shutil.copytree(src, dest)
+        else:
+            shutil.copyfile(src, dest)
+
     def exported_key(
         self,
         obj: model.RepresentById,
@@ -2774,11 +2767,21 @@ class ROCrateArchiveModelExportStore(DirectoryModelExportStore, WriteCrates):
 
 
 class TarModelExportStore(DirectoryModelExportStore):
+    """Export to a tar archive that is written while the model is serialized.
+
+    Dataset files are added to the archive straight from the object store as
+    they are serialized instead of being copied or symlinked into the export
+    directory first, so only the (small) attribute files are staged on disk.
+    With ``gzip`` and ``compression_threads > 1`` the archive is compressed on
+    multiple threads.
+    """
+
     file_source_uri: Optional[StrPath]
     out_file: StrPath
 
-    def __init__(self, uri: StrPath, gzip: bool = True, **kwds) -> None:
+    def __init__(self, uri: StrPath, gzip: bool = True, compression_threads: int = 1, **kwds) -> None:
         self.gzip = gzip
+        self.compression_threads = compression_threads
         temp_output_dir = tempfile.mkdtemp()
         self.temp_output_dir = temp_output_dir
         if "://" in str(uri):
@@ -2789,11 +2792,27 @@ class TarModelExportStore(DirectoryModelExportStore):
             self.out_file = uri
             self.file_source_uri = None
             export_directory = temp_output_dir
+        self._archive: Optional[tarfile.TarFile] = None
+        self._archive_stack = contextlib.ExitStack()
         super().__init__(export_directory, **kwds)
 
+    @property
+    def archive(self) -> tarfile.TarFile:
+        if self._archive is None:
+            self._archive = self._archive_stack.enter_context(
+                open_tar_stream(self.out_file, self.gzip, self.compression_threads)
+            )
+        return self._archive
+
+    def _add_file(self, src: str, arcname: str) -> None:
+        self.archive.add(src, arcname=arcname)
+
     def _finalize(self) -> None:
         super()._finalize()
-        tar_export_directory(self.export_directory, self.out_file, self.gzip)
+        archive = self.archive
+        for export_path in os.listdir(self.export_directory):
+            archive.add(os.path.join(self.export_directory, export_path), arcname=export_path)
+        self._archive_stack.close()
         if self.file_source_uri:
             if not self.file_sources:
                 raise Exception(f"Need self.file_sources but {type(self)} is missing it: {self.file_sources}.")
@@ -2803,6 +2822,16 @@ class TarModelExportStore(DirectoryModelExportStore):
             file_source.write_from(file_source_path.path, self.out_file, user_context=self.user_context)
         shutil.rmtree(self.temp_output_dir)
 
+    def __exit__(
+        self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException], exc_tb: Optional[TracebackType]
+    ) -> bool:
+        if exc_type is not None:
+            # discard the partially written archive
+            self._archive_stack.__exit__(exc_type, exc_val, exc_tb)
+        with self._archive_stack:
+            rval = super().__exit__(exc_type, exc_val, exc_tb)
+        return rval
+
 
 class BagDirectoryModelExportStore(DirectoryModelExportStore):
     def __init__(self, out_directory: str, **kwds) -> None:
@@ -2869,6 +2898,7 @@ def get_export_store_factory(
     if download_format in ["tar.gz", "tgz"]:
         export_store_class = TarModelExportStore
         export_store_class_kwds["gzip"] = True
+        export_store_class_kwds["compression_threads"] = getattr(app.config, "export_compression_threads", 1)
     elif download_format in ["tar"]:
         export_store_class = TarModelExportStore
         export_store_class_kwds["gzip"] = False
@@ -2888,12 +2918,10 @@ def get_export_store_factory(
     return lambda path: export_store_class(path, **export_store_class_kwds)
 
 
-def tar_export_directory(export_directory: StrPath, out_file: StrPath, gzip: bool) -> None:
-    tarfile_mode = "w"
-    if gzip:
-        tarfile_mode += ":gz"
-
-    with tarfile.open(out_file, tarfile_mode, dereference=True) as store_archive:
+def tar_export_directory(
+    export_directory: StrPath, out_file: StrPath, gzip: bool, compression_threads: int = 1
+) -> None:
+    with open_tar_stream(out_file, gzip, compression_threads) as store_archive:
         for export_path in os.listdir(export_directory):
             store_archive.add(os.path.join(export_directory, export_path), arcname=export_path)
 
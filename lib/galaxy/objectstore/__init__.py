@@ -195,6 +195,17 @@ class ObjectStore(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    def exists_locally(self, obj, **kwargs):
+        """
+        Return True if the file for `obj` can be opened locally without first being fetched.
+
+        Object stores backed by remote storage can override this to let callers
+        that only need part of a dataset read it with `get_data` instead of
+        materializing the whole file through `get_filename`. By default every
+        existing object is treated as local.
+        """
+        return self.exists(obj, **kwargs)
+
     @abc.abstractmethod
     def get_filename(
         self, obj, base_dir=None, dir_only=False, extra_dir=None, extra_dir_at_root=False, alt_name=None, obj_dir=False
@@ -244,6 +255,17 @@ class ObjectStore(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    def get_upload_hexdigest(
+        self, obj, hash_function, extra_dir=None, extra_dir_at_root=False, alt_name=None, obj_dir=False
+    ) -> Optional[str]:
+        """
+        Return the ``hash_function`` digest of `obj` computed while uploading it, if recorded.
+
+        Object stores that hash files while pushing them to remote storage keep
+        the digests, other object stores return None and the file needs to be read.
+        """
+        return None
+
     @abc.abstractmethod
     def get_concrete_store_name(self, obj):
         """Return a display name or title of the objectstore corresponding to obj.
@@ -433,6 +455,9 @@ class BaseObjectStore(ObjectStore):
     def get_data(self, obj, **kwargs):
         return self._invoke("get_data", obj, **kwargs)
 
+    def exists_locally(self, obj, **kwargs):
+        return self._invoke("exists_locally", obj, **kwargs)
+
     def get_filename(self, obj, **kwargs):
         return self._invoke("get_filename", obj, **kwargs)
 
@@ -442,6 +467,9 @@ class BaseObjectStore(ObjectStore):
     def get_object_url(self, obj, **kwargs):
         return self._invoke("get_object_url", obj, **kwargs)
 
+    def get_upload_hexdigest(self, obj, hash_function, **kwargs):
+        return self._invoke("get_upload_hexdigest", obj, hash_function=hash_function, **kwargs)
+
     def get_concrete_store_name(self, obj):
         return self._invoke("get_concrete_store_name", obj)
 
@@ -561,6 +589,12 @@ class ConcreteObjectStore(BaseObjectStore):
     def _get_store_by(self, obj):
         return self.store_by
 
+    def _exists_locally(self, obj, **kwargs):
+        return True
+
+    def _get_upload_hexdigest(self, obj, hash_function, **kwargs):
+        return None
+
     def _is_private(self, obj):
         return self.private
 
@@ -948,6 +982,10 @@ class NestedObjectStore(BaseObjectStore):
         """For the first backend that has this `obj`, get data from it."""
         return self._call_method("_get_data", obj, ObjectNotFound, True, **kwargs)
 
+    def _exists_locally(self, obj, **kwargs):
+        """For the first backend that has this `obj`, check if it is available locally."""
+        return self._call_method("_exists_locally", obj, True, False, **kwargs)
+
     def _get_filename(self, obj, **kwargs):
         """For the first backend that has this `obj`, get its filename."""
         return self._call_method("_get_filename", obj, ObjectNotFound, True, **kwargs)
@@ -963,6 +1001,10 @@ class NestedObjectStore(BaseObjectStore):
         """For the first backend that has this `obj`, get its URL."""
         return self._call_method("_get_object_url", obj, None, False, **kwargs)
 
+    def _get_upload_hexdigest(self, obj, **kwargs):
+        """For the first backend that has this `obj`, get the digest recorded while uploading it."""
+        return self._call_method("_get_upload_hexdigest", obj, None, False, **kwargs)
+
     def _get_concrete_store_name(self, obj):
         return self._call_method("_get_concrete_store_name", obj, None, False)
 
@@ -2,9 +2,11 @@
 Object Store plugin for the Microsoft Azure Block Blob Storage system
 """
 
+import base64
 import logging
 import os
 import shutil
+import uuid
 from datetime import datetime
 from typing import Optional
 
@@ -12,7 +14,11 @@ try:
     from azure.common import AzureHttpError
     from azure.storage import CloudStorageAccount
     from azure.storage.blob import BlockBlobService
-    from azure.storage.blob.models import Blob
+    from azure.storage.blob.models import (
+        Blob,
+        BlobBlock,
+        BlockListType,
+    )
 except ImportError:
     BlockBlobService = None
 
@@ -32,6 +38,20 @@ from .caching import (
     enable_cache_monitor,
     InProcessCacheMonitor,
     parse_caching_config_dict_from_xml,
+    record_cache_access,
+    validate_eviction_policy,
+)
+from .chunked_upload import (
+    chunked_upload,
+    forget_upload,
+    hash_functions_from_config,
+    max_in_flight_bytes_from_config,
+    MB,
+    parse_upload_config_dict_from_xml,
+    part_size_for,
+    recorded_hexdigest,
+    upload_state_path,
+    UploadTarget,
 )
 
 NO_BLOBSERVICE_ERROR_MESSAGE = (
@@ -41,6 +61,9 @@ NO_BLOBSERVICE_ERROR_MESSAGE = (
 
 log = logging.getLogger(__name__)
 
+# Largest block accepted by the Put Block operation of the blob service API version in use.
+MAX_BLOCK_SIZE_MB = 100
+
 
 def parse_config_xml(config_xml):
     try:
@@ -51,9 +74,10 @@ def parse_config_xml(config_xml):
 
         container_xml = config_xml.find("container")
         container_name = container_xml.get("name")
-        max_chunk_size = int(container_xml.get("max_chunk_size", 250))  # currently unused
+        max_chunk_size = int(container_xml.get("max_chunk_size", 250))
 
         cache_dict = parse_caching_config_dict_from_xml(config_xml)
+        upload_dict = parse_upload_config_dict_from_xml(config_xml)
 
         tag, attrs = "extra_dir", ("type", "path")
         extra_dirs = config_xml.findall(tag)
@@ -72,6 +96,7 @@ def parse_config_xml(config_xml):
                 "max_chunk_size": max_chunk_size,
             },
             "cache": cache_dict,
+            "upload": upload_dict,
             "extra_dirs": extra_dirs,
             "private": ConcreteObjectStore.parse_private_from_config_xml(config_xml),
         }
@@ -81,6 +106,55 @@ def parse_config_xml(config_xml):
         raise
 
 
+class AzureUploadTarget(UploadTarget):
+    """Upload a blob as a list of blocks.
+
+    Uncommitted blocks are kept by the blob service for a week, the ids of
+    the blocks embed the upload id so blocks of an interrupted upload can be
+    recognized when resuming it.
+    """
+
+    def __init__(self, service, container_name, blob_name):
+        self.service = service
+        self.container_name = container_name
+        self.blob_name = blob_name
+
+    @staticmethod
+    def _block_id(upload_id, number):
+        return base64.b64encode(f"{upload_id}-{number:05d}".encode()).decode("ascii")
+
+    def begin(self):
+        return uuid.uuid4().hex
+
+    def uploaded_parts(self, upload_id):
+        try:
+            block_list = self.service.get_block_list(
+                self.container_name, self.blob_name, block_list_type=BlockListType.Uncommitted
+            )
+        except AzureHttpError:
+            return None
+        prefix = f"{upload_id}-"
+        numbers = set()
+        for block in block_list.uncommitted_blocks:
+            block_name = base64.b64decode(block.id).decode()
+            if block_name.startswith(prefix):
+                numbers.add(int(block_name[len(prefix) :]))
+        return numbers
+
+    def upload_part(self, upload_id, number, data, md5):
+        self.service.put_block(
+            self.container_name, self.blob_name, data, self._block_id(upload_id, number), validate_content=True
+        )
+
+    def complete(self, upload_id, numbers):
+        block_list = [BlobBlock(id=self._block_id(upload_id, number)) for number in numbers]
+        self.service.put_block_list(self.container_name, self.blob_name, block_list)
+
+    def abort(self, upload_id):
+        # uncommitted blocks are garbage collected by the blob service
+        pass
+
+
 class AzureBlobObjectStore(ConcreteObjectStore):
     """
     Object store that stores objects as blobs in an Azure Blob Container. A local
@@ -105,10 +179,16 @@ class AzureBlobObjectStore(ConcreteObjectStore):
         self.account_key = auth_dict.get("account_key")
 
         self.container_name = container_dict.get("name")
-        self.max_chunk_size = container_dict.get("max_chunk_size", 250)  # currently unused
+        self.max_chunk_size = container_dict.get("max_chunk_size", 250)
 
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
+        self.cache_eviction_policy = validate_eviction_policy(cache_dict.get("eviction_policy"))
+
+        upload_dict = config_dict.get("upload") or {}
+        self.upload_threads = upload_dict.get("threads", 1)
+        self.upload_hash_functions = hash_functions_from_config(upload_dict)
+        self.upload_max_in_flight_bytes = max_in_flight_bytes_from_config(upload_dict)
 
         self._initialize()
 
@@ -136,6 +216,14 @@ class AzureBlobObjectStore(ConcreteObjectStore):
                 "cache": {
                     "size": self.cache_size,
                     "path": self.staging_path,
+                    "eviction_policy": self.cache_eviction_policy,
+                },
+                "upload": {
+                    "threads": self.upload_threads,
+                    "hash_functions": [h.value for h in self.upload_hash_functions],
+                    "max_in_flight_mb": self.upload_max_in_flight_bytes // MB
+                    if self.upload_max_in_flight_bytes
+                    else None,
                 },
             }
         )
@@ -314,6 +402,7 @@ class AzureBlobObjectStore(ConcreteObjectStore):
                 return True
 
             if from_string:
+                forget_upload(self.staging_path, rel_path)
                 self.service.create_blob_from_text(
                     self.container_name, rel_path, from_string, progress_callback=self._transfer_cb
                 )
@@ -326,10 +415,23 @@ class AzureBlobObjectStore(ConcreteObjectStore):
                     os.path.getsize(source_file),
                     rel_path,
                 )
-                self.transfer_progress = 0  # Reset transfer progress counter
-                self.service.create_blob_from_path(
-                    self.container_name, rel_path, source_file, progress_callback=self._transfer_cb
-                )
+                file_size = os.path.getsize(source_file)
+                if file_size < 10 * 1e6:
+                    forget_upload(self.staging_path, rel_path)
+                    self.transfer_progress = 0  # Reset transfer progress counter
+                    self.service.create_blob_from_path(
+                        self.container_name, rel_path, source_file, progress_callback=self._transfer_cb
+                    )
+                else:
+                    chunked_upload(
+                        AzureUploadTarget(self.service, self.container_name, rel_path),
+                        source_file,
+                        upload_state_path(self.staging_path, rel_path),
+                        part_size_for(file_size, min(self.max_chunk_size, MAX_BLOCK_SIZE_MB)),
+                        threads=self.upload_threads,
+                        hash_functions=self.upload_hash_functions,
+                        max_in_flight_bytes=self.upload_max_in_flight_bytes,
+                    )
                 end_time = datetime.now()
                 log.debug(
                     "Pushed cache file '%s' to blob '%s' (%s bytes transfered in %s sec)",
@@ -465,6 +567,7 @@ class AzureBlobObjectStore(ConcreteObjectStore):
             # but requires iterating through each individual blob in Azure and deleing it.
             if entire_dir and extra_dir:
                 shutil.rmtree(self._get_cache_path(rel_path), ignore_errors=True)
+                forget_upload(self.staging_path, rel_path, entire_dir=True)
                 blobs = self.service.list_blobs(self.container_name, prefix=rel_path)
                 for blob in blobs:
                     log.debug("Deleting from Azure: %s", blob)
@@ -473,6 +576,7 @@ class AzureBlobObjectStore(ConcreteObjectStore):
             else:
                 # Delete from cache first
                 unlink(self._get_cache_path(rel_path), ignore_errors=True)
+                forget_upload(self.staging_path, rel_path)
                 # Delete from S3 as well
                 if self._in_azure(rel_path):
                     log.debug("Deleting from Azure: %s", rel_path)
@@ -484,11 +588,36 @@ class AzureBlobObjectStore(ConcreteObjectStore):
             log.exception("%s delete error", self._get_filename(obj, **kwargs))
         return False
 
+    def _get_range(self, rel_path, start, count):
+        if count == 0:
+            return ""
+        size = self._get_size_in_azure(rel_path)
+        if size < 0:
+            raise ObjectNotFound(f"objectstore, _get_data failed: blob '{rel_path}' does not exist")
+        if start >= size:
+            return ""
+        try:
+            blob = self.service.get_blob_to_bytes(
+                self.container_name, rel_path, start_range=start, end_range=start + count - 1
+            )
+        except AzureHttpError:
+            log.exception("Problem reading range of '%s' from Azure", rel_path)
+            raise
+        # Byte ranges may split multi-byte characters, keep them round-trippable
+        return blob.content.decode("utf-8", "surrogateescape")
+
+    def _exists_locally(self, obj, **kwargs):
+        return self._in_cache(self._construct_path(obj, **kwargs))
+
     def _get_data(self, obj, start=0, count=-1, **kwargs):
         rel_path = self._construct_path(obj, **kwargs)
         # Check cache first and get file if not there
         if not self._in_cache(rel_path):
+            if count >= 0:
+                # Serve bounded reads with a ranged request instead of pulling the whole file
+                return self._get_range(rel_path, start, count)
             self._pull_into_cache(rel_path)
+        record_cache_access(self.cache_target, self._get_cache_path(rel_path))
         # Read the file content from cache
         data_file = open(self._get_cache_path(rel_path))
         data_file.seek(start)
@@ -517,6 +646,7 @@ class AzureBlobObjectStore(ConcreteObjectStore):
         #     return cache_path
         # Check if the file exists in the cache first
         if self._in_cache(rel_path):
+            record_cache_access(self.cache_target, cache_path)
             return cache_path
         # Check if the file exists in persistent storage and, if it does, pull it into cache
         elif self._exists(obj, **kwargs):
@@ -524,6 +654,7 @@ class AzureBlobObjectStore(ConcreteObjectStore):
                 return cache_path
             else:
                 if self._pull_into_cache(rel_path):
+                    record_cache_access(self.cache_target, cache_path)
                     return cache_path
         # For the case of retrieving a directory only, return the expected path
         # even if it does not exist.
@@ -546,6 +677,7 @@ class AzureBlobObjectStore(ConcreteObjectStore):
                         # FIXME? Should this be a `move`?
                         shutil.copy2(source_file, cache_file)
                     self._fix_permissions(cache_file)
+                    record_cache_access(self.cache_target, cache_file)
                 except OSError:
                     log.exception("Trouble copying source file '%s' to cache '%s'", source_file, cache_file)
             else:
@@ -558,6 +690,11 @@ class AzureBlobObjectStore(ConcreteObjectStore):
                 f"objectstore.update_from_file, object does not exist: {str(obj)}, kwargs: {str(kwargs)}"
             )
 
+    def _get_upload_hexdigest(self, obj, hash_function, **kwargs):
+        rel_path = self._construct_path(obj, **kwargs)
+        state_path = upload_state_path(self.staging_path, rel_path)
+        return recorded_hexdigest(state_path, hash_function, self._size(obj, **kwargs))
+
     def _get_object_url(self, obj, **kwargs):
         if self._exists(obj, **kwargs):
             rel_path = self._construct_path(obj, **kwargs)
@@ -577,6 +714,7 @@ class AzureBlobObjectStore(ConcreteObjectStore):
             self.staging_path,
             self.cache_size,
             0.9,
+            self.cache_eviction_policy,
         )
 
     def shutdown(self):
@@ -2,9 +2,12 @@
 """
 import logging
 import os
+import sqlite3
 import threading
 import time
 from typing import (
+    Dict,
+    Iterator,
     List,
     Optional,
     Tuple,
@@ -12,6 +15,7 @@ from typing import (
 
 from typing_extensions import NamedTuple
 
+from galaxy.exceptions import ConfigurationError
 from galaxy.util import nice_size
 from galaxy.util.sleeper import Sleeper
 
@@ -19,6 +23,13 @@ log = logging.getLogger(__name__)
 
 
 ONE_GIGA_BYTE = 1024 * 1024 * 1024
+CACHE_INDEX_FILENAME = ".galaxy_cache_index.sqlite"
+# Files added to the cache without going through the object store (e.g. extra files
+# downloaded as a directory) are picked up by a full directory walk this often.
+CACHE_INDEX_RECONCILE_INTERVAL = 24 * 60 * 60
+EVICTION_POLICIES = ("lru", "lfu")
+# State of resumable uploads and digests recorded while uploading, never evicted.
+UPLOAD_STATE_DIRNAME = ".galaxy_uploads"
 
 
 FileListT = List[Tuple[time.struct_time, str, int]]
@@ -28,6 +39,8 @@ class CacheTarget(NamedTuple):
     path: str
     size: int  # cache size in gigabytes
     limit: float  # cache limit as a percent
+    # if set to "lru" or "lfu", accesses are tracked in a persistent index used for eviction
+    eviction_policy: Optional[str] = None
 
     def fits_in_cache(self, bytes: int) -> bool:
         # if we don't have a positive cache size - interpret it as an unbounded
@@ -51,6 +64,9 @@ def check_caches(targets: List[CacheTarget]):
 
 def check_cache(cache_target: CacheTarget):
     """Run a step of the cache monitor."""
+    if cache_target.eviction_policy:
+        _check_cache_index(cache_target, cache_target.eviction_policy)
+        return
     total_size, file_list = _get_cache_size_files(cache_target.path)
     # Sort the file list (based on access time)
     file_list.sort()
@@ -104,8 +120,12 @@ def _get_cache_size_files(cache_path) -> Tuple[int, FileListT]:
     cache_size = 0
     file_list = []
 
-    for dirpath, _, filenames in os.walk(cache_path):
+    for dirpath, dirnames, filenames in os.walk(cache_path):
+        if dirpath == cache_path and UPLOAD_STATE_DIRNAME in dirnames:
+            dirnames.remove(UPLOAD_STATE_DIRNAME)
         for filename in filenames:
+            if filename.startswith(CACHE_INDEX_FILENAME):
+                continue
             file_path = os.path.join(dirpath, filename)
             file_size = os.path.getsize(file_path)
             cache_size += file_size
@@ -117,6 +137,192 @@ def _get_cache_size_files(cache_path) -> Tuple[int, FileListT]:
     return cache_size, file_list
 
 
+def _check_cache_index(cache_target: CacheTarget, eviction_policy: str):
+    cache_index = get_cache_index(cache_target.path)
+    try:
+        cache_index.reconcile_if_needed()
+        total_size = cache_index.total_size()
+        cache_limit = cache_target.size * ONE_GIGA_BYTE * cache_target.limit
+        if total_size > cache_limit:
+            log.debug(
+                "Initiating %s cache cleaning: current cache size: %s; clean until smaller than: %s",
+                eviction_policy,
+                nice_size(total_size),
+                nice_size(cache_limit),
+            )
+            deleted_amount = cache_index.evict(total_size - cache_limit, eviction_policy)
+            log.debug("Cache cleaning done. Total space freed: %s", nice_size(deleted_amount))
+    except sqlite3.Error:
+        log.exception("Failed to clean cache using cache index for %s", cache_target.path)
+
+
+class CacheIndex:
+    """Persistent index of the files in an object store cache directory.
+
+    Records size, last access time and number of accesses of each cached file in a
+    SQLite database stored in the cache directory, so that it is shared by all Galaxy
+    processes using the cache. The cache monitor uses it to evict files in LRU or LFU
+    order without walking the cache directory on every check.
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path = os.path.abspath(cache_path)
+        self.db_path = os.path.join(self.cache_path, CACHE_INDEX_FILENAME)
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(self.cache_path, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self._initialize(conn)
+                    self._initialized = True
+        return conn
+
+    def _initialize(self, conn: sqlite3.Connection):
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entry "
+            "(path TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL, hits INTEGER NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entry_last_access ON cache_entry (last_access)")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (key TEXT PRIMARY KEY, value REAL NOT NULL)")
+
+    def _relpath(self, file_path: str) -> str:
+        return os.path.relpath(os.path.abspath(file_path), self.cache_path)
+
+    def record_access(self, file_path: str, size: Optional[int] = None) -> None:
+        """Record that ``file_path`` was read from or written to the cache."""
+        try:
+            if size is None:
+                size = os.path.getsize(file_path)
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT INTO cache_entry (path, size, last_access, hits) VALUES (?, ?, ?, 1) "
+                    "ON CONFLICT(path) DO UPDATE SET size = excluded.size, last_access = excluded.last_access, "
+                    "hits = cache_entry.hits + 1",
+                    (self._relpath(file_path), size, time.time()),
+                )
+            finally:
+                conn.close()
+        except (OSError, sqlite3.Error) as e:
+            # Tracking accesses is best effort, never fail a read because of it.
+            log.debug("Failed to record cache access for %s: %s", file_path, e)
+
+    def remove(self, file_path: str) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM cache_entry WHERE path = ?", (self._relpath(file_path),))
+        finally:
+            conn.close()
+
+    def total_size(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entry").fetchone()[0]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _eviction_order(conn: sqlite3.Connection, policy: str) -> sqlite3.Cursor:
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown cache eviction policy '{policy}'")
+        order_by = "last_access" if policy == "lru" else "hits, last_access"
+        return conn.execute(f"SELECT path, size FROM cache_entry ORDER BY {order_by}")
+
+    def eviction_candidates(self, policy: str = "lru") -> Iterator[Tuple[str, int]]:
+        """Yield ``(absolute path, size)`` of cached files in the order they should be evicted."""
+        conn = self._connect()
+        try:
+            rows = self._eviction_order(conn, policy).fetchall()
+        finally:
+            conn.close()
+        for path, size in rows:
+            yield os.path.join(self.cache_path, path), size
+
+    def evict(self, delete_this_much: float, policy: str = "lru") -> int:
+        """Delete files in eviction order until at least ``delete_this_much`` bytes are freed."""
+        deleted_amount = 0
+        evicted = []
+        conn = self._connect()
+        try:
+            cursor = self._eviction_order(conn, policy)
+            try:
+                for path, size in cursor:
+                    if deleted_amount >= delete_this_much:
+                        break
+                    try:
+                        os.remove(os.path.join(self.cache_path, path))
+                        deleted_amount += size
+                    except FileNotFoundError:
+                        pass
+                    evicted.append((path,))
+            finally:
+                # forget the evicted files in a single transaction
+                cursor.close()
+                conn.execute("BEGIN")
+                conn.executemany("DELETE FROM cache_entry WHERE path = ?", evicted)
+                conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return deleted_amount
+
+    def reconcile(self) -> None:
+        """Replace the index content with the result of a full walk of the cache directory."""
+        _, file_list = _get_cache_size_files(self.cache_path)
+        now = time.time()
+        conn = self._connect()
+        try:
+            known = {
+                path: (last_access, hits)
+                for path, last_access, hits in conn.execute("SELECT path, last_access, hits FROM cache_entry")
+            }
+            entries = []
+            for last_access_time, file_path, file_size in file_list:
+                path = self._relpath(file_path)
+                last_access, hits = known.get(path, (time.mktime(last_access_time), 1))
+                entries.append((path, file_size, last_access, hits))
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM cache_entry WHERE 1 = 1")
+            conn.executemany("INSERT INTO cache_entry (path, size, last_access, hits) VALUES (?, ?, ?, ?)", entries)
+            conn.execute("INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('last_reconcile', ?)", (now,))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def reconcile_if_needed(self) -> None:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM cache_meta WHERE key = 'last_reconcile'").fetchone()
+        finally:
+            conn.close()
+        if row is None or time.time() - row[0] > CACHE_INDEX_RECONCILE_INTERVAL:
+            self.reconcile()
+
+
+_cache_indexes: Dict[str, CacheIndex] = {}
+_cache_indexes_lock = threading.Lock()
+
+
+def get_cache_index(cache_path: str) -> CacheIndex:
+    """Return the (per process) shared CacheIndex for ``cache_path``."""
+    cache_path = os.path.abspath(cache_path)
+    with _cache_indexes_lock:
+        if cache_path not in _cache_indexes:
+            _cache_indexes[cache_path] = CacheIndex(cache_path)
+        return _cache_indexes[cache_path]
+
+
+def record_cache_access(cache_target: CacheTarget, file_path: str) -> None:
+    """Record an access to a cached file, if the cache tracks accesses."""
+    if cache_target.eviction_policy and os.path.isfile(file_path):
+        get_cache_index(cache_target.path).record_access(file_path)
+
+
 def parse_caching_config_dict_from_xml(config_xml):
     cache_els = config_xml.findall("cache")
     if len(cache_els) > 0:
@@ -130,11 +336,23 @@ def parse_caching_config_dict_from_xml(config_xml):
             "path": staging_path,
             "monitor": monitor,
         }
+        eviction_policy = c_xml.get("eviction_policy", None)
+        if eviction_policy:
+            cache_dict["eviction_policy"] = validate_eviction_policy(eviction_policy)
     else:
         cache_dict = {}
     return cache_dict
 
 
+def validate_eviction_policy(eviction_policy: Optional[str]) -> Optional[str]:
+    """Return ``eviction_policy`` if it is unset or a known policy, raise ConfigurationError otherwise."""
+    if eviction_policy and eviction_policy not in EVICTION_POLICIES:
+        raise ConfigurationError(
+            f"Unknown object store cache eviction_policy '{eviction_policy}', must be one of {', '.join(EVICTION_POLICIES)}"
+        )
+    return eviction_policy
+
+
 def configured_cache_size(config, config_dict) -> int:
     cache_config_dict = config_dict.get("cache") or {}
     cache_size = cache_config_dict.get("size") or config.object_store_cache_size
@@ -0,0 +1,269 @@
+"""
+Parallel, resumable chunked uploads for the cloud object stores.
+
+A file is split into parts of ``part_size`` bytes that are uploaded
+concurrently by up to ``threads`` workers. The calling thread reads the file
+exactly once, sequentially: every part is hashed (MD5, handed to the backend
+for integrity checks) before it is passed to a worker, and the whole file
+digests listed in ``hash_functions`` are computed along the way. The parts
+held in memory (read or being uploaded) never exceed ``max_in_flight_bytes``,
+by default ``threads`` parts.
+
+The progress of an upload (upload id and the MD5 of every uploaded part) is
+persisted in a small JSON state file, so pushing the same, unmodified file
+again after a failure only uploads the parts that are still missing. The
+state file is deleted once the upload is complete. The file digests of the
+most recent uploads are kept in memory, which lets :func:`recorded_hexdigest`
+answer hash requests of this process without reading the file again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from galaxy.util.hash_util import (
+    HASH_NAME_MAP,
+    HashFunctionNameEnum,
+)
+from .caching import UPLOAD_STATE_DIRNAME
+
+log = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+# S3 rejects parts smaller than 5 MB (except for the last one)
+MIN_PART_SIZE = 5 * MB
+DEFAULT_HASH_FUNCTIONS = (HashFunctionNameEnum.md5,)
+MAX_RECORDED_DIGESTS = 10000
+
+UploadStateT = Dict[str, Any]
+
+# file size and digests of the most recently completed uploads by state path
+_recorded_digests: "OrderedDict[str, Tuple[int, Dict[str, str]]]" = OrderedDict()
+_recorded_digests_lock = threading.Lock()
+
+
+class UploadTarget:
+    """Interface of the backend specific part of a chunked upload.
+
+    Parts are numbered starting at 1. ``upload_part`` is called concurrently
+    from the worker threads.
+    """
+
+    def begin(self) -> str:
+        """Start a new upload and return its id."""
+        raise NotImplementedError()
+
+    def uploaded_parts(self, upload_id: str) -> Optional[Set[int]]:
+        """Return the numbers of the parts stored for ``upload_id``, ``None`` if the upload is gone."""
+        raise NotImplementedError()
+
+    def upload_part(self, upload_id: str, number: int, data: bytes, md5: str) -> None:
+        raise NotImplementedError()
+
+    def complete(self, upload_id: str, numbers: Iterable[int]) -> None:
+        raise NotImplementedError()
+
+    def abort(self, upload_id: str) -> None:
+        raise NotImplementedError()
+
+
+def parse_upload_config_dict_from_xml(config_xml):
+    upload_els = config_xml.findall("upload")
+    if len(upload_els) > 0:
+        u_xml = upload_els[0]
+        upload_dict: Dict[str, Any] = {
+            "threads": int(u_xml.get("threads", 1)),
+        }
+        max_in_flight_mb = u_xml.get("max_in_flight_mb", None)
+        if max_in_flight_mb:
+            upload_dict["max_in_flight_mb"] = int(max_in_flight_mb)
+        hash_functions = u_xml.get("hash_functions", None)
+        if hash_functions:
+            upload_dict["hash_functions"] = [h.strip() for h in hash_functions.split(",")]
+    else:
+        upload_dict = {}
+    return upload_dict
+
+
+def hash_functions_from_config(upload_dict) -> Set[HashFunctionNameEnum]:
+    hash_functions = upload_dict.get("hash_functions") or DEFAULT_HASH_FUNCTIONS
+    return {HashFunctionNameEnum(h) for h in hash_functions}
+
+
+def max_in_flight_bytes_from_config(upload_dict) -> Optional[int]:
+    max_in_flight_mb = upload_dict.get("max_in_flight_mb")
+    return max_in_flight_mb * MB if max_in_flight_mb else None
+
+
+def part_size_for(file_size: int, max_part_size_mb: int, split_num: int = 5) -> int:
+    """Split files in about ``2 * split_num`` parts of at least 5 MB and at most ``max_part_size_mb``."""
+    part_size = min(file_size // (split_num * 2), max_part_size_mb * MB)
+    return max(part_size, MIN_PART_SIZE)
+
+
+def upload_state_path(staging_path: str, rel_path: str) -> str:
+    return os.path.join(staging_path, UPLOAD_STATE_DIRNAME, f"{rel_path}.json")
+
+
+def forget_upload(staging_path: str, rel_path: str, entire_dir: bool = False) -> None:
+    """Drop the upload state and digest record(s) of ``rel_path``."""
+    if entire_dir:
+        state_dir = os.path.join(staging_path, UPLOAD_STATE_DIRNAME, rel_path)
+        shutil.rmtree(state_dir, ignore_errors=True)
+        with _recorded_digests_lock:
+            for state_path in [p for p in _recorded_digests if p.startswith(state_dir + os.sep)]:
+                del _recorded_digests[state_path]
+    else:
+        state_path = upload_state_path(staging_path, rel_path)
+        _remove_state(state_path)
+        with _recorded_digests_lock:
+            _recorded_digests.pop(state_path, None)
+
+
+def recorded_hexdigest(state_path: str, hash_function: HashFunctionNameEnum, size: int) -> Optional[str]:
+    """Return the digest recorded when uploading a file of ``size`` bytes, if any."""
+    with _recorded_digests_lock:
+        recorded = _recorded_digests.get(state_path)
+    if recorded is None or recorded[0] != size:
+        return None
+    return recorded[1].get(hash_function.value)
+
+
+def _record_digests(state_path: str, size: int, hashes: Dict[str, str]) -> None:
+    with _recorded_digests_lock:
+        _recorded_digests[state_path] = (size, hashes)
+        _recorded_digests.move_to_end(state_path)
+        while len(_recorded_digests) > MAX_RECORDED_DIGESTS:
+            _recorded_digests.popitem(last=False)
+
+
+def chunked_upload(
+    target: UploadTarget,
+    source_file: str,
+    state_path: str,
+    part_size: int,
+    threads: int = 1,
+    hash_functions: Iterable[HashFunctionNameEnum] = DEFAULT_HASH_FUNCTIONS,
+    max_in_flight_bytes: Optional[int] = None,
+) -> Dict[str, str]:
+    """Upload ``source_file`` to ``target`` and return the computed file digests by hash function name."""
+    threads = max(threads, 1)
+    if max_in_flight_bytes is None:
+        max_in_flight_bytes = threads * part_size
+    stat = os.stat(source_file)
+    state = _resumable_state(target, state_path, stat, part_size)
+    uploaded = state["parts"].copy()
+    if uploaded:
+        log.info("Resuming upload of '%s', %s parts already uploaded", source_file, len(uploaded))
+    hashers = {h.value: HASH_NAME_MAP[h]() for h in hash_functions}
+    upload_id = state["upload_id"]
+    lock = threading.Lock()
+
+    def upload(number: int, data: bytes, md5: str) -> None:
+        target.upload_part(upload_id, number, data, md5)
+        with lock:
+            state["parts"][str(number)] = md5
+            _save_state(state_path, state)
+
+    number = 0
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="chunked-upload") as executor:
+        # size of the parts submitted and not uploaded yet
+        in_flight: Dict["Future[None]", int] = {}
+        with open(source_file, "rb") as fh:
+            while True:
+                # wait for room before reading the next part
+                while in_flight and sum(in_flight.values()) + part_size > max_in_flight_bytes:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del in_flight[future]
+                        future.result()
+                data = fh.read(part_size)
+                if not data:
+                    break
+                number += 1
+                for hasher in hashers.values():
+                    hasher.update(data)
+                md5 = hashlib.md5(data).hexdigest()
+                if uploaded.get(str(number)) == md5:
+                    continue
+                in_flight[executor.submit(upload, number, data, md5)] = len(data)
+        for future in in_flight:
+            future.result()
+    target.complete(upload_id, range(1, number + 1))
+    hashes = {name: hasher.hexdigest() for name, hasher in hashers.items()}
+    _remove_state(state_path)
+    _record_digests(state_path, stat.st_size, hashes)
+    return hashes
+
+
+def _resumable_state(target: UploadTarget, state_path: str, stat: os.stat_result, part_size: int) -> UploadStateT:
+    state = _load_state(state_path)
+    if state and not state.get("complete"):
+        matches = (
+            state.get("size") == stat.st_size
+            and state.get("mtime") == stat.st_mtime
+            and state.get("part_size") == part_size
+        )
+        if matches:
+            parts_on_target = target.uploaded_parts(state["upload_id"])
+            if parts_on_target is not None:
+                state["parts"] = {n: md5 for n, md5 in state["parts"].items() if int(n) in parts_on_target}
+                return state
+        else:
+            try:
+                target.abort(state["upload_id"])
+            except Exception:
+                log.warning("Failed to abort stale upload '%s'", state["upload_id"], exc_info=True)
+    state = {
+        "upload_id": target.begin(),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "part_size": part_size,
+        "parts": {},
+    }
+    _save_state(state_path, state)
+    return state
+
+
+def _load_state(state_path: str) -> Optional[UploadStateT]:
+    try:
+        with open(state_path) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        log.warning("Ignoring corrupt upload state file '%s'", state_path)
+        return None
+
+
+def _remove_state(state_path: str) -> None:
+    try:
+        os.unlink(state_path)
+    except FileNotFoundError:
+        pass
+
+
+def _save_state(state_path: str, state: UploadStateT) -> None:
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump(state, fh)
+    os.replace(tmp_path, state_path)
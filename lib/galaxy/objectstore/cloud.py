@@ -26,6 +26,8 @@ from .caching import (
     CacheTarget,
     enable_cache_monitor,
     InProcessCacheMonitor,
+    record_cache_access,
+    validate_eviction_policy,
 )
 from .s3 import parse_config_xml
 
@@ -66,6 +68,7 @@ class CloudConfigMixin:
             "cache": {
                 "size": self.cache_size,
                 "path": self.staging_path,
+                "eviction_policy": self.cache_eviction_policy,
             },
         }
 
@@ -103,6 +106,7 @@ class Cloud(ConcreteObjectStore, CloudConfigMixin):
 
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
+        self.cache_eviction_policy = validate_eviction_policy(cache_dict.get("eviction_policy"))
 
         self._initialize()
 
@@ -249,6 +253,7 @@ class Cloud(ConcreteObjectStore, CloudConfigMixin):
             self.staging_path,
             self.cache_size,
             0.9,
+            self.cache_eviction_policy,
         )
 
     def _get_bucket(self, bucket_name):
@@ -609,6 +614,7 @@ class Cloud(ConcreteObjectStore, CloudConfigMixin):
         # Check cache first and get file if not there
         if not self._in_cache(rel_path):
             self._pull_into_cache(rel_path)
+        record_cache_access(self.cache_target, self._get_cache_path(rel_path))
         # Read the file content from cache
         data_file = open(self._get_cache_path(rel_path))
         data_file.seek(start)
@@ -637,6 +643,7 @@ class Cloud(ConcreteObjectStore, CloudConfigMixin):
         #     return cache_path
         # Check if the file exists in the cache first
         if self._in_cache(rel_path):
+            record_cache_access(self.cache_target, cache_path)
             return cache_path
         # Check if the file exists in persistent storage and, if it does, pull it into cache
         elif self._exists(obj, **kwargs):
@@ -644,6 +651,7 @@ class Cloud(ConcreteObjectStore, CloudConfigMixin):
                 return cache_path
             else:
                 if self._pull_into_cache(rel_path):
+                    record_cache_access(self.cache_target, cache_path)
                     return cache_path
         # For the case of retrieving a directory only, return the expected path
         # even if it does not exist.
@@ -667,6 +675,7 @@ class Cloud(ConcreteObjectStore, CloudConfigMixin):
                         # FIXME? Should this be a `move`?
                         shutil.copy2(source_file, cache_file)
                     self._fix_permissions(cache_file)
+                    record_cache_access(self.cache_target, cache_file)
                 except OSError:
                     log.exception("Trouble copying source file '%s' to cache '%s'", source_file, cache_file)
             else:
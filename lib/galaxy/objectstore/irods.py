@@ -31,6 +31,7 @@ from galaxy.util import (
 )
 from galaxy.util.path import safe_relpath
 from . import DiskObjectStore
+from .chunked_upload import parse_upload_config_dict_from_xml
 
 IRODS_IMPORT_MESSAGE = "The Python irods package is required to use this feature, please install it"
 # 1 MB
@@ -82,6 +83,8 @@ def parse_config_xml(config_xml):
         cache_size = float(c_xml[0].get("size", -1))
         staging_path = c_xml[0].get("path", None)
 
+        upload_dict = parse_upload_config_dict_from_xml(config_xml)
+
         attrs = ("type", "path")
         e_xml = config_xml.findall("extra_dir")
         if not e_xml:
@@ -110,6 +113,7 @@ def parse_config_xml(config_xml):
                 "size": cache_size,
                 "path": staging_path,
             },
+            "upload": upload_dict,
             "extra_dirs": extra_dirs,
             "private": DiskObjectStore.parse_private_from_config_xml(config_xml),
         }
@@ -143,6 +147,7 @@ class CloudConfigMixin:
                 "size": self.cache_size,
                 "path": self.staging_path,
             },
+            "upload": self.upload_dict,
         }
 
 
@@ -210,6 +215,10 @@ class IRODSObjectStore(DiskObjectStore, CloudConfigMixin):
         if self.staging_path is None:
             _config_dict_error("cache->path")
 
+        # iRODS transfers large files with parallel threads of its own, ``threads``
+        # overrides the number of threads picked by the client
+        self.upload_dict = config_dict.get("upload") or {}
+
         extra_dirs = {e["type"]: e["path"] for e in config_dict.get("extra_dirs", [])}
         if not extra_dirs:
             _config_dict_error("extra_dirs")
@@ -518,7 +527,10 @@ class IRODSObjectStore(DiskObjectStore, CloudConfigMixin):
                 )
 
                 # Add the source file to the irods collection
-                self.session.data_objects.put(source_file, data_object_path, **options)
+                put_kwargs = {}
+                if "threads" in self.upload_dict:
+                    put_kwargs["num_threads"] = self.upload_dict["threads"]
+                self.session.data_objects.put(source_file, data_object_path, **put_kwargs, **options)
 
                 end_time = datetime.now()
                 log.debug(
@@ -37,6 +37,17 @@ from .caching import (
     enable_cache_monitor,
     InProcessCacheMonitor,
     parse_caching_config_dict_from_xml,
+    record_cache_access,
+    validate_eviction_policy,
+)
+from .chunked_upload import (
+    forget_upload,
+    hash_functions_from_config,
+    max_in_flight_bytes_from_config,
+    MB,
+    parse_upload_config_dict_from_xml,
+    recorded_hexdigest,
+    upload_state_path,
 )
 from .s3_multipart_upload import multipart_upload
 
@@ -88,6 +99,7 @@ def parse_config_xml(config_xml):
         conn_path = cn_xml.get("conn_path", "/")
 
         cache_dict = parse_caching_config_dict_from_xml(config_xml)
+        upload_dict = parse_upload_config_dict_from_xml(config_xml)
 
         tag, attrs = "extra_dir", ("type", "path")
         extra_dirs = config_xml.findall(tag)
@@ -115,6 +127,7 @@ def parse_config_xml(config_xml):
                 "conn_path": conn_path,
             },
             "cache": cache_dict,
+            "upload": upload_dict,
             "extra_dirs": extra_dirs,
             "private": ConcreteObjectStore.parse_private_from_config_xml(config_xml),
         }
@@ -145,6 +158,12 @@ class CloudConfigMixin:
             "cache": {
                 "size": self.cache_size,
                 "path": self.staging_path,
+                "eviction_policy": self.cache_eviction_policy,
+            },
+            "upload": {
+                "threads": self.upload_threads,
+                "hash_functions": [h.value for h in self.upload_hash_functions],
+                "max_in_flight_mb": self.upload_max_in_flight_bytes // MB if self.upload_max_in_flight_bytes else None,
             },
         }
 
@@ -186,6 +205,12 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
 
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
+        self.cache_eviction_policy = validate_eviction_policy(cache_dict.get("eviction_policy"))
+
+        upload_dict = config_dict.get("upload") or {}
+        self.upload_threads = upload_dict.get("threads", 1)
+        self.upload_hash_functions = hash_functions_from_config(upload_dict)
+        self.upload_max_in_flight_bytes = max_in_flight_bytes_from_config(upload_dict)
 
         extra_dirs = {e["type"]: e["path"] for e in config_dict.get("extra_dirs", [])}
         self.extra_dirs.update(extra_dirs)
@@ -244,6 +269,7 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
             self.staging_path,
             self.cache_size,
             0.9,
+            self.cache_eviction_policy,
         )
 
     def _get_bucket(self, bucket_name):
@@ -451,6 +477,7 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
                     )
                     return True
                 if from_string:
+                    forget_upload(self.staging_path, rel_path)
                     key.set_contents_from_string(from_string, reduced_redundancy=self.use_rr)
                     log.debug("Pushed data from string '%s' to key '%s'", from_string, rel_path)
                 else:
@@ -461,14 +488,26 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
                         os.path.getsize(source_file),
                         rel_path,
                     )
-                    mb_size = os.path.getsize(source_file) / 1e6
+                    file_size = os.path.getsize(source_file)
+                    mb_size = file_size / 1e6
                     if mb_size < 10 or (not self.multipart):
+                        forget_upload(self.staging_path, rel_path)
                         self.transfer_progress = 0  # Reset transfer progress counter
                         key.set_contents_from_filename(
                             source_file, reduced_redundancy=self.use_rr, cb=self._transfer_cb, num_cb=10
                         )
                     else:
-                        multipart_upload(self.s3server, self._bucket, key.name, source_file, mb_size)
+                        multipart_upload(
+                            self.s3server,
+                            self._bucket,
+                            key.name,
+                            source_file,
+                            file_size,
+                            upload_state_path(self.staging_path, rel_path),
+                            threads=self.upload_threads,
+                            hash_functions=self.upload_hash_functions,
+                            max_in_flight_bytes=self.upload_max_in_flight_bytes,
+                        )
                     end_time = datetime.now()
                     log.debug(
                         "Pushed cache file '%s' to key '%s' (%s bytes transfered in %s sec)",
@@ -611,6 +650,7 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
             # but requires iterating through each individual key in S3 and deleing it.
             if entire_dir and extra_dir:
                 shutil.rmtree(self._get_cache_path(rel_path), ignore_errors=True)
+                forget_upload(self.staging_path, rel_path, entire_dir=True)
                 results = self._bucket.get_all_keys(prefix=rel_path)
                 for key in results:
                     log.debug("Deleting key %s", key.name)
@@ -619,6 +659,7 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
             else:
                 # Delete from cache first
                 unlink(self._get_cache_path(rel_path), ignore_errors=True)
+                forget_upload(self.staging_path, rel_path)
                 # Delete from S3 as well
                 if self._key_exists(rel_path):
                     key = Key(self._bucket, rel_path)
@@ -631,11 +672,34 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
             log.exception("%s delete error", self._get_filename(obj, **kwargs))
         return False
 
+    def _get_range(self, rel_path, start, count):
+        if count == 0:
+            return ""
+        try:
+            key = self._bucket.get_key(rel_path)
+            if key is None:
+                raise ObjectNotFound(f"objectstore, _get_data failed: key '{rel_path}' does not exist")
+            if start >= key.size:
+                return ""
+            content = key.get_contents_as_string(headers={"Range": f"bytes={start}-{start + count - 1}"})
+        except S3ResponseError:
+            log.exception("Problem reading range of key '%s' from S3 bucket '%s'", rel_path, self._bucket.name)
+            raise
+        # Byte ranges may split multi-byte characters, keep them round-trippable
+        return content.decode("utf-8", "surrogateescape")
+
+    def _exists_locally(self, obj, **kwargs):
+        return self._in_cache(self._construct_path(obj, **kwargs))
+
     def _get_data(self, obj, start=0, count=-1, **kwargs):
         rel_path = self._construct_path(obj, **kwargs)
         # Check cache first and get file if not there
         if not self._in_cache(rel_path):
+            if count >= 0:
+                # Serve bounded reads with a ranged request instead of pulling the whole file
+                return self._get_range(rel_path, start, count)
             self._pull_into_cache(rel_path)
+        record_cache_access(self.cache_target, self._get_cache_path(rel_path))
         # Read the file content from cache
         data_file = open(self._get_cache_path(rel_path))
         data_file.seek(start)
@@ -664,6 +728,7 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
         #     return cache_path
         # Check if the file exists in the cache first
         if self._in_cache(rel_path):
+            record_cache_access(self.cache_target, cache_path)
             return cache_path
         # Check if the file exists in persistent storage and, if it does, pull it into cache
         elif self._exists(obj, **kwargs):
@@ -672,6 +737,7 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
                 return cache_path
             else:
                 if self._pull_into_cache(rel_path):
+                    record_cache_access(self.cache_target, cache_path)
                     return cache_path
         # For the case of retrieving a directory only, return the expected path
         # even if it does not exist.
@@ -695,6 +761,7 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
                         # FIXME? Should this be a `move`?
                         shutil.copy2(source_file, cache_file)
                     self._fix_permissions(cache_file)
+                    record_cache_access(self.cache_target, cache_file)
                 except OSError:
                     log.exception("Trouble copying source file '%s' to cache '%s'", source_file, cache_file)
             else:
@@ -704,6 +771,11 @@ class S3ObjectStore(ConcreteObjectStore, CloudConfigMixin):
         else:
             raise ObjectNotFound(f"objectstore.update_from_file, object does not exist: {obj}, kwargs: {kwargs}")
 
+    def _get_upload_hexdigest(self, obj, hash_function, **kwargs):
+        rel_path = self._construct_path(obj, **kwargs)
+        state_path = upload_state_path(self.staging_path, rel_path)
+        return recorded_hexdigest(state_path, hash_function, self._size(obj, **kwargs))
+
     def _get_object_url(self, obj, **kwargs):
         if self._exists(obj, **kwargs):
             rel_path = self._construct_path(obj, **kwargs)
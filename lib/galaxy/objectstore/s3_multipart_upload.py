@@ -1,27 +1,33 @@
 #!/usr/bin/env python
 """
-Split large file into multiple pieces for upload to S3.
-This parallelizes the task over available cores using multiprocessing.
-Code mostly taken form CloudBioLinux.
+Upload large files to S3 in multiple parts using :mod:`galaxy.objectstore.chunked_upload`.
+Code originally taken from CloudBioLinux.
 """
 
-import glob
-import os
-import subprocess
+import base64
+import io
 import threading
 
 try:
     import boto
+    from boto.exception import S3ResponseError
     from boto.s3.connection import S3Connection
 except ImportError:
     boto = None  # type: ignore[assignment]
 
+from .chunked_upload import (
+    chunked_upload,
+    DEFAULT_HASH_FUNCTIONS,
+    part_size_for,
+    UploadTarget,
+)
+
 
 def mp_from_ids(s3server, mp_id, mp_keyname, mp_bucketname):
     """Get the multipart upload from the bucket and multipart IDs.
 
     This allows us to reconstitute a connection to the upload
-    from within multiprocessing functions.
+    from within worker threads.
     """
     if s3server["host"]:
         conn = boto.connect_s3(
@@ -46,32 +52,70 @@ def mp_from_ids(s3server, mp_id, mp_keyname, mp_bucketname):
     return mp
 
 
-def transfer_part(s3server, mp_id, mp_keyname, mp_bucketname, i, part):
-    """Transfer a part of a multipart upload. Designed to be run in parallel."""
-    mp = mp_from_ids(s3server, mp_id, mp_keyname, mp_bucketname)
-    with open(part, "rb") as t_handle:
-        mp.upload_part_from_file(t_handle, i + 1)
-    os.remove(part)
+class S3UploadTarget(UploadTarget):
+    """Multipart upload of a single key.
+
+    boto connections are not thread safe, every worker thread reconstitutes
+    its own connection to the upload.
+    """
+
+    def __init__(self, s3server, bucket, s3_key_name):
+        self.s3server = s3server
+        self.bucket = bucket
+        self.s3_key_name = s3_key_name
+        self._local = threading.local()
+
+    def _mp(self, upload_id):
+        mp = getattr(self._local, "mp", None)
+        if mp is None or mp.id != upload_id:
+            mp = mp_from_ids(self.s3server, upload_id, self.s3_key_name, self.bucket.name)
+            self._local.mp = mp
+        return mp
+
+    def begin(self):
+        mp = self.bucket.initiate_multipart_upload(self.s3_key_name, reduced_redundancy=self.s3server["use_rr"])
+        return mp.id
 
+    def uploaded_parts(self, upload_id):
+        try:
+            return {part.part_number for part in self._mp(upload_id)}
+        except S3ResponseError:
+            return None
 
-def multipart_upload(s3server, bucket, s3_key_name, tarball, mb_size):
-    """Upload large files using Amazon's multipart upload functionality."""
+    def upload_part(self, upload_id, number, data, md5):
+        md5_b64 = base64.b64encode(bytes.fromhex(md5)).decode("ascii")
+        self._mp(upload_id).upload_part_from_file(io.BytesIO(data), number, md5=(md5, md5_b64), size=len(data))
 
-    def split_file(in_file, mb_size, split_num=5):
-        prefix = os.path.join(os.path.dirname(in_file), f"{os.path.basename(s3_key_name)}S3PART")
-        max_chunk = s3server["max_chunk_size"]
-        # Split chunks so they are 5MB < chunk < 250MB(max_chunk_size)
-        split_size = int(max(min(mb_size / (split_num * 2.0), max_chunk), 5))
-        if not os.path.exists(f"{prefix}aa"):
-            cl = ["split", f"-b{split_size}m", in_file, prefix]
-            subprocess.check_call(cl)
-        return sorted(glob.glob(f"{prefix}*"))
+    def complete(self, upload_id, numbers):
+        self._mp(upload_id).complete_upload()
 
-    mp = bucket.initiate_multipart_upload(s3_key_name, reduced_redundancy=s3server["use_rr"])
+    def abort(self, upload_id):
+        self._mp(upload_id).cancel_upload()
 
-    for i, part in enumerate(split_file(tarball, mb_size)):
-        t = threading.Thread(target=transfer_part, args=(s3server, mp.id, mp.key_name, mp.bucket_name, i, part))
-        t.start()
-        t.join()
 
-    mp.complete_upload()
+def multipart_upload(
+    s3server,
+    bucket,
+    s3_key_name,
+    source_file,
+    file_size,
+    state_path,
+    threads=1,
+    hash_functions=DEFAULT_HASH_FUNCTIONS,
+    max_in_flight_bytes=None,
+):
+    """Upload large files using Amazon's multipart upload functionality.
+
+    Returns the digests of ``source_file`` computed while uploading.
+    """
+    part_size = part_size_for(file_size, s3server["max_chunk_size"])
+    target = S3UploadTarget(s3server, bucket, s3_key_name)
+    return chunked_upload(
+        target,
+        source_file,
+        state_path,
+        part_size,
+        threads=threads,
+        hash_functions=hash_functions,
+        max_in_flight_bytes=max_in_flight_bytes,
+    )
@@ -158,13 +158,25 @@ def reload_tool(app, **kwargs):
         log.error("Reload tool invoked without tool id.")
 
 
-def reload_toolbox(app, save_integrated_tool_panel=True, **kwargs):
+def reload_toolbox(app, save_integrated_tool_panel=True, tool_conf_paths=None, **kwargs):
+    """Reload the toolbox.
+
+    If ``tool_conf_paths`` lists the changed (shed) tool config files, only
+    these are reloaded and the changes are applied to the current toolbox in
+    place. Otherwise a new toolbox is built from all tool config files.
+    """
     reload_timer = util.ExecutionTimer()
-    log.debug("Executing toolbox reload on '%s'", app.config.server_name)
     reload_count = app.toolbox._reload_count
+    removed_tool_ids = []
     if hasattr(app, "tool_cache"):
-        app.tool_cache.cleanup()
-    _get_new_toolbox(app, save_integrated_tool_panel)
+        removed_tool_ids = app.tool_cache.cleanup()
+    if tool_conf_paths and not removed_tool_ids and app.toolbox.can_reload_tool_configs(tool_conf_paths):
+        log.debug("Executing toolbox reload of %s on '%s'", ", ".join(tool_conf_paths), app.config.server_name)
+        app.toolbox.reload_tool_configs(tool_conf_paths, save_integrated_tool_panel=save_integrated_tool_panel)
+        app.toolbox.persist_cache()
+    else:
+        log.debug("Executing toolbox reload on '%s'", app.config.server_name)
+        _get_new_toolbox(app, save_integrated_tool_panel)
     app.toolbox._reload_count = reload_count + 1
     send_local_control_task(app, "rebuild_toolbox_search_index")
     log.debug("Toolbox reload %s", reload_timer)
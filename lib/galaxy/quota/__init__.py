@@ -1,11 +1,23 @@
 """Galaxy Quotas"""
 import logging
-from typing import Optional
-
-from sqlalchemy import select
+from typing import (
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+from sqlalchemy import (
+    func,
+    select,
+)
 from sqlalchemy.sql import text
 
 import galaxy.util
+from galaxy.model import (
+    User,
+    UserDiskUsageDelta,
+)
 from galaxy.model.base import transaction
 
 log = logging.getLogger(__name__)
@@ -297,6 +309,114 @@ WHERE default_quota_association.type = :default_type
         return False
 
 
+class DiskUsageDrift(NamedTuple):
+    user_id: int
+    quota_source_label: Optional[str]
+    recorded: int
+    actual: int
+
+
+# Reason of the ledger entries that fold the reconciled deltas of a user
+RECONCILED_REASON = "reconciled"
+
+
+def _disk_usage_counters(sa_session, user) -> Dict[Optional[str], int]:
+    sa_session.refresh(user)
+    counters: Dict[Optional[str], int] = {None: int(user.disk_usage or 0)}
+    for usage in user.quota_source_usages:
+        counters[usage.quota_source_label] = int(usage.disk_usage or 0)
+    return counters
+
+
+def _ledger_sums(sa_session, user_id: int, *conditions) -> Dict[Optional[str], int]:
+    stmt = (
+        select(UserDiskUsageDelta.quota_source_label, func.sum(UserDiskUsageDelta.amount))
+        .where(UserDiskUsageDelta.user_id == user_id, *conditions)
+        .group_by(UserDiskUsageDelta.quota_source_label)
+    )
+    return {label: int(amount or 0) for label, amount in sa_session.execute(stmt)}
+
+
+def _compact_ledger(sa_session, user, max_delta_id: int) -> None:
+    """Replace the ledger entries of ``user`` up to ``max_delta_id`` by one reconciled entry per counter."""
+    counters = _disk_usage_counters(sa_session, user)
+    later = _ledger_sums(sa_session, user.id, UserDiskUsageDelta.id > max_delta_id)
+    UserDiskUsageDelta.prune(sa_session, user.id, max_delta_id)
+    for label, usage in counters.items():
+        sa_session.add(
+            UserDiskUsageDelta(user, usage - later.get(label, 0), quota_source_label=label, reason=RECONCILED_REASON)
+        )
+
+
+def reconcile_user_disk_usage(
+    sa_session, object_store, max_users: Optional[int] = None, sample_size: int = 0
+) -> List[DiskUsageDrift]:
+    """Reconcile the disk usage counters of users with pending adjustments.
+
+    Every adjustment of a counter is recorded in the ``user_disk_usage_delta``
+    ledger, so the sum of a user's ledger entries must equal the counter.
+    Users with new entries are processed oldest first, at most ``max_users``
+    of them. If their ledger sums up to their counters, the entries are
+    compacted into one ``reconciled`` entry per counter without touching the
+    datasets. Users whose ledger does not match, that were never reconciled
+    before, or that are among ``sample_size`` randomly sampled users, are
+    fully recalculated; differences between the counters and the
+    recalculated usage are logged and returned.
+    """
+    pending = UserDiskUsageDelta.reason.is_(None) | (UserDiskUsageDelta.reason != RECONCILED_REASON)
+    stmt = (
+        select(UserDiskUsageDelta.user_id, func.max(UserDiskUsageDelta.id))
+        .where(pending)
+        .group_by(UserDiskUsageDelta.user_id)
+        .order_by(func.min(UserDiskUsageDelta.id))
+    )
+    if max_users:
+        stmt = stmt.limit(max_users)
+    max_delta_ids: Dict[int, int] = dict(sa_session.execute(stmt).all())
+    sampled = set()
+    if sample_size:
+        sampled = set(sa_session.scalars(select(User.id).order_by(func.random()).limit(sample_size)))
+        for user_id in sampled - set(max_delta_ids):
+            stmt = select(func.max(UserDiskUsageDelta.id)).where(UserDiskUsageDelta.user_id == user_id)
+            max_delta_ids[user_id] = sa_session.scalar(stmt) or 0
+    drifts: List[DiskUsageDrift] = []
+    for user_id, max_delta_id in max_delta_ids.items():
+        user = sa_session.get(User, user_id)
+        if user is None:
+            UserDiskUsageDelta.prune(sa_session, user_id, max_delta_id)
+        else:
+            recorded = _disk_usage_counters(sa_session, user)
+            reconciled = sa_session.scalar(
+                select(func.count(UserDiskUsageDelta.id)).where(
+                    UserDiskUsageDelta.user_id == user_id,
+                    UserDiskUsageDelta.id <= max_delta_id,
+                    UserDiskUsageDelta.reason == RECONCILED_REASON,
+                )
+            )
+            ledger = _ledger_sums(sa_session, user_id)
+            consistent = reconciled and all(
+                recorded.get(label, 0) == ledger.get(label, 0) for label in set(recorded) | set(ledger)
+            )
+            if user_id in sampled or not consistent:
+                user.calculate_and_set_disk_usage(object_store)
+                actual = _disk_usage_counters(sa_session, user)
+                for label in set(recorded) | set(actual):
+                    drift = DiskUsageDrift(user_id, label, recorded.get(label, 0), actual.get(label, 0))
+                    if drift.recorded != drift.actual:
+                        log.warning(
+                            "Disk usage of user %s for quota source %s drifted, recorded %s bytes, actual %s bytes",
+                            user_id,
+                            label,
+                            drift.recorded,
+                            drift.actual,
+                        )
+                        drifts.append(drift)
+            _compact_ledger(sa_session, user, max_delta_id)
+        with transaction(sa_session):
+            sa_session.commit()
+    return drifts
+
+
 def get_quota_agent(config, model) -> QuotaAgent:
     quota_agent: QuotaAgent
     if config.enable_quotas:
@@ -306,4 +426,4 @@ def get_quota_agent(config, model) -> QuotaAgent:
     return quota_agent
 
 
-__all__ = ("get_quota_agent", "NoQuotaAgent")
+__all__ = ("get_quota_agent", "NoQuotaAgent", "reconcile_user_disk_usage")
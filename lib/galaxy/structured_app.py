@@ -127,7 +127,7 @@ class MinimalManagerApp(MinimalApp):
     def is_job_handler(self) -> bool:
         ...
 
-    def wait_for_toolbox_reload(self, old_toolbox: "ToolBox") -> None:
+    def wait_for_toolbox_reload(self, old_reload_count: int) -> None:
         ...
 
 
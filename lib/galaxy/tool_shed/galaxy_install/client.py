@@ -69,5 +69,5 @@ class InstallationTarget(HasToolBox, Generic[ToolBoxType]):
     tool_shed_repository_cache: Optional[ToolShedRepositoryCache]
     tool_data_tables: ToolDataTableManager
 
-    def wait_for_toolbox_reload(self, old_toolbox: ToolBoxType) -> None:
+    def wait_for_toolbox_reload(self, old_reload_count: int) -> None:
         ...
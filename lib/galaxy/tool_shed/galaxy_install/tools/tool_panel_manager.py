@@ -40,7 +40,7 @@ class ToolPanelManager:
             # We may have an empty elem_list in case a data manager is being installed.
             # In that case we don't want to wait for a toolbox reload that will never happen.
             return
-        old_toolbox = self.app.toolbox
+        old_reload_count = self.app.toolbox._reload_count
         shed_tool_conf = shed_tool_conf_dict["config_filename"]
         tool_cache_data_dir = shed_tool_conf_dict.get("tool_cache_data_dir")
         tool_path = shed_tool_conf_dict["tool_path"]
@@ -84,7 +84,7 @@ class ToolPanelManager:
                     config_elems.append(elem_entry)
             # Persist the altered shed_tool_config file.
             self.config_elems_to_xml_file(config_elems, shed_tool_conf, tool_path, tool_cache_data_dir)
-            self.app.wait_for_toolbox_reload(old_toolbox)
+            self.app.wait_for_toolbox_reload(old_reload_count)
         else:
             log.error(error_message)
 
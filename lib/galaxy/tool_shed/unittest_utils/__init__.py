@@ -125,7 +125,7 @@ class Watchers:
     def __init__(self, app):
         self.app = app
         self.tool_config_watcher = get_tool_conf_watcher(
-            reload_callback=self.app.reload_toolbox,
+            reload_callback=lambda changed_paths: self.app.reload_toolbox(),
             tool_cache=None,
         )
         self.tool_watcher = get_tool_watcher(self, app.config)
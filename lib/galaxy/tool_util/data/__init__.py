@@ -24,6 +24,7 @@ from typing import (
     Callable,
     cast,
     Dict,
+    Iterable,
     List,
     Optional,
     Set,
@@ -303,6 +304,8 @@ class TabularToolDataTable(ToolDataTable):
     dict_export_visible_keys = ["name", "data", "largest_index", "columns", "missing_index_file"]
 
     type_key = "tabular"
+    # tables restored by ``from_dict`` do not run ``__init__``
+    _column_indexes_version: Optional[Tuple[int, int]] = None
 
     def __init__(
         self,
@@ -323,6 +326,8 @@ class TabularToolDataTable(ToolDataTable):
         )
         self.config_element = config_element
         self.data = []
+        self._column_indexes: Dict[int, Dict[str, List[List[str]]]] = {}
+        self._column_indexes_version = None
         self.configure_and_load(config_element, tool_data_path, from_shed_config)
 
     def configure_and_load(
@@ -604,28 +609,57 @@ class TabularToolDataTable(ToolDataTable):
         """
         Returns table entries associated with a col/val pair.
         """
+        return self.get_entries_many(query_attr, [query_val], return_attr, limit=limit).get(query_val, [])
+
+    def get_entries_many(
+        self, query_attr: str, query_vals: Iterable[str], return_attr: Optional[str], limit=None
+    ) -> Dict[str, List]:
+        """
+        Returns table entries associated with each of several values of a column,
+        as a dictionary keyed by the queried values.
+        """
         query_col = self.columns.get(query_attr, None)
         if query_col is None:
-            return []
+            return {}
+        return_col = None
         if return_attr is not None:
             return_col = self.columns.get(return_attr, None)
             if return_col is None:
-                return []
-        rval = []
-        # Look for table entry.
-        for fields in self.get_fields():
-            if fields[query_col] == query_val:
-                if return_attr is None:
+                return {}
+        column_names = self.get_column_name_list() if return_col is None else []
+        column_index = self._get_column_index(query_col)
+        rval: Dict[str, List] = {}
+        for query_val in query_vals:
+            entries: List = []
+            for fields in column_index.get(query_val, [])[:limit]:
+                if return_col is not None:
+                    entries.append(fields[return_col])
+                else:
                     field_dict = {}
-                    for i, col_name in enumerate(self.get_column_name_list()):
+                    for i, col_name in enumerate(column_names):
                         field_dict[col_name or i] = fields[i]
-                    rval.append(field_dict)
-                else:
-                    rval.append(fields[return_col])
-                if limit is not None and len(rval) == limit:
-                    break
+                    entries.append(field_dict)
+            rval[query_val] = entries
         return rval
 
+    def _get_column_index(self, column: int) -> Dict[str, List[List[str]]]:
+        """
+        Returns a mapping of the values of ``column`` to the rows containing them.
+
+        Indexes are built on first use and discarded whenever the table content changes.
+        """
+        version = (self._loaded_content_version, len(self.data))
+        if self._column_indexes_version != version:
+            self._column_indexes = {}
+            self._column_indexes_version = version
+        column_index = self._column_indexes.get(column)
+        if column_index is None:
+            column_index = {}
+            for fields in self.get_fields():
+                column_index.setdefault(fields[column], []).append(fields)
+            self._column_indexes[column] = column_index
+        return column_index
+
     # This method is used in tools, so need to keep its API stable
     def get_filename_for_source(self, source: EntrySource, default: Optional[str] = None) -> Optional[str]:
         source_repo_info: Optional[dict] = None
@@ -11,6 +11,7 @@ from typing import (
     Dict,
     List,
     Optional,
+    Set,
     Tuple,
     Union,
 )
@@ -170,6 +171,11 @@ class AbstractToolBox(Dictifiable, ManagesIntegratedToolPanelMixin):
         # In-memory dictionary that defines the layout of the tool panel.
         self._tool_panel = ToolPanelElements()
         self._index = 0
+        # The (id, version) of the tools loaded from each tool config file,
+        # used to work out which tools to unload when a config file changes.
+        self._tools_by_config: Dict[str, Set[Tuple[str, Optional[str]]]] = {}
+        self._loading_config_filename: Optional[str] = None
+        self._reload_count = 0
         self.data_manager_tools = {}
         self._lineage_map = LineageMap(app)
         # Sets self._integrated_tool_panel and self._integrated_tool_panel_config_has_contents
@@ -267,20 +273,126 @@ class AbstractToolBox(Dictifiable, ManagesIntegratedToolPanelMixin):
         for config_filename in config_filenames:
             if not self.can_load_config_file(config_filename):
                 continue
+            self._load_tools_from_config(config_filename)
+        log.debug("Reading tools from config files finished %s", execution_timer)
+
+    def _load_tools_from_config(self, config_filename):
+        self._loading_config_filename = config_filename
+        try:
+            self._init_tools_from_config(config_filename)
+        except etree.ParseError:
+            # Occasionally we experience "Missing required parameter 'shed_tool_conf'."
+            # This happens if parsing the shed_tool_conf fails, so we just sleep a second and try again.
+            # TODO: figure out why this fails occasionally (try installing hundreds of tools in batch ...).
+            time.sleep(1)
             try:
                 self._init_tools_from_config(config_filename)
-            except etree.ParseError:
-                # Occasionally we experience "Missing required parameter 'shed_tool_conf'."
-                # This happens if parsing the shed_tool_conf fails, so we just sleep a second and try again.
-                # TODO: figure out why this fails occasionally (try installing hundreds of tools in batch ...).
-                time.sleep(1)
-                try:
-                    self._init_tools_from_config(config_filename)
-                except Exception:
-                    raise
             except Exception:
-                log.exception("Error loading tools defined in config %s", config_filename)
-        log.debug("Reading tools from config files finished %s", execution_timer)
+                raise
+        except Exception:
+            log.exception("Error loading tools defined in config %s", config_filename)
+        finally:
+            self._loading_config_filename = None
+
+    def can_reload_tool_configs(self, config_filenames) -> bool:
+        """Return True if changes to ``config_filenames`` can be applied with :meth:`reload_tool_configs`.
+
+        Only shed tool configuration files are reloaded incrementally, they
+        can't contain ``tool_dir`` items and are the files changed by Tool
+        Shed installs.
+        """
+        dynamic_conf_paths = {os.path.abspath(conf["config_filename"]) for conf in self._dynamic_tool_confs}
+        config_filenames = listify(config_filenames)
+        return bool(config_filenames) and all(
+            os.path.abspath(config_filename) in dynamic_conf_paths for config_filename in config_filenames
+        )
+
+    def reload_tool_configs(self, config_filenames, save_integrated_tool_panel=True):
+        """Apply changes of the tool config files ``config_filenames`` to this toolbox in place.
+
+        The config files are parsed again (unchanged tools are taken from the
+        tool cache), tools no longer listed in any of them are unloaded and
+        the tool panel and panel views are updated. Returns the (id, version)
+        tuples of the added and removed tools.
+        """
+        execution_timer = ExecutionTimer()
+        added: Set[Tuple[str, Optional[str]]] = set()
+        removed: Set[Tuple[str, Optional[str]]] = set()
+        with self.app._toolbox_lock:
+            for config_filename in listify(config_filenames):
+                config_path = os.path.abspath(config_filename)
+                config_filename = next(
+                    (
+                        conf["config_filename"]
+                        for conf in self._dynamic_tool_confs
+                        if os.path.abspath(conf["config_filename"]) == config_path
+                    ),
+                    config_filename,
+                )
+                previous = self._tools_by_config.pop(config_filename, set())
+                # Parsing the config file registers it again
+                self._dynamic_tool_confs = [
+                    conf for conf in self._dynamic_tool_confs if conf["config_filename"] != config_filename
+                ]
+                self._load_tools_from_config(config_filename)
+                current = self._tools_by_config.get(config_filename, set())
+                added.update(current - previous)
+                removed.update(previous - current)
+            still_loaded = set().union(*self._tools_by_config.values())
+            removed -= still_loaded
+            for tool_id, version in removed:
+                self._unload_tool(tool_id, version)
+            if self.app.name == "galaxy" and self._integrated_tool_panel_config_has_contents:
+                self._load_tool_panel()
+            if self.app.name == "galaxy":
+                self._load_tool_panel_views()
+            self._tool_to_dict_cache.clear()
+            self._tool_to_dict_cache_admin.clear()
+            if save_integrated_tool_panel:
+                self._save_integrated_tool_panel()
+        log.debug(
+            "Reloaded tool configs %s (%d tools added, %d removed) %s",
+            ", ".join(listify(config_filenames)),
+            len(added),
+            len(removed),
+            execution_timer,
+        )
+        return added, removed
+
+    def _unload_tool(self, tool_id, version):
+        """Unload a single version of a tool, promoting the newest remaining version if needed."""
+        versions = self._tool_versions_by_id.get(tool_id, {})
+        tool = versions.pop(version, None)
+        if tool is None:
+            return
+        if tool.lineage is not None:
+            tool.lineage.unregister_version(tool.version)
+        if self._tools_by_id.get(tool_id) is not tool:
+            # an older version, the default tool for this id is unchanged
+            old_id_tools = self._tools_by_old_id.get(tool.old_id, [])
+            if tool in old_id_tools:
+                old_id_tools.remove(tool)
+            return
+        if not versions:
+            del self._tool_versions_by_id[tool_id]
+            self.remove_tool_by_id(tool_id)
+            replacement = None
+        else:
+            replacement = next(iter(versions.values()))
+            for other_tool in versions.values():
+                if self._newer_tool(other_tool, replacement):
+                    replacement = other_tool
+            self._tools_by_id[tool_id] = replacement
+            self._tools_by_old_id[tool.old_id].remove(tool)
+        key = f"tool_{tool_id}"
+        for panel, stub in ((self._tool_panel, False), (self._integrated_tool_panel, True)):
+            for panel_dict in [panel] + [section.elems for _, section in panel.walk_sections()]:
+                if key not in panel_dict:
+                    continue
+                if replacement is None and not stub:
+                    del panel_dict[key]
+                else:
+                    panel_dict[key] = replacement
 
     def _init_tools_from_config(self, config_filename):
         """
@@ -961,6 +1073,8 @@ class AbstractToolBox(Dictifiable, ManagesIntegratedToolPanelMixin):
         # performing that check did not enable this scenario.
         tool._lineage = self._lineage_map.register(tool)
         self.register_tool(tool)
+        if self._loading_config_filename:
+            self._tools_by_config.setdefault(self._loading_config_filename, set()).add((tool.id, tool.version or None))
         if load_panel_dict:
             self.__add_tool_to_tool_panel(tool, panel_dict)
 
@@ -1164,7 +1278,8 @@ class AbstractToolBox(Dictifiable, ManagesIntegratedToolPanelMixin):
         old_id = tool.old_id
         if old_id not in self._tools_by_old_id:
             self._tools_by_old_id[old_id] = []
-        self._tools_by_old_id[old_id].append(tool)
+        if tool not in self._tools_by_old_id[old_id]:
+            self._tools_by_old_id[old_id].append(tool)
 
     def package_tool(self, trans, tool_id):
         """
@@ -69,6 +69,9 @@ class ToolLineage:
         assert tool_version is not None
         self.tool_versions.add(str(tool_version))
 
+    def unregister_version(self, tool_version) -> None:
+        self.tool_versions.discard(str(tool_version))
+
     def get_versions(self):
         """
         Return an ordered list of lineages (ToolLineageVersion) in this
@@ -1,6 +1,10 @@
 import logging
 import os.path
 import threading
+from typing import (
+    List,
+    Optional,
+)
 
 try:
     from watchdog.events import FileSystemEventHandler
@@ -96,12 +100,18 @@ class ToolConfWatcher:
             self.exit = None
 
     def check(self):
-        """Check for changes in self.paths or self.cache and call the event handler."""
+        """Check for changes in self.paths or self.cache and call the event handler.
+
+        The handler is called with the list of changed paths, or with ``None``
+        if the cause of the reload is not limited to changed files (unreadable
+        files, tools removed from the tool cache).
+        """
         hashes = {}
         if self.cache:
             self.cache.assert_hashes_initialized()
         while self._active and not self.exit.is_set():
             do_reload = False
+            changed_paths: Optional[List[str]] = []
             drop_on_next_loop = set()
             drop_now = set()
             with self._lock:
@@ -123,6 +133,8 @@ class ToolConfWatcher:
                         self.paths[path] = new_mod_time
                         log.debug("The file '%s' has been created.", path)
                         do_reload = True
+                        if changed_paths is not None:
+                            changed_paths.append(path)
                     elif new_mod_time > mod_time:
                         new_hash = md5_hash_file(path)
                         if hashes[path] != new_hash:
@@ -130,6 +142,8 @@ class ToolConfWatcher:
                             hashes[path] = new_hash
                             log.debug("The file '%s' has changes.", path)
                             do_reload = True
+                            if changed_paths is not None:
+                                changed_paths.append(path)
                 except OSError:
                     # in rare cases `path` may be deleted between `os.path.exists` calls
                     # and reading the file from the filesystem. We do not want the watcher
@@ -145,12 +159,14 @@ class ToolConfWatcher:
                     if self.cache:
                         self.cache.cleanup()
                     do_reload = True
+                    changed_paths = None
             if not do_reload and self.cache:
                 removed_ids = self.cache.cleanup()
                 if removed_ids:
                     do_reload = True
+                    changed_paths = None
             if do_reload:
-                self.reload_callback()
+                self.reload_callback(changed_paths)
             drop_now = drop_on_next_loop
             drop_on_next_loop = set()
             self.exit.wait(1)
@@ -403,7 +403,6 @@ class ToolBox(AbstractToolBox):
     """
 
     def __init__(self, config_filenames, tool_root_dir, app, save_integrated_tool_panel=True):
-        self._reload_count = 0
         self.tool_location_fetcher = ToolLocationFetcher()
         self.cache_regions = {}
         # This is here to deal with the old default value, which doesn't make
@@ -491,8 +490,10 @@ class ToolBox(AbstractToolBox):
             )
         return True
 
-    def has_reloaded(self, other_toolbox):
-        return self._reload_count != other_toolbox._reload_count
+    def has_reloaded(self, old_reload_count: int) -> bool:
+        # Toolbox reloads either replace the toolbox or update it in place,
+        # both bump the reload count.
+        return self._reload_count != old_reload_count
 
     @property
     def all_requirements(self):
@@ -1944,11 +1945,16 @@ class Tool(Dictifiable):
         job_callback=None,
         preferred_object_store_id=None,
         flush_job=True,
+        add_pending_items=True,
         skip=False,
     ):
         """
         Return a pair with whether execution is successful as well as either
         resulting output data or an error message indicating the problem.
+
+        If ``add_pending_items`` is ``False`` new outputs are only staged for
+        addition to the history, the caller needs to call
+        ``history.add_pending_items()`` once all jobs of a batch are created.
         """
         try:
             rval = self.execute(
@@ -1963,6 +1969,7 @@ class Tool(Dictifiable):
                 job_callback=job_callback,
                 preferred_object_store_id=preferred_object_store_id,
                 flush_job=flush_job,
+                add_pending_items=add_pending_items,
                 skip=skip,
             )
             job = rval[0]
@@ -25,6 +25,11 @@ from galaxy.model import (
 )
 from galaxy.model.base import transaction
 from galaxy.model.dataset_collections.builder import CollectionBuilder
+from galaxy.model.job_fingerprint import (
+    compute_job_fingerprint,
+    session_dataset_token_resolver,
+    set_job_fingerprint,
+)
 from galaxy.model.none_like import NoneDataset
 from galaxy.objectstore import ObjectStorePopulator
 from galaxy.tools.parameters import update_dataset_ids
@@ -57,6 +62,14 @@ class ToolExecutionCache:
         self.current_user_roles = trans.get_current_user_roles()
         self.chrom_info = {}
         self.cached_collection_elements = {}
+        self._dataset_access_oracle = None
+
+    @property
+    def dataset_access_oracle(self):
+        """Dataset access decisions for ``current_user_roles``, shared by all executions."""
+        if self._dataset_access_oracle is None:
+            self._dataset_access_oracle = self.trans.app.security_agent.dataset_access_oracle(self.current_user_roles)
+        return self._dataset_access_oracle
 
     def get_chrom_info(self, tool_id, input_dbkey):
         genome_builds = self.trans.app.genome_builds
@@ -100,6 +113,7 @@ class DefaultToolAction(ToolAction):
         current_user_roles=None,
         dataset_collection_elements=None,
         collection_info=None,
+        dataset_access_oracle=None,
     ):
         """
         Collect any dataset inputs from incoming. Returns a mapping from
@@ -108,6 +122,8 @@ class DefaultToolAction(ToolAction):
         """
         if current_user_roles is None:
             current_user_roles = trans.get_current_user_roles()
+        if dataset_access_oracle is None:
+            dataset_access_oracle = trans.app.security_agent.dataset_access_oracle(current_user_roles)
         input_datasets = LegacyUnprefixedDict()
         all_permissions: Dict[str, Set[str]] = {}
 
@@ -137,29 +153,29 @@ class DefaultToolAction(ToolAction):
                 # fetch dataset details for this input from the database.
                 if collection_info and collection_info.is_mapped_over(input_name):
                     action_tuples = collection_info.map_over_action_tuples(input_name)
-                    if not trans.user_is_admin and not trans.app.security_agent.can_access_datasets(
-                        current_user_roles, action_tuples
-                    ):
+                    if not trans.user_is_admin and not dataset_access_oracle.can_access_action_tuples(action_tuples):
                         raise ItemAccessibilityException(
                             "User does not have permission to use a dataset provided for input."
                         )
                     for action, role_id in action_tuples:
                         record_permission(action, role_id)
                 else:
-                    if not trans.user_is_admin and not trans.app.security_agent.can_access_dataset(
-                        current_user_roles, data.dataset
-                    ):
+                    if not trans.user_is_admin and not dataset_access_oracle.can_access_dataset(data.dataset):
                         raise ItemAccessibilityException(
                             f"User does not have permission to use dataset ({data.name}) provided for input."
                         )
-                    permissions = trans.app.security_agent.get_permissions(data.dataset)
-                    for action, roles in permissions.items():
-                        for role in roles:
-                            record_permission(action.action, model.cached_id(role))
+                    for action, role_id in dataset_access_oracle.dataset_action_tuples(data.dataset):
+                        record_permission(action, role_id)
                 return data
 
             if isinstance(input, DataToolParameter):
                 if isinstance(value, list):
+                    # Load the permissions of all datasets of this input at once
+                    dataset_access_oracle.prefetch(
+                        (v.hda if hasattr(v, "hda") else v).dataset
+                        for v in value
+                        if v is not None and not isinstance(v, RuntimeValue)
+                    )
                     # If there are multiple inputs with the same name, they
                     # are stored as name1, name2, ...
                     for i, v in enumerate(value):
@@ -239,9 +255,7 @@ class DefaultToolAction(ToolAction):
                     collection = value.collection
 
                 action_tuples = collection.dataset_action_tuples
-                if not trans.user_is_admin and not trans.app.security_agent.can_access_datasets(
-                    current_user_roles, action_tuples
-                ):
+                if not trans.user_is_admin and not dataset_access_oracle.can_access_collection(collection):
                     raise ItemAccessibilityException(
                         "User does not have permission to use a dataset provided for input."
                     )
@@ -334,7 +348,9 @@ class DefaultToolAction(ToolAction):
     def _check_access(self, tool, trans):
         assert tool.allow_user_access(trans.user), f"User ({trans.user}) is not allowed to access this tool."
 
-    def _collect_inputs(self, tool, trans, incoming, history, current_user_roles, collection_info):
+    def _collect_inputs(
+        self, tool, trans, incoming, history, current_user_roles, collection_info, dataset_access_oracle=None
+    ):
         """Collect history as well as input datasets and collections."""
         # Set history.
         if not history:
@@ -351,6 +367,7 @@ class DefaultToolAction(ToolAction):
             history=history,
             current_user_roles=current_user_roles,
             collection_info=collection_info,
+            dataset_access_oracle=dataset_access_oracle,
         )
 
         preserved_tags = {}
@@ -389,6 +406,7 @@ class DefaultToolAction(ToolAction):
         job_callback=None,
         preferred_object_store_id=None,
         flush_job=True,
+        add_pending_items=True,
         skip=False,
     ):
         """
@@ -410,7 +428,15 @@ class DefaultToolAction(ToolAction):
             preserved_tags,
             preserved_hdca_tags,
             all_permissions,
-        ) = self._collect_inputs(tool, trans, incoming, history, current_user_roles, collection_info)
+        ) = self._collect_inputs(
+            tool,
+            trans,
+            incoming,
+            history,
+            current_user_roles,
+            collection_info,
+            dataset_access_oracle=execution_cache.dataset_access_oracle,
+        )
         # Build name for output datasets based on tool name and input names
         on_text = self._get_on_text(inp_data)
 
@@ -656,7 +682,8 @@ class DefaultToolAction(ToolAction):
             if name not in incoming and name not in child_dataset_names:
                 # don't add already existing datasets, i.e. async created
                 history.stage_addition(data)
-        history.add_pending_items(set_output_hid=set_output_hid)
+        if add_pending_items:
+            history.add_pending_items(set_output_hid=set_output_hid)
 
         log.info(add_datasets_timer)
         job_setup_timer = ExecutionTimer()
@@ -866,6 +893,15 @@ class DefaultToolAction(ToolAction):
         # FIXME: Don't need all of incoming here, just the defined parameters
         #        from the tool. We need to deal with tools that pass all post
         #        parameters to the command as a special case.
+        # Fingerprint the parameters as passed to the tool (i.e. as JobSearch sees them),
+        # before reduced collections are restored below.
+        fingerprint = compute_job_fingerprint(
+            job.tool_id,
+            job.tool_version,
+            tool.params_to_strings(incoming, trans.app, nested=True),
+            session_dataset_token_resolver(trans.sa_session),
+        )
+        set_job_fingerprint(job, fingerprint)
         reductions: Dict[str, List[str]] = {}
         for name, dataset_collection_info_pairs in inp_dataset_collections.items():
             for dataset_collection, reduced in dataset_collection_info_pairs:
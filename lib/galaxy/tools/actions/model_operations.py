@@ -22,7 +22,13 @@ class ModelOperationToolAction(DefaultToolAction):
 
         current_user_roles = execution_cache.current_user_roles
         history, inp_data, inp_dataset_collections, _, _, _ = self._collect_inputs(
-            tool, trans, incoming, history, current_user_roles, collection_info
+            tool,
+            trans,
+            incoming,
+            history,
+            current_user_roles,
+            collection_info,
+            dataset_access_oracle=execution_cache.dataset_access_oracle,
         )
 
         tool.check_inputs_ready(inp_data, inp_dataset_collections)
@@ -56,7 +62,15 @@ class ModelOperationToolAction(DefaultToolAction):
             preserved_tags,
             preserved_hdca_tags,
             all_permissions,
-        ) = self._collect_inputs(tool, trans, incoming, history, current_user_roles, collection_info)
+        ) = self._collect_inputs(
+            tool,
+            trans,
+            incoming,
+            history,
+            current_user_roles,
+            collection_info,
+            dataset_access_oracle=execution_cache.dataset_access_oracle,
+        )
 
         # Build name for output datasets based on tool name and input names
         on_text = self._get_on_text(inp_data)
@@ -1,14 +1,19 @@
 import json
 import logging
+import mmap
 import os
 import shutil
 import sqlite3
+import struct
 import tempfile
 import zlib
+from contextlib import closing
 from threading import Lock
 from typing import (
     Dict,
+    Iterable,
     Optional,
+    Tuple,
 )
 
 from sqlitedict import SqliteDict
@@ -29,19 +34,130 @@ def decoder(obj):
     return json.loads(zlib.decompress(bytes(obj)).decode("utf-8"))
 
 
+class ToolDocumentSnapshot:
+    """Read-only, memory-mapped copy of a tool document cache.
+
+    The snapshot file consists of a fixed header, a JSON index mapping config
+    files to the offset and length of their document, and the documents
+    themselves encoded like in the sqlite cache. Documents are only decoded
+    when requested and, as the file is mapped read-only, its pages are shared
+    by all processes using the same snapshot. The header records the size and
+    modification time of the sqlite cache file the snapshot was built from, so
+    stale snapshots are ignored.
+
+    The snapshot holds macro-expanded tool documents, ``Tool`` objects are
+    still built from them when the toolbox is loaded.
+    """
+
+    MAGIC = b"GXTOOLDOCS"
+    HEADER = struct.Struct("<10sIQqQ")
+
+    def __init__(self, path: str, source_stat: os.stat_result):
+        self.path = path
+        with open(path, "rb") as fh:
+            header = fh.read(self.HEADER.size)
+            if len(header) != self.HEADER.size:
+                raise ValueError(f"Tool document snapshot {path} is truncated")
+            magic, version, source_size, source_mtime_ns, index_length = self.HEADER.unpack(header)
+            if magic != self.MAGIC or version != CURRENT_TOOL_CACHE_VERSION:
+                raise ValueError(f"Tool document snapshot {path} has an unsupported format")
+            if (source_size, source_mtime_ns) != (source_stat.st_size, source_stat.st_mtime_ns):
+                raise ValueError(f"Tool document snapshot {path} is out of date")
+            self._index: Dict[str, Tuple[int, int]] = json.loads(fh.read(index_length).decode("utf-8"))
+            self._data_offset = self.HEADER.size + index_length
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, config_file):
+        return config_file in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def get(self, config_file):
+        location = self._index.get(config_file)
+        if location is None:
+            return None
+        offset, length = location
+        start = self._data_offset + offset
+        return decoder(self._mmap[start : start + length])
+
+    def close(self):
+        self._mmap.close()
+
+    @classmethod
+    def write(cls, path: str, source_stat: os.stat_result, encoded_documents: Iterable[Tuple[str, bytes]]):
+        """Atomically write a snapshot from ``(config_file, encoded document)`` pairs."""
+        index = {}
+        offset = 0
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".snapshot.tmp", delete=False) as data_fh:
+            for config_file, encoded_document in encoded_documents:
+                data_fh.write(encoded_document)
+                index[config_file] = (offset, len(encoded_document))
+                offset += len(encoded_document)
+        try:
+            encoded_index = json.dumps(index).encode("utf-8")
+            fd, snapshot_tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".snapshot.tmp")
+            with open(fd, "wb") as fh:
+                fh.write(
+                    cls.HEADER.pack(
+                        cls.MAGIC,
+                        CURRENT_TOOL_CACHE_VERSION,
+                        source_stat.st_size,
+                        source_stat.st_mtime_ns,
+                        len(encoded_index),
+                    )
+                )
+                fh.write(encoded_index)
+                with open(data_fh.name, "rb") as data_in:
+                    shutil.copyfileobj(data_in, fh)
+            os.rename(snapshot_tmp, path)
+        finally:
+            os.unlink(data_fh.name)
+
+
 class ToolDocumentCache:
     def __init__(self, cache_dir):
         self.cache_dir = cache_dir
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
         self.cache_file = os.path.join(self.cache_dir, "cache.sqlite")
+        self.snapshot_file = os.path.join(self.cache_dir, "cache.snapshot")
         self.writeable_cache_file = None
         self._cache = None
+        self._snapshot: Optional[ToolDocumentSnapshot] = None
         self.disabled = False
         self._get_cache(create_if_necessary=True)
+        self._open_snapshot()
 
     def close(self):
         self._cache and self._cache.close()
+        self._close_snapshot()
+
+    def _open_snapshot(self):
+        self._close_snapshot()
+        if not os.path.exists(self.snapshot_file):
+            return
+        try:
+            self._snapshot = ToolDocumentSnapshot(self.snapshot_file, os.stat(self.cache_file))
+        except (OSError, ValueError) as e:
+            log.debug("Tool document snapshot unavailable: %s", unicodify(e))
+
+    def _close_snapshot(self):
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+    def _write_snapshot(self):
+        """Build the memory-mapped snapshot from the persisted sqlite cache file."""
+        try:
+            with closing(sqlite3.connect(f"file:{self.cache_file}?mode=ro", uri=True)) as connection:
+                source_stat = os.stat(self.cache_file)
+                rows = connection.execute('SELECT key, value FROM "unnamed"')
+                ToolDocumentSnapshot.write(
+                    self.snapshot_file, source_stat, ((key, bytes(value)) for key, value in rows)
+                )
+        except (OSError, sqlite3.Error) as e:
+            log.warning("Could not write tool document snapshot: %s", unicodify(e))
 
     def _get_cache(self, flag="r", create_if_necessary=False):
         try:
@@ -63,15 +179,19 @@ class ToolDocumentCache:
         return os.access(self.cache_file, os.W_OK)
 
     def reopen_ro(self):
-        self._get_cache(flag="r")
         self.writeable_cache_file = None
+        self._get_cache(flag="r")
+        self._open_snapshot()
 
     def get(self, config_file):
-        try:
-            tool_document = self._cache.get(config_file)
-        except sqlite3.OperationalError:
-            log.debug("Tool document cache unavailable")
-            return None
+        if self._snapshot is not None and not self.writeable_cache_file and config_file in self._snapshot:
+            tool_document = self._snapshot.get(config_file)
+        else:
+            try:
+                tool_document = self._cache.get(config_file)
+            except sqlite3.OperationalError:
+                log.debug("Tool document cache unavailable")
+                return None
         if not tool_document:
             return None
         if tool_document.get("tool_cache_version") != CURRENT_TOOL_CACHE_VERSION:
@@ -95,7 +215,12 @@ class ToolDocumentCache:
         if self.writeable_cache_file:
             self._cache.commit()
             os.rename(self.writeable_cache_file.name, self.cache_file)
+            self._write_snapshot()
             self.reopen_ro()
+        elif self._snapshot is None and self.cache_file_is_writeable:
+            # e.g. a cache created before snapshots were introduced
+            self._write_snapshot()
+            self._open_snapshot()
 
     def set(self, config_file, tool_source):
         try:
@@ -5,10 +5,15 @@ import os
 import shutil
 import sys
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from io import StringIO
 from typing import (
     Any,
     Dict,
+    Iterable,
     List,
     Optional,
     Tuple,
@@ -34,7 +39,9 @@ from galaxy.util.bunch import Bunch
 from galaxy.util.compression_utils import CompressedFile
 from galaxy.util.hash_util import (
     HASH_NAMES,
-    memory_bound_hexdigest,
+    HashFunctionNameEnum,
+    memory_bound_hexdigests,
+    StreamingDigest,
 )
 
 DESCRIPTION = """Data Import Script"""
@@ -46,7 +53,12 @@ def main(argv=None):
     args = _arg_parser().parse_args(argv)
     registry = Registry()
     registry.load_datatypes(root_dir=args.galaxy_root, config=args.datatypes_registry)
-    do_fetch(args.request, working_directory=args.working_directory or os.getcwd(), registry=registry)
+    do_fetch(
+        args.request,
+        working_directory=args.working_directory or os.getcwd(),
+        registry=registry,
+        workers=args.workers,
+    )
 
 
 def do_fetch(
@@ -54,6 +66,7 @@ def do_fetch(
     working_directory: str,
     registry: Registry,
     file_sources_dict: Optional[Dict] = None,
+    workers: int = 1,
 ):
     assert os.path.exists(request_path)
     with open(request_path) as f:
@@ -66,6 +79,7 @@ def do_fetch(
         working_directory,
         allow_failed_collections,
         file_sources_dict,
+        workers=workers,
     )
     galaxy_json = _request_to_galaxy_json(upload_config, request)
     galaxy_json_path = os.path.join(working_directory, "galaxy.json")
@@ -88,6 +102,7 @@ def _request_to_galaxy_json(upload_config: "UploadConfig", request):
 def _fetch_target(upload_config: "UploadConfig", target):
     destination = target.get("destination", None)
     assert destination, "No destination defined."
+    target_timings: Dict[str, float] = {}
 
     def expand_elements_from(target_or_item):
         elements_from = target_or_item.get("elements_from", None)
@@ -114,7 +129,8 @@ def _fetch_target(upload_config: "UploadConfig", target):
 
     expansion_error = None
     try:
-        _for_each_src(expand_elements_from, target)
+        with _timed(target_timings, "expansion"):
+            _for_each_src(expand_elements_from, target)
     except Exception as e:
         expansion_error = f"Error expanding elements/items for upload destination. {str(e)}"
 
@@ -128,7 +144,7 @@ def _fetch_target(upload_config: "UploadConfig", target):
     fetched_target["destination"] = destination
     destination_type = destination["type"]
     is_collection = destination_type == "hdca"
-    failed_elements = []
+    failed_element_ids = set()
 
     if "collection_type" in target:
         fetched_target["collection_type"] = target["collection_type"]
@@ -153,7 +169,7 @@ def _fetch_target(upload_config: "UploadConfig", target):
             target_metadata["error_message"] = src_item["error_message"]
         return target_metadata
 
-    def _resolve_item(item):
+    def _resolve_item(item, timings):
         # Might be a dataset or a composite upload.
         requested_ext = item.get("ext", None)
         registry = upload_config.registry
@@ -206,7 +222,8 @@ def _fetch_target(upload_config: "UploadConfig", target):
                     pass
                 key = keys[composite_item_idx]
                 writable_file = writable_files[key]
-                _, src_target = _has_src_to_path(upload_config, composite_item)
+                with _timed(timings, "fetch"):
+                    _, src_target = _has_src_to_path(upload_config, composite_item)
                 # do the writing
                 sniff.handle_composite_file(
                     datatype,
@@ -232,9 +249,9 @@ def _fetch_target(upload_config: "UploadConfig", target):
         else:
             if composite:
                 raise Exception(f"Non-composite datatype [{datatype}] attempting to be created with composite data.")
-            return _resolve_item_with_primary(item)
+            return _resolve_item_with_primary(item, timings)
 
-    def _resolve_item_with_primary(item):
+    def _resolve_item_with_primary(item, timings):
         error_message = None
         converted_path = None
 
@@ -242,7 +259,8 @@ def _fetch_target(upload_config: "UploadConfig", target):
         name: str
         path: Optional[str]
         if not deferred:
-            name, path = _has_src_to_path(upload_config, item, is_dataset=True)
+            with _timed(timings, "fetch"):
+                name, path = _has_src_to_path(upload_config, item, is_dataset=True)
         else:
             name, path = _has_src_to_name(item) or "Deferred Dataset", None
         sources = []
@@ -252,11 +270,19 @@ def _fetch_target(upload_config: "UploadConfig", target):
         if url:
             sources.append(source_dict)
         hashes = item.get("hashes", [])
-        for hash_dict in hashes:
-            hash_function = hash_dict.get("hash_function")
-            hash_value = hash_dict.get("hash_value")
+        # digests of the stored file requested by Galaxy, unless provided with the request
+        supplied_hash_functions = {hash_dict.get("hash_function") for hash_dict in hashes}
+        hash_functions = [h for h in upload_config.hash_functions if h.value not in supplied_hash_functions]
+        fetched_digests: Dict[str, str] = {}
+        if hashes:
             try:
-                _handle_hash_validation(upload_config, hash_function, hash_value, path)
+                with _timed(timings, "hash_validation"):
+                    fetched_digests = _handle_hash_validation(
+                        upload_config,
+                        {hash_dict.get("hash_function"): hash_dict.get("hash_value") for hash_dict in hashes},
+                        path,
+                        hash_functions,
+                    )
             except Exception as e:
                 error_message = str(e)
                 item["error_message"] = error_message
@@ -283,20 +309,36 @@ def _fetch_target(upload_config: "UploadConfig", target):
             registry = upload_config.registry
             check_content = upload_config.check_content
             assert path  # if deferred won't be in this branch.
-            stdout, ext, datatype, is_binary, converted_path, converted_newlines, converted_spaces = handle_upload(
-                registry=registry,
-                path=path,
-                requested_ext=requested_ext,
-                name=name,
-                tmp_prefix="data_fetch_upload_",
-                tmp_dir=upload_config.working_directory,
-                check_content=check_content,
-                link_data_only=link_data_only,
-                in_place=in_place,
-                auto_decompress=auto_decompress,
-                convert_to_posix_lines=to_posix_lines,
-                convert_spaces_to_tabs=space_to_tab,
-            )
+            digest = StreamingDigest(hash_functions) if hash_functions else None
+            with _timed(timings, "upload"):
+                (
+                    stdout,
+                    ext,
+                    datatype,
+                    is_binary,
+                    converted_path,
+                    converted_newlines,
+                    converted_spaces,
+                ) = handle_upload(
+                    registry=registry,
+                    path=path,
+                    requested_ext=requested_ext,
+                    name=name,
+                    tmp_prefix="data_fetch_upload_",
+                    tmp_dir=upload_config.working_directory,
+                    check_content=check_content,
+                    link_data_only=link_data_only,
+                    in_place=in_place,
+                    auto_decompress=auto_decompress,
+                    convert_to_posix_lines=to_posix_lines,
+                    convert_spaces_to_tabs=space_to_tab,
+                    digest=digest,
+                )
+            if hash_functions:
+                # Decompression and conversions hash the file they write, if no file has been
+                # written the content is still the one hashed during validation (if any).
+                if digest and digest.path is not None:
+                    fetched_digests = digest.hexdigests() if digest.covers(converted_path or path) else {}
             transform = []
             if converted_newlines:
                 transform.append({"action": "to_posix_lines"})
@@ -359,7 +401,19 @@ def _fetch_target(upload_config: "UploadConfig", target):
                     {"action": "datatype_groom", "datatype_ext": ext, "datatype_class": datatype.__class__.__name__}
                 )
                 assert path
-                datatype.groom_dataset_content(path)
+                with _timed(timings, "groom"):
+                    datatype.groom_dataset_content(path)
+                fetched_digests = {}
+
+            if hash_functions:
+                missing = [h for h in hash_functions if h.value not in fetched_digests]
+                if missing:
+                    assert path
+                    with _timed(timings, "hash"):
+                        fetched_digests.update(memory_bound_hexdigests(missing, path))
+                hashes = hashes + [
+                    {"hash_function": h.value, "hash_value": fetched_digests[h.value]} for h in hash_functions
+                ]
 
             if len(transform) > 0:
                 source_dict["transform"] = transform
@@ -389,16 +443,22 @@ def _fetch_target(upload_config: "UploadConfig", target):
         return _copy_and_validate_simple_attributes(item, rval)
 
     def _resolve_item_capture_error(item):
+        timings: Dict[str, float] = {}
         try:
-            return _resolve_item(item)
+            with _timed(timings, "total"):
+                rval = _resolve_item(item, timings)
         except Exception as e:
             rval = {"error_message": str(e)}
             rval = _copy_and_validate_simple_attributes(item, rval)
-            failed_elements.append(rval)
-            return rval
+            failed_element_ids.add(id(rval))
+        rval["timings"] = timings
+        return rval
 
     if expansion_error is None:
-        elements = elements_tree_map(_resolve_item_capture_error, items)
+        with _timed(target_timings, "resolution"):
+            elements = upload_config.elements_tree_map(_resolve_item_capture_error, items)
+        # Collect failures in element order, no matter in which order elements were resolved.
+        failed_elements = [element for element in _elements_tree_leaves(elements) if id(element) in failed_element_ids]
         if is_collection and not upload_config.allow_failed_collections and len(failed_elements) > 0:
             element_error = "Failed to fetch collection element(s):\n"
             for failed_element in failed_elements:
@@ -410,6 +470,8 @@ def _fetch_target(upload_config: "UploadConfig", target):
     else:
         fetched_target["elements"] = []
         fetched_target["error_message"] = expansion_error
+    target_timings["workers"] = upload_config.workers
+    fetched_target["timings"] = target_timings
     return fetched_target
 
 
@@ -433,16 +495,44 @@ def _decompress_target(upload_config: "UploadConfig", target):
     return result if fuzzy_root else temp_directory
 
 
-def elements_tree_map(f, items):
-    new_items = []
+def elements_tree_map(f, items, map_function=map):
+    """Apply ``f`` to the leaves of a nested elements tree, keeping its structure.
+
+    Leaves are passed to ``map_function`` (e.g. ``Executor.map``) in tree order and
+    its results are expected in the same order.
+    """
+    results = iter(map_function(f, list(_elements_tree_leaves(items))))
+
+    def rebuild(items):
+        new_items = []
+        for item in items:
+            if "elements" in item:
+                new_item = item.copy()
+                new_item["elements"] = rebuild(item["elements"])
+                new_items.append(new_item)
+            else:
+                new_items.append(next(results))
+        return new_items
+
+    return rebuild(items)
+
+
+def _elements_tree_leaves(items):
     for item in items:
         if "elements" in item:
-            new_item = item.copy()
-            new_item["elements"] = elements_tree_map(f, item["elements"])
-            new_items.append(new_item)
+            yield from _elements_tree_leaves(item["elements"])
         else:
-            new_items.append(f(item))
-    return new_items
+            yield item
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], stage: str):
+    """Add the wall clock time spent in the block to ``timings[stage]`` (in seconds)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
 
 
 def _directory_to_items(directory):
@@ -493,10 +583,8 @@ def _has_src_to_path(upload_config, item, is_dataset=False) -> Tuple[str, str]:
         if not is_dataset:
             # Actual target dataset will validate and put results in dict
             # that gets passed back to Galaxy.
-            for hash_function in HASH_NAMES:
-                hash_value = item.get(hash_function)
-                if hash_value:
-                    _handle_hash_validation(upload_config, hash_function, hash_value, path)
+            expected_hashes = {h.value: item[h.value] for h in HASH_NAMES if item.get(h.value)}
+            _handle_hash_validation(upload_config, expected_hashes, path)
         if name is None:
             name = url.split("/")[-1]
     elif src == "pasted":
@@ -511,13 +599,24 @@ def _has_src_to_path(upload_config, item, is_dataset=False) -> Tuple[str, str]:
     return name, path
 
 
-def _handle_hash_validation(upload_config, hash_function, hash_value, path):
-    if upload_config.validate_hashes:
-        calculated_hash_value = memory_bound_hexdigest(hash_func_name=hash_function, path=path)
+def _handle_hash_validation(
+    upload_config, expected_hashes: Dict[str, str], path, hash_functions: Iterable[HashFunctionNameEnum] = ()
+) -> Dict[str, str]:
+    """Validate ``expected_hashes`` (hash function name -> value) reading the file once.
+
+    The digests for ``hash_functions`` are computed in the same pass. All
+    computed digests are returned.
+    """
+    if not upload_config.validate_hashes or not expected_hashes:
+        return {}
+    calculated_hashes = memory_bound_hexdigests(set(expected_hashes) | set(hash_functions), path)
+    for hash_function, hash_value in expected_hashes.items():
+        calculated_hash_value = calculated_hashes[HashFunctionNameEnum(hash_function).value]
         if calculated_hash_value != hash_value:
             raise Exception(
                 f"Failed to validate upload with [{hash_function}] - expected [{hash_value}] got [{calculated_hash_value}]"
             )
+    return calculated_hashes
 
 
 def _arg_parser():
@@ -527,6 +626,9 @@ def _arg_parser():
     parser.add_argument("--request-version")
     parser.add_argument("--request")
     parser.add_argument("--working-directory")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of elements to resolve concurrently (e.g. $GALAXY_SLOTS)"
+    )
     return parser
 
 
@@ -555,6 +657,7 @@ class UploadConfig:
         working_directory,
         allow_failed_collections,
         file_sources_dict=None,
+        workers=1,
     ):
         self.registry = registry
         self.working_directory = working_directory
@@ -564,13 +667,16 @@ class UploadConfig:
         self.space_to_tab = request.get("space_to_tab", False)
         self.auto_decompress = request.get("auto_decompress", False)
         self.validate_hashes = request.get("validate_hashes", False)
+        self.hash_functions = [HashFunctionNameEnum(h) for h in request.get("hash_functions", [])]
         self.deferred = request.get("deferred", False)
         self.link_data_only = _link_data_only(request)
         self.file_sources_dict = file_sources_dict
         self._file_sources = None
+        self.workers = max(1, workers or 1)
 
         self.__workdir = os.path.abspath(working_directory)
         self.__upload_count = 0
+        self.__upload_count_lock = threading.Lock()
 
     @property
     def file_sources(self):
@@ -589,10 +695,24 @@ class UploadConfig:
         else:
             return getattr(self, key)
 
+    def elements_tree_map(self, f, items):
+        """Resolve the leaves of an elements tree with up to ``workers`` threads.
+
+        Resolving elements is dominated by I/O (downloads, decompression, copying
+        and sniffing files), so threads are sufficient to overlap it.
+        """
+        if self.workers == 1:
+            return elements_tree_map(f, items)
+        # Initialize shared state before it is accessed from multiple threads.
+        self.file_sources
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="data_fetch") as executor:
+            return elements_tree_map(f, items, map_function=executor.map)
+
     def __new_dataset_path(self):
-        path = os.path.join(self.working_directory, f"gxupload_{self.__upload_count}")
-        self.__upload_count += 1
-        return path
+        with self.__upload_count_lock:
+            upload_count = self.__upload_count
+            self.__upload_count += 1
+        return os.path.join(self.working_directory, f"gxupload_{upload_count}")
 
     def ensure_in_working_directory(self, path, purge_source, in_place):
         if in_directory(path, self.__workdir):
@@ -20,6 +20,7 @@ from galaxy.authnz.util import provider_name_to_backend
 from galaxy.job_execution.compute_environment import ComputeEnvironment
 from galaxy.job_execution.setup import ensure_configs_directory
 from galaxy.model.deferred import (
+    materialization_cache_for,
     materialize_collection_input,
     materializer_factory,
 )
@@ -239,6 +240,7 @@ class ToolEvaluator:
             False,  # unattached to a session.
             transient_directory=transient_directory,
             file_sources=self.app.file_sources,
+            materialization_cache=materialization_cache_for(self.app.config),
         )
         for key, value in deferred_objects.items():
             if isinstance(value, model.DatasetInstance):
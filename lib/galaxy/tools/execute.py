@@ -92,6 +92,10 @@ def execute(
         )
     execution_cache = ToolExecutionCache(trans)
 
+    # Outputs of all jobs of a batch are added to the history at once, this allocates
+    # their hids with a single update of the history's hid counter instead of one per job.
+    batch_history_additions = len(execution_tracker.param_combinations) > 1 and rerun_remap_job_id is None
+
     def execute_single_job(execution_slice, completed_job, skip=False):
         job_timer = tool.app.execution_timer_factory.get_timer(
             "internals.galaxy.tools.execute.job_single", SINGLE_EXECUTION_SUCCESS_MESSAGE
@@ -124,6 +128,7 @@ def execute(
             job_callback=job_callback,
             preferred_object_store_id=preferred_object_store_id,
             flush_job=False,
+            add_pending_items=not batch_history_additions,
             skip=skip,
         )
         if job:
@@ -154,6 +159,7 @@ def execute(
 
     execution_tracker.ensure_implicit_collections_populated(history, mapping_params.param_template)
     job_count = len(execution_tracker.param_combinations)
+    pending_histories: List[model.History] = []
 
     jobs_executed = 0
     has_remaining_jobs = False
@@ -168,6 +174,8 @@ def execute(
             skip = execution_slice.param_combination.pop("__when_value__", None) is False
             execute_single_job(execution_slice, completed_jobs[i], skip=skip)
             history = execution_slice.history or history
+            if not any(history is pending_history for pending_history in pending_histories):
+                pending_histories.append(history)
             jobs_executed += 1
 
     if job_datasets:
@@ -175,8 +183,8 @@ def execute(
             for dataset_instance in datasets:
                 dataset_instance.dataset.job = job
 
-    if execution_slice:
-        history.add_pending_items()
+    for pending_history in pending_histories:
+        pending_history.add_pending_items()
     # Make sure collections, implicit jobs etc are flushed even if there are no precreated output datasets
     with transaction(trans.sa_session):
         trans.sa_session.commit()
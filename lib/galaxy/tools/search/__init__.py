@@ -24,13 +24,18 @@ Filters - various filters are available for processing content as the index is
     stemming -> stem; opened -> open; philosophy -> philosoph.
 
 """
+import hashlib
 import logging
 import os
 import re
 import shutil
+import threading
+from collections import OrderedDict
 from typing import (
     Dict,
     List,
+    Optional,
+    Tuple,
     Union,
 )
 
@@ -54,6 +59,7 @@ from whoosh.scoring import (
     Frequency,
     MultiWeighting,
 )
+from whoosh.searching import Searcher
 from whoosh.writing import AsyncWriter
 
 from galaxy.config import GalaxyAppConfiguration
@@ -65,6 +71,22 @@ log = logging.getLogger(__name__)
 CanConvertToFloat = Union[str, int, float]
 CanConvertToInt = Union[str, int, float]
 
+SEARCH_FIELDS = [
+    "id",
+    "id_exact",
+    "name",
+    "name_exact",
+    "description",
+    "section",
+    "edam_operations",
+    "edam_topics",
+    "repository",
+    "owner",
+    "help",
+    "labels",
+    "stub",
+]
+
 
 def get_or_create_index(index_dir, schema):
     """Get or create a reference to the index."""
@@ -82,6 +104,60 @@ def get_or_create_index(index_dir, schema):
     return index.create_in(index_dir, schema=schema)
 
 
+def normalize_query(q: str) -> str:
+    """Collapse whitespace so equivalent queries share a result cache entry."""
+    return " ".join(q.split())
+
+
+def document_hash(doc: Dict[str, str]) -> str:
+    """Return a digest of the indexed content of a tool document."""
+    doc_hash = hashlib.md5()
+    for field in sorted(doc):
+        doc_hash.update(f"{field}\0{doc[field]}\0".encode())
+    return doc_hash.hexdigest()
+
+
+class SearchResultCache:
+    """Thread-safe LRU cache of search hits.
+
+    All entries are dropped whenever ``state`` changes, i.e. whenever the index
+    generation or the scoring configuration the hits were computed with change.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._state: Optional[Tuple] = None
+        self._hits: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, state: Tuple, key: str) -> Optional[List[str]]:
+        with self._lock:
+            if state != self._state:
+                self._state = state
+                self._hits.clear()
+                return None
+            hits = self._hits.get(key)
+            if hits is not None:
+                self._hits.move_to_end(key)
+            return hits
+
+    def put(self, state: Tuple, key: str, hits: List[str]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if state != self._state:
+                return
+            self._hits[key] = hits
+            self._hits.move_to_end(key)
+            while len(self._hits) > self.max_size:
+                self._hits.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._state = None
+            self._hits.clear()
+
+
 class ToolBoxSearch:
     """Support searching across all fixed panel views in a toolbox.
 
@@ -123,6 +199,11 @@ class ToolPanelViewSearch:
     """
     Support searching tools in a toolbox. This implementation uses
     the Whoosh search library.
+
+    The index is kept on disk and updated incrementally: every document stores
+    a hash of its content, so only tools whose document changed are rewritten,
+    also across restarts. Searchers are kept per thread and only refreshed when
+    the index changes, and hits are cached per normalized query.
     """
 
     def __init__(
@@ -136,6 +217,8 @@ class ToolPanelViewSearch:
         schema_conf = {
             # The stored ID field is not searchable
             "id": ID(stored=True, unique=True),
+            # Hash of the indexed document content, used to skip unchanged tools
+            "doc_hash": ID(stored=True),
             # This exact field is searchable by exact matches only
             "id_exact": NGRAMWORDS(
                 minsize=config.tool_ngram_minsize,
@@ -195,6 +278,13 @@ class ToolPanelViewSearch:
         self.index_dir = index_dir
         self.panel_view_id = panel_view_id
         self.index = self._index_setup()
+        self.parser = MultifieldParser(
+            SEARCH_FIELDS,
+            schema=self.schema,
+            group=OrGroup,
+        )
+        self._local = threading.local()
+        self._result_cache = SearchResultCache(config.tool_search_cache_size)
 
     def _index_setup(self) -> index.Index:
         """Get or create a reference to the index."""
@@ -211,27 +301,39 @@ class ToolPanelViewSearch:
 
         with self.index.reader() as reader:
             # Index ocasionally contains empty stored fields
-            self.indexed_tool_ids = {f["id"] for f in reader.all_stored_fields() if f}
+            indexed_doc_hashes = {f["id"]: f.get("doc_hash") for f in reader.all_stored_fields() if f}
+        self.indexed_tool_ids = set(indexed_doc_hashes)
 
         tool_ids_to_remove = self._get_tools_to_remove(tool_cache)
-        tools_to_index = self._get_tool_list(
-            toolbox,
-            tool_cache,
+        docs_to_index = []
+        for tool in self._get_tool_list(toolbox, tool_cache):
+            add_doc_kwds = self._create_doc(
+                tool=tool,
+                index_help=index_help,
+            )
+            if not add_doc_kwds:
+                continue
+            add_doc_kwds["doc_hash"] = document_hash(add_doc_kwds)
+            tool_id = add_doc_kwds["id"]
+            if tool_id not in tool_ids_to_remove and indexed_doc_hashes.get(tool_id) == add_doc_kwds["doc_hash"]:
+                # Unchanged since it was last indexed, possibly by a previous Galaxy process
+                continue
+            docs_to_index.append(add_doc_kwds)
+
+        if tool_ids_to_remove or docs_to_index:
+            with AsyncWriter(self.index) as writer:
+                for tool_id in tool_ids_to_remove:
+                    writer.delete_by_term("id", tool_id)
+                for add_doc_kwds in docs_to_index:
+                    # Add tool document to index (or overwrite if existing)
+                    writer.update_document(**add_doc_kwds)
+            self._result_cache.clear()
+
+        log.debug(
+            f"Toolbox index of panel {self.panel_view_id} finished {execution_timer},"
+            f" {len(docs_to_index)} tools (re)indexed, {len(tool_ids_to_remove)} removed"
         )
 
-        with AsyncWriter(self.index) as writer:
-            for tool_id in tool_ids_to_remove:
-                writer.delete_by_term("id", tool_id)
-            for tool in tools_to_index:
-                add_doc_kwds = self._create_doc(
-                    tool=tool,
-                    index_help=index_help,
-                )
-                # Add tool document to index (or overwrite if existing)
-                writer.update_document(**add_doc_kwds)
-
-        log.debug(f"Toolbox index of panel {self.panel_view_id}" f" finished {execution_timer}")
-
     def _get_tools_to_remove(self, tool_cache) -> list:
         """Return list of tool IDs to be removed from index."""
         tool_ids_to_remove = (self.indexed_tool_ids - set(tool_cache._tool_paths_by_id.keys())).union(
@@ -254,7 +356,7 @@ class ToolPanelViewSearch:
         """Return list of tools to add and remove from index."""
         tools_to_index = []
 
-        for tool_id in tool_cache._new_tool_ids - self.indexed_tool_ids:
+        for tool_id in tool_cache._new_tool_ids:
             tool = toolbox.get_tool(tool_id)
             if tool and tool.is_latest_version and toolbox.panel_has_tool(tool, self.panel_view_id):
                 if tool.hidden:
@@ -325,40 +427,39 @@ class ToolPanelViewSearch:
         q: str,
         config: GalaxyAppConfiguration,
     ) -> List[str]:
-        """Perform search on the in-memory index."""
-        # Change field boosts for searcher
-        self.searcher = self.index.searcher(
-            weighting=MultiWeighting(
-                Frequency(),
-                help=BM25F(K1=config.tool_help_bm25f_k1),
+        """Perform search on the on-disk index, serving repeated queries from cache."""
+        searcher = self._get_searcher(config)
+        state = (searcher.reader().generation(), config.tool_help_bm25f_k1)
+        q = normalize_query(q)
+        hits = self._result_cache.get(state, q)
+        if hits is None:
+            parsed_query = self.parser.parse(q)
+            results = searcher.search(
+                parsed_query,
+                limit=None,
+                sortedby="",
+                terms=True,
             )
-        )
-        fields = [
-            "id",
-            "id_exact",
-            "name",
-            "name_exact",
-            "description",
-            "section",
-            "edam_operations",
-            "edam_topics",
-            "repository",
-            "owner",
-            "help",
-            "labels",
-            "stub",
-        ]
-        self.parser = MultifieldParser(
-            fields,
-            schema=self.schema,
-            group=OrGroup,
-        )
-        parsed_query = self.parser.parse(q)
-        hits = self.searcher.search(
-            parsed_query,
-            limit=None,
-            sortedby="",
-            terms=True,
-        )
-
-        return [hit["id"] for hit in hits]
+            hits = [hit["id"] for hit in results]
+            self._result_cache.put(state, q, hits)
+        return list(hits)
+
+    def _get_searcher(self, config: GalaxyAppConfiguration) -> Searcher:
+        """Return this thread's searcher, refreshed if the index changed."""
+        k1 = config.tool_help_bm25f_k1
+        searcher = getattr(self._local, "searcher", None)
+        if searcher is not None and self._local.k1 == k1:
+            searcher = searcher.refresh()
+        else:
+            if searcher is not None:
+                searcher.close()
+            # Change field boosts for searcher
+            searcher = self.index.searcher(
+                weighting=MultiWeighting(
+                    Frequency(),
+                    help=BM25F(K1=k1),
+                )
+            )
+            self._local.k1 = k1
+        self._local.searcher = searcher
+        return searcher
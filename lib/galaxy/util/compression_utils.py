@@ -6,12 +6,21 @@ import os
 import tarfile
 import tempfile
 import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor,
+)
+from contextlib import contextmanager
 from typing import (
     Any,
     cast,
+    Deque,
     Generator,
     IO,
     Iterable,
+    Iterator,
     List,
     Optional,
     overload,
@@ -345,3 +354,92 @@ class CompressedFile:
             if not member_path.startswith(basename):
                 return False
         return True
+
+
+class ParallelGzipWriter:
+    """Write-only file object gzip compressing its input on ``threads`` threads.
+
+    The input is cut into blocks of ``block_size`` bytes that are compressed
+    independently (zlib releases the GIL) and written in order as separate gzip
+    members. A concatenation of gzip members is a valid gzip file, readable by
+    ``gzip``, ``tar`` and Python's ``gzip`` and ``tarfile`` modules. At most
+    ``2 * threads`` blocks are held in memory.
+    """
+
+    def __init__(self, fileobj: IO[bytes], threads: int, block_size: int = 4 * 1024 * 1024, compresslevel: int = 9):
+        self.fileobj = fileobj
+        self.threads = max(threads, 1)
+        self.block_size = block_size
+        self.compresslevel = compresslevel
+        self._buffer = bytearray()
+        self._pending: Deque["Future[bytes]"] = deque()
+        self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="parallel-gzip")
+        self._members = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[: self.block_size]))
+            del self._buffer[: self.block_size]
+        return len(data)
+
+    def _submit(self, block: bytes) -> None:
+        self._pending.append(self._executor.submit(_gzip_member, block, self.compresslevel))
+        self._members += 1
+        while len(self._pending) > 2 * self.threads:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def flush(self) -> None:
+        self.fileobj.flush()
+
+    def close(self) -> None:
+        """Compress the remaining input and write all members, the underlying file object is not closed."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self._buffer or not self._members:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self.fileobj.write(self._pending.popleft().result())
+            self.fileobj.flush()
+        finally:
+            self._executor.shutdown()
+
+    def __enter__(self) -> "ParallelGzipWriter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def _gzip_member(data: bytes, compresslevel: int) -> bytes:
+    # wbits=31 writes a gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+@contextmanager
+def open_tar_stream(out_file: StrPath, gzip: bool, compression_threads: int = 1) -> Iterator[tarfile.TarFile]:
+    """Open ``out_file`` as a sequentially written tar archive, gzip compressed on ``compression_threads`` if ``gzip``.
+
+    The archive is written to ``<out_file>.partial`` and only moved to ``out_file`` once it
+    has been completely written, the partial file is removed if an exception is raised.
+    """
+    partial_file = f"{out_file}.partial"
+    try:
+        with open(partial_file, "wb") as out:
+            if gzip and compression_threads > 1:
+                with ParallelGzipWriter(out, compression_threads) as gzip_out:
+                    with tarfile.open(fileobj=cast(IO[bytes], gzip_out), mode="w|", dereference=True) as archive:
+                        yield archive
+            else:
+                with tarfile.open(fileobj=out, mode="w:gz" if gzip else "w", dereference=True) as archive:
+                    yield archive
+    except BaseException:
+        if os.path.exists(partial_file):
+            os.unlink(partial_file)
+        raise
+    os.replace(partial_file, out_file)
@@ -12,6 +12,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Iterable,
     List,
     Optional,
     Tuple,
@@ -82,6 +83,51 @@ def memory_bound_hexdigest(
         file.close()
 
 
+class StreamingDigest:
+    """Compute several digests and the size of a stream of bytes in a single pass.
+
+    Code writing a file block by block (e.g. while decompressing or converting
+    an upload) calls :meth:`start` with the path of the file it produces and
+    :meth:`update` with every block written, so the digests of the file are
+    available without reading it again.
+    """
+
+    def __init__(self, hash_func_names: Iterable[Union[str, HashFunctionNameEnum]] = ()):
+        self.hash_func_names = [HashFunctionNameEnum(name) for name in hash_func_names]
+        self.start()
+
+    def start(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.size = 0
+        self._hashers = {name: HASH_NAME_MAP[name]() for name in self.hash_func_names}
+
+    def update(self, block: bytes) -> None:
+        self.size += len(block)
+        for hasher in self._hashers.values():
+            hasher.update(block)
+
+    def hexdigests(self) -> Dict[str, str]:
+        return {name.value: hasher.hexdigest() for name, hasher in self._hashers.items()}
+
+    def covers(self, path: str) -> bool:
+        """Return True if the digests describe the current content of ``path``."""
+        return (
+            self.path is not None
+            and os.path.abspath(self.path) == os.path.abspath(path)
+            and os.path.getsize(path) == self.size
+        )
+
+
+def memory_bound_hexdigests(hash_func_names: Iterable[Union[str, HashFunctionNameEnum]], path: str) -> Dict[str, str]:
+    """Return the digests of the file at ``path`` for all ``hash_func_names``, reading it once."""
+    digest = StreamingDigest(hash_func_names)
+    digest.start(path)
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigests()
+
+
 def md5_hash_file(path: Union[str, os.PathLike]) -> Optional[str]:
     """
     Return a md5 hashdigest for a file or None if path could not be read.
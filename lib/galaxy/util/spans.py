@@ -0,0 +1,170 @@
+"""
+Hierarchical timing spans.
+
+A :class:`SpanRecorder` collects nested, named timing spans for one unit of
+work (e.g. a job). Spans opened while another span of the same recorder is
+active in the current thread are named after their parents (``queue_job/prepare``),
+so the recorded names form a tree describing where wall time was spent.
+Repeated spans with the same name are aggregated (total duration and number
+of occurrences) until the recorder is persisted.
+
+Code that has no access to the recorder (e.g. the metadata strategies) can
+use the module level :func:`span` and :func:`spanned`, which nest spans into
+the recorder active in the current thread and do nothing otherwise.
+"""
+
+import datetime
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+log = logging.getLogger(__name__)
+
+SPAN_SEPARATOR = "/"
+
+
+class Span(NamedTuple):
+    name: str
+    start_time: datetime.datetime
+    duration: float
+    occurrences: int
+
+
+PersistSpans = Callable[[List[Span]], None]
+
+_active = threading.local()
+
+
+def _stack() -> List["_ActiveSpan"]:
+    try:
+        return _active.stack
+    except AttributeError:
+        _active.stack = []
+        return _active.stack
+
+
+class _ActiveSpan(NamedTuple):
+    recorder: "SpanRecorder"
+    name: str
+
+
+class SpanRecorder:
+    """Record nested timing spans and hand them to ``persist`` in batches.
+
+    Spans are kept in memory until the outermost span opened with
+    ``persist=True`` exits without an exception. If ``statsd_client`` is set,
+    the duration of every span is also sent as a statsd timing below
+    ``statsd_prefix``.
+    """
+
+    def __init__(
+        self,
+        persist: Optional[PersistSpans] = None,
+        enabled: bool = True,
+        statsd_client=None,
+        statsd_prefix: str = "galaxy.jobs.spans",
+    ):
+        self._persist = persist
+        self.enabled = enabled
+        self.statsd_client = statsd_client
+        self.statsd_prefix = statsd_prefix
+        self._pending: Dict[str, Span] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> List[Span]:
+        with self._lock:
+            return list(self._pending.values())
+
+    @contextmanager
+    def span(self, name: str, persist: bool = False) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        stack = _stack()
+        parent = next((active for active in reversed(stack) if active.recorder is self), None)
+        if parent is not None:
+            name = f"{parent.name}{SPAN_SEPARATOR}{name}"
+        stack.append(_ActiveSpan(self, name))
+        start_time = datetime.datetime.utcnow()
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            self._record(name, start_time, duration)
+            if persist and parent is None and not failed:
+                try:
+                    self.persist()
+                except Exception:
+                    # timing information must never fail the work it measures
+                    log.exception("Failed to persist timing spans")
+
+    def _record(self, name: str, start_time: datetime.datetime, duration: float) -> None:
+        with self._lock:
+            previous = self._pending.get(name)
+            if previous is None:
+                self._pending[name] = Span(name, start_time, duration, 1)
+            else:
+                self._pending[name] = Span(
+                    name, previous.start_time, previous.duration + duration, previous.occurrences + 1
+                )
+        if self.statsd_client:
+            metric = name.replace(SPAN_SEPARATOR, ".")
+            self.statsd_client.timing(f"{self.statsd_prefix}.{metric}", duration * 1000.0)
+
+    def persist(self) -> None:
+        """Hand all pending spans to the ``persist`` callback."""
+        with self._lock:
+            spans = list(self._pending.values())
+            self._pending.clear()
+        if spans and self._persist:
+            self._persist(spans)
+
+
+def span(name: str):
+    """Open a span nested into the innermost span active in this thread, if any."""
+    stack = _stack()
+    if not stack:
+        return _null_span()
+    return stack[-1].recorder.span(name)
+
+
+@contextmanager
+def _null_span() -> Iterator[None]:
+    yield
+
+
+def spanned(name: str):
+    """Decorator recording calls of the decorated function as span ``name``."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwds):
+            with span(name):
+                return func(*args, **kwds)
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = (
+    "Span",
+    "SpanRecorder",
+    "span",
+    "spanned",
+)
@@ -9,6 +9,8 @@ import os
 import random
 import re
 import sys
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 from json import loads
 from typing import (
@@ -19,6 +21,7 @@ from typing import (
     List,
     Optional,
     Tuple,
+    Type,
     Union,
 )
 
@@ -97,6 +100,42 @@ def _chrom_naming_matches(chrom1, chrom2):
     )
 
 
+class SummaryCache:
+    """
+    Thread-safe LRU cache for summaries of BBI files, shared by all data
+    providers. Keys start with the path of the summarized file.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Tiles of 512 bins at the default 1000 samples per request keep any coarse
+# query to at most 3 tiles.
+SUMMARY_TILE_BINS = 512
+summary_cache = SummaryCache(max_entries=4096)
+
+
 class FeatureLocationIndexDataProvider(BaseDataProvider):
     """
     Reads/writes/queries feature location index (FLI) datasets.
@@ -1159,14 +1198,25 @@ class SamDataProvider(BamDataProvider):
 class BBIDataProvider(GenomeDataProvider):
     """
     BBI data provider for the Galaxy track browser.
+
+    Zoomed out regions are summarized in bins whose size is a power of two,
+    aligned to a grid so that the bins of neighboring and repeated requests
+    coincide. Bins are computed a tile of ``SUMMARY_TILE_BINS`` at a time from
+    the zoom levels stored in the BBI file, and tiles and region stats are kept
+    in ``summary_cache``, keyed by file, chrom and bin range.
     """
 
     dataset_type = "bigwig"
+    bbi_file_class: Type[Union[BigBedFile, BigWigFile]]
 
     @abc.abstractmethod
-    def _get_dataset(self) -> Tuple[IO[bytes], Union[BigBedFile, BigWigFile]]:
+    def _get_file_name(self) -> str:
         ...
 
+    def _get_dataset(self) -> Tuple[IO[bytes], Union[BigBedFile, BigWigFile]]:
+        f = open(self._get_file_name(), "rb")
+        return f, self.bbi_file_class(file=f)
+
     def valid_chroms(self):
         # No way to return this info as of now
         return None
@@ -1190,66 +1240,38 @@ class BBIDataProvider(GenomeDataProvider):
                 _convert_between_ucsc_and_ensemble_naming(chrom), start, end, num_points
             )
 
-        # Bigwig can be a standalone bigwig file, in which case we use
-        # original_dataset, or coming from wig->bigwig conversion in
-        # which we use converted_dataset
-        f, bbi = self._get_dataset()
-
         # If stats requested, compute overall summary data for the range
         # start:endbut no reduced data. This is currently used by client
         # to determine the default range.
         if "stats" in kwargs:
-            summary = _summarize_bbi(bbi, chrom, start, end, 1)
-            f.close()
-
-            min_val = 0
-            max_val = 0
-            mean = 0
-            sd = 0.0
-            if summary is not None:
-                # Does the summary contain any defined values?
-                valid_count = summary.valid_count[0]
-                if summary.valid_count > 0:
-                    # Compute $\mu \pm 2\sigma$ to provide an estimate for upper and lower
-                    # bounds that contain ~95% of the data.
-                    mean = summary.sum_data[0] / valid_count
-                    var = max(summary.sum_squares[0] - mean, 0)  # Prevent variance underflow.
-                    if valid_count > 1:
-                        var /= valid_count - 1
-                    sd = math.sqrt(var)
-                    min_val = summary.min_val[0]
-                    max_val = summary.max_val[0]
-
-            return dict(data=dict(min=min_val, max=max_val, mean=mean, sd=sd))
-
-        def summarize_region(bbi, chrom, start, end, num_points):
-            """
-            Returns results from summarizing a region using num_points.
-            NOTE: num_points cannot be greater than end - start or BBI
-            will return None for all positions.
-            """
-            result = []
-
-            # Get summary; this samples at intervals of length
-            # (end - start)/num_points -- i.e. drops any fractional component
-            # of interval length.
-            summary = _summarize_bbi(bbi, chrom, start, end, num_points)
-            if summary:
-                # mean = summary.sum_data / summary.valid_count
-
-                # Standard deviation by bin, not yet used
-                # var = summary.sum_squares - mean
-                # var /= minimum( valid_count - 1, 1 )
-                # sd = sqrt( var )
-
-                pos = start
-                step_size = (end - start) / num_points
-
-                for i in range(num_points):
-                    result.append((pos, float_nan(summary.sum_data[i] / summary.valid_count[i])))
-                    pos += step_size
-
-            return result
+            stats_key = (self._get_file_name(), "stats", chrom, start, end)
+            stats = summary_cache.get(stats_key)
+            if stats is None:
+                f, bbi = self._get_dataset()
+                summary = _summarize_bbi(bbi, chrom, start, end, 1)
+                f.close()
+
+                min_val = 0
+                max_val = 0
+                mean = 0
+                sd = 0.0
+                if summary is not None:
+                    # Does the summary contain any defined values?
+                    valid_count = summary.valid_count[0]
+                    if summary.valid_count > 0:
+                        # Compute $\mu \pm 2\sigma$ to provide an estimate for upper and lower
+                        # bounds that contain ~95% of the data.
+                        mean = summary.sum_data[0] / valid_count
+                        var = max(summary.sum_squares[0] - mean, 0)  # Prevent variance underflow.
+                        if valid_count > 1:
+                            var /= valid_count - 1
+                        sd = math.sqrt(var)
+                        min_val = summary.min_val[0]
+                        max_val = summary.max_val[0]
+                stats = dict(min=min_val, max=max_val, mean=mean, sd=sd)
+                summary_cache.put(stats_key, stats)
+
+            return dict(data=dict(stats))
 
         # Approach is different depending on region size.
         num_samples = int(num_samples)
@@ -1257,43 +1279,63 @@ class BBIDataProvider(GenomeDataProvider):
             # Get values for individual bases in region, including start and end.
             # To do this, need to increase end to next base and request number of points.
             num_points = end - start + 1
-            end += 1
+            f, bbi = self._get_dataset()
+            summary = _summarize_bbi(bbi, chrom, start, end + 1, num_points)
+            f.close()
+            result = []
+            if summary:
+                for i in range(num_points):
+                    result.append((start + i, float_nan(summary.sum_data[i] / summary.valid_count[i])))
         else:
-            #
-            # The goal is to sample the region between start and end uniformly
-            # using ~N (num_samples) data points. The challenge is that the size of
-            # sampled intervals rarely is full bases, so sampling using N points
-            # will leave the end of the region unsampled due to remainders for
-            # each interval. To recitify this, a new N is calculated based on the
-            # step size that covers as much of the region as possible.
-            #
-            # However, this still leaves some of the region unsampled. This
-            # could be addressed by repeatedly sampling remainder using a
-            # smaller and smaller step_size, but that would require iteratively
-            # going to BBI, which could be time consuming.
-            #
-
-            # Start with N samples.
-            num_points = num_samples
-            step_size = (end - start) // num_points
-            # Add additional points to sample in the remainder not covered by
-            # the initial N samples.
-            remainder_start = start + step_size * num_points
-            additional_points = (end - remainder_start) // step_size
-            num_points += additional_points
-
-        result = summarize_region(bbi, chrom, start, end, num_points)
+            # Sample the region with at most num_samples bins of equal,
+            # power of two size; the region is extended to whole bins.
+            bin_size = 1 << max(math.ceil(math.log2((end - start) / num_samples)), 0)
+            result = self._summarize_bins(_summarize_bbi, chrom, start, end, bin_size)
 
-        # Cleanup and return.
-        f.close()
         return {"data": result, "dataset_type": self.dataset_type}
 
+    def _summarize_bins(self, summarize_bbi, chrom, start, end, bin_size):
+        """
+        Returns (bin start, mean) for all bins of ``bin_size`` overlapping
+        start:end, using cached tiles where possible.
+        """
+        file_name = self._get_file_name()
+        tile_size = bin_size * SUMMARY_TILE_BINS
+        first_bin = start // bin_size
+        last_bin = (end - 1) // bin_size
+        bbi_file = None
+        result = []
+        try:
+            for tile in range(first_bin // SUMMARY_TILE_BINS, last_bin // SUMMARY_TILE_BINS + 1):
+                tile_key = (file_name, "tile", chrom, bin_size, tile)
+                means = summary_cache.get(tile_key)
+                if means is None:
+                    if bbi_file is None:
+                        bbi_file = self._get_dataset()
+                    tile_start = tile * tile_size
+                    summary = summarize_bbi(bbi_file[1], chrom, tile_start, tile_start + tile_size, SUMMARY_TILE_BINS)
+                    if summary:
+                        means = [float_nan(s / c) if c else None for s, c in zip(summary.sum_data, summary.valid_count)]
+                    else:
+                        means = []
+                    summary_cache.put(tile_key, means)
+                if not means:
+                    continue
+                tile_first_bin = tile * SUMMARY_TILE_BINS
+                for i in range(max(first_bin - tile_first_bin, 0), min(last_bin - tile_first_bin + 1, len(means))):
+                    result.append(((tile_first_bin + i) * bin_size, means[i]))
+        finally:
+            if bbi_file is not None:
+                bbi_file[0].close()
+        return result
+
 
 class BigBedDataProvider(BBIDataProvider):
-    def _get_dataset(self):
+    bbi_file_class = BigBedFile
+
+    def _get_file_name(self):
         # Nothing converts to bigBed so we don't consider converted dataset
-        f = open(self.original_dataset.file_name, "rb")
-        return f, BigBedFile(file=f)
+        return self.original_dataset.file_name
 
 
 class BigWigDataProvider(BBIDataProvider):
@@ -1302,12 +1344,12 @@ class BigWigDataProvider(BBIDataProvider):
     coordinate system, i.e. wiggle format.
     """
 
-    def _get_dataset(self):
+    bbi_file_class = BigWigFile
+
+    def _get_file_name(self):
         if self.converted_dataset is not None:
-            f = open(self.converted_dataset.file_name, "rb")
-        else:
-            f = open(self.original_dataset.file_name, "rb")
-        return f, BigWigFile(file=f)
+            return self.converted_dataset.file_name
+        return self.original_dataset.file_name
 
 
 class IntervalIndexDataProvider(GenomeDataProvider, FilterableMixin):
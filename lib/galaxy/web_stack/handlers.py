@@ -87,6 +87,9 @@ class ConfiguresHandlers:
             ready_window_size_str = config_element.attrib.get("ready_window_size", None)
             if ready_window_size_str:
                 handling_config_dict["ready_window_size"] = int(ready_window_size_str)
+            ready_sweep_interval_str = config_element.attrib.get("ready_sweep_interval", None)
+            if ready_sweep_interval_str:
+                handling_config_dict["ready_sweep_interval"] = float(ready_sweep_interval_str)
 
         return handling_config_dict
 
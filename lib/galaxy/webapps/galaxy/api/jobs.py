@@ -38,6 +38,8 @@ from galaxy.managers.jobs import (
     summarize_destination_params,
     summarize_job_metrics,
     summarize_job_parameters,
+    summarize_job_spans,
+    summarize_span_statistics,
 )
 from galaxy.schema.fields import DecodedDatabaseIdField
 from galaxy.schema.schema import JobIndexSortByEnum
@@ -369,6 +371,44 @@ class JobController(BaseGalaxyAPIController, UsesVisualizationMixin):
         job = self.__get_job(trans, **kwd)
         return summarize_destination_params(trans, job)
 
+    @require_admin
+    @expose_api
+    def spans(self, trans: ProvidesUserContext, **kwd):
+        """
+        * GET /api/jobs/{job_id}/spans
+            Return the timing spans recorded for the specified job (requires
+            ``track_job_spans`` to be enabled).
+
+        :type   job_id: string
+        :param  job_id: Encoded job id
+
+        :rtype:     dict
+        :returns:   dictionary containing the job's spans and the delay before
+                    the job was picked up by a handler
+        """
+        job = self.__get_job(trans, **kwd)
+        return summarize_job_spans(trans, job)
+
+    @require_admin
+    @expose_api
+    def span_summary(self, trans: ProvidesUserContext, tool_id=None, limit=1000, **kwd):
+        """
+        * GET /api/jobs/spans/summary
+            Aggregate the timing spans of the most recent jobs by span name.
+
+        :type   tool_id: string
+        :param  tool_id: only summarize jobs of this tool
+
+        :type   limit: int
+        :param  limit: maximum number of jobs to summarize (default 1000)
+
+        :rtype:     list
+        :returns:   list of dictionaries with the number of jobs and
+                    occurrences, the total, mean (per job) and maximum
+                    duration of every span
+        """
+        return summarize_span_statistics(trans.sa_session, tool_id=tool_id, limit=int(limit))
+
     @expose_api_anonymous
     def parameters_display(self, trans: ProvidesUserContext, **kwd):
         """
@@ -947,6 +947,20 @@ def populate_api_routes(webapp, app):
         action="common_problems",
         conditions=dict(method=["GET"]),
     )
+    webapp.mapper.connect(
+        "job_span_summary",
+        "/api/jobs/spans/summary",
+        controller="jobs",
+        action="span_summary",
+        conditions=dict(method=["GET"]),
+    )
+    webapp.mapper.connect(
+        "job_spans",
+        "/api/jobs/{job_id}/spans",
+        controller="jobs",
+        action="spans",
+        conditions=dict(method=["GET"]),
+    )
     # Job metrics and parameters by job id or dataset id (for slightly different accessibility checking)
     webapp.mapper.connect(
         "destination_params",
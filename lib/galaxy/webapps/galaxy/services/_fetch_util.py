@@ -13,7 +13,11 @@ from galaxy.model.store.discover import (
 )
 from galaxy.schema.fields import DecodedDatabaseIdField
 from galaxy.tools.actions.upload_common import validate_datatype_extension
-from galaxy.util import relpath
+from galaxy.util import (
+    listify,
+    relpath,
+)
+from galaxy.util.hash_util import HashFunctionNameEnum
 
 log = logging.getLogger(__name__)
 
@@ -58,6 +62,16 @@ def validate_and_normalize_targets(trans, payload):
 
     payload["check_content"] = trans.app.config.check_upload_content
 
+    # digests computed while importing the data and stored with the datasets
+    hash_functions = listify(trans.app.config.upload_hash_functions) + listify(payload.get("hash_functions"))
+    for hash_function in hash_functions:
+        try:
+            HashFunctionNameEnum(hash_function)
+        except ValueError:
+            raise RequestParameterInvalidException(f"Invalid hash function [{hash_function}]")
+    if hash_functions:
+        payload["hash_functions"] = sorted(set(hash_functions))
+
     def check_src(item):
         validate_datatype_extension(datatypes_registry=trans.app.datatypes_registry, ext=item.get("ext"))
 
@@ -214,7 +214,7 @@ class DatasetCollectionsService(ServiceBase, UsesLibraryMixinItems):
             raise exceptions.ObjectNotFound("No DatasetCollectionElement found")
         if not trans.user_is_admin:
             collection = dce.child_collection or dce.collection
-            if not trans.app.security_agent.can_access_collection(trans.get_current_user_roles(), collection):
+            if not trans.get_dataset_access_oracle().can_access_collection(collection):
                 raise exceptions.ItemAccessibilityException("Collection not accessible by user.")
         serialized_dce = dictify_element_reference(dce, recursive=False, security=trans.security)
         return trans.security.encode_all_ids(serialized_dce, recursive=True)
@@ -943,7 +943,8 @@ class HistoriesContentsService(ServiceBase, ServesExportStores, ConsumesModelSto
             object_store_ids = self.object_store.object_store_ids(private=not shareable)
             if object_store_ids:
                 legacy_params_dict["object_store_ids"] = object_store_ids
-        contents = history.contents_iter(**legacy_params_dict)
+        contents = list(history.contents_iter(**legacy_params_dict))
+        self._prefetch_dataset_access(trans, contents)
         items = [
             self._serialize_legacy_content_item(trans, content, legacy_params_dict.get("dataset_details"))
             for content in contents
@@ -985,6 +986,7 @@ class HistoriesContentsService(ServiceBase, ServesExportStores, ConsumesModelSto
             order_by=order_by,
             serialization_params=serialization_params,
         )
+        self._prefetch_dataset_access(trans, contents)
         items = [
             self._serialize_content_item(
                 trans,
@@ -1015,6 +1017,14 @@ class HistoriesContentsService(ServiceBase, ServesExportStores, ConsumesModelSto
             serialization_params.keys.append("elements_datatypes")
         return serialization_params
 
+    def _prefetch_dataset_access(self, trans, contents) -> None:
+        """Load the access permissions of all datasets in ``contents`` at once for serialization."""
+        if trans.user_is_admin:
+            return
+        trans.get_dataset_access_oracle().prefetch(
+            content.dataset for content in contents if isinstance(content, HistoryDatasetAssociation)
+        )
+
     def _serialize_legacy_content_item(
         self,
         trans,
@@ -0,0 +1,184 @@
+"""
+Compact state graph of workflow invocations used during scheduling.
+
+Every scheduling iteration of a workflow invocation recovers the outputs of
+all steps scheduled in previous iterations. Walking the ORM relationships of
+each invocation step for this costs a few queries per step (output
+associations, the outputs themselves and the step's output value), which adds
+up for workflows with hundreds of steps and nested subworkflows.
+
+The outputs of a scheduled invocation step never change, so an
+:class:`InvocationStateGraph` records them once as ``(src, id)`` references
+and is kept per invocation in the handler process. Each scheduling iteration
+then only queries the association tables for steps scheduled since the last
+iteration and loads all referenced datasets and collections in bulk.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import set_committed_value
+
+from galaxy import model
+
+log = logging.getLogger(__name__)
+
+# Maximum number of invocations whose state graph is kept per handler process.
+MAX_CACHED_INVOCATION_STATE_GRAPHS = 1000
+# Maximum number of ids per IN clause of a bulk query.
+QUERY_CHUNK_SIZE = 1000
+
+OutputReference = Tuple[str, int]
+StepOutputs = Dict[str, Any]
+
+MODEL_CLASSES: Dict[str, Type[Union[model.HistoryDatasetAssociation, model.HistoryDatasetCollectionAssociation]]] = {
+    "hda": model.HistoryDatasetAssociation,
+    "hdca": model.HistoryDatasetCollectionAssociation,
+}
+
+
+def _chunks(ids: List[int]) -> Iterable[List[int]]:
+    for i in range(0, len(ids), QUERY_CHUNK_SIZE):
+        yield ids[i : i + QUERY_CHUNK_SIZE]
+
+
+class InvocationStateGraph:
+    """Outputs of the scheduled steps of a single workflow invocation.
+
+    Maps the id of every scheduled :class:`~galaxy.model.WorkflowInvocationStep`
+    to its dataset and collection outputs. Steps with a recorded output value
+    (parameter outputs) are tracked by workflow step id, their value is still
+    read from the invocation step.
+    """
+
+    def __init__(self, invocation_id: Optional[int] = None):
+        self.invocation_id = invocation_id
+        self.step_outputs: Dict[int, Dict[str, OutputReference]] = {}
+        self.steps_with_output_value: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.step_outputs)
+
+    def _record_steps(self, sa_session, invocation_step_ids: List[int], invocation_id: int) -> None:
+        step_outputs: Dict[int, Dict[str, OutputReference]] = {step_id: {} for step_id in invocation_step_ids}
+        dataset_association = model.WorkflowInvocationStepOutputDatasetAssociation
+        collection_association = model.WorkflowInvocationStepOutputDatasetCollectionAssociation
+        for chunk in _chunks(invocation_step_ids):
+            stmt = select(
+                dataset_association.workflow_invocation_step_id,
+                dataset_association.output_name,
+                dataset_association.dataset_id,
+            ).where(dataset_association.workflow_invocation_step_id.in_(chunk))
+            for step_id, output_name, dataset_id in sa_session.execute(stmt):
+                step_outputs[step_id][output_name] = ("hda", dataset_id)
+            stmt = select(
+                collection_association.workflow_invocation_step_id,
+                collection_association.output_name,
+                collection_association.dataset_collection_id,
+            ).where(collection_association.workflow_invocation_step_id.in_(chunk))
+            for step_id, output_name, dataset_collection_id in sa_session.execute(stmt):
+                # collections take precedence, like in WorkflowModule.recover_mapping
+                step_outputs[step_id][output_name] = ("hdca", dataset_collection_id)
+        output_value = model.WorkflowInvocationOutputValue
+        stmt = select(output_value.workflow_step_id).where(output_value.workflow_invocation_id == invocation_id)
+        steps_with_output_value = set(sa_session.scalars(stmt))
+        with self._lock:
+            self.step_outputs.update(step_outputs)
+            self.steps_with_output_value = steps_with_output_value
+
+    def resolve(
+        self,
+        sa_session,
+        workflow_invocation: "model.WorkflowInvocation",
+        scheduled_steps: List["model.WorkflowInvocationStep"],
+    ) -> Dict[int, StepOutputs]:
+        """Return the outputs of ``scheduled_steps`` by invocation step id.
+
+        Steps scheduled since the last call are added to the graph first. All
+        referenced datasets and collections are loaded with one query per type.
+        Steps whose outputs cannot be resolved are left out and should be
+        recovered from their ORM relationships.
+        """
+        new_step_ids = [step.id for step in scheduled_steps if step.id is not None and step.id not in self.step_outputs]
+        if new_step_ids:
+            self._record_steps(sa_session, new_step_ids, workflow_invocation.id)
+
+        ids_by_src: Dict[str, Set[int]] = {src: set() for src in MODEL_CLASSES}
+        known_steps = [step for step in scheduled_steps if step.id in self.step_outputs]
+        for step in known_steps:
+            for src, object_id in self.step_outputs[step.id].values():
+                ids_by_src[src].add(object_id)
+        objects: Dict[OutputReference, Any] = {}
+        for src, ids in ids_by_src.items():
+            model_class = MODEL_CLASSES[src]
+            for chunk in _chunks(list(ids)):
+                for instance in sa_session.scalars(select(model_class).where(model_class.table.c.id.in_(chunk))):
+                    objects[(src, instance.id)] = instance
+
+        recovered: Dict[int, StepOutputs] = {}
+        for step in known_steps:
+            try:
+                outputs = {name: objects[reference] for name, reference in self.step_outputs[step.id].items()}
+            except KeyError:
+                continue
+            if step.workflow_step_id not in self.steps_with_output_value:
+                # Avoids lazy loading the (absent) output value in WorkflowProgress.set_step_outputs
+                set_committed_value(step, "output_value", None)
+            recovered[step.id] = outputs
+        return recovered
+
+
+class InvocationStateGraphCache:
+    """Bounded, thread-safe cache of state graphs by invocation id."""
+
+    def __init__(self, max_size: int = MAX_CACHED_INVOCATION_STATE_GRAPHS):
+        self.max_size = max_size
+        self._graphs: "OrderedDict[int, InvocationStateGraph]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, invocation_id: Optional[int]) -> InvocationStateGraph:
+        if invocation_id is None:
+            # not flushed yet, there is nothing to recover
+            return InvocationStateGraph()
+        with self._lock:
+            graph = self._graphs.get(invocation_id)
+            if graph is None:
+                graph = self._graphs[invocation_id] = InvocationStateGraph(invocation_id)
+                while len(self._graphs) > self.max_size:
+                    self._graphs.popitem(last=False)
+            else:
+                self._graphs.move_to_end(invocation_id)
+            return graph
+
+    def discard(self, invocation_id: Optional[int]) -> None:
+        if invocation_id is None:
+            return
+        with self._lock:
+            self._graphs.pop(invocation_id, None)
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+
+invocation_state_graphs = InvocationStateGraphCache()
+
+
+__all__ = (
+    "InvocationStateGraph",
+    "InvocationStateGraphCache",
+    "invocation_state_graphs",
+)
@@ -492,13 +492,17 @@ class WorkflowModule:
         """Re-populate progress object with information about connections
         from previously executed steps recorded via invocation_steps.
         """
-        outputs = {}
+        outputs = progress.recovered_step_outputs(invocation_step)
+        if outputs is None:
+            outputs = {}
 
-        for output_dataset_assoc in invocation_step.output_datasets:
-            outputs[output_dataset_assoc.output_name] = output_dataset_assoc.dataset
+            for output_dataset_assoc in invocation_step.output_datasets:
+                outputs[output_dataset_assoc.output_name] = output_dataset_assoc.dataset
 
-        for output_dataset_collection_assoc in invocation_step.output_dataset_collections:
-            outputs[output_dataset_collection_assoc.output_name] = output_dataset_collection_assoc.dataset_collection
+            for output_dataset_collection_assoc in invocation_step.output_dataset_collections:
+                outputs[
+                    output_dataset_collection_assoc.output_name
+                ] = output_dataset_collection_assoc.dataset_collection
 
         progress.set_step_outputs(invocation_step, outputs, already_persisted=True)
 
@@ -1,4 +1,5 @@
 import logging
+import time
 import uuid
 from typing import (
     Any,
@@ -10,6 +11,7 @@ from typing import (
     Union,
 )
 
+from sqlalchemy.orm import object_session
 from typing_extensions import Protocol
 
 from galaxy import model
@@ -33,6 +35,11 @@ from galaxy.schema.invocation import (
 )
 from galaxy.util import ExecutionTimer
 from galaxy.workflow import modules
+from galaxy.workflow.invocation_state import (
+    invocation_state_graphs,
+    InvocationStateGraph,
+    StepOutputs,
+)
 from galaxy.workflow.run_request import (
     workflow_request_to_run_config,
     workflow_run_config_to_request,
@@ -110,6 +117,9 @@ def __invoke(
         workflow_invocation.fail()
         workflow_invocation.add_message(failure)
 
+    if workflow_invocation.state not in model.WorkflowInvocation.non_terminal_states:
+        invocation_state_graphs.discard(workflow_invocation.id)
+
     # Be sure to update state of workflow_invocation.
     trans.sa_session.add(workflow_invocation)
     with transaction(trans.sa_session):
@@ -178,6 +188,9 @@ class WorkflowInvoker:
                 jobs_per_scheduling_iteration=getattr(
                     trans.app.config, "maximum_workflow_jobs_per_scheduling_iteration", -1
                 ),
+                seconds_per_scheduling_iteration=getattr(
+                    trans.app.config, "maximum_workflow_seconds_per_scheduling_iteration", -1
+                ),
                 copy_inputs_to_history=workflow_run_config.copy_inputs_to_history,
                 use_cached_job=workflow_run_config.use_cached_job,
                 replacement_dict=workflow_run_config.replacement_dict,
@@ -255,6 +268,7 @@ class WorkflowInvoker:
             state = model.WorkflowInvocation.states.READY
         else:
             state = model.WorkflowInvocation.states.SCHEDULED
+            invocation_state_graphs.discard(workflow_invocation.id)
         workflow_invocation.state = state
 
         # All jobs ran successfully, so we can save now
@@ -337,6 +351,7 @@ class WorkflowProgress:
         module_injector: ModuleInjector,
         param_map: Dict[int, Dict[str, Any]],
         jobs_per_scheduling_iteration: int = -1,
+        seconds_per_scheduling_iteration: float = -1,
         copy_inputs_to_history: bool = False,
         use_cached_job: bool = False,
         replacement_dict: Optional[Dict[str, str]] = None,
@@ -350,6 +365,9 @@ class WorkflowProgress:
         self.param_map = param_map
         self.jobs_per_scheduling_iteration = jobs_per_scheduling_iteration
         self.jobs_scheduled_this_iteration = 0
+        self.seconds_per_scheduling_iteration = seconds_per_scheduling_iteration
+        self.scheduling_iteration_start = time.time()
+        self.scheduling_time_slice_logged = False
         self.copy_inputs_to_history = copy_inputs_to_history
         self.use_cached_job = use_cached_job
         self.replacement_dict = replacement_dict or {}
@@ -357,9 +375,30 @@ class WorkflowProgress:
         self.subworkflow_collection_info = subworkflow_collection_info
         self.subworkflow_structure = subworkflow_collection_info.structure if subworkflow_collection_info else None
         self.when_values = when_values
+        self.state_graph: InvocationStateGraph = invocation_state_graphs.get(workflow_invocation.id)
+        self.recovered_outputs: Dict[int, StepOutputs] = {}
+
+    @property
+    def scheduling_time_slice_exceeded(self) -> bool:
+        # Only end the iteration once some jobs were scheduled, so the invocation always makes progress.
+        return (
+            self.seconds_per_scheduling_iteration > 0
+            and self.jobs_scheduled_this_iteration > 0
+            and time.time() - self.scheduling_iteration_start >= self.seconds_per_scheduling_iteration
+        )
 
     @property
     def maximum_jobs_to_schedule_or_none(self) -> Optional[int]:
+        if self.scheduling_time_slice_exceeded:
+            if not self.scheduling_time_slice_logged:
+                log.debug(
+                    "Workflow invocation [%s] used its %s second scheduling time slice after scheduling %s jobs",
+                    self.workflow_invocation.id,
+                    self.seconds_per_scheduling_iteration,
+                    self.jobs_scheduled_this_iteration,
+                )
+                self.scheduling_time_slice_logged = True
+            return 0
         if self.jobs_per_scheduling_iteration > 0:
             return self.jobs_per_scheduling_iteration - self.jobs_scheduled_this_iteration
         else:
@@ -379,6 +418,14 @@ class WorkflowProgress:
         # steps we are no where near ready to schedule?
         remaining_steps = []
         step_invocations_by_id = self.workflow_invocation.step_invocations_by_step_id()
+        scheduled_steps = [
+            invocation_step
+            for invocation_step in step_invocations_by_id.values()
+            if invocation_step.state == "scheduled"
+        ]
+        sa_session = object_session(self.workflow_invocation)
+        if scheduled_steps and sa_session is not None:
+            self.recovered_outputs = self.state_graph.resolve(sa_session, self.workflow_invocation, scheduled_steps)
         self.module_injector.inject_all(self.workflow_invocation.workflow, param_map=self.param_map)
         for step in steps:
             step_id = step.id
@@ -511,6 +558,14 @@ class WorkflowProgress:
 
         return replacement
 
+    def recovered_step_outputs(self, invocation_step: WorkflowInvocationStep) -> Optional[StepOutputs]:
+        """Return the outputs of a scheduled step resolved through the invocation state graph.
+
+        ``None`` is returned if the outputs need to be recovered from the step's relationships.
+        """
+        outputs = self.recovered_outputs.get(invocation_step.id)
+        return dict(outputs) if outputs is not None else None
+
     def get_replacement_workflow_output(self, workflow_output: "WorkflowOutput") -> Any:
         step = workflow_output.workflow_step
         output_name = workflow_output.output_name
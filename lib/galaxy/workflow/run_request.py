@@ -372,24 +372,18 @@ def build_workflow_run_configs(
             try:
                 if input_source == "ldda":
                     ldda = trans.sa_session.get(LibraryDatasetDatasetAssociation, trans.security.decode_id(input_id))
-                    assert trans.user_is_admin or trans.app.security_agent.can_access_dataset(
-                        trans.get_current_user_roles(), ldda.dataset
-                    )
+                    assert trans.user_is_admin or trans.get_dataset_access_oracle().can_access_dataset(ldda.dataset)
                     content = ldda.to_history_dataset_association(history, add_to_history=add_to_history)
                 elif input_source == "ld":
                     ldda = trans.sa_session.get(
                         LibraryDataset, trans.security.decode_id(input_id)
                     ).library_dataset_dataset_association
-                    assert trans.user_is_admin or trans.app.security_agent.can_access_dataset(
-                        trans.get_current_user_roles(), ldda.dataset
-                    )
+                    assert trans.user_is_admin or trans.get_dataset_access_oracle().can_access_dataset(ldda.dataset)
                     content = ldda.to_history_dataset_association(history, add_to_history=add_to_history)
                 elif input_source == "hda":
                     # Get dataset handle, add to dict and history if necessary
                     content = trans.sa_session.get(HistoryDatasetAssociation, trans.security.decode_id(input_id))
-                    assert trans.user_is_admin or trans.app.security_agent.can_access_dataset(
-                        trans.get_current_user_roles(), content.dataset
-                    )
+                    assert trans.user_is_admin or trans.get_dataset_access_oracle().can_access_dataset(content.dataset)
                 elif input_source == "hdca":
                     content = app.dataset_collection_manager.get_dataset_collection_instance(trans, "history", input_id)
                 else:
@@ -1,12 +1,25 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
+from itertools import count
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
 
 import galaxy.workflow.schedulers
 from galaxy import model
 from galaxy.exceptions import HandlerAssignmentError
 from galaxy.jobs.handler import ItemGrabber
 from galaxy.model.base import transaction
-from galaxy.util import plugin_config
+from galaxy.util import (
+    plugin_config,
+    StructuredExecutionTimer,
+)
 from galaxy.util.custom_logging import get_logger
 from galaxy.util.monitors import Monitors
 from galaxy.util.xml_macros import load
@@ -29,6 +42,32 @@ EXCEPTION_MESSAGE_DUPLICATE_SCHEDULERS = (
 EXCEPTION_MESSAGE_SERIALIZE = "Parallelization is not desired but handler assignment methods are non-deterministic. Set DB_PREASSIGN in workflow_schedulers_conf.xml."
 
 
+def fair_share_order(
+    invocations: Iterable[Tuple[int, Optional[int], Optional[int]]],
+    priorities: Optional[Dict[int, float]] = None,
+) -> List[Tuple[int, Optional[int], Optional[int]]]:
+    """Order ``(invocation_id, history_id, user_id)`` rows round-robin by user.
+
+    The invocations of each user are ranked by ``priorities`` (lowest first,
+    defaulting to the invocation id). The first ranked invocation of every
+    user comes first, then the second one of every user and so on, so a user
+    with many active invocations cannot delay invocations of other users.
+    """
+
+    def priority(invocation):
+        return priorities[invocation[0]] if priorities is not None else invocation[0]
+
+    positions: Dict[Optional[int], count] = {}
+    keyed = []
+    for invocation in sorted(invocations, key=lambda invocation: (priority(invocation), invocation[0])):
+        user_id = invocation[2]
+        if user_id not in positions:
+            positions[user_id] = count()
+        keyed.append((next(positions[user_id]), priority(invocation), invocation[0], invocation))
+    keyed.sort()
+    return [invocation for *_, invocation in keyed]
+
+
 class WorkflowSchedulingManager(ConfiguresHandlers):
     """A workflow scheduling manager based loosely on pattern established by
     ``galaxy.manager.JobManager``. Only schedules workflows on handler
@@ -297,6 +336,13 @@ class WorkflowRequestMonitor(Monitors):
                 self_handler_tags=self_handler_tags,
                 handler_tags=self_handler_tags,
             )
+        self.scheduling_workers = max(getattr(app.config, "workflow_scheduling_workers", 1) or 1, 1)
+        self._schedule_executor: Optional[ThreadPoolExecutor] = None
+        # Invocations being scheduled by the worker pool, mapped to their history id
+        self._in_flight: Dict[int, Optional[int]] = {}
+        self._in_flight_lock = threading.Lock()
+        # Per scheduler, timers started when an invocation was first seen waiting to be scheduled
+        self._ready_timers: Dict[str, Dict[int, StructuredExecutionTimer]] = {}
 
     def __monitor(self):
         to_monitor = self.workflow_scheduling_manager.active_workflow_schedulers
@@ -320,13 +366,91 @@ class WorkflowRequestMonitor(Monitors):
             self._monitor_sleep(self.app.config.workflow_monitor_sleep)
 
     def __schedule(self, workflow_scheduler_id, workflow_scheduler):
+        if self.scheduling_workers > 1:
+            self.__schedule_concurrently(workflow_scheduler_id, workflow_scheduler)
+            return
         invocation_ids = self.__active_invocation_ids(workflow_scheduler_id)
+        ready_timers = self.__update_ready_timers(workflow_scheduler_id, invocation_ids)
         for invocation_id in invocation_ids:
             log.debug("Attempting to schedule workflow invocation [%s]", invocation_id)
+            self.__record_scheduling_lag(workflow_scheduler_id, ready_timers.pop(invocation_id))
             self.__attempt_schedule(invocation_id, workflow_scheduler)
             if not self.monitor_running:
                 return
 
+    def __schedule_concurrently(self, workflow_scheduler_id, workflow_scheduler):
+        """Hand active invocations to a pool of ``workflow_scheduling_workers`` threads.
+
+        The monitor thread does not wait for the workers, so a long running
+        invocation only occupies its own worker. An invocation is never
+        scheduled twice at the same time and invocations of the same history
+        are still scheduled one at a time. Waiting invocations are submitted
+        in ``fair_share_order``, least recently scheduled first.
+        """
+        if self._schedule_executor is None:
+            self._schedule_executor = ThreadPoolExecutor(
+                max_workers=self.scheduling_workers, thread_name_prefix="WorkflowRequestMonitor.schedule_thread"
+            )
+        invocations = self.__active_invocations(workflow_scheduler_id)
+        with self._in_flight_lock:
+            in_flight = dict(self._in_flight)
+        ready_timers = self.__update_ready_timers(
+            workflow_scheduler_id, [invocation[0] for invocation in invocations if invocation[0] not in in_flight]
+        )
+        # Invocations being scheduled count as already served, waiting ones are
+        # ranked by how long they have been waiting.
+        priorities = {invocation_id: ready_timer.begin for invocation_id, ready_timer in ready_timers.items()}
+        priorities.update((invocation_id, 0.0) for invocation_id in in_flight)
+        busy_histories = set(in_flight.values())
+        for invocation_id, history_id, _ in fair_share_order(invocations, priorities):
+            if not self.monitor_running:
+                return
+            if len(in_flight) >= self.scheduling_workers:
+                break
+            if invocation_id in in_flight or history_id in busy_histories:
+                continue
+            in_flight[invocation_id] = history_id
+            busy_histories.add(history_id)
+            with self._in_flight_lock:
+                self._in_flight[invocation_id] = history_id
+            self._schedule_executor.submit(
+                self.__attempt_schedule_in_thread,
+                invocation_id,
+                workflow_scheduler_id,
+                workflow_scheduler,
+                ready_timers.pop(invocation_id),
+            )
+
+    def __attempt_schedule_in_thread(self, invocation_id, workflow_scheduler_id, workflow_scheduler, ready_timer):
+        try:
+            self.__record_scheduling_lag(workflow_scheduler_id, ready_timer)
+            self.__attempt_schedule(invocation_id, workflow_scheduler)
+        except Exception:
+            log.exception("Exception raised while attempting to schedule workflow invocation [%s]", invocation_id)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(invocation_id, None)
+
+    def __update_ready_timers(self, workflow_scheduler_id, invocation_ids):
+        # Keep the timers of invocations that are still waiting, start timers for new ones.
+        previous_timers = self._ready_timers.get(workflow_scheduler_id, {})
+        ready_timers = {}
+        for invocation_id in invocation_ids:
+            ready_timer = previous_timers.get(invocation_id)
+            if ready_timer is None:
+                ready_timer = self.app.execution_timer_factory.get_timer(
+                    "internal.galaxy.workflows.scheduling_manager.scheduling_lag",
+                    "Workflow invocation waited to be scheduled",
+                )
+            ready_timers[invocation_id] = ready_timer
+        self._ready_timers[workflow_scheduler_id] = ready_timers
+        return ready_timers
+
+    def __record_scheduling_lag(self, workflow_scheduler_id, ready_timer):
+        # Only reported as a metric (if statsd is configured), tagged by
+        # scheduler rather than invocation to keep the number of series bounded.
+        ready_timer.to_str(workflow_scheduler=workflow_scheduler_id)
+
     def __attempt_schedule(self, invocation_id, workflow_scheduler):
         with self.app.model.context() as session:
             workflow_invocation = session.get(model.WorkflowInvocation, invocation_id)
@@ -360,8 +484,18 @@ class WorkflowRequestMonitor(Monitors):
             handler=handler,
         )
 
+    def __active_invocations(self, scheduler_id):
+        handler = self.app.config.server_name
+        return model.WorkflowInvocation.poll_active_workflow_invocations(
+            self.app.model.engine,
+            scheduler=scheduler_id,
+            handler=handler,
+        )
+
     def start(self):
         self.monitor_thread.start()
 
     def shutdown(self):
         self.shutdown_monitor()
+        if self._schedule_executor is not None:
+            self._schedule_executor.shutdown(wait=False)
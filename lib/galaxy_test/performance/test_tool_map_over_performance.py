@@ -0,0 +1,60 @@
+import logging
+import os
+import time
+
+from galaxy_test.base.populators import (
+    DatasetCollectionPopulator,
+    DatasetPopulator,
+)
+from ._framework import PerformanceTestCase
+
+log = logging.getLogger(__name__)
+
+GALAXY_TEST_PERFORMANCE_TIMEOUT_DEFAULT = 5000
+GALAXY_TEST_PERFORMANCE_TIMEOUT = int(
+    os.environ.get("GALAXY_TEST_PERFORMANCE_TIMEOUT", GALAXY_TEST_PERFORMANCE_TIMEOUT_DEFAULT)
+)
+GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZE_DEFAULT = 100
+GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZE = int(
+    os.environ.get("GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZE", GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZE_DEFAULT)
+)
+
+
+class TestToolMapOverPerformance(PerformanceTestCase):
+    framework_tool_and_types = True
+
+    def setUp(self):
+        super().setUp()
+        self.dataset_populator = DatasetPopulator(self.galaxy_interactor)
+        self.dataset_collection_populator = DatasetCollectionPopulator(self.galaxy_interactor)
+
+    def test_map_over_list(self):
+        self._run_map_over("cat1", "input1")
+
+    def test_map_over_list_collection_output(self):
+        self._run_map_over("collection_creates_pair", "input1")
+
+    def _run_map_over(self, tool_id, input_name):
+        with self.dataset_populator.test_history() as history_id:
+            contents = [(f"data{i}", f"{i}\t{i}\n") for i in range(GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZE)]
+            hdca_id = self.dataset_collection_populator.create_list_in_history(
+                history_id, contents=contents, wait=True
+            ).json()["outputs"][0]["id"]
+            start = time.time()
+            response = self.dataset_populator.run_tool(
+                tool_id=tool_id,
+                inputs={input_name: {"batch": True, "values": [{"src": "hdca", "id": hdca_id}]}},
+                history_id=history_id,
+            )
+            duration = time.time() - start
+            assert len(response["jobs"]) == GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZE
+            log.info(
+                "Created %d jobs for tool %s in %.2f seconds (%.1f ms per job)",
+                GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZE,
+                tool_id,
+                duration,
+                duration / GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZE * 1000,
+            )
+            self.dataset_populator.wait_for_history_jobs(
+                history_id, assert_ok=True, timeout=GALAXY_TEST_PERFORMANCE_TIMEOUT
+            )
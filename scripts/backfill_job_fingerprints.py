@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""Compute fingerprints for jobs without a fingerprint of the current version.
+
+Jobs with a current fingerprint are found by the job cache with a single
+indexed query, other jobs (created before job fingerprints were recorded or
+before the last change of ``FINGERPRINT_VERSION``) only by the much slower
+full parameter search. Run this after upgrading Galaxy to a release that
+changes the fingerprint version. Only jobs that can be reused by the job cache
+(original, successful jobs) are processed. Jobs that cannot be fingerprinted
+reliably get an empty fingerprint and remain available to the full search.
+"""
+
+import argparse
+import os
+import sys
+
+from sqlalchemy import select
+
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "lib")))
+
+import galaxy.config
+from galaxy.model.base import transaction
+from galaxy.model.job_fingerprint import (
+    job_fingerprint_from_parameters,
+    lacks_current_fingerprint,
+    set_job_fingerprint,
+)
+from galaxy.model.mapping import init_models_from_config
+from galaxy.objectstore import build_object_store_from_config
+from galaxy.util.script import (
+    app_properties_from_args,
+    populate_config_args,
+)
+
+DESCRIPTION = "Compute job cache fingerprints of existing jobs."
+
+
+def init(args):
+    app_properties = app_properties_from_args(args)
+    config = galaxy.config.Configuration(**app_properties)
+
+    object_store = build_object_store_from_config(config)
+    model = init_models_from_config(config, object_store=object_store)
+    return model, object_store
+
+
+def main(argv=None):
+    """Entry point for script."""
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    populate_config_args(parser)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Number of jobs to update per transaction")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of jobs to process")
+    parser.add_argument("--dry-run", action="store_true", help="Compute fingerprints without storing them")
+    args = parser.parse_args(argv)
+
+    print("Loading Galaxy model...")
+    model, object_store = init(args)
+    session = model.context()
+    Job = model.Job
+
+    processed = fingerprinted = 0
+    last_id = None
+    while args.limit is None or processed < args.limit:
+        batch_size = args.batch_size if args.limit is None else min(args.batch_size, args.limit - processed)
+        stmt = select(Job).where(
+            lacks_current_fingerprint(), Job.copied_from_job_id.is_(None), Job.state == Job.states.OK
+        )
+        if last_id is not None:
+            stmt = stmt.where(Job.id < last_id)
+        jobs = session.scalars(stmt.order_by(Job.id.desc()).limit(batch_size)).all()
+        if not jobs:
+            break
+        for job in jobs:
+            fingerprint = job_fingerprint_from_parameters(session, job)
+            if fingerprint is not None:
+                fingerprinted += 1
+            set_job_fingerprint(job, fingerprint)
+        processed += len(jobs)
+        last_id = jobs[-1].id
+        if args.dry_run:
+            session.rollback()
+        else:
+            with transaction(session):
+                session.commit()
+        session.expunge_all()
+        print(f"Processed {processed} jobs, fingerprinted {fingerprinted}")
+    object_store.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""Benchmark datatype sniffing over the datatype test files.
+
+Reports sniffs per second and the median time per file when walking the plain
+``sniff_order`` list and when using the registry's precomputed
+``SniffOrderIndex``, and checks that both detect the same datatype for every
+file. Overall rates are dominated by the few files (archives) that are
+expensive to sniff with either approach, the per file median is not.
+"""
+
+import os
+import statistics
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "lib")))
+
+from galaxy.datatypes.registry import example_datatype_registry_for_sample
+from galaxy.datatypes.sniff import (
+    FilePrefix,
+    get_test_fname,
+    run_sniffers_raw,
+)
+
+DESCRIPTION = "Benchmark datatype sniffing with and without the sniff order index."
+
+
+def _sniff_all(file_prefixes, sniff_order, repeat):
+    results = {}
+    times = {}
+    for _ in range(repeat):
+        for path, file_prefix in file_prefixes:
+            start = time.perf_counter()
+            results[path] = run_sniffers_raw(file_prefix, sniff_order)
+            elapsed = time.perf_counter() - start
+            times[path] = min(elapsed, times.get(path, elapsed))
+    return results, times
+
+
+def _report(label, times, baseline=None):
+    total = sum(times.values())
+    median = statistics.median(times.values())
+    line = f"{label}: {len(times) / total:.1f} sniffs/sec, median {median * 1000:.3f} ms per file"
+    if baseline:
+        speedups = [baseline[path] / times[path] for path in times]
+        line += f" ({sum(baseline.values()) / total:.2f}x overall, median {statistics.median(speedups):.2f}x per file)"
+    print(line)
+
+
+def main(argv=None):
+    """Entry point for script."""
+    arg_parser = ArgumentParser(description=DESCRIPTION)
+    arg_parser.add_argument("--directory", default=os.path.dirname(get_test_fname("1.bed")))
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    registry = example_datatype_registry_for_sample()
+    paths = sorted(os.path.join(args.directory, f) for f in os.listdir(args.directory))
+    # FilePrefix reads the file, build them once so only sniffing is measured
+    file_prefixes = [(path, FilePrefix(path)) for path in paths if os.path.isfile(path)]
+
+    list_results, list_times = _sniff_all(file_prefixes, registry.sniff_order, args.repeat)
+    index_results, index_times = _sniff_all(file_prefixes, registry.sniff_order_index, args.repeat)
+    mismatches = [path for path in list_results if list_results[path] != index_results[path]]
+
+    print(f"Files: {len(file_prefixes)}, best of {args.repeat} repeats")
+    _report("sniff_order list ", list_times)
+    _report("sniff_order index", index_times, list_times)
+    slowest = max(index_times, key=index_times.get)
+    print(f"Slowest file: {os.path.basename(slowest)} ({index_times[slowest] * 1000:.1f} ms with the index)")
+    for path in mismatches:
+        print(f"Mismatch for {path}: {list_results[path]} != {index_results[path]}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
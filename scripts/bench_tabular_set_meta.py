@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""Benchmark ``Tabular.set_meta`` on synthetic tabular files.
+
+Generates files with a mix of integer, float, list, string and categorical
+columns and reports how long metadata detection takes for each of them.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "lib")))
+
+from galaxy.datatypes.tabular import Tabular
+
+DESCRIPTION = "Benchmark Tabular.set_meta column type detection on synthetic files."
+
+COLUMN_GENERATORS = {
+    "int": lambda rng: str(rng.randint(-100000, 100000)),
+    "float": lambda rng: f"{rng.uniform(-1000, 1000):.4f}",
+    "list": lambda rng: f"{rng.randint(0, 9)},{rng.randint(0, 9)},{rng.randint(0, 9)}",
+    "str": lambda rng: f"gene_{rng.randint(0, 10 ** 9):x}",
+    "categorical": lambda rng: rng.choice(["chr1", "chr2", "chrX", "chrM"]),
+}
+
+LAYOUTS = {
+    "numeric": ["int", "int", "float", "float", "float", "int"],
+    "bed_like": ["categorical", "int", "int", "str", "float", "categorical"],
+    "mixed": ["str", "int", "float", "list", "categorical", "str", "int", "float"],
+}
+
+
+class _MockMetadata:
+    pass
+
+
+class _MockDataset:
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.metadata = _MockMetadata()
+
+    def has_data(self):
+        return True
+
+    def get_size(self):
+        return os.path.getsize(self.file_name)
+
+
+def _write_file(path, columns, rows, seed):
+    rng = random.Random(seed)
+    generators = [COLUMN_GENERATORS[column] for column in columns]
+    with open(path, "w") as fh:
+        fh.write("#" + "\t".join(columns) + "\n")
+        for _ in range(rows):
+            fh.write("\t".join(generator(rng) for generator in generators))
+            fh.write("\n")
+
+
+def main(argv=None):
+    """Entry point for script."""
+    arg_parser = ArgumentParser(description=DESCRIPTION)
+    arg_parser.add_argument("--rows", type=int, default=1000000)
+    arg_parser.add_argument("--repeat", type=int, default=1)
+    arg_parser.add_argument("--layout", choices=sorted(LAYOUTS), action="append")
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for layout in args.layout or sorted(LAYOUTS):
+            path = os.path.join(tmp_dir, f"{layout}.tabular")
+            _write_file(path, LAYOUTS[layout], args.rows, args.seed)
+            dataset = _MockDataset(path)
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                Tabular().set_meta(dataset, max_data_lines=None)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            size_mb = os.path.getsize(path) / 1024**2
+            print(
+                f"{layout}: {args.rows} rows, {size_mb:.1f} MB, {best:.2f} s "
+                f"({args.rows / best:.0f} rows/sec), column_types={dataset.metadata.column_types}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""Benchmark toolbox search latency.
+
+Indexes a synthetic toolbox and reports p50/p99 query latencies when opening a
+new searcher for every query, for uncached queries (searcher and parser
+reused, result cache emptied before every query) and with the result cache.
+Also reports how long it takes to rebuild the persisted index when no tool
+changed.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "lib")))
+
+from galaxy.config import GalaxyAppConfiguration
+from galaxy.tools.search import ToolPanelViewSearch
+
+DESCRIPTION = "Benchmark toolbox search latency with and without the result cache."
+WORDS = (
+    "align assemble bam bed blast call count fasta fastq filter genome join map merge quality "
+    "read sample sort split trim variant vcf annotate cluster convert extract peak coverage"
+).split()
+
+
+class _Tool:
+    tool_type = "default"
+    edam_operations = ""
+    edam_topics = ""
+    guid = None
+    labels = None
+    is_latest_version = True
+    hidden = False
+    lineage = None
+
+    def __init__(self, index, rng):
+        self.id = f"tool_{index}"
+        self.name = " ".join(rng.sample(WORDS, 2))
+        self.description = " ".join(rng.sample(WORDS, 5))
+        self.raw_help = " ".join(rng.choice(WORDS) for _ in range(200))
+        self.repository_name = f"repo_{index % 50}"
+        self.repository_owner = f"owner_{index % 10}"
+        self._section = rng.choice(WORDS)
+
+    def get_panel_section(self):
+        return (self._section, self._section.title())
+
+
+class _ToolCache:
+    def __init__(self, tools):
+        self.tools = {tool.id: tool for tool in tools}
+        self._tool_paths_by_id = {tool_id: f"{tool_id}.xml" for tool_id in self.tools}
+        self._new_tool_ids = set(self.tools)
+        self._removed_tool_ids = set()
+
+    def get_tool_by_id(self, tool_id):
+        return self.tools.get(tool_id)
+
+
+class _ToolBox:
+    def __init__(self, tool_cache):
+        self.get_tool = tool_cache.get_tool_by_id
+
+    def panel_has_tool(self, tool, panel_view_id):
+        return True
+
+
+def _percentile(times, percent):
+    times = sorted(times)
+    return times[min(len(times) - 1, int(len(times) * percent / 100))]
+
+
+def _run(search, config, queries, clear_cache, new_searcher):
+    times = []
+    for query in queries:
+        if clear_cache:
+            search._result_cache.clear()
+        if new_searcher:
+            search._local = threading.local()
+        start = time.perf_counter()
+        search.search(query, config)
+        times.append((time.perf_counter() - start) * 1000.0)
+    return times
+
+
+def main(argv=None):
+    """Entry point for script."""
+    arg_parser = ArgumentParser(description=DESCRIPTION)
+    arg_parser.add_argument("--tools", type=int, default=2000)
+    arg_parser.add_argument("--queries", type=int, default=2000)
+    arg_parser.add_argument("--distinct-queries", type=int, default=200)
+    args = arg_parser.parse_args(argv)
+
+    rng = random.Random(42)
+    config = GalaxyAppConfiguration(override_tempdir=False)
+    tool_cache = _ToolCache([_Tool(i, rng) for i in range(args.tools)])
+    distinct = [" ".join(rng.sample(WORDS, rng.randint(1, 2))) for _ in range(args.distinct_queries)]
+    queries = [rng.choice(distinct) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        search = ToolPanelViewSearch("default", index_dir, config=config)
+        start = time.perf_counter()
+        search.build_index(tool_cache, _ToolBox(tool_cache))
+        print(f"Initial index of {args.tools} tools: {time.perf_counter() - start:.2f} s")
+        search = ToolPanelViewSearch("default", index_dir, config=config)
+        start = time.perf_counter()
+        search.build_index(tool_cache, _ToolBox(tool_cache))
+        print(f"Rebuild of unchanged persisted index: {time.perf_counter() - start:.2f} s")
+
+        modes = (("new searcher", True, True), ("uncached", True, False), ("cached", False, False))
+        for label, clear_cache, new_searcher in modes:
+            times = _run(search, config, queries, clear_cache, new_searcher)
+            print(
+                f"{label:>12} ({len(times)} queries): p50 {_percentile(times, 50):.3f} ms,"
+                f" p99 {_percentile(times, 99):.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
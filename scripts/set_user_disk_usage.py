@@ -9,6 +9,7 @@ sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pa
 import galaxy.config
 from galaxy.model.mapping import init_models_from_config
 from galaxy.objectstore import build_object_store_from_config
+from galaxy.quota import reconcile_user_disk_usage
 from galaxy.util import nice_size
 from galaxy.util.script import (
     app_properties_from_args,
@@ -27,6 +28,13 @@ parser.add_argument(
     action="store_true",
     default=False,
 )
+parser.add_argument(
+    "--reconcile",
+    dest="reconcile",
+    help="Only reconcile users whose disk usage was adjusted since the last reconciliation and report drift",
+    action="store_true",
+    default=False,
+)
 populate_config_args(parser)
 args = parser.parse_args()
 
@@ -72,7 +80,20 @@ if __name__ == "__main__":
     model, object_store, engine = init()
     sa_session = model.context.current
 
-    if not args.username and not args.email:
+    if args.reconcile:
+        drifts = reconcile_user_disk_usage(sa_session, object_store)
+        for drift in drifts:
+            print(
+                f"user {drift.user_id}, quota source {drift.quota_source_label}:",
+                "recorded",
+                nice_size(drift.recorded),
+                "actual",
+                nice_size(drift.actual),
+            )
+        print(f"{len(drifts)} drifted disk usage counters corrected")
+        object_store.shutdown()
+        sys.exit(0)
+    elif not args.username and not args.email:
         user_count = sa_session.query(model.User).count()
         print("Processing %i users..." % user_count)
         for i, user in enumerate(sa_session.query(model.User).enable_eagerloads(False).yield_per(1000)):
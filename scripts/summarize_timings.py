@@ -1,13 +1,47 @@
-"""Script to parse timings out of a Galaxy log and summarize."""
+"""Script to parse timings out of a Galaxy log and summarize.
 
+With ``--spans`` the job timing spans saved from the ``/api/jobs/{job_id}/spans``
+API (a single response or a list of responses) are summarized by span name
+instead.
+"""
+
+import json
 import re
 from argparse import ArgumentParser
+from collections import defaultdict
 
 import numpy
 
 DESCRIPTION = ""
 
 TIMING_LINE_PATTERN = re.compile(r"\((\d+.\d+) ms\)")
+SUMMARY_TEMPLATE = "Summary (ms) - Mean: %f, Median: %f, Max: %f, Min: %f, StdDev: %f"
+
+
+def summarize(times):
+    return SUMMARY_TEMPLATE % (
+        numpy.mean(times),
+        numpy.median(times),
+        numpy.max(times),
+        numpy.min(times),
+        numpy.std(times),
+    )
+
+
+def span_times(jobs, filter_pattern=None):
+    """Collect the durations (in ms) and the number of occurrences of the spans of ``jobs`` by span name."""
+    times = defaultdict(list)
+    occurrences = defaultdict(int)
+    for job in jobs:
+        if job.get("pickup_delay") is not None:
+            times["pickup_delay"].append(job["pickup_delay"] * 1000.0)
+            occurrences["pickup_delay"] += 1
+        for span in job["spans"]:
+            times[span["name"]].append(span["duration"] * 1000.0)
+            occurrences[span["name"]] += span.get("occurrences", 1)
+    if filter_pattern:
+        times = {name: durations for name, durations in times.items() if filter_pattern.search(name)}
+    return times, occurrences
 
 
 def main(argv=None):
@@ -16,11 +50,23 @@ def main(argv=None):
     arg_parser.add_argument("--file", default="galaxy.log")
     arg_parser.add_argument("--print_lines", default=False, action="store_true")
     arg_parser.add_argument("--pattern", default=None)
+    arg_parser.add_argument("--spans", default=None, help="JSON file with job spans downloaded from the jobs API")
 
     args = arg_parser.parse_args(argv)
     print_lines = args.print_lines
     pattern_str = args.pattern
     filter_pattern = re.compile(pattern_str) if pattern_str is not None else None
+
+    if args.spans:
+        with open(args.spans) as f:
+            jobs = json.load(f)
+        if isinstance(jobs, dict):
+            jobs = [jobs]
+        times, occurrences = span_times(jobs, filter_pattern)
+        for name, durations in sorted(times.items()):
+            print(f"{name} ({len(durations)} samples, {occurrences[name]} occurrences): {summarize(durations)}")
+        return
+
     times = []
     for line in open(args.file):
         if filter_pattern and not filter_pattern.search(line):
@@ -34,9 +80,7 @@ def main(argv=None):
         if print_lines:
             print(line.strip())
 
-    template = "Summary (ms) - Mean: %f, Median: %f, Max: %f, Min: %f, StdDev: %f"
-    message = template % (numpy.mean(times), numpy.median(times), numpy.max(times), numpy.min(times), numpy.std(times))
-    print(message)
+    print(summarize(times))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,45 @@
+from galaxy.jobs.readiness import JobReadinessIndex
+
+
+def test_jobs_without_unmet_inputs_are_ready():
+    index = JobReadinessIndex(sweep_interval=60)
+    index.reset(max_job_id=0, now=0)
+    index.add_jobs([1, 2], [(2, 10)])
+    assert index.ready_job_ids == {1}
+    assert index.waiting_job_count == 1
+    assert index.max_job_id == 2
+    assert index.is_tracking_job(2)
+    assert index.is_tracking_dataset(10)
+
+
+def test_jobs_released_once_all_inputs_changed():
+    index = JobReadinessIndex(sweep_interval=60)
+    index.reset(max_job_id=0, now=0)
+    index.add_jobs([1, 2], [(1, 10), (1, 11), (2, 11)])
+    assert index.datasets_changed([10]) == []
+    assert sorted(index.datasets_changed([11])) == [1, 2]
+    assert index.ready_job_ids == {1, 2}
+    assert not index.is_tracking_dataset(11)
+    # Unrelated or repeated changes are ignored
+    assert index.datasets_changed([11, 12]) == []
+
+
+def test_discard():
+    index = JobReadinessIndex(sweep_interval=60)
+    index.reset(max_job_id=0, now=0)
+    index.add_jobs([1, 2], [(2, 10)])
+    index.discard([1, 2])
+    assert index.ready_job_ids == set()
+    assert not index.is_tracking_job(2)
+    assert not index.is_tracking_dataset(10)
+
+
+def test_sweep_due():
+    index = JobReadinessIndex(sweep_interval=60)
+    assert index.sweep_due(now=0)
+    index.add_jobs([1], [])
+    index.reset(max_job_id=5, now=100)
+    assert index.ready_job_ids == set()
+    assert index.max_job_id == 5
+    assert not index.sweep_due(now=159)
+    assert index.sweep_due(now=160)
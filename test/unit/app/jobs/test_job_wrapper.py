@@ -4,6 +4,9 @@ from contextlib import contextmanager
 from typing import (
     cast,
     Dict,
+    List,
+    Optional,
+    Tuple,
     Type,
 )
 
@@ -17,6 +20,7 @@ from galaxy.jobs import (
 )
 from galaxy.model import (
     Base,
+    Dataset,
     Job,
     Task,
     User,
@@ -84,6 +88,14 @@ class AbstractTestCases:
             with self._prepared_wrapper() as wrapper:
                 assert TEST_DEPENDENCIES_COMMANDS == wrapper.dependency_shell_commands
 
+        def test_prepare_records_span(self):
+            self.app.config.track_job_spans = True
+            wrapper = self._wrapper()
+            wrapper._get_tool_evaluator = lambda *args, **kwargs: MockEvaluator(wrapper.app, wrapper.tool, wrapper.get_job(), wrapper.working_directory)  # type: ignore[assignment]
+            with wrapper.spans.span("runner.queue_job"):
+                wrapper.prepare()
+            assert [span.name for span in wrapper.spans.pending] == ["runner.queue_job/prepare", "runner.queue_job"]
+
         @abc.abstractmethod
         def _wrapper(self) -> JobWrapper:
             pass
@@ -93,6 +105,28 @@ class TestJobWrapper(AbstractTestCases.BaseWrapperTestCase):
     def _wrapper(self):
         return JobWrapper(self.job, self.queue)  # type: ignore[arg-type]
 
+    def test_stage_outputs(self):
+        self.app.config.job_output_finish_workers = 2
+        self.app.config.retry_job_output_collection = 0
+        object_store = StagingObjectStore(self.working_directory)
+        self.app.object_store = cast(BaseObjectStore, object_store)
+        extra_files_directory = os.path.join(self.working_directory, "outputs", "dataset_1_files")
+        os.makedirs(extra_files_directory)
+        with open(os.path.join(extra_files_directory, "index.html"), "w") as f:
+            f.write("extra")
+        datasets = [Dataset(id=1), Dataset(id=2), Dataset(id=3)]
+        datasets[2].purged = True
+        Dataset.object_store = cast(BaseObjectStore, object_store)
+        try:
+            staged = self._wrapper()._stage_outputs(datasets)
+        finally:
+            Dataset.object_store = None
+        assert set(staged) == {1, 2}
+        assert staged[1].file_size == 3
+        assert staged[1].total_size == 3 + len("extra")
+        assert staged[2].total_size == 3
+        assert set(object_store.pushed) == {(1, None), (1, "index.html"), (2, None)}
+
 
 class TestTaskWrapper(AbstractTestCases.BaseWrapperTestCase):
     def setUp(self):
@@ -186,3 +220,31 @@ class MockObjectStore:
         if kwds.get("base_dir", "") == "job_work":
             return self.working_directory
         return None
+
+
+class StagingObjectStore(MockObjectStore):
+    def __init__(self, working_directory):
+        self.working_directory = working_directory
+        self.pushed: List[Tuple[int, Optional[str]]] = []
+
+    def get_store_by(self, obj):
+        return "id"
+
+    def size(self, obj):
+        return 3
+
+    def update_from_file(self, obj, alt_name=None, **kwds):
+        self.pushed.append((obj.id, alt_name))
+
+    def exists(self, obj, extra_dir=None, **kwds):
+        if extra_dir:
+            return os.path.exists(self.get_filename(obj, extra_dir=extra_dir))
+        return True
+
+    def get_filename(self, obj, extra_dir=None, **kwds):
+        if extra_dir:
+            return os.path.join(self.working_directory, "outputs", extra_dir)
+        return super().get_filename(obj, **kwds)
+
+    def construct_path(self, obj, **kwds):
+        return self.get_filename(obj, **kwds)
@@ -0,0 +1,68 @@
+from galaxy.app_unittest_utils.galaxy_mock import MockApp
+from galaxy.jobs.runners import AsynchronousJobRunner
+
+
+class DummyJobState:
+    def __init__(self, job_id, running=True):
+        self.job_id = job_id
+        self.running = running
+
+
+class DummyAsynchronousJobRunner(AsynchronousJobRunner):
+    runner_name = "DummyRunner"
+
+    def check_watched_item(self, job_state):
+        if job_state.running:
+            return job_state
+        return None
+
+
+def test_check_watched_items_serial():
+    runner = DummyAsynchronousJobRunner(MockApp(), 1)
+    runner.watched = [DummyJobState(1), DummyJobState(2, running=False), DummyJobState(3)]
+    runner.check_watched_items()
+    assert [s.job_id for s in runner.watched] == [1, 3]
+    assert runner.last_check_watched_items_count == 3
+    assert runner.last_check_watched_items_duration is not None
+    assert runner._check_executor is None
+
+
+def test_check_watched_items_thread_pool():
+    runner = DummyAsynchronousJobRunner(MockApp(), 1, monitor_check_workers=4)
+    runner.watched = [DummyJobState(i, running=i % 2 == 0) for i in range(20)]
+    runner.check_watched_items()
+    assert [s.job_id for s in runner.watched] == list(range(0, 20, 2))
+    assert runner._check_executor is not None
+    runner._check_executor.shutdown()
+
+
+class FailingAsynchronousJobRunner(DummyAsynchronousJobRunner):
+    def check_watched_item(self, job_state):
+        if job_state.job_id == 2:
+            raise Exception("state check failed")
+        return super().check_watched_item(job_state)
+
+
+def test_check_watched_items_keeps_failed_checks():
+    runner = FailingAsynchronousJobRunner(MockApp(), 1)
+    runner.watched = [DummyJobState(1), DummyJobState(2), DummyJobState(3, running=False)]
+    runner.check_watched_items()
+    assert [s.job_id for s in runner.watched] == [1, 2]
+
+
+class BatchAsynchronousJobRunner(AsynchronousJobRunner):
+    runner_name = "BatchRunner"
+
+    def check_watched_items_batch(self, job_states):
+        running = set(self._map_watched_items(lambda job_state: job_state.running and job_state.job_id, job_states))
+        return [job_state for job_state in job_states if job_state.job_id in running]
+
+
+def test_check_watched_items_batch_override():
+    runner = BatchAsynchronousJobRunner(MockApp(), 1, monitor_check_workers=2)
+    runner.watched = [DummyJobState(i, running=i != 2) for i in range(1, 5)]
+    runner.check_watched_items()
+    assert [s.job_id for s in runner.watched] == [1, 3, 4]
+    assert runner.last_check_watched_items_count == 4
+    assert runner.last_check_watched_items_duration is not None
+    runner._check_executor.shutdown()
@@ -115,6 +115,15 @@ class TestDefaultToolAction(TestCase, tools_support.UsesTools):
         # Again this is a stupid way to ensure data parameters are wrapped.
         assert output["out1"].name == f"Output ({hda1.dataset.get_file_name()})"
 
+    def test_pending_history_items(self):
+        _, output1 = self._simple_execute(add_pending_items=False)
+        _, output2 = self._simple_execute(add_pending_items=False)
+        # outputs are staged for addition to the history but have no hid yet
+        assert output1["out1"].hid is None
+        assert output2["out1"].hid is None
+        self.history.add_pending_items()
+        assert output2["out1"].hid == output1["out1"].hid + 1
+
     def test_inactive_user_job_create_failure(self):
         self.trans.user_is_active = False
         try:
@@ -134,7 +143,7 @@ class TestDefaultToolAction(TestCase, tools_support.UsesTools):
             session.commit()
         return hda
 
-    def _simple_execute(self, contents=None, incoming=None):
+    def _simple_execute(self, contents=None, incoming=None, **kwds):
         if contents is None:
             contents = tools_support.SIMPLE_TOOL_CONTENTS
         if incoming is None:
@@ -145,6 +154,7 @@ class TestDefaultToolAction(TestCase, tools_support.UsesTools):
             trans=self.trans,
             history=self.history,
             incoming=incoming,
+            **kwds,
         )
         return job, out_data
 
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 import tempfile
@@ -239,6 +240,93 @@ def test_hdca_failed_expansion():
         assert "Expected bagit.txt does not exist" in output["error_message"]
 
 
+def test_hdca_concurrent_resolution():
+    with _execute_context() as execute_context:
+        job_directory = execute_context.job_directory
+        elements = []
+        for i in range(8):
+            example_path = os.path.join(job_directory, f"example_file_{i}")
+            with open(example_path, "w") as f:
+                f.write(f"sample data {i}\nhello world")
+            elements.append({"src": "path", "path": example_path, "name": f"element_{i}"})
+        elements.insert(3, {"src": "path", "path": os.path.join(job_directory, "missing"), "name": "missing"})
+        request = {
+            "allow_failed_collections": True,
+            "targets": [
+                {
+                    "destination": {
+                        "type": "hdca",
+                    },
+                    "elements": [
+                        {"name": "outer", "elements": elements[:5]},
+                        {"src": "pasted", "paste_content": "pasted data\n", "name": "pasted"},
+                    ]
+                    + elements[5:],
+                }
+            ],
+        }
+        execute_context.execute_request(request, ["--workers", "4"])
+        output = _unnamed_output(execute_context)
+        assert output["timings"]["workers"] == 4
+        assert "resolution" in output["timings"]
+        outer, pasted, *rest = output["elements"]
+        assert [e.get("name") for e in outer["elements"]] == ["element_0", "element_1", "element_2", None, "element_3"]
+        assert "error_message" in outer["elements"][3]
+        assert pasted["name"] == "pasted"
+        assert [e["name"] for e in rest] == ["element_4", "element_5", "element_6", "element_7"]
+        for element in [pasted] + rest:
+            assert element["state"] == "ok"
+            assert "upload" in element["timings"]
+            assert element["timings"]["total"] >= element["timings"]["upload"]
+        filenames = [e["filename"] for e in [pasted] + rest]
+        assert len(set(filenames)) == len(filenames)
+
+
+def test_hash_functions_computed_during_ingest():
+    with _execute_context() as execute_context:
+        job_directory = execute_context.job_directory
+        raw_path = os.path.join(job_directory, "raw_file")
+        with open(raw_path, "w") as f:
+            f.write("1 2\r\n3 4")
+        validated_path = os.path.join(job_directory, "validated_file")
+        with open(validated_path, "w") as f:
+            f.write("1\t2\n")
+        request = {
+            "hash_functions": ["SHA-256", "MD5"],
+            "validate_hashes": True,
+            "targets": [
+                {
+                    "destination": {
+                        "type": "hdas",
+                    },
+                    "elements": [
+                        {"src": "path", "path": raw_path, "to_posix_lines": True},
+                        {
+                            "src": "path",
+                            "path": validated_path,
+                            "hashes": [{"hash_function": "MD5", "hash_value": hashlib.md5(b"1\t2\n").hexdigest()}],
+                        },
+                    ],
+                }
+            ],
+        }
+        execute_context.execute_request(request)
+        output = _unnamed_output(execute_context)
+        converted, validated = output["elements"]
+        converted_content = open(converted["filename"], "rb").read()
+        assert converted_content == b"1 2\n3 4\n"
+        assert {h["hash_function"]: h["hash_value"] for h in converted["hashes"]} == {
+            "SHA-256": hashlib.sha256(converted_content).hexdigest(),
+            "MD5": hashlib.md5(converted_content).hexdigest(),
+        }
+        # the supplied MD5 is validated and kept, SHA-256 is computed in the same pass
+        assert {h["hash_function"]: h["hash_value"] for h in validated["hashes"]} == {
+            "MD5": hashlib.md5(b"1\t2\n").hexdigest(),
+            "SHA-256": hashlib.sha256(b"1\t2\n").hexdigest(),
+        }
+        assert "hash" not in validated["timings"]
+
+
 @contextmanager
 def _execute_context():
     job_directory = mkdtemp()
@@ -268,11 +356,11 @@ class ExecuteContext:
         self.job_directory = directory
         self.galaxy_json_path = os.path.join(directory, "galaxy.json")
 
-    def execute_request(self, request):
+    def execute_request(self, request, extra_args=None):
         request_path = os.path.join(self.job_directory, "request.json")
         with open(request_path, "w") as f:
             json.dump(request, f)
-        self._execute(["--request", request_path])
+        self._execute(["--request", request_path] + (extra_args or []))
 
     def _execute(self, args):
         args.extend(["--working-directory", self.job_directory])
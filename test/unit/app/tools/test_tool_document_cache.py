@@ -0,0 +1,85 @@
+import os
+
+from galaxy.tools.cache import (
+    ToolDocumentCache,
+    ToolDocumentSnapshot,
+)
+
+
+class MockToolSource:
+    def __init__(self, path, document):
+        self.path = path
+        self.document = document
+        self.macro_paths = []
+
+    def to_string(self):
+        return self.document
+
+    def paths_and_modtimes(self):
+        return {self.path: os.path.getmtime(self.path)}
+
+
+def _tool_source(tmp_path, name):
+    path = tmp_path / f"{name}.xml"
+    document = f'<tool id="{name}" name="{name}" version="1.0"/>'
+    path.write_text(document)
+    return MockToolSource(str(path), document)
+
+
+def test_persist_writes_snapshot(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    tool_sources = [_tool_source(tmp_path, name) for name in ("cat", "sort")]
+    cache = ToolDocumentCache(cache_dir=cache_dir)
+    for tool_source in tool_sources:
+        cache.set(tool_source.path, tool_source)
+    cache.persist()
+    assert os.path.exists(cache.snapshot_file)
+    cache.close()
+
+    cache = ToolDocumentCache(cache_dir=cache_dir)
+    assert cache._snapshot is not None
+    assert len(cache._snapshot) == 2
+    # documents are served from the snapshot
+    cache._cache = None
+    for tool_source in tool_sources:
+        assert cache.get(tool_source.path)["document"] == tool_source.document
+    cache.close()
+
+
+def test_stale_snapshot_is_ignored(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    cat = _tool_source(tmp_path, "cat")
+    cache = ToolDocumentCache(cache_dir=cache_dir)
+    cache.set(cat.path, cat)
+    cache.persist()
+    cache.close()
+    snapshot_stat = os.stat(cache.snapshot_file)
+
+    sort = _tool_source(tmp_path, "sort")
+    cache = ToolDocumentCache(cache_dir=cache_dir)
+    cache.set(sort.path, sort)
+    # pending changes are read from the writeable sqlite copy
+    assert cache.get(sort.path)["document"] == sort.document
+    cache.persist()
+    assert os.stat(cache.snapshot_file).st_mtime_ns >= snapshot_stat.st_mtime_ns
+    assert sort.path in cache._snapshot
+    cache.close()
+
+    # a snapshot not matching the sqlite cache file is not used
+    os.utime(cache.cache_file, ns=(1, 1))
+    cache = ToolDocumentCache(cache_dir=cache_dir)
+    assert cache._snapshot is None
+    assert cache.get(cat.path)["document"] == cat.document
+    cache.close()
+
+
+def test_snapshot_round_trip(tmp_path):
+    source = tmp_path / "cache.sqlite"
+    source.write_bytes(b"")
+    source_stat = os.stat(source)
+    path = str(tmp_path / "cache.snapshot")
+    ToolDocumentSnapshot.write(path, source_stat, [])
+    snapshot = ToolDocumentSnapshot(path, source_stat)
+    assert len(snapshot) == 0
+    assert snapshot.get("missing.xml") is None
+    snapshot.close()
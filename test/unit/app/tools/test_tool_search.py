@@ -0,0 +1,107 @@
+import pytest
+
+from galaxy.config import GalaxyAppConfiguration
+from galaxy.tools.search import ToolPanelViewSearch
+
+
+class FakeTool:
+    tool_type = "default"
+    edam_operations = ""
+    edam_topics = ""
+    repository_name = None
+    repository_owner = None
+    guid = None
+    labels = None
+    is_latest_version = True
+    hidden = False
+    lineage = None
+
+    def __init__(self, tool_id, name, description="", raw_help=""):
+        self.id = tool_id
+        self.name = name
+        self.description = description
+        self.raw_help = raw_help
+
+    def get_panel_section(self):
+        return ("filters", "Filter and Sort")
+
+
+class FakeToolCache:
+    def __init__(self, tools):
+        self.tools = {tool.id: tool for tool in tools}
+        self._tool_paths_by_id = {tool_id: f"{tool_id}.xml" for tool_id in self.tools}
+        self._new_tool_ids = set(self.tools)
+        self._removed_tool_ids = set()
+
+    def get_tool_by_id(self, tool_id):
+        return self.tools.get(tool_id)
+
+    def remove(self, tool_id):
+        del self.tools[tool_id]
+        del self._tool_paths_by_id[tool_id]
+        self._new_tool_ids.discard(tool_id)
+        self._removed_tool_ids.add(tool_id)
+
+
+class FakeToolBox:
+    def __init__(self, tool_cache):
+        self.tool_cache = tool_cache
+
+    def get_tool(self, tool_id):
+        return self.tool_cache.get_tool_by_id(tool_id)
+
+    def panel_has_tool(self, tool, panel_view_id):
+        return True
+
+
+@pytest.fixture(scope="module")
+def config():
+    return GalaxyAppConfiguration(override_tempdir=False)
+
+
+def _tools():
+    return [
+        FakeTool("sort1", "Sort", "data in ascending or descending order"),
+        FakeTool("Filter1", "Filter", "data on any column using simple expressions"),
+        FakeTool("Grep1", "Select", "lines that match an expression"),
+    ]
+
+
+def _build(search, tool_cache):
+    search.build_index(tool_cache, FakeToolBox(tool_cache))
+
+
+def test_search(tmp_path, config):
+    search = ToolPanelViewSearch("default", str(tmp_path), config=config)
+    _build(search, FakeToolCache(_tools()))
+    assert search.search("sort", config)[0] == "sort1"
+    assert search.search("  Filter \n", config)[0] == "Filter1"
+
+
+def test_only_changed_tools_reindexed(tmp_path, config):
+    tools = _tools()
+    search = ToolPanelViewSearch("default", str(tmp_path), config=config)
+    _build(search, FakeToolCache(tools))
+    generation = search.index.latest_generation()
+    # a new process reopening the persisted index does not rewrite unchanged tools
+    search = ToolPanelViewSearch("default", str(tmp_path), config=config)
+    _build(search, FakeToolCache(tools))
+    assert search.index.latest_generation() == generation
+    assert search.search("Select", config)[0] == "Grep1"
+    tools[2].name = "Extract"
+    _build(search, FakeToolCache(tools))
+    assert search.index.latest_generation() > generation
+    assert search.search("Extract", config) == ["Grep1"]
+    assert "Grep1" not in search.search("Select", config)
+
+
+def test_result_cache_invalidated_by_index_changes(tmp_path, config):
+    search = ToolPanelViewSearch("default", str(tmp_path), config=config)
+    tool_cache = FakeToolCache(_tools())
+    _build(search, tool_cache)
+    hits = search.search("data", config)
+    assert set(hits) == {"sort1", "Filter1"}
+    assert search._result_cache.get(search._result_cache._state, "data") == hits
+    tool_cache.remove("Filter1")
+    _build(search, tool_cache)
+    assert search.search("data", config) == ["sort1"]
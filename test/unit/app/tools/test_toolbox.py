@@ -201,6 +201,43 @@ class TestToolBox(BaseToolBoxTestCase):
         test_tool = self.toolbox.get_tool("test_tool", tool_version="3")
         assert test_tool.version == "0.2"
 
+    def test_reload_tool_configs(self):
+        self._init_tool()
+        self._init_tool(filename="tool2.xml", tool_id="test_tool2")
+        self._init_tool(filename="tool_v02.xml", version="2.0")
+        conf_template = """<toolbox tool_path="%s"><section id="tid" name="TID">%s</section></toolbox>"""
+        self._add_config(conf_template % (self.test_directory, '<tool file="tool.xml" /><tool file="tool_v02.xml" />'))
+        toolbox = self.toolbox
+        # apply the changes explicitly instead of through the config watcher
+        self.app.watchers.shutdown()
+        conf_path = self._tool_conf_path()
+        assert toolbox.can_reload_tool_configs([conf_path])
+        assert not toolbox.can_reload_tool_configs([self._tool_path()])
+        assert toolbox.get_tool("test_tool").version == "2.0"
+
+        # drop the newer version of test_tool and add test_tool2
+        with open(conf_path, "w") as f:
+            f.write(conf_template % (self.test_directory, '<tool file="tool.xml" /><tool file="tool2.xml" />'))
+        added, removed = toolbox.reload_tool_configs([conf_path])
+        assert added == {("test_tool2", "1.0")}
+        assert removed == {("test_tool", "2.0")}
+        assert self.app.toolbox is toolbox
+        assert toolbox.get_tool("test_tool").version == "1.0"
+        assert toolbox.get_tool("test_tool", tool_version="2.0").version == "1.0"
+        assert toolbox.get_tool("test_tool").lineage.get_version_ids() == ["test_tool/1.0"]
+        assert toolbox.get_tool("test_tool2") is not None
+        section = toolbox._tool_panel["tid"]
+        assert list(section.elems.keys()) == ["tool_test_tool", "tool_test_tool2"]
+        assert section.elems["tool_test_tool"].version == "1.0"
+
+        with open(conf_path, "w") as f:
+            f.write(conf_template % (self.test_directory, '<tool file="tool2.xml" />'))
+        added, removed = toolbox.reload_tool_configs([conf_path])
+        assert not added
+        assert removed == {("test_tool", "1.0")}
+        assert toolbox.get_tool("test_tool") is None
+        assert list(toolbox._tool_panel["tid"].elems.keys()) == ["tool_test_tool2"]
+
     def test_load_file_in_section(self):
         self._init_tool_in_section()
 
@@ -0,0 +1,54 @@
+import os
+from unittest import mock
+
+from galaxy.util import galaxy_directory
+from galaxy.util.bunch import Bunch
+from galaxy.visualization.data_providers import genome
+from galaxy.visualization.data_providers.genome import BigWigDataProvider
+
+BIGWIG = os.path.join(galaxy_directory(), "test-data", "1.bigwig")
+# 1.bigwig has data on chr21:9411190-9416185
+DATA_START = 9411190
+DATA_END = 9416185
+
+
+def _provider():
+    genome.summary_cache.clear()
+    return BigWigDataProvider(original_dataset=Bunch(file_name=BIGWIG))
+
+
+def test_zoomed_out_bins_are_aligned_and_bounded():
+    provider = _provider()
+    start, end = DATA_START - 1000000, DATA_END + 1000000
+    data = provider.get_data("chr21", start, end, num_samples=1000)["data"]
+    positions = [pos for pos, _ in data]
+    bin_size = positions[1] - positions[0]
+    assert bin_size == 2048
+    assert len(data) <= 1000
+    assert all(pos % bin_size == 0 for pos in positions)
+    assert positions[0] <= start < positions[0] + bin_size
+    assert positions[-1] < end <= positions[-1] + bin_size
+    values = [value for pos, value in data if value is not None]
+    assert values
+    assert all(0 <= value <= 100 for value in values)
+    assert all(value is None for pos, value in data if pos + bin_size <= DATA_START or pos >= DATA_END)
+
+
+def test_summaries_served_from_cache():
+    provider = _provider()
+    first = provider.get_data("chr21", DATA_START - 500000, DATA_END + 500000)
+    stats = provider.get_data("chr21", DATA_START, DATA_END, stats=True)
+    assert stats["data"]["max"] == 100
+    with mock.patch.object(BigWigDataProvider, "_get_dataset", side_effect=AssertionError("not cached")):
+        assert provider.get_data("chr21", DATA_START - 500000, DATA_END + 500000) == first
+        assert provider.get_data("chr21", DATA_START, DATA_END, stats=True) == stats
+        # panning within the same tiles is served from cache as well
+        panned = provider.get_data("chr21", DATA_START - 400000, DATA_END + 400000)["data"]
+    assert set(panned) <= set(first["data"])
+
+
+def test_base_level_data():
+    provider = _provider()
+    data = provider.get_data("chr21", DATA_START, DATA_START + 10)["data"]
+    assert [pos for pos, _ in data] == list(range(DATA_START, DATA_START + 11))
+    assert data[0][1] == 50.0
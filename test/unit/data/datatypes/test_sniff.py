@@ -1,3 +1,5 @@
+import hashlib
+import os
 import tempfile
 
 import pytest
@@ -7,8 +9,11 @@ from galaxy.datatypes.sniff import (
     convert_newlines,
     convert_newlines_sep2tabs,
     convert_sep2tabs,
+    FilePrefix,
     get_test_fname,
+    run_sniffers_raw,
 )
+from galaxy.util.hash_util import StreamingDigest
 
 
 def assert_converts_to_1234_convert_sep2tabs(content, expected="1\t2\n3\t4\n"):
@@ -109,3 +114,45 @@ def test_infer_from_filename():
     assert datatypes_registry.get_datatype_from_filename("mycool.fq").file_ext == "fastqsanger"
     assert datatypes_registry.get_datatype_from_filename("mycool.fq.gz").file_ext == "fastqsanger.gz"
     assert datatypes_registry.get_datatype_from_filename("mycool.fastq").file_ext == "fastqsanger"
+
+
+def test_sniff_order_index_matches_sniff_order():
+    datatypes_registry = example_datatype_registry_for_sample()
+    sniff_order_index = datatypes_registry.sniff_order_index
+    assert datatypes_registry.sniff_order_index is sniff_order_index
+    test_dir = os.path.dirname(get_test_fname("1.bed"))
+    for name in sorted(os.listdir(test_dir)):
+        path = os.path.join(test_dir, name)
+        if not os.path.isfile(path):
+            continue
+        expected = run_sniffers_raw(FilePrefix(path), datatypes_registry.sniff_order)
+        assert run_sniffers_raw(FilePrefix(path), sniff_order_index) == expected, name
+
+
+def test_convert_newlines_digest():
+    with tempfile.NamedTemporaryFile(delete=False, mode="wb") as tf:
+        tf.write(b"1 2\r3 4")
+    digest = StreamingDigest(["MD5", "SHA-1"])
+    rval = convert_newlines_sep2tabs(
+        tf.name, in_place=False, tmp_prefix="gxtest", tmp_dir=tempfile.gettempdir(), digest=digest
+    )
+    assert rval.converted_path
+    assert digest.covers(rval.converted_path)
+    assert not digest.covers(tf.name)
+    assert digest.hexdigests() == {
+        "MD5": hashlib.md5(b"1\t2\n3\t4\n").hexdigest(),
+        "SHA-1": hashlib.sha1(b"1\t2\n3\t4\n").hexdigest(),
+    }
+
+
+def test_sniff_order_index_skips_tar_sniffers():
+    datatypes_registry = example_datatype_registry_for_sample()
+
+    def candidate_extensions(fname):
+        file_prefix = FilePrefix(get_test_fname(fname))
+        return {datatype.file_ext for datatype in datatypes_registry.sniff_order_index.candidates(file_prefix)}
+
+    assert "brukerbaf.d.tar" in candidate_extensions("brukerbaf.d.tar")
+    assert "mongodb" in candidate_extensions("mongodb_fake.tar.bz2")
+    # a gzip (BGZF) compressed file that is not a tar archive
+    assert not {"brukerbaf.d.tar", "mongodb"} & candidate_extensions("1.bam")
@@ -1,10 +1,22 @@
+import gzip
+import os
 import tempfile
 
 from galaxy.datatypes.tabular import (
+    _update_column_type,
+    guess_column_type,
     MAX_DATA_LINES,
     Tabular,
+    type_overrules_type,
+)
+from galaxy.datatypes.util.line_index import (
+    line_offset,
+    LineIndex,
+)
+from .util import (
+    MockDataset,
+    MockMetadata,
 )
-from .util import MockDataset
 
 
 def test_tabular_set_meta_large_file():
@@ -15,3 +27,130 @@ def test_tabular_set_meta_large_file():
         dataset = MockDataset(id=1)
         dataset.file_name = test_file.name
         Tabular().set_meta(dataset)  # type: ignore [arg-type]
+
+
+def test_update_column_type_matches_per_value_guess():
+    values = ["1", "-2", "+3", "007", "1.5", ".5", "1e5", "na", " 4 ", "1_0", "a,b", "x", "", "inf", "\u0663"]
+    for i in range(len(values)):
+        for j in range(i, len(values) + 1):
+            for initial_type in [None, "int", "float", "list", "str"]:
+                expected = initial_type
+                for value in values[i:j]:
+                    value_type = guess_column_type(value)
+                    if type_overrules_type(value_type, expected):
+                        expected = value_type
+                assert _update_column_type(initial_type, values[i:j]) == expected
+
+
+def test_tabular_set_meta_column_types():
+    with tempfile.NamedTemporaryFile(mode="w") as test_file:
+        test_file.write("#header\n")
+        test_file.write("c1\tc2\tc3\tc4\n")
+        for i in range(1000):
+            test_file.write(f"{i}\t{i}.5\t{i},{i}\tchr{i % 3}\n")
+        test_file.write("\n1\tna\t\n")
+        test_file.flush()
+        dataset = MockDataset(id=1)
+        dataset.file_name = test_file.name
+        Tabular().set_meta(dataset, skip=1)  # type: ignore [arg-type]
+        assert dataset.metadata.column_types == ["str", "str", "str", "str"]
+        Tabular().set_meta(dataset, skip=2)  # type: ignore [arg-type]
+        assert dataset.metadata.column_types == ["int", "float", "list", "str"]
+        assert dataset.metadata.data_lines == 1001
+        assert dataset.metadata.comment_lines == 3
+        Tabular().set_meta(dataset, skip=2, max_data_lines=10)  # type: ignore [arg-type]
+        assert dataset.metadata.columns == 4
+        assert dataset.metadata.data_lines is None
+        assert dataset.metadata.comment_lines is None
+
+
+class RemoteOnlyObjectStore:
+    """Object store stand-in serving ranged reads of a local file it reports as remote."""
+
+    def __init__(self, path):
+        self.path = path
+        self.requests = []
+
+    def exists_locally(self, dataset):
+        return False
+
+    def get_data(self, dataset, start=0, count=-1):
+        self.requests.append((start, count))
+        with open(self.path, "rb") as fh:
+            fh.seek(start)
+            return fh.read(count).decode("utf-8", "surrogateescape")
+
+
+class RemoteDatasetInstance:
+    def __init__(self, object_store):
+        self.dataset = MockDataset(id=1)
+        self.dataset.object_store = object_store
+
+    @property
+    def file_name(self):
+        raise AssertionError("chunk reads should not materialize the dataset")
+
+
+def test_tabular_get_chunk_from_remote_object_store():
+    with tempfile.NamedTemporaryFile(mode="w") as test_file:
+        test_file.write("A\tB\nCCCCCCCC\tD\nE\tF\n")
+        test_file.flush()
+        object_store = RemoteOnlyObjectStore(test_file.name)
+        dataset = RemoteDatasetInstance(object_store)
+        ck_data, last_read = Tabular()._read_chunk(None, dataset, 0, 6)
+        assert ck_data == "A\tB\nCCCCCCCC\tD"
+        assert last_read == 15
+        assert object_store.requests[0] == (0, 6)
+        ck_data, last_read = Tabular()._read_chunk(None, dataset, last_read, 100)
+        assert ck_data == "E\tF\n"
+        assert last_read == 19
+
+
+def _write_line_index_test_file(path, opener=open):
+    with opener(path, "wt") as fh:
+        fh.write("#header\n")
+        for i in range(25):
+            fh.write(f"{i}\tline{i}\n")
+        fh.write("\n")
+        fh.write("last\tline")
+
+
+def test_line_index(tmp_path):
+    for opener in (open, gzip.open):
+        path = str(tmp_path / f"lines_{opener.__module__}.tabular")
+        _write_line_index_test_file(path, opener)
+        line_index = LineIndex.build(path, interval=4)
+        assert line_index.line_count == 28
+        assert line_index.data_line_count == 26
+        assert len(line_index.offsets) == 7
+        index_path = str(tmp_path / "lines.line_index")
+        line_index.write(index_path)
+        line_index = LineIndex.read(index_path)
+        assert line_index.interval == 4
+        with open(path, "rb") if opener is open else gzip.open(path, "rb") as fh:
+            lines = fh.readlines()
+        expected_offset = 0
+        for line_number, line in enumerate(lines):
+            assert line_offset(path, line_index, line_number) == expected_offset
+            assert line_offset(path, None, line_number) == expected_offset
+            expected_offset += len(line)
+        assert line_offset(path, line_index, 28) is None
+        assert line_offset(path, None, 28) is None
+
+
+def test_tabular_line_index_metadata(tmp_path):
+    path = str(tmp_path / "lines.tabular")
+    _write_line_index_test_file(path)
+    index_file = MockMetadata()
+    index_file.file_name = str(tmp_path / "lines.line_index")
+    LineIndex.build(path, interval=4).write(index_file.file_name)
+    dataset = MockDataset(id=1)
+    dataset.file_name = path
+    tabular = Tabular()
+    # counting without an index
+    assert tabular.count_data_lines(dataset) == 26
+    assert tabular.get_line_offset(dataset, 2) == len("#header\n0\tline0\n")
+    dataset.metadata.line_index = index_file  # type: ignore[attr-defined]
+    os.truncate(path, 0)
+    # the index is used instead of the (now empty) file
+    assert tabular.count_data_lines(dataset) == 26
@@ -57,6 +57,34 @@ def test_import_export_history():
     _assert_simple_cat_job_imported(imported_history)
 
 
+def test_import_export_history_parallel_gzip():
+    """Test a history export compressed on multiple threads can be imported again."""
+    app = _mock_app()
+
+    u, h, d1, d2, j = _setup_simple_cat_job(app)
+
+    imported_history = _import_export_history(app, h, export_files="symlink", compression_threads=4)
+
+    _assert_simple_cat_job_imported(imported_history)
+
+
+def test_failed_history_export_leaves_no_archive(tmp_path, monkeypatch):
+    """Test an export that fails while the archive is being written does not leave a partial archive behind."""
+    app = _mock_app()
+
+    u, h, d1, d2, j = _setup_simple_cat_job(app)
+
+    def add_file_and_fail(export_store, src, arcname):
+        export_store.archive.add(src, arcname=arcname)
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(store.TarModelExportStore, "_add_file", add_file_and_fail)
+    with pytest.raises(OSError):
+        with store.TarModelExportStore(tmp_path / "moo.tgz", app=app, export_files="copy") as export_store:
+            export_store.export_history(h)
+    assert list(tmp_path.iterdir()) == []
+
+
 def test_import_export_history_failed_job():
     """Test a simple job import/export, make sure state is maintained correctly."""
     app = _mock_app()
@@ -996,12 +1024,16 @@ def _setup_simple_invocation(app):
     return invocation
 
 
-def _import_export_history(app, h, dest_export=None, export_files=None, import_options=None, include_hidden=False):
+def _import_export_history(
+    app, h, dest_export=None, export_files=None, import_options=None, include_hidden=False, compression_threads=1
+):
     if dest_export is None:
         dest_parent = mkdtemp()
         dest_export = os.path.join(dest_parent, "moo.tgz")
 
-    with store.TarModelExportStore(dest_export, app=app, export_files=export_files) as export_store:
+    with store.TarModelExportStore(
+        dest_export, app=app, export_files=export_files, compression_threads=compression_threads
+    ) as export_store:
         export_store.export_history(h, include_hidden=include_hidden)
 
     imported_history = import_archive(dest_export, app, h.user, import_options=import_options)
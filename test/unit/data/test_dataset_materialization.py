@@ -1,10 +1,17 @@
+import fcntl
+from unittest import mock
+
+import pytest
 from pkg_resources import resource_string
 from sqlalchemy import select
 
+from galaxy.datatypes.sniff import stream_url_to_file
+from galaxy.exceptions import MalformedContents
 from galaxy.files.unittest_utils import TestPosixConfiguredFileSources
 from galaxy.model import (
     DatasetCollection,
     DatasetCollectionElement,
+    DatasetSourceHash,
     HistoryDatasetAssociation,
     HistoryDatasetCollectionAssociation,
     LibraryDatasetDatasetAssociation,
@@ -12,6 +19,7 @@ from galaxy.model import (
 )
 from galaxy.model.base import transaction
 from galaxy.model.deferred import (
+    MaterializationCache,
     materialize_collection_instance,
     materializer_factory,
 )
@@ -199,6 +207,73 @@ def test_deferred_hdas_basic_attached_file_sources(tmpdir):
     _assert_2_bed_metadata(materialized_hda)
 
 
+def test_deferred_hdas_materialization_cache(tmpdir):
+    root = tmpdir / "root"
+    root.mkdir()
+    (root / "2.bed").write_text(CONTENTS_2_BED, encoding="utf-8")
+    file_sources = TestPosixConfiguredFileSources(root)
+    fixture_context = setup_fixture_context_with_history()
+    store_dict = deferred_hda_model_store_dict(source_uri="gxfiles://test1/2.bed")
+    perform_import_from_store_dict(fixture_context, store_dict)
+    deferred_hda = fixture_context.history.datasets[0]
+    source_hash = DatasetSourceHash(hash_function="MD5", hash_value="f568c29421792b1b1df4474dafae01f1")
+    deferred_hda.dataset.sources[0].hashes.append(source_hash)
+    cache = MaterializationCache(str(tmpdir / "cache"), 1)
+    with mock.patch("galaxy.model.deferred.stream_url_to_file", wraps=stream_url_to_file) as stream:
+        for i in range(3):
+            materializer = materializer_factory(
+                False,
+                transient_directory=str(tmpdir / f"job_{i}"),
+                file_sources=file_sources,
+                materialization_cache=cache,
+            )
+            (tmpdir / f"job_{i}").mkdir()
+            materialized_hda = materializer.ensure_materialized(deferred_hda)
+            _assert_path_contains_2_bed(materialized_hda.dataset.external_filename)
+        assert stream.call_count == 1
+    key = MaterializationCache.cache_key(deferred_hda.dataset.sources[0])
+    assert [lock.basename for lock in (tmpdir / "cache" / "locks").listdir()] == [f"{key[:2]}.lock"]
+
+    # a source with different declared hashes is a different cache entry, and
+    # a mismatching hash is never cached
+    source_hash.hash_value = "moocow"
+    materializer = materializer_factory(False, transient_directory=str(tmpdir), file_sources=file_sources)
+    materializer._materialization_cache = cache
+    with pytest.raises(MalformedContents):
+        materializer.ensure_materialized(deferred_hda)
+    assert not (tmpdir / "cache" / "tmp").listdir()
+
+
+def test_materialization_cache_fetches_outside_lookup_lock(tmpdir):
+    root = tmpdir / "root"
+    root.mkdir()
+    (root / "2.bed").write_text(CONTENTS_2_BED, encoding="utf-8")
+    file_sources = TestPosixConfiguredFileSources(root)
+    fixture_context = setup_fixture_context_with_history()
+    store_dict = deferred_hda_model_store_dict(source_uri="gxfiles://test1/2.bed")
+    perform_import_from_store_dict(fixture_context, store_dict)
+    source = fixture_context.history.datasets[0].dataset.sources[0]
+    cache = MaterializationCache(str(tmpdir / "cache"), 1)
+    key = MaterializationCache.cache_key(source)
+    # a marker left behind by a process that died does not block the fetch
+    (tmpdir / "cache" / "in_progress" / "stale").write_text("", encoding="utf-8")
+
+    def fetch_while_unlocked(*args, **kwds):
+        with open(tmpdir / "cache" / "locks" / f"{key[:2]}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        with open(tmpdir / "cache" / "in_progress" / key) as marker:
+            with pytest.raises(BlockingIOError):
+                fcntl.flock(marker, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        return stream_url_to_file(*args, **kwds)
+
+    with mock.patch("galaxy.model.deferred.stream_url_to_file", side_effect=fetch_while_unlocked) as stream:
+        _assert_path_contains_2_bed(cache.fetch(source, file_sources))
+        _assert_path_contains_2_bed(cache.fetch(source, file_sources))
+        assert stream.call_count == 1
+    assert not (tmpdir / "cache" / "in_progress").listdir()
+    assert not (tmpdir / "cache" / "tmp").listdir()
+
+
 def test_deferred_hdas_with_deferred_metadata():
     fixture_context = setup_fixture_context_with_history()
     store_dict = deferred_hda_model_store_dict(metadata_deferred=True)
@@ -973,6 +973,43 @@ class TestMappings(BaseModelTestCase):
         assert security_agent.can_manage_dataset(u_from.all_roles(), d1.dataset)
         assert not security_agent.can_manage_dataset(u_other.all_roles(), d1.dataset)
 
+    def test_dataset_access_oracle(self):
+        security_agent = GalaxyRBACAgent(self.model)
+        u_from, u_to, u_other = self._three_users("access_oracle")
+
+        h = model.History(name="History for Access Oracle", user=u_from)
+        public, private, shared = (
+            model.HistoryDatasetAssociation(
+                extension="txt", history=h, create_dataset=True, sa_session=self.model.session
+            )
+            for _ in range(3)
+        )
+        self.persist(h, public, private, shared)
+        self._make_private(security_agent, u_from, private)
+        security_agent.privately_share_dataset(shared.dataset, [u_to])
+        datasets = [public.dataset, private.dataset, shared.dataset]
+
+        for user in (u_from, u_to, u_other):
+            user_roles = user.all_roles()
+            expected = [security_agent.can_access_dataset(user_roles, dataset) for dataset in datasets]
+            for dataset in datasets:
+                self.model.session.expire(dataset, ["actions"])
+            oracle = security_agent.dataset_access_oracle(user_roles)
+            oracle.prefetch(datasets)
+            assert len(oracle._dataset_action_tuples) == 3
+            assert [oracle.can_access_dataset(dataset) for dataset in datasets] == expected
+        assert expected == [True, False, False]
+
+        # permissions that have not been flushed yet are taken into account
+        oracle = security_agent.dataset_access_oracle(u_other.all_roles())
+        private_role = security_agent.get_private_user_role(u_from)
+        public_dataset = public.dataset
+        self.model.session.expire(public_dataset, ["actions"])
+        oracle.prefetch([public_dataset])
+        assert oracle.can_access_dataset(public_dataset)
+        model.DatasetPermissions(security_agent.permitted_actions.DATASET_ACCESS.action, public_dataset, private_role)
+        assert not oracle.can_access_dataset(public_dataset)
+
     def test_history_hid_counter_is_expired_after_next_hid_call(self):
         u = model.User(email="hid_abuser@example.com", password="password")
         h = model.History(name="History for hid testing", user=u)
@@ -0,0 +1,152 @@
+import json
+from unittest import mock
+
+from galaxy import model
+from galaxy.managers.jobs import JobSearch
+from galaxy.model.job_fingerprint import (
+    compute_job_fingerprint,
+    has_current_fingerprint,
+    job_fingerprint_from_parameters,
+    session_dataset_token_resolver,
+    set_job_fingerprint,
+)
+from galaxy.security.idencoding import IdEncodingHelper
+from galaxy.util.bunch import Bunch
+from .test_galaxy_mapping import BaseModelTestCase
+
+
+class TestJobFingerprint(BaseModelTestCase):
+    def _hda(self, history, name="input.txt", dataset=None, state=model.Dataset.states.OK):
+        hda = model.HistoryDatasetAssociation(
+            history=history,
+            name=name,
+            extension="txt",
+            dataset=dataset,
+            create_dataset=dataset is None,
+            sa_session=self.model.session,
+        )
+        hda.dataset.state = state
+        self.persist(hda)
+        return hda
+
+    def _fingerprint(self, param_dump, tool_version="1.0"):
+        return compute_job_fingerprint(
+            "cat1", tool_version, param_dump, session_dataset_token_resolver(self.model.session)
+        )
+
+    def test_fingerprint_of_copies(self):
+        history = self.persist(model.History())
+        hda = self._hda(history)
+        copied_hda = self._hda(history, dataset=hda.dataset)
+        other_hda = self._hda(history)
+        fingerprint = self._fingerprint({"input1": {"values": [{"id": hda.id, "src": "hda"}]}, "p": 1})
+        assert fingerprint is not None
+        # copies of an input share the underlying dataset
+        assert fingerprint == self._fingerprint(
+            {"input1": {"values": [{"id": copied_hda.id, "src": "hda"}]}, "p": 1, "chromInfo": "x.len"}
+        )
+        assert fingerprint != self._fingerprint({"input1": {"values": [{"id": other_hda.id, "src": "hda"}]}, "p": 1})
+        assert fingerprint != self._fingerprint({"input1": {"values": [{"id": hda.id, "src": "hda"}]}, "p": 2})
+        assert fingerprint != self._fingerprint(
+            {"input1": {"values": [{"id": hda.id, "src": "hda"}]}, "p": 1}, tool_version="2.0"
+        )
+
+    def test_no_fingerprint_for_pending_inputs(self):
+        history = self.persist(model.History())
+        hda = self._hda(history, state=model.Dataset.states.QUEUED)
+        assert self._fingerprint({"input1": {"values": [{"id": hda.id, "src": "hda"}]}}) is None
+        assert self._fingerprint({"input1": {"values": [{"id": hda.id, "src": "unknown"}]}}) is not None
+
+    def test_fingerprint_from_job_parameters(self):
+        history = self.persist(model.History())
+        hda = self._hda(history)
+        param_dump = {"input1": {"values": [{"id": hda.id, "src": "hda"}]}, "p": "a"}
+        job = model.Job()
+        job.tool_id = "cat1"
+        job.tool_version = "1.0"
+        for name, value in param_dump.items():
+            job.add_parameter(name, json.dumps(value, sort_keys=True))
+        job.add_parameter("__workflow_invocation_uuid__", json.dumps("abc"))
+        job.add_input_dataset("input1", dataset=hda)
+        self.persist(job)
+        assert job_fingerprint_from_parameters(self.model.session, job) == self._fingerprint(param_dump)
+
+    def test_fingerprint_excludes_chrom_info_only(self):
+        history = self.persist(model.History())
+        hda = self._hda(history)
+        param_dump = {"input1": {"values": [{"id": hda.id, "src": "hda"}]}, "dbkey": "hg19"}
+        assert self._fingerprint(param_dump) != self._fingerprint(dict(param_dump, dbkey="mm10"))
+        assert self._fingerprint(param_dump) == self._fingerprint(dict(param_dump, chromInfo="hg19.len"))
+
+
+class TestJobSearch(BaseModelTestCase):
+    def setUp(self):
+        self.user = self.persist(model.User(email="jobsearch@example.org", password="password"))
+        self.history = self.persist(model.History(user=self.user))
+        self.hda = model.HistoryDatasetAssociation(
+            history=self.history, name="input.txt", extension="txt", create_dataset=True, sa_session=self.model.session
+        )
+        self.hda.dataset.state = model.Dataset.states.OK
+        self.persist(self.hda)
+        self.param_dump = {"input1": {"values": [{"id": self.hda.id, "src": "hda"}]}, "p": "a"}
+        self.job_search = JobSearch(
+            self.model.session,
+            hda_manager=mock.Mock(),
+            dataset_collection_manager=mock.Mock(),
+            ldda_manager=mock.Mock(),
+            id_encoding_helper=IdEncodingHelper(id_secret="jobsearch"),
+        )
+
+    def _job(self, fingerprint=None, fingerprint_version=None, with_parameters=True):
+        job = model.Job()
+        job.user = self.user
+        job.history = self.history
+        job.tool_id = "cat1"
+        job.tool_version = "1.0"
+        job.state = model.Job.states.OK
+        job.fingerprint = fingerprint
+        job.fingerprint_version = fingerprint_version
+        if with_parameters:
+            for name, value in self.param_dump.items():
+                job.add_parameter(name, json.dumps(value, sort_keys=True))
+        job.add_input_dataset("input1", dataset=self.hda)
+        return self.persist(job)
+
+    def _search(self):
+        return self.job_search.by_tool_input(
+            trans=Bunch(user=self.user),
+            tool_id="cat1",
+            tool_version="1.0",
+            param={"input1": [self.hda], "p": "a"},
+            param_dump=self.param_dump,
+        )
+
+    def _fingerprint(self):
+        fingerprint = compute_job_fingerprint(
+            "cat1", "1.0", self.param_dump, session_dataset_token_resolver(self.model.session)
+        )
+        assert fingerprint is not None
+        return fingerprint
+
+    def test_hit_by_fingerprint(self):
+        # without parameters the job can only be found by its fingerprint
+        job = self._job(with_parameters=False)
+        set_job_fingerprint(job, self._fingerprint())
+        self.persist(job)
+        assert has_current_fingerprint(job)
+        assert self._search() is job
+
+    def test_hit_on_legacy_job(self):
+        job = self._job()
+        assert self._search() is job
+
+    def test_hit_on_job_with_outdated_fingerprint(self):
+        job = self._job(fingerprint="0" * 64)
+        assert self._search() is job
+
+    def test_no_parameter_search_on_job_with_current_fingerprint(self):
+        # a current fingerprint that does not match means the job does not match
+        job = self._job()
+        set_job_fingerprint(job, "0" * 64)
+        self.persist(job)
+        assert self._search() is None
@@ -1,11 +1,15 @@
 import uuid
+from unittest import mock
 
 from galaxy import model
 from galaxy.objectstore import (
     QuotaSourceInfo,
     QuotaSourceMap,
 )
-from galaxy.quota import DatabaseQuotaAgent
+from galaxy.quota import (
+    DatabaseQuotaAgent,
+    reconcile_user_disk_usage,
+)
 from .test_galaxy_mapping import (
     BaseModelTestCase,
     MockObjectStore,
@@ -284,6 +288,79 @@ class TestCalculateUsage(BaseModelTestCase):
         assert usages[1].quota_source_label == "alt_source"
         assert usages[1].total_disk_usage == 15
 
+    def test_reconcile_usage(self):
+        u = self.u
+        self._add_dataset(10)
+        object_store = MockObjectStore()
+        u.calculate_and_set_disk_usage(object_store)
+
+        # counter drifts from the actual usage
+        u.adjust_total_disk_usage(5, None, reason="job_output")
+        self.persist(u)
+        self._refresh_user_and_assert_disk_usage_is(15)
+        assert self._ledger() == [(None, 5, "job_output")]
+
+        assert self._reconcile(object_store) == [(u.id, None, 15, 10)]
+        self._refresh_user_and_assert_disk_usage_is(10)
+        assert self._ledger() == [(None, 10, "reconciled")]
+
+        # users without recorded adjustments are not recalculated again
+        with self._no_recalculation():
+            assert self._reconcile(object_store) == []
+        assert self._ledger() == [(None, 10, "reconciled")]
+
+    def test_reconcile_usage_sums_deltas(self):
+        u = self.u
+        self._add_dataset(10)
+        object_store = MockObjectStore()
+        # users are recalculated on their first reconciliation
+        u.adjust_total_disk_usage(10, None, reason="job_output")
+        self.persist(u)
+        assert self._reconcile(object_store) == []
+        assert self._ledger() == [(None, 10, "reconciled")]
+
+        self._add_dataset(5)
+        u.adjust_total_disk_usage(5, None, reason="job_output")
+        self.persist(u)
+        with self._no_recalculation():
+            assert self._reconcile(object_store) == []
+        self._refresh_user_and_assert_disk_usage_is(15)
+        assert self._ledger() == [(None, 15, "reconciled")]
+
+        # a counter changed without recording the adjustment is recalculated
+        u.disk_usage = 20
+        self.persist(u)
+        u.adjust_total_disk_usage(1, None, reason="job_output")
+        self.persist(u)
+        assert self._reconcile(object_store) == [(u.id, None, 21, 15)]
+        self._refresh_user_and_assert_disk_usage_is(15)
+        assert self._ledger() == [(None, 15, "reconciled")]
+
+    def test_reconcile_usage_samples_users(self):
+        u = self.u
+        self._add_dataset(10)
+        object_store = MockObjectStore()
+        u.calculate_and_set_disk_usage(object_store)
+        self._reconcile(object_store)
+
+        u.disk_usage = 20
+        self.persist(u)
+        assert self._reconcile(object_store) == []
+        assert self._reconcile(object_store, sample_size=1000) == [(u.id, None, 20, 10)]
+        self._refresh_user_and_assert_disk_usage_is(10)
+        assert self._ledger() == [(None, 10, "reconciled")]
+
+    def _reconcile(self, object_store, **kwd):
+        drifts = reconcile_user_disk_usage(self.model.session, object_store, **kwd)
+        return [drift for drift in drifts if drift.user_id == self.u.id]
+
+    def _ledger(self):
+        deltas = self.model.session.query(model.UserDiskUsageDelta).filter_by(user_id=self.u.id)
+        return [(delta.quota_source_label, int(delta.amount), delta.reason) for delta in deltas]
+
+    def _no_recalculation(self):
+        return mock.patch.object(model.User, "calculate_and_set_disk_usage", side_effect=AssertionError("recalculated"))
+
     def _refresh_user_and_assert_disk_usage_is(self, usage):
         u = self.u
         self.model.context.refresh(u)
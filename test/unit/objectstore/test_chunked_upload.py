@@ -0,0 +1,141 @@
+import hashlib
+import os
+import threading
+import time
+
+import pytest
+
+from galaxy.objectstore.caching import _get_cache_size_files
+from galaxy.objectstore.chunked_upload import (
+    chunked_upload,
+    forget_upload,
+    recorded_hexdigest,
+    upload_state_path,
+    UploadTarget,
+)
+from galaxy.util.hash_util import HashFunctionNameEnum
+
+PART_SIZE = 1024
+
+
+class FakeTarget(UploadTarget):
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.uploads = {}
+        self.upload_count = 0
+        self.completed = {}
+        self.uploaded_numbers = []
+        self.lock = threading.Lock()
+
+    def begin(self):
+        self.upload_count += 1
+        upload_id = str(self.upload_count)
+        self.uploads[upload_id] = {}
+        return upload_id
+
+    def uploaded_parts(self, upload_id):
+        if upload_id not in self.uploads:
+            return None
+        return set(self.uploads[upload_id])
+
+    def upload_part(self, upload_id, number, data, md5):
+        if number == self.fail_on:
+            raise OSError("connection reset")
+        assert hashlib.md5(data).hexdigest() == md5
+        with self.lock:
+            self.uploads[upload_id][number] = data
+            self.uploaded_numbers.append(number)
+
+    def complete(self, upload_id, numbers):
+        parts = self.uploads.pop(upload_id)
+        self.completed[upload_id] = b"".join(parts[number] for number in numbers)
+
+    def abort(self, upload_id):
+        self.uploads.pop(upload_id, None)
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    path = tmp_path / "dataset_1.dat"
+    path.write_bytes(os.urandom(PART_SIZE * 10 + 17))
+    return str(path)
+
+
+def test_chunked_upload(tmp_path, source_file):
+    target = FakeTarget()
+    state_path = upload_state_path(str(tmp_path / "cache"), "000/dataset_1.dat")
+    hashes = chunked_upload(
+        target,
+        source_file,
+        state_path,
+        PART_SIZE,
+        threads=4,
+        hash_functions=[HashFunctionNameEnum.md5, HashFunctionNameEnum.sha256],
+    )
+    content = open(source_file, "rb").read()
+    assert target.completed["1"] == content
+    assert sorted(target.uploaded_numbers) == list(range(1, 12))
+    assert hashes == {"MD5": hashlib.md5(content).hexdigest(), "SHA-256": hashlib.sha256(content).hexdigest()}
+    # the upload state is dropped once the upload is complete
+    assert not os.path.exists(state_path)
+    assert recorded_hexdigest(state_path, HashFunctionNameEnum.sha256, len(content)) == hashes["SHA-256"]
+    assert recorded_hexdigest(state_path, HashFunctionNameEnum.sha256, len(content) - 1) is None
+    assert recorded_hexdigest(state_path, HashFunctionNameEnum.sha512, len(content)) is None
+    forget_upload(str(tmp_path / "cache"), "000/dataset_1.dat")
+    assert recorded_hexdigest(state_path, HashFunctionNameEnum.sha256, len(content)) is None
+
+
+def test_chunked_upload_resumes(tmp_path, source_file):
+    target = FakeTarget(fail_on=6)
+    state_path = upload_state_path(str(tmp_path / "cache"), "000/dataset_1.dat")
+    with pytest.raises(OSError):
+        chunked_upload(target, source_file, state_path, PART_SIZE)
+    assert target.uploaded_numbers == [1, 2, 3, 4, 5]
+    target.fail_on = None
+    target.uploaded_numbers = []
+    chunked_upload(target, source_file, state_path, PART_SIZE, threads=2)
+    assert sorted(target.uploaded_numbers) == list(range(6, 12))
+    assert target.completed["1"] == open(source_file, "rb").read()
+
+
+def test_chunked_upload_restarts_modified_file(tmp_path, source_file):
+    target = FakeTarget(fail_on=6)
+    state_path = upload_state_path(str(tmp_path / "cache"), "000/dataset_1.dat")
+    with pytest.raises(OSError):
+        chunked_upload(target, source_file, state_path, PART_SIZE)
+    with open(source_file, "ab") as fh:
+        fh.write(b"more")
+    target.fail_on = None
+    target.uploaded_numbers = []
+    chunked_upload(target, source_file, state_path, PART_SIZE)
+    # the stale upload is aborted and the file uploaded from scratch
+    assert "1" not in target.uploads
+    assert sorted(target.uploaded_numbers) == list(range(1, 12))
+    assert target.completed["2"] == open(source_file, "rb").read()
+
+
+def test_upload_state_not_in_cache_size(tmp_path, source_file):
+    cache_path = str(tmp_path / "cache")
+    chunked_upload(FakeTarget(), source_file, upload_state_path(cache_path, "000/dataset_1.dat"), PART_SIZE)
+    assert _get_cache_size_files(cache_path) == (0, [])
+
+
+def test_chunked_upload_bounds_in_flight_bytes(tmp_path, source_file):
+    in_flight = []
+    max_in_flight = []
+
+    class SlowTarget(FakeTarget):
+        def upload_part(self, upload_id, number, data, md5):
+            with self.lock:
+                in_flight.append(len(data))
+                max_in_flight.append(sum(in_flight))
+            time.sleep(0.01)
+            with self.lock:
+                in_flight.remove(len(data))
+            super().upload_part(upload_id, number, data, md5)
+
+    target = SlowTarget()
+    state_path = upload_state_path(str(tmp_path / "cache"), "000/dataset_1.dat")
+    chunked_upload(target, source_file, state_path, PART_SIZE, threads=4, max_in_flight_bytes=2 * PART_SIZE)
+    assert max(max_in_flight) <= 2 * PART_SIZE
+    assert target.completed["1"] == open(source_file, "rb").read()
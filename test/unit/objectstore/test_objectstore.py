@@ -9,12 +9,18 @@ from uuid import uuid4
 
 import pytest
 
-from galaxy.exceptions import ObjectInvalid
+from galaxy.exceptions import (
+    ConfigurationError,
+    ObjectInvalid,
+)
+from galaxy.objectstore import ObjectStore
 from galaxy.objectstore.azure_blob import AzureBlobObjectStore
 from galaxy.objectstore.caching import (
     CacheTarget,
     check_cache,
+    get_cache_index,
     InProcessCacheMonitor,
+    validate_eviction_policy,
 )
 from galaxy.objectstore.cloud import Cloud
 from galaxy.objectstore.pithos import PithosObjectStore
@@ -827,6 +833,52 @@ def test_config_parse_s3():
             assert len(extra_dirs) == 2
 
 
+class MockS3Key:
+    def __init__(self, content):
+        self.content = content
+        self.size = len(content)
+        self.ranges_requested = []
+
+    def get_contents_as_string(self, headers=None):
+        byte_range = headers["Range"]
+        self.ranges_requested.append(byte_range)
+        start, end = byte_range[len("bytes=") :].split("-")
+        return self.content[int(start) : int(end) + 1]
+
+
+class MockS3Bucket:
+    name = "mock_bucket"
+
+    def __init__(self, keys):
+        self.keys = keys
+
+    def get_key(self, rel_path):
+        return self.keys.get(rel_path)
+
+
+def test_exists_locally_not_abstract():
+    # object stores implemented outside of Galaxy do not need to implement it
+    assert "exists_locally" not in ObjectStore.__abstractmethods__
+
+
+def test_s3_get_data_range_without_caching():
+    with TestConfig(S3_TEST_CONFIG, clazz=UninitializedS3ObjectStore) as (directory, object_store):
+        dataset = MockDataset(1)
+        rel_path = object_store._construct_path(dataset)
+        key = MockS3Key("chr1\t100\nchr2\t\u00e9200\n".encode())
+        object_store._bucket = MockS3Bucket({rel_path: key})
+
+        assert not object_store.exists_locally(dataset)
+        assert object_store.get_data(dataset, start=5, count=4) == "100\n"
+        assert key.ranges_requested == ["bytes=5-8"]
+        # split multi-byte characters survive a round trip back to bytes
+        first = object_store.get_data(dataset, start=9, count=6)
+        second = object_store.get_data(dataset, start=15, count=10)
+        assert (first + second).encode("utf-8", "surrogateescape").decode() == "chr2\t\u00e9200\n"
+        assert object_store.get_data(dataset, start=100, count=10) == ""
+        assert not os.path.exists(object_store._get_cache_path(rel_path))
+
+
 S3_DEFAULT_CACHE_TEST_CONFIG = """<object_store type="s3" private="true">
      <auth access_key="access_moo" secret_key="secret_cow" />
      <bucket name="unique_bucket_name_all_lowercase" use_reduced_redundancy="False" />
@@ -1212,6 +1264,59 @@ def test_check_cache_sanity(tmp_path):
     assert not path.exists()
 
 
+def test_check_cache_with_index_lru(tmp_path):
+    cache_dir = tmp_path
+    paths = []
+    for i in range(3):
+        path = cache_dir / f"a_file_{i}"
+        path.write_text("x" * 100)
+        paths.append(path)
+    cache_index = get_cache_index(str(cache_dir))
+    cache_index.reconcile()
+    assert cache_index.total_size() == 300
+    # touch files in reverse order, so a_file_2 is least recently used
+    for path in reversed(paths):
+        cache_index.record_access(str(path))
+    # cache limit allowing two of the three files
+    cache_target = CacheTarget(str(cache_dir), 1, 250 / (1024 * 1024 * 1024), "lru")
+    check_cache(cache_target)
+    assert paths[0].exists()
+    assert paths[1].exists()
+    assert not paths[2].exists()
+    assert cache_index.total_size() == 200
+
+
+def test_check_cache_with_index_lfu(tmp_path):
+    cache_dir = tmp_path
+    hot = cache_dir / "hot"
+    hot.write_text("x" * 100)
+    cold = cache_dir / "cold"
+    cold.write_text("x" * 100)
+    cache_index = get_cache_index(str(cache_dir))
+    cache_index.record_access(str(cold))
+    for _ in range(3):
+        cache_index.record_access(str(hot))
+    cache_index.record_access(str(cold))
+    cache_target = CacheTarget(str(cache_dir), 1, 150 / (1024 * 1024 * 1024), "lfu")
+    check_cache(cache_target)
+    assert hot.exists()
+    assert not cold.exists()
+
+
+def test_cache_index_creates_cache_dir(tmp_path):
+    cache_dir = tmp_path / "not_yet_created"
+    cache_index = get_cache_index(str(cache_dir))
+    assert cache_index.total_size() == 0
+    assert cache_dir.is_dir()
+
+
+def test_validate_eviction_policy():
+    assert validate_eviction_policy(None) is None
+    assert validate_eviction_policy("lfu") == "lfu"
+    with pytest.raises(ConfigurationError, match="'lruu'"):
+        validate_eviction_policy("lruu")
+
+
 def test_fits_in_cache_check(tmp_path):
     cache_dir = tmp_path
     big_cache_target = CacheTarget(cache_dir, 1, 0.2)
@@ -51,6 +51,32 @@ def test_reload_by_name(tdt_manager, tmp_path):
     assert len(tdt_manager["testalpha"].data) == 3
 
 
+def test_get_entries(tdt_manager, tmp_path):
+    table = tdt_manager["testalpha"]
+    assert table.get_entry("value", "data1", "name") == "data1name"
+    assert table.get_entry("value", "data3", "name") is None
+    assert table.get_entries("value", "data2", None) == [
+        {"value": "data2", "name": "data2name", "path": str(tmp_path / "data2" / "entry.txt")}
+    ]
+    assert table.get_entries_many("name", ["data1name", "data2name", "missing"], "value") == {
+        "data1name": ["data1"],
+        "data2name": ["data2"],
+        "missing": [],
+    }
+    assert table.get_entries_many("unknown", ["data1"], "value") == {}
+
+
+def test_get_entries_after_changes(tdt_manager, tmp_path):
+    table = tdt_manager["testalpha"]
+    assert table.get_entry("value", "data3", "name") is None
+    table.add_entry(["data3", "data3name", "/data3"])
+    assert table.get_entry("value", "data3", "name") == "data3name"
+    loc1 = tmp_path / "testalpha.loc"
+    loc1.write_text(LOC_ALPHA_CONTENTS_V2)
+    tdt_manager.reload_tables("testalpha")
+    assert table.get_entries("value", "data3", "path") == [str(tmp_path / "data3" / "entry.txt")]
+
+
 def test_merging_tables(merged_tdt_manager):
     assert len(merged_tdt_manager["testbeta"].data) == 2
 
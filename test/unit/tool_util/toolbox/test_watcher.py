@@ -44,6 +44,7 @@ def test_tool_conf_watcher():
         with open(tool_conf_path, "w") as f:
             f.write("b")
         wait_for_reload(lambda: callback.called)
+        assert callback.changed_paths == [tool_conf_path]
         conf_watcher.shutdown()
         assert conf_watcher.thread is None
 
@@ -73,8 +74,9 @@ class CallbackRecorder:
     def __init__(self):
         self.called = False
 
-    def call(self):
+    def call(self, changed_paths):
         self.called = True
+        self.changed_paths = changed_paths
 
 
 @contextmanager
@@ -1,9 +1,13 @@
+import gzip
+import io
+import os
 import shutil
 import tempfile
 
 from galaxy.util.compression_utils import (
     CompressedFile,
     get_fileobj_raw,
+    ParallelGzipWriter,
 )
 from galaxy.util.unittest import TestCase
 
@@ -26,6 +30,17 @@ class TestCompressionUtil(TestCase):
         self.assert_format_detected("test-data/4.bed.bz2", "bz2")
         self.assert_format_detected("test-data/4.bed.bz2", None, ["gzip", "zip"])
 
+    def test_parallel_gzip_writer(self):
+        data = os.urandom(10000) + b"a" * 10000
+        out = io.BytesIO()
+        with ParallelGzipWriter(out, threads=3, block_size=1000) as writer:
+            for i in range(0, len(data), 333):
+                writer.write(data[i : i + 333])
+        assert gzip.decompress(out.getvalue()) == data
+        empty = io.BytesIO()
+        ParallelGzipWriter(empty, threads=2).close()
+        assert gzip.decompress(empty.getvalue()) == b""
+
     def assert_safety(self, path, expected_to_be_safe):
         temp_dir = tempfile.mkdtemp()
         try:
@@ -0,0 +1,48 @@
+import pytest
+
+from galaxy.util.spans import (
+    span,
+    spanned,
+    SpanRecorder,
+)
+
+
+@spanned("inner")
+def _inner():
+    with span("leaf"):
+        pass
+
+
+def test_nested_spans_are_aggregated_and_persisted():
+    persisted = []
+    recorder = SpanRecorder(persist=persisted.extend)
+    with recorder.span("handler"):
+        pass
+    assert [s.name for s in recorder.pending] == ["handler"]
+    with recorder.span("runner", persist=True):
+        _inner()
+        _inner()
+    assert not recorder.pending
+    spans = {s.name: s for s in persisted}
+    assert set(spans) == {"handler", "runner", "runner/inner", "runner/inner/leaf"}
+    assert spans["runner/inner"].occurrences == 2
+    assert spans["runner"].duration >= spans["runner/inner"].duration
+
+
+def test_spans_are_kept_on_failure():
+    persisted = []
+    recorder = SpanRecorder(persist=persisted.extend)
+    with pytest.raises(ValueError):
+        with recorder.span("runner", persist=True):
+            raise ValueError()
+    assert not persisted
+    assert [s.name for s in recorder.pending] == ["runner"]
+
+
+def test_disabled_recorder():
+    recorder = SpanRecorder(persist=None, enabled=False)
+    with recorder.span("runner", persist=True):
+        _inner()
+    assert not recorder.pending
+    # spans without an active recorder are ignored
+    _inner()
@@ -0,0 +1,86 @@
+from galaxy import model
+from galaxy.model.base import transaction
+from galaxy.util.unittest import TestCase
+from galaxy.workflow.invocation_state import (
+    InvocationStateGraph,
+    InvocationStateGraphCache,
+)
+from .workflow_support import (
+    MockApp,
+    yaml_to_model,
+)
+
+TEST_WORKFLOW_YAML = """
+steps:
+  - type: "data_input"
+    tool_inputs: {"name": "input1"}
+  - type: "tool"
+    tool_id: "cat1"
+    inputs:
+      "input1":
+        connections:
+        - "@output_step": 0
+          output_name: "output"
+"""
+
+
+class TestInvocationStateGraph(TestCase):
+    def setUp(self):
+        self.app = MockApp()
+        self.sa_session = self.app.model.context
+        self.history = model.History()
+        self.invocation = model.WorkflowInvocation()
+        self.invocation.workflow = yaml_to_model(TEST_WORKFLOW_YAML)
+        self.invocation.history = self.history
+        self.sa_session.add(self.invocation)
+
+    def _scheduled_step(self, index, outputs):
+        invocation_step = model.WorkflowInvocationStep()
+        invocation_step.workflow_invocation = self.invocation
+        invocation_step.workflow_step = self.invocation.workflow.steps[index]
+        invocation_step.state = "scheduled"
+        for output_name, output in outputs.items():
+            invocation_step.add_output(output_name, output)
+        return invocation_step
+
+    def _flush(self):
+        with transaction(self.sa_session):
+            self.sa_session.commit()
+
+    def test_resolve_scheduled_steps(self):
+        hda = model.HistoryDatasetAssociation(history=self.history, create_dataset=True, sa_session=self.sa_session)
+        hdca = model.HistoryDatasetCollectionAssociation(history=self.history)
+        hdca.collection = model.DatasetCollection(collection_type="list")
+        input_step = self._scheduled_step(0, {"output": hda})
+        self._flush()
+
+        graph = InvocationStateGraph(self.invocation.id)
+        recovered = graph.resolve(self.sa_session, self.invocation, [input_step])
+        assert recovered == {input_step.id: {"output": hda}}
+        assert len(graph) == 1
+
+        # steps scheduled later are added incrementally
+        tool_step = self._scheduled_step(1, {"out_file1": hdca})
+        self._flush()
+        self.sa_session.expire_all()
+        recovered = graph.resolve(self.sa_session, self.invocation, [input_step, tool_step])
+        assert len(graph) == 2
+        assert recovered[input_step.id]["output"].id == hda.id
+        assert recovered[tool_step.id]["out_file1"].id == hdca.id
+        assert graph.step_outputs[tool_step.id] == {"out_file1": ("hdca", hdca.id)}
+
+
+def test_state_graph_cache():
+    cache = InvocationStateGraphCache(max_size=2)
+    graph = cache.get(1)
+    assert cache.get(1) is graph
+    cache.get(2)
+    cache.get(1)
+    cache.get(3)
+    # least recently used graph is evicted
+    assert len(cache) == 2
+    assert cache.get(1) is graph
+    cache.discard(1)
+    assert cache.get(1) is not graph
+    # unsaved invocations are not cached
+    assert cache.get(None) is not cache.get(None)
@@ -0,0 +1,26 @@
+from galaxy.workflow.scheduling_manager import fair_share_order
+
+
+def test_fair_share_order_round_robin_by_user():
+    invocations = [
+        (1, 10, 1),
+        (2, 10, 1),
+        (3, 11, 1),
+        (4, 20, 2),
+        (5, 30, 3),
+        (6, 20, 2),
+    ]
+    ordered = fair_share_order(invocations)
+    assert [invocation[0] for invocation in ordered] == [1, 4, 5, 2, 6, 3]
+
+
+def test_fair_share_order_anonymous_users_share_a_slot():
+    invocations = [(3, 2, None), (1, 1, None), (2, 3, 7)]
+    assert [invocation[0] for invocation in fair_share_order(invocations)] == [1, 2, 3]
+
+
+def test_fair_share_order_with_priorities():
+    invocations = [(1, 10, 1), (2, 11, 1), (3, 20, 2)]
+    # invocation 1 was scheduled most recently, invocation 2 is in flight
+    priorities = {1: 5.0, 2: 0.0, 3: 4.0}
+    assert [invocation[0] for invocation in fair_share_order(invocations, priorities)] == [2, 3, 1]
@@ -172,6 +172,25 @@ class TestWorkflowProgress(TestCase):
         replacement = progress.replacement_for_input(self._step(4), step_dict)
         assert replacement is hda3
 
+    def test_maximum_jobs_to_schedule_with_time_slice(self):
+        self._setup_workflow(TEST_WORKFLOW_YAML)
+        progress = WorkflowProgress(
+            self.invocation,
+            self.inputs_by_step_id,
+            MockModuleInjector(self.progress),
+            {},
+            jobs_per_scheduling_iteration=10,
+            seconds_per_scheduling_iteration=60,
+        )
+        assert progress.maximum_jobs_to_schedule_or_none == 10
+        progress.scheduling_iteration_start -= 120
+        # the time slice only ends an iteration once it scheduled jobs
+        assert progress.maximum_jobs_to_schedule_or_none == 10
+        progress.record_executed_job_count(4)
+        assert progress.maximum_jobs_to_schedule_or_none == 0
+        progress.scheduling_iteration_start += 120
+        assert progress.maximum_jobs_to_schedule_or_none == 6
+
     # TODO: Replace multiple true HDA with HDCA
     # TODO: Test explicit delay
     # TODO: Test cancel on collection invalid